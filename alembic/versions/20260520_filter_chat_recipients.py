@@ -0,0 +1,38 @@
+"""add filter_chat_recipients table — чат → пользователи для дедупликации в группах
+
+Заменяет LIKE-сканирование sniper_filters.notify_chat_ids. Таблица
+заполняется из notify_chat_ids при старте сервиса мониторинга.
+
+Revision ID: 20260520_chat_recipients
+Revises: 20260504_own_products
+Create Date: 2026-05-20
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '20260520_chat_recipients'
+down_revision: Union[str, None] = '20260504_own_products'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'filter_chat_recipients',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('filter_id', sa.Integer(),
+                  sa.ForeignKey('sniper_filters.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(),
+                  sa.ForeignKey('sniper_users.id', ondelete='CASCADE'), nullable=False),
+        sa.UniqueConstraint('chat_id', 'filter_id', name='uq_filter_chat_recipients_chat_filter'),
+    )
+    op.create_index('ix_filter_chat_recipients_filter_id', 'filter_chat_recipients', ['filter_id'])
+    op.create_index('ix_filter_chat_recipients_chat_user', 'filter_chat_recipients', ['chat_id', 'user_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('filter_chat_recipients')
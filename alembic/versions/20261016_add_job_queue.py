@@ -0,0 +1,53 @@
+"""add background_jobs and leader_leases — очередь фоновых задач и выбор лидера
+
+Процесс бота делится на роли (bot/sniper/scheduler/web/worker):
+тяжёлые задачи идут через background_jobs, периодические — только
+на реплике, держащей аренду в leader_leases.
+
+Revision ID: 20261016_job_queue
+Revises: 20260520_chat_recipients
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '20261016_job_queue'
+down_revision: Union[str, None] = '20260520_chat_recipients'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_type', sa.String(100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='100'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('run_after', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('locked_by', sa.String(100), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('dedup_key', sa.String(255), nullable=True, unique=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_background_jobs_ready', 'background_jobs', ['status', 'priority', 'run_after'])
+
+    op.create_table(
+        'leader_leases',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('holder', sa.String(100), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('leader_leases')
+    op.drop_table('background_jobs')
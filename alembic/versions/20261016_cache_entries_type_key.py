@@ -0,0 +1,32 @@
+"""cache_entries: уникальность ключа в пределах cache_type
+
+Upsert персистентного кэша идёт через INSERT ... ON CONFLICT
+(cache_type, cache_key) DO UPDATE — нужен уникальный индекс по паре
+вместо прежнего уникального cache_key.
+
+Revision ID: 20261016_cache_type_key
+Revises: 20261016_job_queue
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '20261016_cache_type_key'
+down_revision: Union[str, None] = '20261016_job_queue'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('uq_cache_entries_type_key', 'cache_entries', ['cache_type', 'cache_key'], unique=True)
+    # Таблица создавалась и миграцией 20260219_cache (UNIQUE в колонке + индекс),
+    # и create_all (только уникальный индекс) — убираем оба варианта
+    op.execute("ALTER TABLE cache_entries DROP CONSTRAINT IF EXISTS cache_entries_cache_key_key")
+    op.execute("DROP INDEX IF EXISTS ix_cache_entries_cache_key")
+
+
+def downgrade() -> None:
+    op.create_index('ix_cache_entries_cache_key', 'cache_entries', ['cache_key'], unique=True)
+    op.drop_index('uq_cache_entries_type_key', table_name='cache_entries')
@@ -0,0 +1,51 @@
+"""add notification_stats_rollup and stats_rollup_state — счётчики уведомлений для админки
+
+Графики и дашборд админки читают готовые счётчики по часам/дням
+(всего, по тарифу, фильтру и источнику) вместо выборки всех sent_at
+из sniper_notifications. Заполняются инкрементально по watermark
+(tender_sniper/jobs/stats_rollup.py), история — автоматически первым
+проходом или командой --rebuild.
+
+Revision ID: 20261016_stats_rollup
+Revises: 20261016_cache_type_key
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '20261016_stats_rollup'
+down_revision: Union[str, None] = '20261016_cache_type_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_stats_rollup',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('granularity', sa.String(10), nullable=False),
+        sa.Column('dimension', sa.String(20), nullable=False),
+        sa.Column('dimension_value', sa.String(100), nullable=False, server_default=''),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index(
+        'uq_notification_stats_rollup_bucket', 'notification_stats_rollup',
+        ['granularity', 'dimension', 'dimension_value', 'bucket_start'], unique=True
+    )
+
+    op.create_table(
+        'stats_rollup_state',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stats_rollup_state')
+    op.drop_index('uq_notification_stats_rollup_bucket', table_name='notification_stats_rollup')
+    op.drop_table('notification_stats_rollup')
@@ -275,136 +275,226 @@ class EngagementScheduler:
                 user.data = current_data
                 await session.commit()
 
-    async def _send_daily_digests(self, bot: Bot):
-        """Отправить дневной дайджест пользователям."""
+    # ============================================
+    # ДНЕВНОЙ ДАЙДЖЕСТ
+    # ============================================
+
+    # Тендеров в ТОП дайджеста
+    DIGEST_TOP_N = 3
+    # Дайджестов в пачке: отправляются параллельно через общий rate limiter,
+    # после пачки сохраняется чекпоинт (при рестарте повторится не больше пачки)
+    DIGEST_CHUNK_SIZE = 50
+    DIGEST_CHECKPOINT_TYPE = 'digest_checkpoint'
+
+    @staticmethod
+    def _digest_allowed(user) -> bool:
+        """Дайджест включён и сейчас не тихие часы пользователя."""
+        # Группы пропускаем — уведомления привязаны к user_id владельца фильтра, не группы
+        if getattr(user, 'is_group', False):
+            return False
+
+        user_data = user.data if isinstance(user.data, dict) else {}
+        if user_data.get('digest_disabled', False):
+            return False
+
+        # Проверяем тихие часы (даже для дайджеста)
+        if user_data.get('quiet_hours_enabled', False):
+            current_hour = (datetime.utcnow() + timedelta(hours=MOSCOW_TZ_OFFSET)).hour
+            quiet_start = user_data.get('quiet_hours_start', 22)
+            quiet_end = user_data.get('quiet_hours_end', 8)
+
+            if quiet_start > quiet_end:
+                is_quiet = current_hour >= quiet_start or current_hour < quiet_end
+            else:
+                is_quiet = quiet_start <= current_hour < quiet_end
+
+            if is_quiet:
+                logger.debug(f"Пропускаем дайджест для {user.telegram_id} (тихие часы)")
+                return False
+        return True
+
+    async def _build_daily_digests(self, since: datetime, after_user_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Данные дайджестов для всех пользователей двумя запросами.
+
+        1. Пользователи с уведомлениями с since + число уведомлений и активных
+           фильтров (GROUP BY подзапросы, JOIN к пользователям).
+        2. ТОП-N тендеров каждого пользователя одним запросом
+           (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY score DESC)).
+
+        Args:
+            since: начало периода
+            after_user_id: продолжить после этого пользователя (чекпоинт)
+
+        Returns:
+            [{'user': SniperUser, 'count', 'filters', 'top': [строки]}] по возрастанию user.id
+        """
         from database import DatabaseSession, SniperUser, SniperFilter, SniperNotification
         from sqlalchemy import select, func, and_
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
-        yesterday = datetime.utcnow() - timedelta(days=1)
+        counts = (
+            select(SniperNotification.user_id, func.count(SniperNotification.id).label('cnt'))
+            .where(SniperNotification.sent_at >= since)
+            .group_by(SniperNotification.user_id)
+            .subquery()
+        )
+        filters = (
+            select(SniperFilter.user_id, func.count(SniperFilter.id).label('cnt'))
+            .where(SniperFilter.is_active == True)
+            .group_by(SniperFilter.user_id)
+            .subquery()
+        )
+        ranked = (
+            select(
+                SniperNotification.user_id,
+                SniperNotification.tender_number,
+                SniperNotification.tender_name,
+                SniperNotification.tender_price,
+                SniperNotification.tender_url,
+                func.row_number().over(
+                    partition_by=SniperNotification.user_id,
+                    order_by=(SniperNotification.score.desc(), SniperNotification.id.desc()),
+                ).label('rn'),
+            )
+            .where(
+                and_(
+                    SniperNotification.sent_at >= since,
+                    SniperNotification.user_id > after_user_id,
+                )
+            )
+            .subquery()
+        )
 
         async with DatabaseSession() as session:
-            # Получаем активных пользователей
-            result = await session.execute(
-                select(SniperUser).where(
+            users_result = await session.execute(
+                select(SniperUser, counts.c.cnt, func.coalesce(filters.c.cnt, 0))
+                .join(counts, counts.c.user_id == SniperUser.id)
+                .outerjoin(filters, filters.c.user_id == SniperUser.id)
+                .where(
                     and_(
+                        SniperUser.id > after_user_id,
                         SniperUser.subscription_tier.in_(['trial', 'starter', 'pro', 'premium', 'basic']),
                         SniperUser.trial_expires_at > datetime.utcnow()  # Активная подписка
                     )
                 )
+                .order_by(SniperUser.id)
             )
-            users = result.scalars().all()
-
-        digests_sent = 0
+            rows = users_result.all()
 
-        for user in users:
-            try:
-                # Пропускаем группы — уведомления привязаны к user_id владельца фильтра, не группы
-                if getattr(user, 'is_group', False):
-                    continue
-
-                # Проверяем, включён ли дайджест у пользователя
-                user_data = user.data if isinstance(user.data, dict) else {}
-                if user_data.get('digest_disabled', False):
-                    continue
-
-                # Проверяем тихие часы (даже для дайджеста)
-                if user_data.get('quiet_hours_enabled', False):
-                    current_hour = (datetime.utcnow() + timedelta(hours=MOSCOW_TZ_OFFSET)).hour
-                    quiet_start = user_data.get('quiet_hours_start', 22)
-                    quiet_end = user_data.get('quiet_hours_end', 8)
-
-                    # Проверяем, находимся ли в тихих часах
-                    if quiet_start > quiet_end:
-                        is_quiet = current_hour >= quiet_start or current_hour < quiet_end
-                    else:
-                        is_quiet = quiet_start <= current_hour < quiet_end
-
-                    if is_quiet:
-                        logger.debug(f"Пропускаем дайджест для {user.telegram_id} (тихие часы)")
-                        continue
+            top_result = await session.execute(
+                select(ranked)
+                .where(ranked.c.rn <= self.DIGEST_TOP_N)
+                .order_by(ranked.c.user_id, ranked.c.rn)
+            )
+            top_by_user: Dict[int, List[Any]] = {}
+            for row in top_result.all():
+                top_by_user.setdefault(row.user_id, []).append(row)
+
+        return [
+            {'user': user, 'count': count, 'filters': active_filters, 'top': top_by_user.get(user.id, [])}
+            for user, count, active_filters in rows
+        ]
+
+    @staticmethod
+    def _format_digest(digest: Dict[str, Any]):
+        """Текст и клавиатура дайджеста."""
+        notifications_count = digest['count']
+        top_tenders = digest['top']
+
+        # Формируем список ТОП-тендеров
+        top_lines = []
+        for t in top_tenders:
+            name = (t.tender_name or '')[:60]
+            if len(t.tender_name or '') > 60:
+                name += '…'
+            price_str = ''
+            if t.tender_price:
+                try:
+                    price_str = f" · {float(t.tender_price):,.0f} ₽".replace(',', ' ')
+                except Exception:
+                    pass
+            link = t.tender_url or f"https://zakupki.gov.ru/epz/order/notice/ea44/view/common-info.html?regNumber={t.tender_number}"
+            top_lines.append(f'• <a href="{link}">{name}</a>{price_str}')
+
+        top_block = '\n'.join(top_lines)
+
+        text = (
+            f"☀️ <b>Доброе утро!</b>\n\n"
+            f"📊 <b>Дайджест за вчера:</b>\n"
+            f"📬 Найдено тендеров: <b>{notifications_count}</b> · "
+            f"🎯 Фильтров: <b>{digest['filters']}</b>\n\n"
+            f"<b>ТОП-{len(top_tenders)}:</b>\n{top_block}"
+        )
 
-                # Получаем статистику за вчера
-                async with DatabaseSession() as session:
-                    # Количество уведомлений за вчера
-                    notifications_count = await session.scalar(
-                        select(func.count(SniperNotification.id)).where(
-                            and_(
-                                SniperNotification.user_id == user.id,
-                                SniperNotification.sent_at >= yesterday
-                            )
-                        )
-                    ) or 0
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text=f"📋 Все {notifications_count} тендеров", callback_data="alltenders_last_24h")],
+            [InlineKeyboardButton(text="🔕 Отключить дайджест", callback_data="disable_digest")],
+        ])
+        return text, keyboard
 
-                    # Количество активных фильтров
-                    active_filters = await session.scalar(
-                        select(func.count(SniperFilter.id)).where(
-                            and_(
-                                SniperFilter.user_id == user.id,
-                                SniperFilter.is_active == True
-                            )
-                        )
-                    ) or 0
+    async def _send_digest(self, bot: Bot, digest: Dict[str, Any]) -> bool:
+        from tender_sniper.notifications.telegram_notifier import send_rate_limited
 
-                    # ТОП-3 тендера за вчера (по score)
-                    top_tenders_result = await session.execute(
-                        select(SniperNotification).where(
-                            and_(
-                                SniperNotification.user_id == user.id,
-                                SniperNotification.sent_at >= yesterday
-                            )
-                        ).order_by(SniperNotification.score.desc()).limit(3)
-                    )
-                    top_tenders = top_tenders_result.scalars().all()
+        user = digest['user']
+        text, keyboard = self._format_digest(digest)
+        try:
+            await send_rate_limited(
+                bot, user.telegram_id,
+                text=text,
+                reply_markup=keyboard,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Не удалось отправить дайджест пользователю {user.telegram_id}: {e}")
+            return False
 
-                # Не отправляем дайджест если тендеров нет
-                if notifications_count == 0:
-                    logger.debug(f"Дайджест для {user.telegram_id}: 0 тендеров — пропускаем")
-                    continue
+    async def _send_daily_digests(self, bot: Bot):
+        """
+        Отправить дневной дайджест пользователям.
 
-                # Формируем список ТОП-3 тендеров
-                top_lines = []
-                for t in top_tenders:
-                    name = (t.tender_name or '')[:60]
-                    if len(t.tender_name or '') > 60:
-                        name += '…'
-                    price_str = ''
-                    if t.tender_price:
-                        try:
-                            price_str = f" · {float(t.tender_price):,.0f} ₽".replace(',', ' ')
-                        except Exception:
-                            pass
-                    link = t.tender_url or f"https://zakupki.gov.ru/epz/order/notice/ea44/view/common-info.html?regNumber={t.tender_number}"
-                    top_lines.append(f'• <a href="{link}">{name}</a>{price_str}')
-
-                top_block = '\n'.join(top_lines)
+        Данные для всех пользователей собираются двумя запросами
+        (_build_daily_digests), дайджесты уходят пачками через общий
+        rate limiter отправок. После каждой пачки в CacheEntry сохраняется
+        чекпоинт (последний обработанный user_id) — после рестарта в тот же
+        день рассылка продолжается с него, а не начинается заново.
+        """
+        from tender_sniper.database import get_sniper_db
 
-                text = (
-                    f"☀️ <b>Доброе утро!</b>\n\n"
-                    f"📊 <b>Дайджест за вчера:</b>\n"
-                    f"📬 Найдено тендеров: <b>{notifications_count}</b> · "
-                    f"🎯 Фильтров: <b>{active_filters}</b>\n\n"
-                    f"<b>ТОП-{len(top_tenders)}:</b>\n{top_block}"
-                )
+        db = await get_sniper_db()
+        digest_day = (datetime.utcnow() + timedelta(hours=MOSCOW_TZ_OFFSET)).date().isoformat()
+        checkpoint_key = f"digest:{digest_day}"
 
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text=f"📋 Все {notifications_count} тендеров", callback_data="alltenders_last_24h")],
-                    [InlineKeyboardButton(text="🔕 Отключить дайджест", callback_data="disable_digest")],
-                ])
+        checkpoint = await db.cache_get(checkpoint_key, self.DIGEST_CHECKPOINT_TYPE) or {}
+        if checkpoint.get('done'):
+            logger.info(f"📧 Дайджест за {digest_day} уже разослан ({checkpoint.get('sent', 0)} шт.)")
+            return
+        last_user_id = checkpoint.get('last_user_id', 0)
+        digests_sent = checkpoint.get('sent', 0)
+        if last_user_id:
+            logger.info(f"📧 Продолжаем рассылку дайджеста после user_id={last_user_id}")
 
-                await bot.send_message(
-                    user.telegram_id, text,
-                    reply_markup=keyboard,
-                    parse_mode="HTML",
-                    disable_web_page_preview=True,
-                )
-                digests_sent += 1
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        digests = await self._build_daily_digests(yesterday, after_user_id=last_user_id)
 
-                # Небольшая задержка между сообщениями
-                await asyncio.sleep(0.1)
+        for i in range(0, len(digests), self.DIGEST_CHUNK_SIZE):
+            chunk = digests[i:i + self.DIGEST_CHUNK_SIZE]
+            results = await asyncio.gather(
+                *(self._send_digest(bot, d) for d in chunk if self._digest_allowed(d['user']))
+            )
+            digests_sent += sum(results)
+            await db.cache_set(
+                checkpoint_key, self.DIGEST_CHECKPOINT_TYPE,
+                {'last_user_id': chunk[-1]['user'].id, 'sent': digests_sent},
+                ttl_hours=48,
+            )
 
-            except Exception as e:
-                logger.warning(f"Не удалось отправить дайджест пользователю {user.telegram_id}: {e}")
+        await db.cache_set(
+            checkpoint_key, self.DIGEST_CHECKPOINT_TYPE,
+            {'last_user_id': digests[-1]['user'].id if digests else last_user_id, 'sent': digests_sent, 'done': True},
+            ttl_hours=48,
+        )
 
         if digests_sent > 0:
             logger.info(f"📧 Отправлено {digests_sent} дневных дайджестов")
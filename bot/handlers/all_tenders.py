@@ -15,7 +15,6 @@
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from pathlib import Path
 
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
@@ -24,15 +23,16 @@ from aiogram.fsm.state import State, StatesGroup
 
 from tender_sniper.database import get_sniper_db
 from bot.utils.access_check import require_feature
-from bot.utils.excel_export import generate_tenders_excel_async
 
 # Импортируем AI генератор названий
 try:
     from tender_sniper.ai_name_generator import generate_tender_name
+    from tender_sniper.name_shortener import get_name_shortener
 except ImportError:
     # Fallback если модуль недоступен
     def generate_tender_name(name, *args, **kwargs):
         return name[:80] + '...' if len(name) > 80 else name
+    get_name_shortener = None
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -226,59 +226,93 @@ def filter_tenders(
     return filtered
 
 
-async def generate_all_tenders_html(
-    tenders: List[Dict[str, Any]],
-    user_id: int,
-    filter_params: Dict[str, Any]
-) -> str:
+def report_params(data: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """
+    Параметры отчёта из FSM: охват списка (report_scope — например, «за 24 часа»)
+    + фильтры меню (filter_params) + overrides.
     """
-    Генерация HTML отчета со всеми тендерами используя all_tenders_report.
+    filter_params = data.get('filter_params') or {}
+    params = dict(data.get('report_scope') or {})
+    for key in ('sort_by', 'price_min', 'price_max', 'region'):
+        if filter_params.get(key) is not None:
+            params[key] = filter_params[key]
+    params.update(overrides)
+    return params
 
-    Args:
-        tenders: Список тендеров
-        user_id: ID пользователя
-        filter_params: Параметры фильтрации
 
-    Returns:
-        Путь к HTML файлу
-    """
-    from tender_sniper.all_tenders_report import generate_html_report
+async def _report_user_id(telegram_id: int) -> Optional[int]:
+    db = await get_sniper_db()
+    user = await db.get_user_by_telegram_id(telegram_id)
+    return user['id'] if user else None
 
-    # Создаем директорию для отчетов
-    reports_dir = Path(f"reports/user_{user_id}")
-    reports_dir.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = reports_dir / f"all_tenders_{timestamp}.html"
+async def count_report_tenders(telegram_id: int, params: Dict[str, Any]) -> int:
+    """Сколько тендеров попадёт в отчёт (агрегат в БД, без выборки строк)."""
+    from tender_sniper.report_engine import get_report_engine
 
-    # Преобразуем данные в нужный формат (убираем None, заменяем на дефолты)
-    formatted_tenders = []
-    for tender in tenders:
-        formatted_tenders.append({
-            'number': tender.get('number') or 'N/A',
-            'name': tender.get('name') or 'Без названия',
-            'price': tender.get('price'),  # None это OK для цены
-            'url': tender.get('url') or '',
-            'customer_name': tender.get('customer_name') or 'Не указан',
-            'region': tender.get('region') or 'Не указан',
-            'published_date': tender.get('published_date') or '',
-            'sent_at': tender.get('sent_at') or datetime.now().isoformat(),
-            'filter_name': tender.get('filter_name') or 'Без фильтра',
-            'source': tender.get('source') or 'automonitoring'
-        })
+    user_id = await _report_user_id(telegram_id)
+    if user_id is None:
+        return 0
+    summary = await get_report_engine().summarize(user_id, params=params)
+    return summary.count
 
-    # Используем готовый генератор HTML с JavaScript фильтрацией
-    html_content = generate_html_report(
-        tenders=formatted_tenders,
-        username=f"User {user_id}",
-        total_count=len(formatted_tenders)
+
+async def build_tenders_report(
+    telegram_id: int,
+    report_format: str = 'html',
+    params: Optional[Dict[str, Any]] = None
+):
+    """
+    Файл отчёта ('html' или 'excel') — ReportResult (path, filename, count, cached).
+
+    Генерация потоковая из БД, готовый файл кэшируется до появления
+    новых уведомлений (tender_sniper/report_engine.py).
+    """
+    from tender_sniper.report_engine import get_report_engine
+
+    user_id = await _report_user_id(telegram_id)
+    if user_id is None:
+        raise ValueError(f"Пользователь {telegram_id} не найден")
+    return await get_report_engine().build(
+        user_id, report_format, params or {}, username=f"User {telegram_id}"
     )
 
-    # Сохраняем файл
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
 
-    return str(report_path)
+async def send_tenders_report(
+    callback: CallbackQuery,
+    params: Dict[str, Any],
+    caption: str,
+    report_format: str = 'html'
+) -> None:
+    """
+    Генерирует отчёт и отправляет файлом.
+
+    В режиме очереди (роли bot/worker разнесены) генерация уходит воркеру —
+    job 'report.tenders', файл пришлёт он; polling не ждёт генерации.
+    """
+    from tender_sniper.jobs.queue import get_job_queue, is_queue_mode
+
+    if is_queue_mode():
+        await get_job_queue().enqueue(
+            'report.tenders',
+            {
+                'chat_id': callback.message.chat.id,
+                'user_id': callback.from_user.id,
+                'format': report_format,
+                'caption': caption,
+                'params': params,
+            },
+            priority=10,
+        )
+        await callback.message.answer("⏳ Отчёт готовится — пришлю файл, как только он будет готов.")
+        return
+
+    report = await build_tenders_report(callback.from_user.id, report_format, params)
+    await callback.message.answer_document(
+        document=FSInputFile(report.path, filename=report.filename),
+        caption=caption,
+        parse_mode="HTML"
+    )
 
 
 # ============================================
@@ -333,7 +367,11 @@ async def show_tenders_last_24h(callback: CallbackQuery, state: FSMContext):
             return
 
         # Сохраняем и показываем
-        await state.update_data(all_tenders=filtered_tenders, filter_params={'sort_by': 'date_desc'})
+        await state.update_data(
+            all_tenders=filtered_tenders,
+            filter_params={'sort_by': 'date_desc'},
+            report_scope={'period_hours': 24, 'filter_expired': False}
+        )
         await state.set_state(AllTendersStates.viewing_list)
 
         # Показываем меню с указанием периода
@@ -371,7 +409,7 @@ async def show_all_tenders(callback: CallbackQuery, state: FSMContext):
             return
 
         # Сохраняем тендеры в состоянии
-        await state.update_data(all_tenders=tenders, filter_params={'sort_by': 'date_desc'})
+        await state.update_data(all_tenders=tenders, filter_params={'sort_by': 'date_desc'}, report_scope={})
         await state.set_state(AllTendersStates.viewing_list)
 
         # Показываем меню фильтрации
@@ -431,6 +469,14 @@ async def show_tenders_menu(message: Message, tenders: List[Dict], filter_params
 
     shown_tenders = 0
 
+    # Готовые AI-названия из общего кэша одним запросом; недостающие
+    # генерируются в фоне (в меню пока показывается regex fallback)
+    if get_name_shortener is not None:
+        await get_name_shortener().warm(
+            [(t.get('name', 'Без названия'), t) for _, group in page_groups for t in group[:3]],
+            max_length=50
+        )
+
     for filter_name, group_tenders in page_groups:
         # Определяем иконку источника
         if any(t.get('source') == 'instant_search' for t in group_tenders):
@@ -546,7 +592,6 @@ async def download_excel(callback: CallbackQuery, state: FSMContext):
     try:
         data = await state.get_data()
         tenders = data.get('all_tenders', [])
-        filter_params = data.get('filter_params', {})
 
         # Если тендеров нет в state - перенаправляем
         if not tenders:
@@ -558,33 +603,21 @@ async def download_excel(callback: CallbackQuery, state: FSMContext):
             )
             return
 
-        # Применяем фильтры
-        filtered_tenders = filter_tenders(
-            tenders,
-            sort_by=filter_params.get('sort_by', 'date_desc'),
-            price_min=filter_params.get('price_min'),
-            price_max=filter_params.get('price_max'),
-            region=filter_params.get('region')
-        )
+        # Отчёт строится из БД с теми же фильтрами, что и список
+        params = report_params(data)
+        count = await count_report_tenders(callback.from_user.id, params)
 
-        if not filtered_tenders:
+        if not count:
             await callback.message.answer("❌ Нет тендеров для экспорта")
             return
 
-        # Генерируем Excel
-        excel_path = await generate_tenders_excel_async(
-            tenders=filtered_tenders,
-            user_id=callback.from_user.id,
-            title="Все тендеры"
-        )
-
-        # Отправляем файл
-        await callback.message.answer_document(
-            document=FSInputFile(excel_path),
+        await send_tenders_report(
+            callback,
+            params,
             caption=f"📊 <b>Экспорт тендеров в Excel</b>\n\n"
-                    f"📋 Тендеров: {len(filtered_tenders)}\n"
+                    f"📋 Тендеров: {count}\n"
                     f"💡 Файл содержит кликабельные ссылки на тендеры",
-            parse_mode="HTML"
+            report_format='excel'
         )
 
     except Exception as e:
@@ -644,7 +677,6 @@ async def download_all_tenders_html(callback: CallbackQuery, state: FSMContext):
     try:
         data = await state.get_data()
         tenders = data.get('all_tenders', [])
-        filter_params = data.get('filter_params', {})
 
         # Если тендеров нет в state - перенаправляем
         if not tenders:
@@ -656,27 +688,14 @@ async def download_all_tenders_html(callback: CallbackQuery, state: FSMContext):
             )
             return
 
-        # Применяем фильтры
-        filtered_tenders = filter_tenders(
-            tenders,
-            sort_by=filter_params.get('sort_by', 'date_desc'),
-            price_min=filter_params.get('price_min'),
-            price_max=filter_params.get('price_max'),
-            region=filter_params.get('region')
-        )
+        # Отчёт строится из БД с теми же фильтрами, что и список
+        params = report_params(data)
+        count = await count_report_tenders(callback.from_user.id, params)
 
-        # Генерируем HTML
-        report_path = await generate_all_tenders_html(
-            filtered_tenders,
-            callback.from_user.id,
-            filter_params
-        )
-
-        # Отправляем файл
-        await callback.message.answer_document(
-            document=FSInputFile(report_path),
-            caption=f"📊 <b>Все мои тендеры</b>\n\nВсего: {len(filtered_tenders)} тендеров",
-            parse_mode="HTML"
+        await send_tenders_report(
+            callback,
+            params,
+            caption=f"📊 <b>Все мои тендеры</b>\n\nВсего: {count} тендеров"
         )
 
     except Exception as e:
@@ -760,30 +779,20 @@ async def download_by_filter(callback: CallbackQuery, state: FSMContext):
             )
             return
 
-        # Фильтруем тендеры по выбранному фильтру
-        if selected_filter == "Без фильтра":
-            filtered_tenders = [t for t in tenders if not t.get('filter_name')]
-        else:
-            filtered_tenders = [t for t in tenders if (t.get('filter_name') or '').startswith(selected_filter)]
+        # Отчёт по выбранному фильтру (охват — как у списка, без фильтров меню)
+        params = dict(data.get('report_scope') or {}, filter=selected_filter)
+        count = await count_report_tenders(callback.from_user.id, params)
 
-        if not filtered_tenders:
+        if not count:
             await callback.message.answer("❌ Нет тендеров по выбранному фильтру")
             return
 
-        # Генерируем HTML
-        report_path = await generate_all_tenders_html(
-            filtered_tenders,
-            callback.from_user.id,
-            {'filter': selected_filter}
-        )
-
-        # Отправляем файл
-        await callback.message.answer_document(
-            document=FSInputFile(report_path),
+        await send_tenders_report(
+            callback,
+            params,
             caption=f"📊 <b>Тендеры по фильтру</b>\n\n"
                     f"🎨 Фильтр: {selected_filter}\n"
-                    f"📋 Тендеров: {len(filtered_tenders)}",
-            parse_mode="HTML"
+                    f"📋 Тендеров: {count}"
         )
 
     except Exception as e:
@@ -827,40 +836,13 @@ async def download_by_period(callback: CallbackQuery, state: FSMContext):
         # Получаем количество дней
         days = int(callback.data.replace("alltenders_dl_period:", ""))
 
-        # ВАЖНО: Загружаем данные напрямую из БД, а не из state
+        # ВАЖНО: Отчёт строится напрямую из БД, а не из state
         # Это гарантирует актуальные данные даже если пользователь
         # пришёл напрямую по ссылке из дайджеста
-        tenders = await get_all_user_tenders(callback.from_user.id, filter_expired=True)
-
-        if not tenders:
-            await callback.message.answer("❌ У вас пока нет найденных тендеров")
-            return
-
-        # Вычисляем дату отсечки (naive UTC для совместимости с БД)
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-
-        # Фильтруем тендеры по дате
-        filtered_tenders = []
-        for tender in tenders:
-            sent_at = tender.get('sent_at')
-            if sent_at:
-                try:
-                    if isinstance(sent_at, str):
-                        # Парсим строку даты, убираем timezone info для naive сравнения
-                        clean = sent_at.replace('Z', '').replace('+00:00', '')
-                        tender_date = datetime.fromisoformat(clean)
-                    else:
-                        tender_date = sent_at
-                        if tender_date.tzinfo is not None:
-                            tender_date = tender_date.replace(tzinfo=None)
+        params = {'filter_expired': True, 'period_days': days}
+        count = await count_report_tenders(callback.from_user.id, params)
 
-                    if tender_date >= cutoff_date:
-                        filtered_tenders.append(tender)
-                except Exception as e:
-                    logger.debug(f"Ошибка парсинга даты '{sent_at}': {e}")
-            # Если нет даты - не включаем (это старые данные)
-
-        if not filtered_tenders:
+        if not count:
             await callback.message.answer(f"❌ Нет тендеров за последние {days} дней")
             return
 
@@ -875,19 +857,11 @@ async def download_by_period(callback: CallbackQuery, state: FSMContext):
         }
         period_name = period_names.get(days, f"последние {days} дней")
 
-        # Генерируем HTML
-        report_path = await generate_all_tenders_html(
-            filtered_tenders,
-            callback.from_user.id,
-            {'period_days': days}
-        )
-
-        # Отправляем файл
-        await callback.message.answer_document(
-            document=FSInputFile(report_path),
+        await send_tenders_report(
+            callback,
+            params,
             caption=f"📊 <b>Тендеры за {period_name}</b>\n\n"
-                    f"📋 Тендеров: {len(filtered_tenders)}",
-            parse_mode="HTML"
+                    f"📋 Тендеров: {count}"
         )
 
     except Exception as e:
@@ -542,9 +542,9 @@ async def priority_sniper_menu_callback(callback: CallbackQuery, state: FSMConte
 
             await state.clear()
 
-            # Восстанавливаем all_tenders если были
+            # Восстанавливаем all_tenders (и охват списка для отчётов) если были
             if all_tenders:
-                await state.update_data(all_tenders=all_tenders)
+                await state.update_data(all_tenders=all_tenders, report_scope=data.get('report_scope') or {})
 
         # Вызываем оригинальный handler с динамической кнопкой паузы
         from bot.handlers.sniper import show_sniper_menu
@@ -647,7 +647,7 @@ async def keyboard_all_tenders(message: Message, state: FSMContext):
             return
 
         # Сохраняем тендеры в состоянии
-        await state.update_data(all_tenders=tenders, filter_params={'sort_by': 'date_desc'})
+        await state.update_data(all_tenders=tenders, filter_params={'sort_by': 'date_desc'}, report_scope={})
         await state.set_state(AllTendersStates.viewing_list)
 
         # Показываем меню фильтрации
@@ -64,6 +64,7 @@ async def _export_notifications(
     total = len(notifications)
     exported = 0
     failed = 0
+    queued = []  # (уведомление, future итога записи строки)
 
     user_columns = set(gs_config.get('columns', []))
     has_ai_columns = bool(user_columns & AI_COLUMNS)
@@ -113,16 +114,14 @@ async def _export_notifications(
                 'ai_data': ai_data,
             }
 
-            await sheets_sync.append_tender(
+            future = await sheets_sync.enqueue_tender(
                 spreadsheet_id=gs_config['spreadsheet_id'],
                 tender_data=tender_data,
                 match_data=match_data,
                 columns=gs_config.get('columns', []),
-                sheet_name=get_weekly_sheet_name()
+                sheet_name=get_weekly_sheet_name(),
             )
-
-            await db.mark_notification_exported(notif.get('id'))
-            exported += 1
+            queued.append((notif, future))
 
             # Обновляем статус каждые 5 тендеров
             if status_msg and ((i + 1) % 5 == 0 or i == total - 1):
@@ -138,6 +137,17 @@ async def _export_notifications(
             logger.warning(f"Export error for {notif.get('tender_number')}: {e}")
             failed += 1
 
+    # Строки пишутся пачками в фоне — экспортированными отмечаем только
+    # записанные (остальные попадут в следующий экспорт)
+    written = await asyncio.gather(*(future for _, future in queued), return_exceptions=True)
+    for (notif, _), ok in zip(queued, written):
+        if ok is True:
+            await db.mark_notification_exported(notif.get('id'))
+            exported += 1
+        else:
+            logger.warning(f"Export error for {notif.get('tender_number')}: строка не записана в таблицу")
+            failed += 1
+
     return exported, failed, 0
 
 
@@ -548,40 +558,23 @@ async def _run_ai_analysis(tender_number: str, subscription_tier: str) -> tuple[
         ImportError: если модули не установлены
         RuntimeError: если документация недоступна или текст не извлечён
     """
-    from src.parsers.zakupki_document_downloader import ZakupkiDocumentDownloader
-    from src.document_processor.text_extractor import TextExtractor
+    from tender_sniper.document_store import get_tender_documents_text
     from tender_sniper.ai_document_extractor import (
         get_document_extractor,
         format_extraction_for_telegram
     )
 
-    downloader = ZakupkiDocumentDownloader()
-    tender_url = f"https://zakupki.gov.ru/epz/order/notice/ea44/view/common-info.html?regNumber={tender_number}"
-
-    # Запускаем синхронный downloader в отдельном потоке
-    result = await asyncio.to_thread(
-        downloader.download_documents,
-        tender_url,
-        tender_number,
-        None
-    )
+    # Документы и текст — из общего хранилища (скачиваются и разбираются один раз)
+    result = await get_tender_documents_text(tender_number, max_files=3)  # Анализируем до 3 документов
 
-    if not result or result.get('downloaded', 0) == 0:
+    if not result['documents']:
         raise RuntimeError("Не удалось загрузить документацию")
 
     # Извлекаем текст из документов
     combined_text = ""
-    files = result.get('files', [])[:3]  # Анализируем до 3 документов
-    for doc_info in files:
-        doc_path = doc_info.get('path')
-        if not doc_path:
-            continue
-        try:
-            extract_result = TextExtractor.extract_text(doc_path)
-            if extract_result['text'] and not extract_result['text'].startswith('[Не удалось'):
-                combined_text += f"\n\n=== {extract_result['file_name']} ===\n{extract_result['text']}"
-        except Exception as e:
-            logger.warning(f"Не удалось извлечь текст из {doc_path}: {e}")
+    for doc in result['documents']:
+        if doc['text']:
+            combined_text += f"\n\n=== {doc['filename']} ===\n{doc['text']}"
 
     if not combined_text:
         raise RuntimeError("Не удалось извлечь текст из документации")
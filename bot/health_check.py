@@ -160,6 +160,59 @@ async def liveness_handler(request):
     return web.json_response({"alive": True}, status=200)
 
 
+def _component_metrics() -> str:
+    """get_stats() уже созданных компонентов процесса как gauges Prometheus."""
+    from tender_sniper.instrumentation import render_stats
+
+    parts = []
+    try:
+        from tender_sniper.database.persistent_cache import get_cache_metrics
+        parts.append(render_stats('cache', get_cache_metrics().get_stats(), label='cache_type'))
+    except Exception as e:
+        logger.debug(f"metrics: persistent cache: {e}")
+    try:
+        from tender_sniper.enrichment_store import get_enrichment_store
+        parts.append(render_stats('enrichment_cache', get_enrichment_store().get_stats()))
+    except Exception as e:
+        logger.debug(f"metrics: enrichment store: {e}")
+    try:
+        from tender_sniper.name_shortener import get_name_shortener
+        parts.append(render_stats('name_shortener', get_name_shortener().get_stats()))
+    except Exception as e:
+        logger.debug(f"metrics: name shortener: {e}")
+    try:
+        from tender_sniper.rss_watermarks import get_rss_watermarks
+        parts.append(render_stats('rss_watermarks', get_rss_watermarks().get_stats()))
+    except Exception as e:
+        logger.debug(f"metrics: rss watermarks: {e}")
+    try:
+        # Только если Google Sheets уже используется (get_sheets_sync() создал бы клиент)
+        from tender_sniper import google_sheets_sync
+        if google_sheets_sync._sheets_sync_instance is not None:
+            parts.append(render_stats('sheets', google_sheets_sync._sheets_sync_instance.get_stats()))
+    except Exception as e:
+        logger.debug(f"metrics: google sheets: {e}")
+    try:
+        from tender_sniper.monitoring import get_proxy_health_stats
+        parts.append(render_stats('proxy', get_proxy_health_stats(), label='proxy'))
+    except Exception as e:
+        logger.debug(f"metrics: proxy health: {e}")
+    return ''.join(parts)
+
+
+async def metrics_handler(request):
+    """
+    Prometheus endpoint: GET /metrics
+
+    Гистограммы этапов конвейера (tender_sniper.instrumentation) и
+    счётчики кэшей/прокси/очередей процесса.
+    """
+    from tender_sniper.instrumentation import get_stage_metrics
+
+    body = get_stage_metrics().render_prometheus() + _component_metrics()
+    return web.Response(text=body, content_type='text/plain', charset='utf-8')
+
+
 async def yookassa_webhook_handler(request):
     """
     YooKassa webhook endpoint: POST /payment/webhook
@@ -489,24 +542,18 @@ async def bitrix24_analyze_handler(request):
         return web.json_response({'error': 'deal_id required'}, status=400)
 
     # Запускаем анализ в фоне — сразу отвечаем Битриксу OK
-    asyncio.create_task(_process_bitrix24_ai_analyze(deal_id))
+    from tender_sniper.jobs.queue import get_job_queue, is_queue_mode
+    if is_queue_mode():
+        await get_job_queue().enqueue(
+            'bitrix24.analyze', {'deal_id': deal_id}, dedup_key=f"bitrix24.analyze:{deal_id}"
+        )
+    else:
+        asyncio.create_task(_process_bitrix24_ai_analyze(deal_id))
     return web.json_response({'ok': True, 'deal_id': deal_id})
 
 
-async def start_health_check_server(port: int = 8080):
-    """
-    Запуск health check HTTP сервера.
-
-    Args:
-        port: Порт для health check endpoint (default: 8080)
-    """
-    app = web.Application()
-
-    # Регистрируем endpoints
-    app.router.add_get('/health', health_check_handler)
-    app.router.add_get('/ready', readiness_handler)
-    app.router.add_get('/live', liveness_handler)
-
+def _add_app_routes(app: web.Application) -> None:
+    """Вебхуки, лендинг и кабинет (роль web / all)."""
     # YooKassa webhook
     app.router.add_post('/payment/webhook', yookassa_webhook_handler)
 
@@ -528,6 +575,27 @@ async def start_health_check_server(port: int = 8080):
     # (не понятно почему). Кнопка из sidebar убрана. Локально admin работает
     # через `python scripts/run_admin.py`.
 
+
+async def start_health_check_server(port: int = 8080, include_app_routes: bool = True):
+    """
+    Запуск health check HTTP сервера.
+
+    Args:
+        port: Порт для health check endpoint (default: 8080)
+        include_app_routes: False — только /health, /ready, /live
+            (роли bot/sniper/scheduler/worker; вебхуки и кабинет — роль web)
+    """
+    app = web.Application()
+
+    # Регистрируем endpoints
+    app.router.add_get('/health', health_check_handler)
+    app.router.add_get('/ready', readiness_handler)
+    app.router.add_get('/live', liveness_handler)
+    app.router.add_get('/metrics', metrics_handler)
+
+    if include_app_routes:
+        _add_app_routes(app)
+
     runner = web.AppRunner(app)
     await runner.setup()
 
@@ -537,10 +605,12 @@ async def start_health_check_server(port: int = 8080):
     _health_status["status"] = "healthy"
 
     logger.info(f"✅ Health check server started on port {port}")
-    logger.info(f"   GET http://0.0.0.0:{port}/ - Landing page")
+    if include_app_routes:
+        logger.info(f"   GET http://0.0.0.0:{port}/ - Landing page")
     logger.info(f"   GET http://0.0.0.0:{port}/health - Full health check")
     logger.info(f"   GET http://0.0.0.0:{port}/ready - Readiness probe")
     logger.info(f"   GET http://0.0.0.0:{port}/live - Liveness probe")
+    logger.info(f"   GET http://0.0.0.0:{port}/metrics - Prometheus metrics")
 
     return runner
 
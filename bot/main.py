@@ -242,121 +242,204 @@ async def run_bitrix24_migration():
     logger.info("=" * 70)
 
 
-async def main():
-    """Главная функция запуска бота."""
+# ============================================
+# РОЛИ ПРОЦЕССА
+# ============================================
+#
+# all        — всё в одном процессе (как раньше, по умолчанию)
+# bot        — Telegram polling (+ VK Max бот)
+# sniper     — цикл мониторинга Tender Sniper (одна реплика — лидер)
+# scheduler  — планировщики и фоновые циклы (одна реплика — лидер)
+# web        — вебхуки, кабинет, лендинг
+# worker     — очередь фоновых задач (отчёты, AI-анализ, ручной мониторинг)
+#
+# Роль задаётся `python -m bot.main --role <роль>` или APP_ROLE.
+# В разнесённом режиме (роль не all) тяжёлые задачи уходят воркерам через
+# очередь background_jobs (tender_sniper/jobs/queue.py).
+
+ROLES = ('all', 'bot', 'sniper', 'scheduler', 'web', 'worker')
+
+
+def parse_role(argv=None) -> str:
+    """Роль процесса из аргументов командной строки или APP_ROLE."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tender Sniper bot")
+    parser.add_argument(
+        '--role',
+        choices=ROLES,
+        default=os.getenv('APP_ROLE', 'all'),
+        help="Роль процесса (по умолчанию all — всё в одном процессе)"
+    )
+    return parser.parse_args(argv).role
 
-    # ============================================
-    # PRODUCTION: Миграции базы данных
-    # ============================================
-    run_migrations()
 
-    # ============================================
-    # PRODUCTION: Одноразовые задачи Битрикс24 (в фоне — не блокируют старт бота)
-    # ============================================
-    asyncio.create_task(run_lily_to_expired())
-    asyncio.create_task(run_holodilnik_filters())
-    asyncio.create_task(run_pricing_broadcast())
-    asyncio.create_task(run_bitrix24_migration())
-    asyncio.create_task(run_bitrix24_update())
-    asyncio.create_task(run_feedback_survey_scheduler())
+async def run_data_cleanup():
+    """Периодическая очистка старых данных (раз в 24 часа)."""
+    while True:
+        try:
+            await asyncio.sleep(24 * 60 * 60)  # Раз в сутки
+
+            # Очищаем уведомления старше 60 дней для всех пользователей
+            from database import DatabaseSession, SniperNotification
+            from sqlalchemy import delete
+            from datetime import datetime, timedelta
+
+            cutoff_date = datetime.utcnow() - timedelta(days=60)
+
+            async with DatabaseSession() as session:
+                result = await session.execute(
+                    delete(SniperNotification).where(
+                        SniperNotification.sent_at < cutoff_date
+                    )
+                )
+                deleted_count = result.rowcount
+                await session.commit()
+
+            if deleted_count > 0:
+                logger.info(f"🗑️ Data Cleanup: удалено {deleted_count} старых уведомлений (>60 дней)")
+            else:
+                logger.debug("🗑️ Data Cleanup: нет старых данных для удаления")
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка Data Cleanup: {e}", exc_info=True)
+
+
+async def run_scheduler_services():
+    """
+    Планировщики и фоновые циклы роли scheduler.
+
+    Выполняется только на реплике-лидере (LeaderElector 'scheduler'),
+    поэтому рассылки и периодические задачи не дублируются между репликами.
+    """
+    tasks = [
+        # Одноразовые задачи Битрикс24 и рассылки (не блокируют старт)
+        asyncio.create_task(run_lily_to_expired()),
+        asyncio.create_task(run_holodilnik_filters()),
+        asyncio.create_task(run_pricing_broadcast()),
+        asyncio.create_task(run_bitrix24_migration()),
+        asyncio.create_task(run_bitrix24_update()),
+        asyncio.create_task(run_feedback_survey_scheduler()),
+    ]
 
     # Pipeline: архивация lost-карточек старше 90 дней (раз в сутки)
     from tender_sniper.jobs.archive_lost_cards import archive_loop
-    asyncio.create_task(archive_loop())
+    tasks.append(asyncio.create_task(archive_loop()))
+
+    # Персистентный кэш: чистка просроченных записей пачками (раз в час)
+    from tender_sniper.jobs.cache_sweeper import sweep_loop as cache_sweep_loop
+    tasks.append(asyncio.create_task(cache_sweep_loop()))
+
+    # Админка: rollup счётчиков уведомлений по часам/дням (каждые 5 мин)
+    from tender_sniper.jobs.stats_rollup import rollup_loop as stats_rollup_loop
+    tasks.append(asyncio.create_task(stats_rollup_loop()))
 
     # Pipeline: pull-синхронизация статусов из Bitrix24 (каждые 5 мин)
     from tender_sniper.jobs.bitrix_pull_sync import pull_loop as bitrix_pull_loop
-    asyncio.create_task(bitrix_pull_loop())
-
-    # ============================================
-    # PRODUCTION: Graceful Shutdown Handler
-    # ============================================
-    shutdown_handler = GracefulShutdown()
-    loop = asyncio.get_running_loop()
+    tasks.append(asyncio.create_task(bitrix_pull_loop()))
 
-    # Регистрируем обработчики сигналов
-    for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(
-            sig,
-            lambda s=sig: asyncio.create_task(shutdown_handler.shutdown(s, loop))
+    # Subscription Checker (проверка истекающих подписок)
+    subscription_checker = None
+    try:
+        logger.info("🔔 Запуск Subscription Checker...")
+        subscription_checker = SubscriptionChecker(
+            bot_token=BotConfig.BOT_TOKEN,
+            check_interval_hours=6  # Проверка каждые 6 часов
         )
 
-    logger.info("✅ Graceful shutdown handler зарегистрирован")
+        async def run_subscription_checker():
+            try:
+                await subscription_checker.start()
+            except Exception as e:
+                logger.error(f"❌ Ошибка Subscription Checker: {e}", exc_info=True)
 
-    # ============================================
-    # PRODUCTION: Валидация окружения
-    # ============================================
-    logger.info("🔍 Проверка переменных окружения...")
-    EnvValidator.validate_and_exit_if_invalid(strict=False)
+        tasks.append(asyncio.create_task(run_subscription_checker()))
+        logger.info("✅ Subscription Checker запущен в фоновом режиме")
+    except Exception as e:
+        logger.error(f"❌ Не удалось запустить Subscription Checker: {e}", exc_info=True)
 
-    # ============================================
-    # PRODUCTION: Health Check Server
-    # ============================================
-    # Если админ-панель запущена отдельно (ADMIN_PANEL_ENABLED=1), она обрабатывает /health
-    health_check_runner = None
-    if not os.getenv('ADMIN_PANEL_ENABLED'):
-        health_check_port = int(os.getenv('HEALTH_CHECK_PORT', '8080'))
-        logger.info(f"🏥 Запуск health check сервера на порту {health_check_port}...")
-        health_check_runner = await start_health_check_server(port=health_check_port)
-    else:
-        logger.info("ℹ️  Health check делегирован Admin Panel")
+    # Engagement Scheduler (follow-ups, digest, deadline reminders)
+    engagement_scheduler = None
+    try:
+        logger.info("📅 Запуск Engagement Scheduler...")
+        engagement_scheduler = EngagementScheduler(
+            bot_token=BotConfig.BOT_TOKEN
+        )
 
-    # Инициализация Sentry для мониторинга ошибок
-    sentry_enabled = init_sentry(
-        environment="production",
-        traces_sample_rate=0.1,  # 10% трассировки
-        profiles_sample_rate=0.1  # 10% профилирования
-    )
-    if sentry_enabled:
-        logger.info("✅ Sentry мониторинг активирован")
-        update_health_status("sentry", "ok")
-    else:
-        logger.info("ℹ️  Sentry мониторинг отключен (SENTRY_DSN не указан)")
-        update_health_status("sentry", "disabled")
+        async def run_engagement_scheduler():
+            try:
+                await engagement_scheduler.start()
+            except Exception as e:
+                logger.error(f"❌ Ошибка Engagement Scheduler: {e}", exc_info=True)
 
-    # Инициализируем Telegram уведомления об ошибках для админа
-    admin_id = int(os.getenv('ADMIN_TELEGRAM_ID', '0'))
-    if admin_id:
-        init_telegram_error_alerts(admin_chat_id=admin_id)
-        logger.info(f"✅ Telegram error alerts настроены для админа {admin_id}")
-    else:
-        logger.info("ℹ️  Telegram error alerts отключены (ADMIN_TELEGRAM_ID не указан)")
+        tasks.append(asyncio.create_task(run_engagement_scheduler()))
+        logger.info("✅ Engagement Scheduler запущен в фоновом режиме")
+    except Exception as e:
+        logger.error(f"❌ Не удалось запустить Engagement Scheduler: {e}", exc_info=True)
+
+    # Data Cleanup Scheduler (очистка старых данных)
+    tasks.append(asyncio.create_task(run_data_cleanup()))
+    logger.info("✅ Data Cleanup Scheduler запущен (каждые 24 часа)")
 
-    # Проверяем конфигурацию
     try:
-        BotConfig.validate()
-        logger.info("✅ Конфигурация валидна")
-        update_health_status("config", "ok")
-    except ValueError as e:
-        logger.error(f"❌ Ошибка конфигурации: {e}")
-        update_health_status("config", f"error: {e}")
-        capture_exception(e, level="fatal", tags={"component": "config"})
-        return
+        await asyncio.gather(*tasks)
+    finally:
+        if subscription_checker:
+            logger.info("🛑 Остановка Subscription Checker...")
+            await subscription_checker.stop()
+        if engagement_scheduler:
+            logger.info("🛑 Остановка Engagement Scheduler...")
+            await engagement_scheduler.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    # Проверяем наличие прокси
-    proxy_url = os.getenv('PROXY_URL', '').strip()
-    if proxy_url:
-        # Скрываем пароль в логах
-        safe_proxy = proxy_url.split('@')[-1] if '@' in proxy_url else proxy_url
-        logger.info(f"🔐 Прокси настроен: {safe_proxy}")
-    else:
-        logger.info("⚠️ Прокси не настроен - будут использоваться mock-данные")
 
-    # Инициализируем базу данных
-    logger.info("🗄️  Инициализация базы данных...")
+async def run_sniper_service():
+    """Цикл мониторинга Tender Sniper (только на реплике-лидере 'sniper')."""
     try:
-        await get_database()
-        update_health_status("database", "ok")
+        logger.info("🎯 Инициализация Tender Sniper Service...")
+        sniper_service = TenderSniperService(
+            bot_token=BotConfig.BOT_TOKEN,
+            poll_interval=120,  # 2 минуты
+            max_tenders_per_poll=100
+        )
+        await sniper_service.initialize()
     except Exception as e:
-        logger.error(f"❌ Ошибка инициализации БД: {e}")
-        update_health_status("database", f"error: {e}")
+        logger.error(f"❌ Не удалось запустить Tender Sniper: {e}", exc_info=True)
+        update_health_status("sniper_service", f"error: {e}")
         raise
 
-    # ОТКРЫТЫЙ ДОСТУП: все пользователи регистрируются автоматически
-    # Блокировка и управление тарифами через админ-панель (/admin)
+    logger.info("✅ Tender Sniper Service запущен")
+    update_health_status("sniper_service", "ok")
+    try:
+        # start() сам вызывает stop() при выходе (в т.ч. при отмене)
+        await sniper_service.start()
+    except Exception as e:
+        logger.error(f"❌ Ошибка Tender Sniper: {e}", exc_info=True)
+        raise
+
+
+async def run_job_worker():
+    """Роль worker: выполняет задачи очереди background_jobs."""
+    from tender_sniper.jobs.queue import JobWorker
+    from tender_sniper.jobs.handlers import close_handler_resources
+
+    job_types = [t.strip() for t in os.getenv('WORKER_JOB_TYPES', '').split(',') if t.strip()]
+    worker = JobWorker(
+        job_types=job_types or None,
+        concurrency=int(os.getenv('WORKER_CONCURRENCY', '2'))
+    )
+    update_health_status("worker", "running")
+    try:
+        await worker.run()
+    finally:
+        await worker.stop()
+        await close_handler_resources()
 
-    # Инициализируем бота и диспетчер
-    bot = Bot(token=BotConfig.BOT_TOKEN)
+
+def create_dispatcher(bot: Bot) -> Dispatcher:
+    """Диспетчер aiogram: middleware, роутеры, обработчик ошибок."""
     storage = MemoryStorage()
     dp = Dispatcher(storage=storage)
 
@@ -455,93 +538,27 @@ async def main():
         return True  # Ошибка обработана
 
     logger.info("✅ Глобальный error handler зарегистрирован")
-    logger.info("🤖 Бот запускается...")
-
-    # Запускаем Subscription Checker (проверка истекающих подписок)
-    subscription_checker = None
-    subscription_checker_task = None
-    try:
-        logger.info("🔔 Запуск Subscription Checker...")
-        subscription_checker = SubscriptionChecker(
-            bot_token=BotConfig.BOT_TOKEN,
-            check_interval_hours=6  # Проверка каждые 6 часов
-        )
-
-        async def run_subscription_checker():
-            try:
-                await subscription_checker.start()
-            except Exception as e:
-                logger.error(f"❌ Ошибка Subscription Checker: {e}", exc_info=True)
-
-        subscription_checker_task = asyncio.create_task(run_subscription_checker())
-        logger.info("✅ Subscription Checker запущен в фоновом режиме")
-    except Exception as e:
-        logger.error(f"❌ Не удалось запустить Subscription Checker: {e}", exc_info=True)
-
-    # Запускаем Engagement Scheduler (follow-ups, digest, deadline reminders)
-    engagement_scheduler = None
-    engagement_scheduler_task = None
-    try:
-        logger.info("📅 Запуск Engagement Scheduler...")
-        engagement_scheduler = EngagementScheduler(
-            bot_token=BotConfig.BOT_TOKEN
-        )
-
-        async def run_engagement_scheduler():
-            try:
-                await engagement_scheduler.start()
-            except Exception as e:
-                logger.error(f"❌ Ошибка Engagement Scheduler: {e}", exc_info=True)
-
-        engagement_scheduler_task = asyncio.create_task(run_engagement_scheduler())
-        logger.info("✅ Engagement Scheduler запущен в фоновом режиме")
-    except Exception as e:
-        logger.error(f"❌ Не удалось запустить Engagement Scheduler: {e}", exc_info=True)
-
-    # Запускаем Data Cleanup Scheduler (очистка старых данных)
-    data_cleanup_task = None
-    try:
-        logger.info("🗑️ Запуск Data Cleanup Scheduler...")
-
-        async def run_data_cleanup():
-            """Периодическая очистка старых данных (раз в 24 часа)."""
-            while True:
-                try:
-                    await asyncio.sleep(24 * 60 * 60)  # Раз в сутки
-
-                    from tender_sniper.database import get_sniper_db
-                    db = await get_sniper_db()
-
-                    # Очищаем уведомления старше 60 дней для всех пользователей
-                    from database import DatabaseSession, SniperNotification
-                    from sqlalchemy import delete
-                    from datetime import datetime, timedelta
-
-                    cutoff_date = datetime.utcnow() - timedelta(days=60)
-
-                    async with DatabaseSession() as session:
-                        result = await session.execute(
-                            delete(SniperNotification).where(
-                                SniperNotification.sent_at < cutoff_date
-                            )
-                        )
-                        deleted_count = result.rowcount
-                        await session.commit()
+    return dp
 
-                    if deleted_count > 0:
-                        logger.info(f"🗑️ Data Cleanup: удалено {deleted_count} старых уведомлений (>60 дней)")
-                    else:
-                        logger.debug("🗑️ Data Cleanup: нет старых данных для удаления")
 
-                except Exception as e:
-                    logger.error(f"❌ Ошибка Data Cleanup: {e}", exc_info=True)
+async def run_bot_polling(bot: Bot, dp: Dispatcher):
+    """Роль bot: команды, VK Max бот и Telegram polling."""
+    # Удаляем старые webhook (если были)
+    # ВАЖНО: НЕ удаляем pending updates, чтобы не терять сообщения при перезапуске
+    await bot.delete_webhook(drop_pending_updates=False)
 
-        data_cleanup_task = asyncio.create_task(run_data_cleanup())
-        logger.info("✅ Data Cleanup Scheduler запущен (каждые 24 часа)")
-    except Exception as e:
-        logger.error(f"❌ Не удалось запустить Data Cleanup: {e}", exc_info=True)
+    # Устанавливаем команды бота
+    commands = [
+        BotCommand(command="start", description="🏠 Главное меню"),
+        BotCommand(command="sniper", description="🎯 Tender Sniper - поиск и мониторинг"),
+        BotCommand(command="bitrix24", description="🔗 Настроить интеграцию с Битрикс24"),
+        BotCommand(command="help", description="❓ Справка"),
+    ]
+    await bot.set_my_commands(commands)
+    logger.info("✅ Команды бота установлены")
+    update_health_status("bot", "ok")
 
-    # Запускаем VK Max бот (если токен задан)
+    # Запускаем Max bot в фоне (если токен задан)
     max_bot_task = None
     try:
         max_token = os.getenv('MAX_BOT_TOKEN', '').strip()
@@ -555,106 +572,12 @@ async def main():
     except Exception as e:
         logger.error(f"❌ Не удалось запустить VK Max бота: {e}", exc_info=True)
 
-    # Инициализируем Tender Sniper Service (если включен)
-    sniper_service = None
-    sniper_task = None
-    if is_tender_sniper_enabled():
-        try:
-            logger.info("🎯 Инициализация Tender Sniper Service...")
-            sniper_service = TenderSniperService(
-                bot_token=BotConfig.BOT_TOKEN,
-                poll_interval=120,  # 2 минуты
-                max_tenders_per_poll=100
-            )
-            await sniper_service.initialize()
-
-            # Запускаем мониторинг в фоновом режиме
-            async def run_sniper():
-                try:
-                    await sniper_service.start()
-                except Exception as e:
-                    logger.error(f"❌ Ошибка Tender Sniper: {e}", exc_info=True)
-
-            sniper_task = asyncio.create_task(run_sniper())
-            logger.info("✅ Tender Sniper Service запущен в фоновом режиме")
-            update_health_status("sniper_service", "ok")
-        except Exception as e:
-            logger.error(f"❌ Не удалось запустить Tender Sniper: {e}", exc_info=True)
-            update_health_status("sniper_service", f"error: {e}")
-    else:
-        logger.info("ℹ️  Tender Sniper отключен в конфигурации")
-        update_health_status("sniper_service", "disabled")
-
     try:
-        # Удаляем старые webhook (если были)
-        # ВАЖНО: НЕ удаляем pending updates, чтобы не терять сообщения при перезапуске
-        await bot.delete_webhook(drop_pending_updates=False)
-
-        # Устанавливаем команды бота
-        commands = [
-            BotCommand(command="start", description="🏠 Главное меню"),
-            BotCommand(command="sniper", description="🎯 Tender Sniper - поиск и мониторинг"),
-            BotCommand(command="bitrix24", description="🔗 Настроить интеграцию с Битрикс24"),
-            BotCommand(command="help", description="❓ Справка"),
-        ]
-        await bot.set_my_commands(commands)
-        logger.info("✅ Команды бота установлены")
-        update_health_status("bot", "ok")
-
-        # Запускаем Max bot в фоне (если токен задан)
-        max_bot_task = None
-        try:
-            from bot_max.main import start_max_bot
-            max_bot_task = asyncio.create_task(start_max_bot())
-            logger.info("🔷 Max bot task запущен")
-        except Exception as e:
-            logger.warning(f"Max bot не запущен: {e}")
-
         # Запускаем Telegram polling
         logger.info("✅ Бот успешно запущен!")
         update_health_status("bot", "running")
         await dp.start_polling(bot)
-
-    except Exception as e:
-        logger.error(f"❌ Ошибка при запуске бота: {e}", exc_info=True)
-        update_health_status("bot", f"error: {e}")
-        capture_exception(e, level="fatal", tags={"component": "main"})
-        # Отправляем критическую ошибку в Telegram админу
-        await send_error_to_telegram(e, context="Запуск бота (main)")
     finally:
-        # Останавливаем Subscription Checker если запущен
-        if subscription_checker:
-            logger.info("🛑 Остановка Subscription Checker...")
-            await subscription_checker.stop()
-        if subscription_checker_task and not subscription_checker_task.done():
-            subscription_checker_task.cancel()
-            try:
-                await subscription_checker_task
-            except asyncio.CancelledError:
-                pass
-
-        # Останавливаем Engagement Scheduler если запущен
-        if engagement_scheduler:
-            logger.info("🛑 Остановка Engagement Scheduler...")
-            await engagement_scheduler.stop()
-        if engagement_scheduler_task and not engagement_scheduler_task.done():
-            engagement_scheduler_task.cancel()
-            try:
-                await engagement_scheduler_task
-            except asyncio.CancelledError:
-                pass
-
-        # Останавливаем Tender Sniper если запущен
-        if sniper_service:
-            logger.info("🛑 Остановка Tender Sniper Service...")
-            await sniper_service.stop()
-        if sniper_task and not sniper_task.done():
-            sniper_task.cancel()
-            try:
-                await sniper_task
-            except asyncio.CancelledError:
-                pass
-
         # Останавливаем VK Max бот если запущен
         if max_bot_task and not max_bot_task.done():
             logger.info("🛑 Остановка VK Max бота...")
@@ -664,7 +587,171 @@ async def main():
             except asyncio.CancelledError:
                 pass
 
-        await bot.session.close()
+
+async def main(role: str = 'all'):
+    """Главная функция запуска: процесс выполняет свою роль (см. ROLES)."""
+    from tender_sniper.jobs.queue import LeaderElector
+
+    def has_role(*names: str) -> bool:
+        return role == 'all' or role in names
+
+    logger.info(f"🚦 Роль процесса: {role}")
+    if role != 'all':
+        # Разнесённый режим: отчёты, AI-анализ и ручной мониторинг — через очередь воркерам
+        os.environ.setdefault('JOB_QUEUE_ENABLED', '1')
+
+    # ============================================
+    # PRODUCTION: Миграции базы данных
+    # ============================================
+    run_migrations()
+
+    # ============================================
+    # PRODUCTION: Graceful Shutdown Handler
+    # ============================================
+    shutdown_handler = GracefulShutdown()
+    loop = asyncio.get_running_loop()
+
+    # Регистрируем обработчики сигналов
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(
+            sig,
+            lambda s=sig: asyncio.create_task(shutdown_handler.shutdown(s, loop))
+        )
+
+    logger.info("✅ Graceful shutdown handler зарегистрирован")
+
+    # ============================================
+    # PRODUCTION: Валидация окружения
+    # ============================================
+    logger.info("🔍 Проверка переменных окружения...")
+    EnvValidator.validate_and_exit_if_invalid(strict=False)
+
+    # ============================================
+    # PRODUCTION: Health Check Server
+    # ============================================
+    # Если админ-панель запущена отдельно (ADMIN_PANEL_ENABLED=1), она обрабатывает /health
+    health_check_runner = None
+    if not os.getenv('ADMIN_PANEL_ENABLED'):
+        health_check_port = int(os.getenv('HEALTH_CHECK_PORT', '8080'))
+        logger.info(f"🏥 Запуск health check сервера на порту {health_check_port}...")
+        health_check_runner = await start_health_check_server(
+            port=health_check_port,
+            include_app_routes=has_role('web')
+        )
+    else:
+        logger.info("ℹ️  Health check делегирован Admin Panel")
+
+    # Инициализация Sentry для мониторинга ошибок
+    sentry_enabled = init_sentry(
+        environment="production",
+        traces_sample_rate=0.1,  # 10% трассировки
+        profiles_sample_rate=0.1  # 10% профилирования
+    )
+    if sentry_enabled:
+        logger.info("✅ Sentry мониторинг активирован")
+        update_health_status("sentry", "ok")
+    else:
+        logger.info("ℹ️  Sentry мониторинг отключен (SENTRY_DSN не указан)")
+        update_health_status("sentry", "disabled")
+
+    # Инициализируем Telegram уведомления об ошибках для админа
+    admin_id = int(os.getenv('ADMIN_TELEGRAM_ID', '0'))
+    if admin_id:
+        init_telegram_error_alerts(admin_chat_id=admin_id)
+        logger.info(f"✅ Telegram error alerts настроены для админа {admin_id}")
+    else:
+        logger.info("ℹ️  Telegram error alerts отключены (ADMIN_TELEGRAM_ID не указан)")
+
+    # Проверяем конфигурацию
+    try:
+        BotConfig.validate()
+        logger.info("✅ Конфигурация валидна")
+        update_health_status("config", "ok")
+    except ValueError as e:
+        logger.error(f"❌ Ошибка конфигурации: {e}")
+        update_health_status("config", f"error: {e}")
+        capture_exception(e, level="fatal", tags={"component": "config"})
+        return
+
+    # Проверяем наличие прокси
+    proxy_url = os.getenv('PROXY_URL', '').strip()
+    if proxy_url:
+        # Скрываем пароль в логах
+        safe_proxy = proxy_url.split('@')[-1] if '@' in proxy_url else proxy_url
+        logger.info(f"🔐 Прокси настроен: {safe_proxy}")
+    else:
+        logger.info("⚠️ Прокси не настроен - будут использоваться mock-данные")
+
+    # Инициализируем базу данных
+    logger.info("🗄️  Инициализация базы данных...")
+    try:
+        await get_database()
+        update_health_status("database", "ok")
+    except Exception as e:
+        logger.error(f"❌ Ошибка инициализации БД: {e}")
+        update_health_status("database", f"error: {e}")
+        raise
+
+    # ОТКРЫТЫЙ ДОСТУП: все пользователи регистрируются автоматически
+    # Блокировка и управление тарифами через админ-панель (/admin)
+
+    # ============================================
+    # ФОНОВЫЕ РОЛИ
+    # ============================================
+    role_tasks = []
+
+    # Планировщики — ровно на одной реплике
+    if has_role('scheduler'):
+        role_tasks.append(asyncio.create_task(
+            LeaderElector('scheduler').run_while_leader(run_scheduler_services)
+        ))
+
+    # Мониторинг — ровно на одной реплике
+    if has_role('sniper'):
+        if is_tender_sniper_enabled():
+            role_tasks.append(asyncio.create_task(
+                LeaderElector('sniper').run_while_leader(run_sniper_service)
+            ))
+        else:
+            logger.info("ℹ️  Tender Sniper отключен в конфигурации")
+            update_health_status("sniper_service", "disabled")
+
+    # Воркеры очереди масштабируются репликами
+    if role == 'worker':
+        role_tasks.append(asyncio.create_task(run_job_worker()))
+
+    bot = None
+    try:
+        if has_role('bot'):
+            # Инициализируем бота и диспетчер
+            bot = Bot(token=BotConfig.BOT_TOKEN)
+            dp = create_dispatcher(bot)
+            logger.info("🤖 Бот запускается...")
+            await run_bot_polling(bot, dp)
+        elif role_tasks:
+            await asyncio.gather(*role_tasks)
+        else:
+            # Роль web: только HTTP сервер
+            update_health_status("web", "running")
+            await asyncio.Event().wait()
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка при запуске ({role}): {e}", exc_info=True)
+        update_health_status("bot" if has_role('bot') else role, f"error: {e}")
+        capture_exception(e, level="fatal", tags={"component": "main"})
+        # Отправляем критическую ошибку в Telegram админу
+        await send_error_to_telegram(e, context=f"Запуск бота (main, роль {role})")
+    finally:
+        # Останавливаем фоновые роли (планировщики, мониторинг, воркер)
+        for task in role_tasks:
+            if not task.done():
+                task.cancel()
+        if role_tasks:
+            logger.info("🛑 Остановка фоновых задач...")
+            await asyncio.gather(*role_tasks, return_exceptions=True)
+
+        if bot:
+            await bot.session.close()
 
         # Останавливаем health check сервер
         if health_check_runner:
@@ -677,6 +764,6 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(parse_role()))
     except KeyboardInterrupt:
         logger.info("🛑 Бот остановлен пользователем")
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
@@ -20,6 +21,77 @@ REPORTS_DIR = Path(__file__).parent.parent.parent / "output" / "excel_reports"
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Стили
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_FILL = PatternFill(start_color="667EEA", end_color="667EEA", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+CELL_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+BORDER = Border(
+    left=Side(style='thin', color='DDDDDD'),
+    right=Side(style='thin', color='DDDDDD'),
+    top=Side(style='thin', color='DDDDDD'),
+    bottom=Side(style='thin', color='DDDDDD')
+)
+# Альтернативные цвета строк
+ALT_FILL = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
+LINK_FONT = Font(color="0066CC", underline="single")
+
+# Заголовки колонок: (название, ширина)
+HEADERS = [
+    ("№", 5),
+    ("Название", 50),
+    ("Цена (НМЦ)", 15),
+    ("Заказчик", 35),
+    ("Регион", 20),
+    ("Дедлайн", 12),
+    ("Закон", 8),
+    ("Статус", 12),
+    ("Ссылка", 40),
+]
+
+
+def tender_row_values(tender: Dict[str, Any], index: int) -> List[Any]:
+    """Значения строки Excel для тендера (index — номер по порядку)."""
+    name = tender.get('name') or tender.get('title', 'Без названия')
+    price = tender.get('price') or tender.get('max_price', 0)
+    customer = tender.get('customer') or tender.get('customer_name') or tender.get('organization', '-')
+    region = tender.get('region') or tender.get('delivery_region', '-')
+    deadline = tender.get('deadline') or tender.get('submission_deadline') or tender.get('end_date', '-')
+    law = tender.get('law_type') or tender.get('purchase_type', '-')
+    status = tender.get('status', 'Активен')
+    link = tender.get('link') or tender.get('url', '')
+
+    # Форматируем цену
+    if isinstance(price, (int, float)) and price > 0:
+        price_str = f"{price:,.0f} ₽".replace(",", " ")
+    else:
+        price_str = "-"
+
+    # Форматируем дедлайн
+    if isinstance(deadline, datetime):
+        deadline_str = deadline.strftime("%d.%m.%Y")
+    elif isinstance(deadline, str) and deadline != '-':
+        deadline_str = deadline[:10] if len(deadline) > 10 else deadline
+    else:
+        deadline_str = "-"
+
+    # Формируем ссылку на zakupki.gov.ru
+    if not link and tender.get('number'):
+        link = f"https://zakupki.gov.ru/epz/order/notice/ea20/view/common-info.html?regNumber={tender['number']}"
+
+    return [
+        index,  # №
+        name[:200],  # Обрезаем длинные названия
+        price_str,
+        customer[:100] if customer else "-",
+        region[:50] if region else "-",
+        deadline_str,
+        law[:10] if law else "-",
+        status,
+        link,
+    ]
+
+
 def generate_tenders_excel(
     tenders: List[Dict[str, Any]],
     user_id: int,
@@ -42,92 +114,25 @@ def generate_tenders_excel(
     ws = wb.active
     ws.title = "Тендеры"
 
-    # Стили
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="667EEA", end_color="667EEA", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    cell_alignment = Alignment(vertical="top", wrap_text=True)
-    border = Border(
-        left=Side(style='thin', color='DDDDDD'),
-        right=Side(style='thin', color='DDDDDD'),
-        top=Side(style='thin', color='DDDDDD'),
-        bottom=Side(style='thin', color='DDDDDD')
-    )
-
-    # Заголовки колонок
-    headers = [
-        ("№", 5),
-        ("Название", 50),
-        ("Цена (НМЦ)", 15),
-        ("Заказчик", 35),
-        ("Регион", 20),
-        ("Дедлайн", 12),
-        ("Закон", 8),
-        ("Статус", 12),
-        ("Ссылка", 40),
-    ]
-
     # Записываем заголовки
-    for col, (header_name, width) in enumerate(headers, 1):
+    for col, (header_name, width) in enumerate(HEADERS, 1):
         cell = ws.cell(row=1, column=col, value=header_name)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = BORDER
         ws.column_dimensions[get_column_letter(col)].width = width
 
-    # Альтернативные цвета строк
-    alt_fill = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")
-
     # Записываем данные
     for row_idx, tender in enumerate(tenders, 2):
-        # Извлекаем данные
-        name = tender.get('name') or tender.get('title', 'Без названия')
-        price = tender.get('price') or tender.get('max_price', 0)
-        customer = tender.get('customer') or tender.get('organization', '-')
-        region = tender.get('region') or tender.get('delivery_region', '-')
-        deadline = tender.get('deadline') or tender.get('end_date', '-')
-        law = tender.get('law_type') or tender.get('purchase_type', '-')
-        status = tender.get('status', 'Активен')
-        link = tender.get('link') or tender.get('url', '')
-
-        # Форматируем цену
-        if isinstance(price, (int, float)) and price > 0:
-            price_str = f"{price:,.0f} ₽".replace(",", " ")
-        else:
-            price_str = "-"
-
-        # Форматируем дедлайн
-        if isinstance(deadline, datetime):
-            deadline_str = deadline.strftime("%d.%m.%Y")
-        elif isinstance(deadline, str) and deadline != '-':
-            deadline_str = deadline[:10] if len(deadline) > 10 else deadline
-        else:
-            deadline_str = "-"
-
-        # Формируем ссылку на zakupki.gov.ru
-        if not link and tender.get('number'):
-            link = f"https://zakupki.gov.ru/epz/order/notice/ea20/view/common-info.html?regNumber={tender['number']}"
-
-        row_data = [
-            row_idx - 1,  # №
-            name[:200],  # Обрезаем длинные названия
-            price_str,
-            customer[:100] if customer else "-",
-            region[:50] if region else "-",
-            deadline_str,
-            law[:10] if law else "-",
-            status,
-            link,
-        ]
+        row_data = tender_row_values(tender, row_idx - 1)
 
         # Записываем строку
-        row_fill = alt_fill if row_idx % 2 == 0 else None
+        row_fill = ALT_FILL if row_idx % 2 == 0 else None
         for col, value in enumerate(row_data, 1):
             cell = ws.cell(row=row_idx, column=col, value=value)
-            cell.alignment = cell_alignment
-            cell.border = border
+            cell.alignment = CELL_ALIGNMENT
+            cell.border = BORDER
             if row_fill:
                 cell.fill = row_fill
 
@@ -136,7 +141,7 @@ def generate_tenders_excel(
         cell = ws.cell(row=row_idx, column=9)  # Колонка ссылки
         if cell.value and cell.value.startswith("http"):
             cell.hyperlink = cell.value
-            cell.font = Font(color="0066CC", underline="single")
+            cell.font = LINK_FONT
 
     # Добавляем итоговую строку
     total_row = len(tenders) + 3
@@ -182,3 +187,70 @@ async def generate_tenders_excel_async(
         title,
         filter_name
     )
+
+
+class ExcelReportWriter:
+    """
+    Потоковая запись отчёта в режиме write_only.
+
+    Строки уходят в файл по мере append — в памяти не держится вся книга,
+    поэтому размер отчёта ограничен диском, а не RAM. Методы синхронные:
+    вызывающий код выносит их из event loop (asyncio.to_thread).
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self.count = 0
+        self.total_price = 0.0
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Тендеры")
+        for col, (_, width) in enumerate(HEADERS, 1):
+            self._ws.column_dimensions[get_column_letter(col)].width = width
+        self._ws.append([
+            self._cell(name, font=HEADER_FONT, fill=HEADER_FILL, alignment=HEADER_ALIGNMENT)
+            for name, _ in HEADERS
+        ])
+
+    def _cell(self, value, font=None, fill=None, alignment=CELL_ALIGNMENT) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self._ws, value=value)
+        cell.alignment = alignment
+        cell.border = BORDER
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        return cell
+
+    def write_rows(self, tenders: List[Dict[str, Any]]) -> None:
+        """Дописывает строки тендеров."""
+        for tender in tenders:
+            self.count += 1
+            row_fill = ALT_FILL if (self.count + 1) % 2 == 0 else None
+            values = tender_row_values(tender, self.count)
+            row = [self._cell(value, fill=row_fill) for value in values]
+            # Делаем ссылку кликабельной
+            if values[-1] and values[-1].startswith("http"):
+                row[-1].hyperlink = values[-1]
+                row[-1].font = LINK_FONT
+            self._ws.append(row)
+
+            price = tender.get('price') or tender.get('max_price')
+            if isinstance(price, (int, float)):
+                self.total_price += price
+
+    def close(self) -> Path:
+        """Итоговая строка и сохранение файла."""
+        bold = Font(bold=True)
+        self._ws.append([])
+        total = [
+            WriteOnlyCell(self._ws, value="Итого:"),
+            WriteOnlyCell(self._ws, value=f"{self.count} тендеров"),
+        ]
+        if self.total_price > 0:
+            total.append(WriteOnlyCell(self._ws, value=f"{self.total_price:,.0f} ₽".replace(",", " ")))
+        for cell in total:
+            cell.font = bold
+        self._ws.append(total)
+        self._wb.save(self.filepath)
+        logger.info(f"Excel отчёт создан: {self.filepath} ({self.count} тендеров)")
+        return self.filepath
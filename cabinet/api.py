@@ -9,6 +9,7 @@ import os
 import logging
 from datetime import datetime, timedelta
 from aiohttp import web
+from cachetools import TTLCache
 from typing import Dict, Any
 
 from .auth import require_auth
@@ -74,14 +75,25 @@ async def get_tenders(request: web.Request) -> web.Response:
     user = request['user']
     page = int(request.query.get('page', '1'))
     limit = min(int(request.query.get('limit', '50')), 500)
-    offset = (page - 1) * limit
+    cursor = request.query.get('cursor') or None
 
     from tender_sniper.database import get_sniper_db
     db = await get_sniper_db()
-    tenders = await db.get_user_tenders(user['user_id'], limit=limit + offset)
 
-    # Ручная пагинация (adapter возвращает лимитированный список)
-    page_tenders = tenders[offset:offset + limit] if offset < len(tenders) else []
+    next_cursor = None
+    if page > 1 and not cursor:
+        # Старые клиенты с ?page=N: OFFSET-пагинация (медленная на глубоких страницах)
+        offset = (page - 1) * limit
+        tenders = await db.get_user_tenders(user['user_id'], limit=limit + offset)
+        page_tenders = tenders[offset:offset + limit] if offset < len(tenders) else []
+    else:
+        # Keyset-пагинация: следующая страница — ?cursor=<next_cursor>
+        try:
+            page_tenders, next_cursor = await db.get_user_tenders_page(
+                user['user_id'], limit=limit, cursor=cursor
+            )
+        except ValueError:
+            return web.json_response({'error': 'Invalid cursor'}, status=400)
 
     counts = await db.count_user_tenders(user['user_id'], hours=24)
 
@@ -92,6 +104,7 @@ async def get_tenders(request: web.Request) -> web.Response:
         'total_count': counts['total'],    # alias для ясности на клиенте
         'page': page,
         'limit': limit,
+        'next_cursor': next_cursor,
     })
 
 
@@ -553,6 +566,11 @@ async def search_tenders(request: web.Request) -> web.Response:
 # STATS API
 # ============================================
 
+# Топ фильтров пересчитывается не чаще раза в минуту на пользователя
+TOP_FILTERS_TTL = 60
+_top_filters_cache: TTLCache = TTLCache(maxsize=2000, ttl=TOP_FILTERS_TTL)
+
+
 @require_auth
 async def get_stats(request: web.Request) -> web.Response:
     """GET /cabinet/api/stats — статистика пользователя."""
@@ -565,18 +583,16 @@ async def get_stats(request: web.Request) -> web.Response:
     # Последние 10 тендеров
     recent = await db.get_user_tenders(user['user_id'], limit=10)
 
-    # Топ фильтры: фильтры с количеством уведомлений
-    all_tenders = await db.get_user_tenders(user['user_id'], limit=500)
-    filter_counts: Dict[str, int] = {}
-    for t in all_tenders:
-        fn = t.get('filter_name') or 'Без фильтра'
-        filter_counts[fn] = filter_counts.get(fn, 0) + 1
-    top_filters = sorted(filter_counts.items(), key=lambda x: -x[1])[:5]
+    # Топ фильтры: GROUP BY в БД, кэш на пользователя на TOP_FILTERS_TTL секунд
+    top_filters = _top_filters_cache.get(user['user_id'])
+    if top_filters is None:
+        top_filters = await db.get_user_filter_counts(user['user_id'], limit=5)
+        _top_filters_cache[user['user_id']] = top_filters
 
     return web.json_response({
         **stats,
         'recent_tenders': recent[:10],
-        'top_filters': [{'name': k, 'count': v} for k, v in top_filters],
+        'top_filters': top_filters,
     })
 
 
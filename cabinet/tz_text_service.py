@@ -14,7 +14,6 @@ force=True.
 Используется в supplier_request_service для AI-оценки и clean ТЗ.
 """
 
-import asyncio
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -31,7 +30,6 @@ logger = logging.getLogger(__name__)
 
 
 CACHE_TTL_DAYS = 7
-DOWNLOAD_DIR = Path('/tmp/tender_downloads')
 # 80K хватит для большинства ТЗ (gpt-4o-mini 128K context window).
 # В тендерах часто характеристики в табличной форме после общего описания —
 # обрезаем не слишком рано чтобы их не потерять.
@@ -47,16 +45,15 @@ def _now() -> datetime:
 # Source 1: extract from uploaded files
 # ============================================
 
-def _extract_from_local_file(file_path: str) -> str:
-    """Sync функция (для asyncio.to_thread). Читает файл через TextExtractor."""
+async def _extract_from_local_file(file_path: str) -> str:
+    """Читает файл через ExtractionEngine (пул процессов, лимит времени на документ)."""
     try:
-        from src.document_processor.text_extractor import TextExtractor
-        result = TextExtractor.extract_text(file_path)
-        if isinstance(result, dict):
-            return result.get('text') or result.get('content') or ''
-        return str(result or '')
+        from src.document_processor.extraction_engine import get_extraction_engine
+        result = await get_extraction_engine().extract_text(file_path)
+        text = result.get('text') or ''
+        return '' if text.startswith('[Не удалось') else text
     except Exception as e:
-        logger.warning(f'TextExtractor failed for {file_path}: {e}')
+        logger.warning(f'Text extraction failed for {file_path}: {e}')
         return ''
 
 
@@ -82,7 +79,7 @@ async def _get_text_from_card_files(card_id: int) -> Tuple[str, List[Dict]]:
         ext = Path(path).suffix.lower()
         if ext not in SUPPORTED_EXTENSIONS:
             continue
-        text = await asyncio.to_thread(_extract_from_local_file, path)
+        text = await _extract_from_local_file(path)
         if not text or len(text.strip()) < 50:
             continue
         parts.append(f'=== {f.filename} ===\n{text.strip()}')
@@ -119,59 +116,42 @@ def _doc_priority_score(doc: Dict) -> int:
     return 10
 
 
-def _download_and_extract_from_zakupki(tender_url: str, tender_number: str) -> Tuple[str, List[str]]:
-    """Sync функция. Качает документы тендера с zakupki, извлекает текст.
+async def _download_and_extract_from_zakupki(tender_url: str, tender_number: str) -> Tuple[str, List[str]]:
+    """Документация тендера с zakupki через общий TenderDocumentStore.
     Возвращает (combined_text, list_of_filenames).
     Приоритет файлов: ТЗ/описание объекта закупки → проект контракта → остальное.
     """
-    logger.info(f'[tz] zakupki download start: tender={tender_number}')
+    logger.info(f'[tz] zakupki documents start: tender={tender_number}')
     try:
-        from src.parsers.zakupki_document_downloader import ZakupkiDocumentDownloader
-        from src.document_processor.text_extractor import TextExtractor
-    except Exception as e:
-        logger.error(f'[tz] cannot import downloader/extractor: {e}')
-        return '', []
-
-    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    downloader = ZakupkiDocumentDownloader(download_dir=DOWNLOAD_DIR)
-
-    try:
-        result = downloader.download_documents(tender_url, tender_number)
+        from tender_sniper.document_store import get_tender_documents_text
+        result = await get_tender_documents_text(
+            tender_number, tender_url=tender_url, max_files=10, sort_key=_doc_priority_score,
+        )
     except Exception as e:
-        logger.warning(f'[tz] zakupki download_documents failed: {e}', exc_info=True)
+        logger.warning(f'[tz] zakupki documents failed: {e}', exc_info=True)
         return '', []
 
-    files = result.get('files') if isinstance(result, dict) else None
-    if not files:
+    documents = result['documents']
+    if not documents:
         logger.warning(f'[tz] zakupki returned 0 files for {tender_number}')
         return '', []
 
-    # Сортируем по приоритету так чтобы ТЗ оказался впереди
-    sorted_files = sorted(files, key=lambda f: _doc_priority_score(f))
     logger.info(
-        f'[tz] zakupki got {len(files)} files, priority order: '
-        + ', '.join((f.get('title') or '?')[:40] for f in sorted_files[:5])
+        f'[tz] zakupki got files, priority order: '
+        + ', '.join((d.get('title') or '?')[:40] for d in documents[:5])
     )
 
     parts: List[str] = []
     filenames: List[str] = []
-    for d in sorted_files[:10]:
-        path = d.get('path') or d.get('local_path') or d.get('file_path')
-        if not path or not Path(path).exists():
-            continue
-        ext = Path(path).suffix.lower()
+    for d in documents:
+        ext = Path(d['filename']).suffix.lower()
         if ext not in SUPPORTED_EXTENSIONS:
-            logger.debug(f'[tz] skip unsupported {path}')
-            continue
-        try:
-            extracted = TextExtractor.extract_text(path)
-            text = extracted.get('text') if isinstance(extracted, dict) else str(extracted or '')
-        except Exception as e:
-            logger.warning(f'[tz] TextExtractor failed for {path}: {e}')
+            logger.debug(f'[tz] skip unsupported {d["filename"]}')
             continue
+        text = d['text']
         if not text or len(text.strip()) < 50:
             continue
-        title = d.get('title') or Path(path).name
+        title = d.get('title') or d['filename']
         parts.append(f'=== {title} ===\n{text.strip()}')
         filenames.append(title)
 
@@ -225,9 +205,7 @@ async def get_full_tz_text(card_id: int, company_id: int,
 
     # 1. Try zakupki download FIRST (основной путь)
     if tender_url and tender_number:
-        zk_text, filenames = await asyncio.to_thread(
-            _download_and_extract_from_zakupki, tender_url, tender_number,
-        )
+        zk_text, filenames = await _download_and_extract_from_zakupki(tender_url, tender_number)
         if zk_text and len(zk_text.strip()) >= 200:
             text = zk_text
             source = 'zakupki'
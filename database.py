@@ -846,21 +846,114 @@ class ReactivationEvent(Base):
 
 
 class CacheEntry(Base):
-    """Персистентный кэш для AI-решений и enrichment данных."""
+    """Персистентный кэш для AI-решений и enrichment данных.
+
+    Ключ уникален в пределах cache_type (upsert ON CONFLICT (cache_type, cache_key));
+    большие значения хранятся сжатыми — tender_sniper/database/persistent_cache.py.
+    """
     __tablename__ = 'cache_entries'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    cache_key = Column(String(255), unique=True, nullable=False, index=True)
+    cache_key = Column(String(255), nullable=False)
     cache_type = Column(String(50), nullable=False, index=True)  # 'ai_relevance', 'enrichment'
     value = Column(JSON, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=False, index=True)
 
     __table_args__ = (
+        Index('uq_cache_entries_type_key', 'cache_type', 'cache_key', unique=True),
         Index('ix_cache_entries_type_expires', 'cache_type', 'expires_at'),
     )
 
 
+class FilterChatRecipient(Base):
+    """Чат → пользователи, чьи фильтры шлют в него уведомления.
+
+    Денормализация sniper_filters.notify_chat_ids для дедупликации
+    в групповых чатах без LIKE-сканирования JSON.
+    """
+    __tablename__ = 'filter_chat_recipients'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(BigInteger, nullable=False)
+    filter_id = Column(Integer, ForeignKey('sniper_filters.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('sniper_users.id', ondelete='CASCADE'), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('chat_id', 'filter_id', name='uq_filter_chat_recipients_chat_filter'),
+        Index('ix_filter_chat_recipients_chat_user', 'chat_id', 'user_id'),
+    )
+
+
+class BackgroundJob(Base):
+    """Задача очереди фоновых работ (tender_sniper/jobs/queue.py).
+
+    Воркеры забирают задачи через SELECT ... FOR UPDATE SKIP LOCKED
+    и держат аренду до locked_until; просроченная аренда — задача
+    снова доступна (воркер упал).
+    """
+    __tablename__ = 'background_jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    priority = Column(Integer, nullable=False, default=100)  # меньше — раньше
+    status = Column(String(20), nullable=False, default='pending')  # pending/running/done/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    # Не больше одной незавершённой задачи с этим ключом (снимается по завершении)
+    dedup_key = Column(String(255), unique=True, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_background_jobs_ready', 'status', 'priority', 'run_after'),
+    )
+
+
+class LeaderLease(Base):
+    """Аренда лидерства: периодические задачи выполняет одна реплика."""
+    __tablename__ = 'leader_leases'
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class NotificationStatsRollup(Base):
+    """Счётчики уведомлений по часам и дням для админки (tender_sniper/jobs/stats_rollup.py).
+
+    dimension: 'total' / 'tier' / 'filter' / 'source'; dimension_value —
+    тариф, id фильтра или источник ('' для total).
+    """
+    __tablename__ = 'notification_stats_rollup'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(10), nullable=False)  # 'hour' / 'day'
+    dimension = Column(String(20), nullable=False)
+    dimension_value = Column(String(100), nullable=False, default='')
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('uq_notification_stats_rollup_bucket',
+              'granularity', 'dimension', 'dimension_value', 'bucket_start', unique=True),
+    )
+
+
+class StatsRollupState(Base):
+    """Watermark rollup: до какого sniper_notifications.id уведомления уже учтены."""
+    __tablename__ = 'stats_rollup_state'
+
+    name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 # ============================================
 # DATABASE ENGINE & SESSION
 # ============================================
@@ -65,6 +65,9 @@ class IntegratedTenderSystem:
         self.search_expander = SmartSearchExpander(self.tender_analyzer.llm)
         self.enhanced_parser = ZakupkiEnhancedParser(self.tender_analyzer.llm)
         self.document_downloader = ZakupkiDocumentDownloader()
+        # Общее хранилище документов: файлы, уже скачанные ботом/кабинетом, не качаются заново
+        from tender_sniper.document_store import TenderDocumentStore
+        self.document_store = TenderDocumentStore(downloader_factory=lambda: self.document_downloader)
 
         print("✅ Система инициализирована\n")
 
@@ -193,6 +196,13 @@ class IntegratedTenderSystem:
 
             analyzed_tenders = []
 
+            # Документы всех тендеров — в одном event loop: async движок БД
+            # и сессии хранилища привязываются к loop и не переживают его закрытие
+            documents_by_tender = {}
+            if download_documents:
+                import asyncio
+                documents_by_tender = asyncio.run(self._download_all_documents(all_tenders))
+
             for i, tender in enumerate(all_tenders, 1):
                 print(f"\n{'─'*70}")
                 print(f"ТЕНДЕР {i}/{len(all_tenders)}: {tender.get('number')}")
@@ -210,21 +220,15 @@ class IntegratedTenderSystem:
 
                 # Скачиваем документы
                 if download_documents and tender.get('url'):
-                    try:
-                        download_result = self.document_downloader.download_documents(
-                            tender_url=tender['url'],
-                            tender_number=tender['number'],
-                            doc_types=None  # Скачиваем все документы
-                        )
+                    documents = documents_by_tender.get(tender.get('number'), [])
+                    if isinstance(documents, Exception):
+                        print(f"\n⚠️  Ошибка скачивания документов: {documents}")
+                    else:
+                        tender_result['documents_downloaded'] = documents
+                        tender_result['download_success'] = len(documents) > 0
+                        tender_result['tender_dir'] = str(self.document_store.blob_dir)
 
-                        tender_result['documents_downloaded'] = download_result.get('files', [])
-                        tender_result['download_success'] = download_result['downloaded'] > 0
-                        tender_result['tender_dir'] = download_result.get('tender_dir')
-
-                        print(f"\n📥 Скачано документов: {download_result['downloaded']}")
-
-                    except Exception as e:
-                        print(f"\n⚠️  Ошибка скачивания документов: {e}")
+                        print(f"\n📥 Скачано документов: {len(documents)}")
 
                 # Анализируем документы через AI
                 if analyze_documents and tender_result['download_success']:
@@ -325,6 +329,26 @@ class IntegratedTenderSystem:
 
         return result
 
+    async def _download_all_documents(self, tenders: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Документы тендеров через общее хранилище, по очереди.
+
+        Returns:
+            {номер тендера: список документов или Exception}
+        """
+        results = {}
+        for tender in tenders:
+            if not tender.get('url'):
+                continue
+            try:
+                results[tender.get('number')] = await self.document_store.get_documents(
+                    tender['number'],
+                    tender_url=tender['url']  # Все документы
+                )
+            except Exception as e:
+                results[tender.get('number')] = e
+        return results
+
     def _create_integrated_report(self, result: Dict[str, Any]) -> Path:
         """Создает итоговый HTML отчет."""
         from smart_tender_search import create_enhanced_html_report
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк клиентской фильтрации InstantSearch: прежний путь (regex на каждое
+ключевое слово / исключение / транслитерацию / синоним для каждого тендера)
+против CompiledFilter (одна альтернация на версию фильтра).
+
+Заодно сверяет вердикты обоих путей на всех синтетических тендерах.
+
+Запуск: python scripts/bench_compiled_filter.py [--tenders 20000] [--repeat 3]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.transliterator import Transliterator
+from tender_sniper.matching.compiled_filter import (
+    INCLUDE_STOP_WORDS, KEYWORD_SYNONYMS, compile_filter
+)
+
+FILTERS = [
+    (['linux', 'сервер', 'антивирус', 'lenovo', 'ноутбук'], ['ремонт', 'б/у']),
+    (['батарейка', 'аккумулятор', 'элемент питания'], ['услуг']),
+    (['фен', 'мебель офисная', 'стул', 'кресло руководителя'], ['аренда', 'ТО']),
+    (['бумага офисная', 'картридж', 'тонер', 'hp', 'canon'], ['заправка', 'восстановление']),
+]
+
+WORDS = (
+    'поставка товаров для нужд учреждения компьютерного оборудования ноутбуков '
+    'серверного шкафа батарейки аккумуляторы фенацетин мебели стулья кресла '
+    'бумаги картриджей тонера леново линукс ubuntu касперский ремонт услуги '
+    'аренда заправка восстановление разгрузка разработка офисной техники'
+).split()
+
+
+def legacy_verdict(text, keywords, exclude_keywords):
+    """Прежний путь: исключения, корни и check_keyword_match по одному regex."""
+    tender_lower = text.lower()
+    for exclude_word in exclude_keywords:
+        pattern = r'\b' + re.escape(exclude_word.lower()) + r'\b' if len(exclude_word) < 4 else r'\b' + re.escape(exclude_word.lower())
+        if re.search(pattern, tender_lower, re.IGNORECASE):
+            return False
+
+    root_found = False
+    for keyword in keywords:
+        kw_lower = keyword.lower()
+        if len(kw_lower) <= 4:
+            pattern = r'\b' + re.escape(kw_lower) + r'\b'
+        else:
+            min_chars = min(len(kw_lower), max(7, len(kw_lower) - 3))
+            pattern = r'\b' + re.escape(kw_lower[:min_chars])
+        if re.search(pattern, tender_lower, re.IGNORECASE):
+            root_found = True
+            break
+    if not root_found:
+        return False
+
+    def bounded(word):
+        return r'\b' + re.escape(word) + r'\b' if len(word) <= 4 else r'\b' + re.escape(word)
+
+    for kw in keywords:
+        kw_lower = kw.lower().strip()
+        if len(kw_lower) < 2 or kw_lower in INCLUDE_STOP_WORDS:
+            continue
+        if ' ' in kw_lower:
+            if kw_lower in tender_lower:
+                return True
+        elif re.search(bounded(kw_lower), tender_lower):
+            return True
+        if kw.isascii():
+            for variant in Transliterator.generate_variants(kw):
+                v_low = variant.lower()
+                if v_low != kw_lower and re.search(bounded(v_low), tender_lower):
+                    return True
+        for synonym in KEYWORD_SYNONYMS.get(kw_lower, []):
+            if re.search(bounded(synonym.lower()), tender_lower):
+                return True
+    return False
+
+
+def compiled_verdict(text, keywords, exclude_keywords):
+    # compile_filter кэширован по содержимому фильтра — компиляция один раз
+    compiled = compile_filter(keywords, exclude_keywords)
+    if compiled.find_excluded(text) or not compiled.has_keyword_root(text):
+        return False
+    return compiled.find_keyword(text) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tenders', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    tenders = [' '.join(rnd.choices(WORDS, k=rnd.randint(6, 18))) for _ in range(args.tenders)]
+
+    mismatches = sum(
+        legacy_verdict(text, kws, excl) != compiled_verdict(text, kws, excl)
+        for text in tenders for kws, excl in FILTERS
+    )
+
+    for name, verdict in (('legacy', legacy_verdict), ('compiled', compiled_verdict)):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            passed = sum(verdict(text, kws, excl) for text in tenders for kws, excl in FILTERS)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        checks = len(tenders) * len(FILTERS)
+        print(f"{name:>9}: {best:.3f}s на {checks} проверок "
+              f"({best / checks * 1e6:.1f} мкс/проверка), прошло {passed}")
+
+    print(f"Расхождений вердиктов: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+"""
+Движок извлечения текста в пуле процессов.
+
+TextExtractor.extract_from_pdf обходит страницы PyPDF2 последовательно,
+затем пробует pdftotext и OCR — и всё это синхронно, часто прямо в async
+обработчике. Скан ТЗ на 300 страниц занимал ядро и останавливал бота.
+
+Здесь:
+- работа идёт в общем ProcessPoolExecutor (MAX_WORKERS процессов — общий
+  бюджет CPU на все документы процесса), event loop не блокируется;
+- большой PDF делится на диапазоны по PAGES_PER_CHUNK страниц, которые
+  разбираются параллельно;
+- страницы сканов (OCR) распознаются параллельно, по одной на задачу;
+- iter_text() отдаёт текст по мере готовности (в порядке страниц) —
+  AI-извлечение может начать работу с первым чанком раньше;
+- на документ действует лимит времени (DOCUMENT_TIMEOUT), на процесс-воркер —
+  лимит памяти (MEMORY_LIMIT_MB, RLIMIT_AS). По таймауту возвращается то,
+  что успели извлечь.
+
+Уже запущенную задачу ProcessPoolExecutor отменить нельзя. Поэтому если
+у документа по таймауту (или при брошенном iter_text) остались
+выполняющиеся задачи, пул заменяется новым, а процессы старого
+убиваются. Задачи других документов на старом пуле (получившие
+BrokenProcessPool или снятые из очереди) перезапускаются на новом.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(Exception):
+    """Документ не уложился в DOCUMENT_TIMEOUT."""
+
+
+# ============================================
+# ФУНКЦИИ ВОРКЕРОВ (выполняются в дочерних процессах)
+# ============================================
+
+def _init_worker(memory_limit_mb: Optional[int]) -> None:
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass  # не Linux или лимит не поддерживается
+
+
+def _pdf_page_count(file_path: str) -> int:
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def _pdf_pages_text(file_path: str, start: int, end: int) -> List[str]:
+    """Текст страниц [start, end) через PyPDF2."""
+    import PyPDF2
+    texts = []
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        for page_num in range(start, min(end, len(reader.pages))):
+            try:
+                texts.append(reader.pages[page_num].extract_text() or '')
+            except Exception:
+                texts.append('')
+    return texts
+
+
+def _pdftotext(file_path: str, timeout: float) -> str:
+    result = subprocess.run(
+        ['pdftotext', '-layout', file_path, '-'],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    return result.stdout.strip() if result.returncode == 0 else ''
+
+
+def _ocr_page(file_path: str, page_num: int) -> str:
+    """OCR одной страницы (page_num с 1)."""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(file_path, first_page=page_num, last_page=page_num)
+    if not images:
+        return ''
+    return pytesseract.image_to_string(images[0], lang='rus+eng').strip()
+
+
+def _extract_whole(file_path: str) -> Dict[str, Any]:
+    """Не-PDF форматы: обычный TextExtractor целиком в воркере."""
+    try:
+        from src.document_processor.text_extractor import TextExtractor
+    except ImportError:
+        from document_processor.text_extractor import TextExtractor
+    return TextExtractor.extract_text(file_path)
+
+
+def _detect_file_type(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        magic = f.read(4)
+    if magic == b'%PDF':
+        return 'pdf'
+    return 'other'
+
+
+# ============================================
+# ДВИЖОК
+# ============================================
+
+class _Job:
+    """Задача пула: функция и аргументы нужны для перезапуска после замены пула."""
+
+    __slots__ = ('fn', 'args', 'future', 'generation')
+
+    def __init__(self, fn, args: tuple, future: Future, generation: int):
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.generation = generation
+
+
+class ExtractionEngine:
+    """Извлечение текста документов в пуле процессов с потоковой выдачей."""
+
+    # Общий бюджет CPU: одно ядро оставляем event loop'у
+    MAX_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+    # Страниц PDF на одну задачу пула
+    PAGES_PER_CHUNK = 25
+
+    # OCR: сколько первых страниц скана распознавать (как в TextExtractor)
+    OCR_MAX_PAGES = 20
+
+    # Лимиты на документ / воркер
+    DOCUMENT_TIMEOUT = 300.0     # секунды
+    MEMORY_LIMIT_MB = 1536
+    PDFTOTEXT_TIMEOUT = 30
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        document_timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None
+    ):
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.document_timeout = document_timeout or self.DOCUMENT_TIMEOUT
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else self.MEMORY_LIMIT_MB
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Номер текущего пула: задачи старых пулов перезапускаются
+        self._generation = 0
+        self._stats = {
+            'documents': 0,
+            'pdf_chunks': 0,
+            'ocr_pages': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'pool_restarts': 0,
+            'pool_recycles': 0,
+            'resubmits': 0,
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: дочерние процессы не наследуют event loop, соединения БД и потоки бота
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb,),
+            )
+        return self._pool
+
+    def _replace_pool(self, terminate: bool) -> None:
+        """Новые задачи — в новый пул; terminate — убить процессы старого."""
+        old, self._pool = self._pool, None
+        self._generation += 1
+        if old is None:
+            return
+        if terminate:
+            terminate_workers = getattr(old, 'terminate_workers', None)  # Python 3.14+
+            if terminate_workers is not None:
+                terminate_workers()
+            else:
+                for process in list((getattr(old, '_processes', None) or {}).values()):
+                    process.terminate()
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args) -> _Job:
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            # Воркер убит (OOM по RLIMIT_AS, segfault в библиотеке) — пересоздаём пул
+            self._stats['pool_restarts'] += 1
+            self._replace_pool(terminate=False)
+            future = self._get_pool().submit(fn, *args)
+        return _Job(fn, args, future, self._generation)
+
+    def _abandon(self, jobs: List[_Job]) -> None:
+        """
+        Результаты jobs больше не нужны: ожидающие задачи отменяются, а если
+        какая-то уже выполняется в текущем пуле — пул заменяется.
+        """
+        running = False
+        for job in jobs:
+            if not job.future.cancel() and not job.future.done() and job.generation == self._generation:
+                running = True
+        if running:
+            self._stats['pool_recycles'] += 1
+            self._replace_pool(terminate=True)
+
+    async def _await(self, job: _Job, deadline: float) -> Any:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._abandon([job])
+            raise ExtractionTimeout()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job.future), timeout=remaining)
+        except asyncio.TimeoutError:
+            self._abandon([job])
+            raise ExtractionTimeout()
+        except asyncio.CancelledError:
+            if job.future.cancelled() and job.generation != self._generation:
+                # Ожидавшая очереди задача снята заменой пула (cancel_futures)
+                # из-за таймаута другого документа — перезапускаем её
+                self._stats['resubmits'] += 1
+                return await self._await(self._submit(job.fn, *job.args), deadline)
+            raise
+        except BrokenProcessPool:
+            if job.generation != self._generation:
+                # Пул заменён из-за таймаута другого документа — задача не виновата
+                self._stats['resubmits'] += 1
+                return await self._await(self._submit(job.fn, *job.args), deadline)
+            self._stats['pool_restarts'] += 1
+            self._replace_pool(terminate=False)
+            raise
+
+    # ============================================
+    # ПОТОКОВОЕ ИЗВЛЕЧЕНИЕ
+    # ============================================
+
+    async def iter_text(self, file_path: str) -> AsyncIterator[str]:
+        """
+        Текст документа частями по мере готовности (для PDF — по страницам).
+
+        Raises:
+            ExtractionTimeout: документ не уложился в document_timeout
+                (части, выданные до этого, корректны)
+        """
+        file_path = str(Path(file_path).resolve())
+        deadline = time.monotonic() + self.document_timeout
+        self._stats['documents'] += 1
+
+        if _detect_file_type(file_path) != 'pdf':
+            result = await self._await(self._submit(_extract_whole, file_path), deadline)
+            text = result.get('text') or ''
+            if text and not text.startswith('[Не удалось'):
+                yield text
+            return
+
+        async for text in self._iter_pdf(file_path, deadline):
+            yield text
+
+    async def _iter_pdf(self, file_path: str, deadline: float) -> AsyncIterator[str]:
+        try:
+            total_pages = await self._await(self._submit(_pdf_page_count, file_path), deadline)
+        except ExtractionTimeout:
+            raise
+        except Exception as e:
+            # Битый PDF (EOF marker not found и т.п.) — pdftotext, затем OCR
+            logger.warning(f"⚠️ PyPDF2 не открыл {Path(file_path).name}: {e}, пробуем pdftotext")
+            text = await self._pdftotext(file_path, deadline)
+            if text:
+                yield text
+                return
+            async for text in self._iter_ocr(file_path, self.OCR_MAX_PAGES, deadline):
+                yield text
+            return
+
+        ranges = [
+            (start, min(start + self.PAGES_PER_CHUNK, total_pages))
+            for start in range(0, total_pages, self.PAGES_PER_CHUNK)
+        ]
+        jobs = [self._submit(_pdf_pages_text, file_path, start, end) for start, end in ranges]
+        self._stats['pdf_chunks'] += len(jobs)
+
+        found_text = False
+        try:
+            for job in jobs:
+                for page_text in await self._await(job, deadline):
+                    if page_text.strip():
+                        found_text = True
+                        yield page_text
+        finally:
+            self._abandon(jobs)
+
+        if not found_text:
+            # Нет текстового слоя — скан
+            logger.info(f"🔍 {Path(file_path).name}: нет текстового слоя, OCR до {self.OCR_MAX_PAGES} стр.")
+            async for text in self._iter_ocr(file_path, min(total_pages, self.OCR_MAX_PAGES), deadline):
+                yield text
+
+    async def _pdftotext(self, file_path: str, deadline: float) -> str:
+        try:
+            text = await self._await(
+                self._submit(_pdftotext, file_path, self.PDFTOTEXT_TIMEOUT), deadline
+            )
+        except ExtractionTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ pdftotext не помог: {e}")
+            return ''
+        return text if len(text) > 100 else ''
+
+    async def _iter_ocr(self, file_path: str, pages: int, deadline: float) -> AsyncIterator[str]:
+        """OCR страниц параллельно (в пределах пула), выдача по порядку."""
+        jobs = [self._submit(_ocr_page, file_path, page_num) for page_num in range(1, pages + 1)]
+        try:
+            for page_num, job in enumerate(jobs, 1):
+                try:
+                    text = await self._await(job, deadline)
+                except ExtractionTimeout:
+                    raise
+                except Exception as e:
+                    logger.warning(f"⚠️ OCR страницы {page_num}: {e}")
+                    continue
+                self._stats['ocr_pages'] += 1
+                if text:
+                    yield text
+        finally:
+            self._abandon(jobs)
+
+    # ============================================
+    # ЦЕЛИКОМ
+    # ============================================
+
+    async def extract_text(self, file_path: str) -> Dict[str, Any]:
+        """
+        Аналог TextExtractor.extract_text без блокировки event loop.
+
+        Returns:
+            {'text', 'file_name', 'file_type', 'char_count', 'word_count',
+             'truncated'}; truncated=True — сработал лимит времени и text
+            содержит только успевшие страницы
+        """
+        is_pdf = _detect_file_type(file_path) == 'pdf'
+        # Не-PDF разбирается одной задачей — метаданные TextExtractor сохраняем
+        result: Dict[str, Any] = {}
+        parts: List[str] = []
+        truncated = False
+        error: Optional[str] = None
+        try:
+            if is_pdf:
+                async for text in self.iter_text(file_path):
+                    parts.append(text)
+            else:
+                self._stats['documents'] += 1
+                deadline = time.monotonic() + self.document_timeout
+                result = await self._await(self._submit(_extract_whole, file_path), deadline)
+                parts.append(result.get('text') or '')
+        except ExtractionTimeout:
+            truncated = True
+            self._stats['timeouts'] += 1
+            logger.warning(
+                f"⏱️ {Path(file_path).name}: лимит {self.document_timeout:.0f}с, извлечено {len(parts)} частей"
+            )
+        except Exception as e:
+            error = str(e)
+            self._stats['errors'] += 1
+            logger.warning(f"⚠️ Ошибка извлечения {Path(file_path).name}: {e}")
+
+        text = '\n\n'.join(part for part in parts if part)
+        if not text:
+            text = f"[Не удалось извлечь текст из файла: {(error or 'нет текста')[:200]}]"
+        return {
+            **result,
+            'text': text,
+            'file_name': os.path.basename(file_path),
+            'file_type': 'PDF' if is_pdf else result.get('file_type', 'OTHER'),
+            'char_count': len(text),
+            'word_count': len(text.split()),
+            'truncated': truncated,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'max_workers': self.max_workers}
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_engine: Optional[ExtractionEngine] = None
+
+
+def get_extraction_engine() -> ExtractionEngine:
+    """Общий на процесс движок извлечения (один пул процессов)."""
+    global _engine
+    if _engine is None:
+        _engine = ExtractionEngine()
+    return _engine
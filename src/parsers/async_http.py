@@ -0,0 +1,322 @@
+"""
+Асинхронный HTTP транспорт для zakupki.gov.ru.
+
+Синхронный ZakupkiRSSParser делает requests-вызовы в thread executor и
+выстраивает ВСЕ запросы процесса в очередь с интервалом 2 секунды
+(_wait_for_rate_limit), сколько бы прокси ни было настроено.
+
+Здесь на каждый прокси (PROXY_URL, PROXY_URL_2 … PROXY_URL_5) заводится:
+- своя keep-alive сессия aiohttp с пулом соединений;
+- свой token bucket (тот же интервал 2с, но на прокси, а не на процесс).
+
+Запрос уходит через прокси с наименьшей ожидаемой стоимостью (латентность
+по ProxyHealthManager + ожидание токена), при 403/434 или ошибке — через
+следующий; плохие прокси отсекает circuit breaker (см. proxy_health.py).
+Суммарная пропускная способность растёт линейно с числом прокси.
+
+aiohttp импортируется лениво — модуль можно импортировать без него.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import ssl
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .proxy_health import ProxyHealthManager, get_proxy_health, proxy_label
+except ImportError:
+    from parsers.proxy_health import ProxyHealthManager, get_proxy_health, proxy_label
+
+logger = logging.getLogger(__name__)
+
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+
+def proxy_urls_from_env() -> List[str]:
+    """Список прокси из переменных окружения: PROXY_URL, PROXY_URL_2, ..., PROXY_URL_5."""
+    proxy_urls = []
+    for suffix in ['', '_2', '_3', '_4', '_5']:
+        val = os.getenv(f'PROXY_URL{suffix}', '').strip()
+        if val:
+            proxy_urls.append(val)
+    return proxy_urls
+
+
+def _make_ssl_context() -> ssl.SSLContext:
+    """SSL контекст без проверки сертификата (как SSLAdapter синхронного парсера)."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    context.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
+    return context
+
+
+# Фразы страницы регламентных работ. «ЕИС» не подходит: он есть в шапке
+# любой страницы zakupki.gov.ru, в том числе страницы блокировки
+MAINTENANCE_MARKERS = ('регламентных работ', 'технических работ')
+
+
+def is_maintenance_page(body: str) -> bool:
+    """Ответ 403/434 со страницей регламентных работ ЕИС."""
+    return any(marker in body for marker in MAINTENANCE_MARKERS)
+
+
+class HttpError(Exception):
+    """HTTP ответ с кодом ошибки."""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status}: {url[:120]}")
+        self.status = status
+        self.url = url
+
+
+class HttpResponse:
+    """Прочитанный ответ (тело загружено целиком, соединение уже возвращено в пул)."""
+
+    def __init__(self, status: int, content: bytes, url: str, charset: Optional[str] = None):
+        self.status = status
+        self.content = content
+        self.url = url
+        self.charset = charset
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.charset or 'utf-8', errors='replace')
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise HttpError(self.status, self.url)
+
+
+class TokenBucket:
+    """
+    Token bucket для одного прокси.
+
+    acquire() резервирует токен сразу (баланс может уйти в минус) и спит
+    ровно столько, сколько нужно до его появления — параллельные корутины
+    выстраиваются в очередь без lock.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Через сколько секунд будет доступен следующий токен (без резервирования)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        self._refill()
+        self._tokens -= 1
+        if self._tokens < 0:
+            wait = -self._tokens / self.rate
+            logger.debug(f"   ⏱️  Rate limit: ожидание {wait:.1f}с...")
+            await asyncio.sleep(wait)
+
+
+class ProxyEndpoint:
+    """Прокси (или прямое подключение) со своим rate limit."""
+
+    def __init__(self, proxy_url: Optional[str], label: str, rate: float, burst: float):
+        self.proxy_url = proxy_url
+        self.label = label
+        self.bucket = TokenBucket(rate, burst)
+        self.in_flight = 0
+
+
+class AsyncZakupkiClient:
+    """
+    Пул keep-alive сессий aiohttp по прокси с per-proxy token bucket.
+
+    Один клиент на процесс (get_async_client()): лимиты общие для всех
+    InstantSearch / ZakupkiRSSParser.
+    """
+
+    # Тот же интервал 2с, что и у синхронного парсера, но на каждый прокси
+    REQUESTS_PER_SECOND_PER_PROXY = 0.5
+    BURST = 1
+
+    # Keep-alive соединений на прокси
+    MAX_CONNECTIONS_PER_PROXY = 4
+
+    BLOCK_STATUSES = (403, 434)
+    RETRY_STATUSES = (500, 502, 503, 504)
+    MAX_RETRIES = 2
+    BACKOFF_FACTOR = 1.0
+
+    def __init__(
+        self,
+        proxy_urls: Optional[List[str]] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        health: Optional[ProxyHealthManager] = None
+    ):
+        if proxy_urls is None:
+            proxy_urls = proxy_urls_from_env()
+        rate = rate or self.REQUESTS_PER_SECOND_PER_PROXY
+        burst = burst or self.BURST
+
+        self.endpoints: List[ProxyEndpoint] = [
+            ProxyEndpoint(p, proxy_label(p, i), rate, burst) for i, p in enumerate(proxy_urls)
+        ] or [ProxyEndpoint(None, proxy_label(None), rate, burst)]
+
+        self.health = health or get_proxy_health()
+        self.health.register(e.label for e in self.endpoints)
+
+        self._sessions: Dict[str, Any] = {}
+        self._sessions_loop = None
+
+    def _ordered_endpoints(self) -> List[ProxyEndpoint]:
+        """Прокси в порядке ProxyHealthManager.rank с учётом ожидания токена."""
+        by_label = {e.label: e for e in self.endpoints}
+        extra_cost = {e.label: e.bucket.delay() for e in self.endpoints}
+        return [by_label[label] for label in self.health.rank(by_label, extra_cost)]
+
+    def _get_session(self, endpoint: ProxyEndpoint):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._sessions_loop is not loop:
+            # Сессии привязаны к event loop (скрипты делают asyncio.run повторно)
+            self._sessions = {}
+            self._sessions_loop = loop
+
+        session = self._sessions.get(endpoint.label)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=_make_ssl_context(),
+                limit=self.MAX_CONNECTIONS_PER_PROXY,
+                keepalive_timeout=60,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                trust_env=False,
+            )
+            self._sessions[endpoint.label] = session
+        return session
+
+    async def _request(self, endpoint: ProxyEndpoint, url: str, timeout: float) -> Tuple[HttpResponse, float]:
+        """Запрос через конкретный прокси с повтором на 5xx. Возвращает (ответ, латентность)."""
+        import aiohttp
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            await endpoint.bucket.acquire()
+            endpoint.in_flight += 1
+            started = time.monotonic()
+            try:
+                session = self._get_session(endpoint)
+                async with session.get(
+                    url,
+                    proxy=endpoint.proxy_url,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                ) as resp:
+                    content = await resp.read()
+                    response = HttpResponse(resp.status, content, url, resp.charset)
+            finally:
+                endpoint.in_flight -= 1
+
+            if response.status in self.RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+                continue
+            break
+        return response, time.monotonic() - started
+
+    async def get(self, url: str, timeout: float = 60) -> HttpResponse:
+        """
+        GET через лучший по здоровью прокси с ротацией при блокировке/ошибке.
+
+        Returns:
+            Первый ответ не 403/434; если все прокси заблокированы — последний
+            такой ответ (вызывающий может проверить тело на регламентные работы)
+
+        Raises:
+            Последнюю сетевую ошибку, если ни один прокси не ответил
+        """
+        import aiohttp
+
+        last_response = None
+        last_error: Optional[BaseException] = None
+
+        for endpoint in self._ordered_endpoints():
+            try:
+                response, latency = await self._request(endpoint, url, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.health.record_failure(endpoint.label, error=repr(e)[:200])
+                logger.warning(f"⚠️  Прокси {endpoint.label} ошибка: {e!r}, пробуем следующий...")
+                last_error = e
+                continue
+
+            if response.status in self.BLOCK_STATUSES:
+                if is_maintenance_page(response.text):
+                    # Регламентные работы ЕИС — прокси не виноват, другие не помогут
+                    return response
+                self.health.record_failure(endpoint.label, blocked=True)
+                logger.warning(f"⚠️  Прокси {endpoint.label} вернул {response.status}, пробуем следующий...")
+                last_response = response
+                continue
+
+            if response.status in self.RETRY_STATUSES:
+                self.health.record_failure(endpoint.label, error=f"HTTP {response.status}")
+            else:
+                self.health.record_success(endpoint.label, latency)
+            return response
+
+        if last_response is not None:
+            return last_response
+        raise last_error or ConnectionError(f"Нет доступных прокси для {url[:120]}")
+
+    async def close(self) -> None:
+        """Закрывает сессии (вызывать из того же event loop)."""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions = {}
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика по прокси (здоровье + текущая загрузка)."""
+        health_stats = self.health.get_stats()
+        return {
+            e.label: {
+                **health_stats.get(e.label, {}),
+                'in_flight': e.in_flight,
+                'token_wait': round(e.bucket.delay(), 2),
+            }
+            for e in self.endpoints
+        }
+
+
+_client: Optional[AsyncZakupkiClient] = None
+
+
+def get_async_client() -> AsyncZakupkiClient:
+    """Общий на процесс async клиент zakupki.gov.ru."""
+    global _client
+    if _client is None:
+        _client = AsyncZakupkiClient()
+        labels = ', '.join(e.label for e in _client.endpoints)
+        logger.info(f"🌐 Async HTTP клиент zakupki.gov.ru: {labels}")
+    return _client
@@ -0,0 +1,262 @@
+"""
+Proxy Health - учёт здоровья прокси и адаптивная маршрутизация запросов.
+
+Раньше при 403/434 или ошибке парсер просто сдвигал _current_proxy_idx и
+пробовал следующий прокси. Мёртвый прокси при этом снова и снова стоил
+полный timeout=60 многим запросам подряд.
+
+Менеджер ведёт по каждому прокси:
+- скользящее окно латентностей успешных запросов (p50/p95);
+- окно исходов (ok / error / blocked) — доля ошибок и доля 403/434;
+- circuit breaker: closed → open (после серии ошибок или высокой доли
+  ошибок) → half_open (после паузы пропускается один пробный запрос) →
+  closed при успехе пробы, иначе снова open с удвоенной паузой.
+
+rank() упорядочивает прокси для запроса: сначала созревшие пробы, затем
+здоровые по ожидаемой латентности, в конце открытые (последний шанс,
+если все прокси плохие — поведение как раньше: пробуем все).
+
+Один менеджер на процесс (get_proxy_health()) — sync ZakupkiRSSParser и
+async AsyncZakupkiClient пишут в одну статистику. Потокобезопасен.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'
+OUTCOME_BLOCKED = 'blocked'
+
+
+def proxy_label(proxy_url: Optional[str], index: int = 0) -> str:
+    """Метка прокси для логов и статистики: номер и хост без логина/пароля."""
+    if not proxy_url:
+        return 'direct'
+    host = proxy_url.split('@')[-1] if '@' in proxy_url else proxy_url.split('://')[-1]
+    return f"#{index + 1} {host.rstrip('/')}"
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(round(q * (len(ordered) - 1)))]
+
+
+class ProxyHealth:
+    """Состояние одного прокси."""
+
+    def __init__(self, label: str, latency_window: int, outcome_window: int):
+        self.label = label
+        self.latencies = deque(maxlen=latency_window)
+        self.outcomes = deque(maxlen=outcome_window)
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0          # подряд открытий (для экспоненциальной паузы)
+        self.open_until = 0.0
+        self.probe_started_at = 0.0  # время выдачи пробного запроса в half_open
+        self.last_error: Optional[str] = None
+        self.totals = {'requests': 0, 'ok': 0, 'errors': 0, 'blocked': 0}
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for o in self.outcomes if o != OUTCOME_OK) / len(self.outcomes)
+
+    def blocked_ratio(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for o in self.outcomes if o == OUTCOME_BLOCKED) / len(self.outcomes)
+
+
+class ProxyHealthManager:
+    """Health scoring и circuit breaker для пула прокси."""
+
+    LATENCY_WINDOW = 100
+    OUTCOME_WINDOW = 50
+
+    # Открываем breaker после N ошибок подряд...
+    FAILURE_THRESHOLD = 3
+    # ...или если в окне (не меньше MIN_SAMPLES исходов) доля ошибок выше порога
+    ERROR_RATE_THRESHOLD = 0.5
+    MIN_SAMPLES = 10
+
+    # Пауза открытого breaker: BASE * 2^(open_count-1), не больше MAX (секунды)
+    BASE_COOLDOWN = 30
+    MAX_COOLDOWN = 900
+
+    # Пробный запрос считается потерянным, если по нему нет исхода дольше (секунды)
+    PROBE_TIMEOUT = 120
+
+    # Оценка латентности прокси без истории (секунды)
+    DEFAULT_LATENCY = 3.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proxies: Dict[str, ProxyHealth] = {}
+
+    def _get(self, label: str) -> ProxyHealth:
+        health = self._proxies.get(label)
+        if health is None:
+            health = ProxyHealth(label, self.LATENCY_WINDOW, self.OUTCOME_WINDOW)
+            self._proxies[label] = health
+        return health
+
+    def register(self, labels: Iterable[str]) -> None:
+        """Регистрирует прокси (чтобы они были видны в статистике до первого запроса)."""
+        with self._lock:
+            for label in labels:
+                self._get(label)
+
+    # ============================================
+    # ИСХОДЫ ЗАПРОСОВ
+    # ============================================
+
+    def record_success(self, label: str, latency: float) -> None:
+        with self._lock:
+            health = self._get(label)
+            health.totals['requests'] += 1
+            health.totals['ok'] += 1
+            health.latencies.append(latency)
+            health.outcomes.append(OUTCOME_OK)
+            health.consecutive_failures = 0
+            if health.state != STATE_CLOSED:
+                health.state = STATE_CLOSED
+                health.open_count = 0
+                health.probe_started_at = 0.0
+
+    def record_failure(self, label: str, blocked: bool = False, error: Optional[str] = None) -> None:
+        """
+        Args:
+            blocked: прокси получил 403/434 (заблокирован на zakupki.gov.ru)
+            error: описание ошибки для статистики
+        """
+        with self._lock:
+            health = self._get(label)
+            health.totals['requests'] += 1
+            health.totals['blocked' if blocked else 'errors'] += 1
+            health.outcomes.append(OUTCOME_BLOCKED if blocked else OUTCOME_ERROR)
+            health.consecutive_failures += 1
+            health.last_error = error or ('HTTP 403/434' if blocked else None)
+
+            if health.state == STATE_HALF_OPEN:
+                self._open(health)
+            elif health.state == STATE_CLOSED and (
+                health.consecutive_failures >= self.FAILURE_THRESHOLD
+                or (len(health.outcomes) >= self.MIN_SAMPLES
+                    and health.error_rate() > self.ERROR_RATE_THRESHOLD)
+            ):
+                self._open(health)
+
+    def _open(self, health: ProxyHealth) -> None:
+        health.open_count += 1
+        cooldown = min(self.MAX_COOLDOWN, self.BASE_COOLDOWN * 2 ** (health.open_count - 1))
+        health.state = STATE_OPEN
+        health.open_until = time.monotonic() + cooldown
+        health.probe_started_at = 0.0
+
+    # ============================================
+    # МАРШРУТИЗАЦИЯ
+    # ============================================
+
+    def _expected_latency(self, health: ProxyHealth) -> float:
+        """Ожидаемая «стоимость» запроса через прокси: p50 с штрафом за ошибки."""
+        p50 = _percentile(list(health.latencies), 0.5)
+        base = p50 if p50 is not None else self.DEFAULT_LATENCY
+        return base * (1 + 2 * health.error_rate())
+
+    def rank(self, labels: Iterable[str], extra_cost: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Порядок прокси для очередного запроса.
+
+        Args:
+            labels: метки прокси пула
+            extra_cost: добавка к ожидаемой латентности (например, ожидание
+                токена rate limit у async клиента)
+
+        Returns:
+            Все метки: пробы созревших half_open, здоровые по возрастанию
+            стоимости, затем открытые по времени до закрытия паузы
+        """
+        extra_cost = extra_cost or {}
+        now = time.monotonic()
+        probes, healthy, opened = [], [], []
+
+        with self._lock:
+            for label in labels:
+                health = self._get(label)
+                if health.state == STATE_OPEN and now >= health.open_until:
+                    health.state = STATE_HALF_OPEN
+                if health.state == STATE_HALF_OPEN:
+                    if now - health.probe_started_at >= self.PROBE_TIMEOUT:
+                        # Выдаём один пробный запрос
+                        health.probe_started_at = now
+                        probes.append(label)
+                    else:
+                        opened.append((health.open_until, label))
+                elif health.state == STATE_OPEN:
+                    opened.append((health.open_until, label))
+                else:
+                    cost = self._expected_latency(health) + extra_cost.get(label, 0.0)
+                    healthy.append((cost, label))
+
+        healthy.sort()
+        opened.sort()
+        return probes + [label for _, label in healthy] + [label for _, label in opened]
+
+    def is_available(self, label: str) -> bool:
+        """Прокси не в открытом breaker (closed или ждёт пробу)."""
+        with self._lock:
+            health = self._get(label)
+            return health.state == STATE_CLOSED or time.monotonic() >= health.open_until
+
+    # ============================================
+    # СТАТИСТИКА
+    # ============================================
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Статистика по прокси (для monitoring и админки)."""
+        now = time.monotonic()
+        stats = {}
+        with self._lock:
+            for label, health in self._proxies.items():
+                latencies = list(health.latencies)
+                p50 = _percentile(latencies, 0.5)
+                p95 = _percentile(latencies, 0.95)
+                stats[label] = {
+                    'state': health.state,
+                    'p50_ms': int(p50 * 1000) if p50 is not None else None,
+                    'p95_ms': int(p95 * 1000) if p95 is not None else None,
+                    'error_rate': round(health.error_rate(), 3),
+                    'blocked_ratio': round(health.blocked_ratio(), 3),
+                    'cooldown_left': max(0, int(health.open_until - now)) if health.state == STATE_OPEN else 0,
+                    'open_count': health.open_count,
+                    'last_error': health.last_error,
+                    **health.totals,
+                }
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._proxies.clear()
+
+
+_manager: Optional[ProxyHealthManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_proxy_health() -> ProxyHealthManager:
+    """Общий на процесс менеджер здоровья прокси."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ProxyHealthManager()
+    return _manager
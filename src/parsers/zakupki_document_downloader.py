@@ -2,7 +2,7 @@
 Модуль для автоматического извлечения и скачивания документов из карточек тендеров zakupki.gov.ru.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import requests
 from bs4 import BeautifulSoup
 import re
@@ -275,16 +275,15 @@ class ZakupkiDocumentDownloader:
 
             try:
                 # Скачиваем файл
-                response = self.session.get(doc['url'], timeout=60, verify=False)
-                response.raise_for_status()
+                content, _ = self.fetch_document(doc['url'])
 
                 # Сохраняем файл (сначала с оригинальным именем)
                 file_path = tender_dir / doc['filename']
 
                 with open(file_path, 'wb') as f:
-                    f.write(response.content)
+                    f.write(content)
 
-                file_size = len(response.content) / 1024  # KB
+                file_size = len(content) / 1024  # KB
 
                 # Определяем реальный тип файла по magic bytes
                 real_type = self._detect_file_type(file_path)
@@ -333,6 +332,17 @@ class ZakupkiDocumentDownloader:
             'files': downloaded_files
         }
 
+    def fetch_document(self, url: str) -> Tuple[bytes, Optional[str]]:
+        """
+        Скачивает один документ.
+
+        Returns:
+            (содержимое файла, ETag ответа или None)
+        """
+        response = self.session.get(url, timeout=60, verify=False)
+        response.raise_for_status()
+        return response.content, response.headers.get('ETag')
+
     def _is_document_link(self, href: str) -> bool:
         """Проверяет, является ли ссылка документом."""
         doc_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar', '.7z', '.rtf']
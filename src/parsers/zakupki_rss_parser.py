@@ -14,6 +14,7 @@ import warnings
 import os
 import html
 import time
+import asyncio
 from threading import Lock
 from bs4 import BeautifulSoup
 
@@ -43,6 +44,14 @@ _JUNK_TITLE_PATTERNS = [
 # Строка состоит ТОЛЬКО из типа процедуры (способ определения поставщика),
 # без предмета закупки. Единый источник правды — tender_sniper.procedure_titles.
 from tender_sniper.procedure_titles import is_procedure_type_only as _is_procedure_type_only
+from tender_sniper.instrumentation import timed
+
+try:
+    from .async_http import AIOHTTP_AVAILABLE, get_async_client, is_maintenance_page
+    from .proxy_health import get_proxy_health, proxy_label
+except ImportError:
+    from parsers.async_http import AIOHTTP_AVAILABLE, get_async_client, is_maintenance_page
+    from parsers.proxy_health import get_proxy_health, proxy_label
 
 
 def _looks_like_junk_title(title: str) -> bool:
@@ -248,7 +257,11 @@ class ZakupkiRSSParser:
                 proxy_urls.append(val)
 
         self._proxy_sessions = [_make_session(p) for p in proxy_urls]
-        self._current_proxy_idx = 0
+        self._proxy_labels = [proxy_label(p, i) for i, p in enumerate(proxy_urls)]
+
+        # Здоровье прокси: маршрутизация к самому быстрому здоровому, circuit breaker
+        self._proxy_health = get_proxy_health()
+        self._proxy_health.register(self._proxy_labels or [proxy_label(None)])
 
         if proxy_urls:
             for i, p in enumerate(proxy_urls):
@@ -260,6 +273,40 @@ class ZakupkiRSSParser:
         # Основная сессия = первый прокси (или без прокси)
         self.session = self._proxy_sessions[0] if self._proxy_sessions else _make_session()
 
+        # Async транспорт (*_async методы): keep-alive сессия aiohttp и
+        # token bucket на каждый прокси вместо глобального интервала 2с.
+        # aiohttp умеет только HTTP(S) прокси — с SOCKS остаёмся на requests
+        self.async_transport = AIOHTTP_AVAILABLE and all(
+            p.startswith(('http://', 'https://')) for p in proxy_urls
+        )
+
+    def _ordered_proxy_sessions(self) -> List[tuple]:
+        """(метка, сессия) в порядке ProxyHealthManager.rank: лучший прокси первым."""
+        if not self._proxy_sessions:
+            return [(proxy_label(None), self.session)]
+        by_label = dict(zip(self._proxy_labels, self._proxy_sessions))
+        return [(label, by_label[label]) for label in self._proxy_health.rank(self._proxy_labels)]
+
+    def _proxy_get(self, label: str, sess, url: str, timeout: float):
+        """GET через прокси с rate limit и учётом исхода в ProxyHealthManager."""
+        self._wait_for_rate_limit()
+        started = time.monotonic()
+        try:
+            response = sess.get(url, timeout=timeout, verify=False)
+        except Exception as e:
+            self._proxy_health.record_failure(label, error=repr(e)[:200])
+            raise
+
+        if response.status_code in (403, 434):
+            # Регламентные работы ЕИС — прокси не виноват
+            if not self._is_maintenance_page(response.text):
+                self._proxy_health.record_failure(label, blocked=True)
+        elif response.status_code >= 500:
+            self._proxy_health.record_failure(label, error=f"HTTP {response.status_code}")
+        else:
+            self._proxy_health.record_success(label, time.monotonic() - started)
+        return response
+
     def _wait_for_rate_limit(self):
         """
         Ожидание перед запросом для соблюдения rate limit.
@@ -282,6 +329,7 @@ class ZakupkiRSSParser:
             _log.debug(f"   ⏱️  Rate limit: ожидание {sleep_time:.1f}с...")
             time.sleep(sleep_time)
 
+    @timed('zakupki_fetch', kind='rss')
     def search_tenders_rss(
         self,
         keywords: Optional[str] = None,
@@ -296,6 +344,7 @@ class ZakupkiRSSParser:
         purchase_method: Optional[str] = None,  # "auction", "tender", "quotation", "all"
         date_from: Optional[str] = None,  # "YYYY-MM-DD"
         date_to: Optional[str] = None,  # "YYYY-MM-DD"
+        watermark=None,  # RssWatermark: инкрементальный разбор (цикл мониторинга)
     ) -> List[Dict[str, Any]]:
         """
         Ищет тендеры через RSS-фид zakupki.gov.ru.
@@ -332,39 +381,29 @@ class ZakupkiRSSParser:
 
             _log.debug(f"   📡 RSS URL: {rss_url[:200]}...")
 
-            # Получаем RSS через requests с ротацией прокси при блокировке
+            # Получаем RSS через requests: лучший по здоровью прокси первым,
+            # при блокировке/ошибке — следующий
             rss_content = None
-            sessions_to_try = list(self._proxy_sessions) if self._proxy_sessions else [self.session]
-            # Начинаем с текущего прокси
-            if self._proxy_sessions:
-                idx = self._current_proxy_idx % len(self._proxy_sessions)
-                sessions_to_try = self._proxy_sessions[idx:] + self._proxy_sessions[:idx]
-
             last_error = None
-            for i, sess in enumerate(sessions_to_try):
+            for label, sess in self._ordered_proxy_sessions():
                 try:
-                    self._wait_for_rate_limit()
-                    response = sess.get(rss_url, timeout=self.timeout, verify=False)
+                    response = self._proxy_get(label, sess, rss_url, self.timeout)
                     if response.status_code in (403, 434):
                         # Проверяем — может это страница тех. работ
                         try:
-                            body = response.text
-                            if 'регламентных работ' in body or 'технических работ' in body or 'ЕИС' in body:
+                            if self._is_maintenance_page(response.text):
                                 _log.warning("🔧 zakupki.gov.ru проводит регламентные работы — сайт недоступен для всех")
                                 return []
                         except Exception:
                             pass
-                        _log.warning(f"⚠️  Прокси #{(self._current_proxy_idx + i) % max(len(sessions_to_try), 1) + 1} вернул {response.status_code}, пробуем следующий...")
+                        _log.warning(f"⚠️  Прокси {label} вернул {response.status_code}, пробуем следующий...")
                         last_error = f"HTTP {response.status_code}"
                         continue
                     response.raise_for_status()
                     rss_content = response.content
-                    # Запоминаем успешный прокси
-                    if self._proxy_sessions:
-                        self._current_proxy_idx = (self._current_proxy_idx + i) % len(self._proxy_sessions)
                     break
                 except Exception as e:
-                    _log.warning(f"⚠️  Прокси #{i+1} ошибка: {e}, пробуем следующий...")
+                    _log.warning(f"⚠️  Прокси {label} ошибка: {e}, пробуем следующий...")
                     last_error = e
                     continue
 
@@ -372,139 +411,171 @@ class ZakupkiRSSParser:
                 _log.error(f"❌ Все прокси недоступны. Последняя ошибка: {last_error}")
                 return []
 
-            # Парсим RSS
-            feed = feedparser.parse(rss_content)
-
-            if feed.bozo and not feed.entries:
-                _log.warning(f"⚠️  Ошибка парсинга RSS: {feed.bozo_exception}")
-                return []
+            return self._parse_rss_feed(rss_content, max_results, tender_type, watermark)
 
-            _log.info(f"   📋 RSS entries: {len(feed.entries)}")
+        except Exception as e:
+            print(f"✗ Ошибка получения RSS: {e}")
+            return []
 
-            # Диагностика: самая свежая дата в RSS
-            if feed.entries:
-                newest = getattr(feed.entries[0], 'published', getattr(feed.entries[0], 'updated', '?'))
-                _log.info(f"   📅 RSS newest: {newest}")
+    def _parse_rss_feed(
+        self,
+        rss_content: bytes,
+        max_results: int,
+        tender_type: Optional[str] = None,
+        watermark=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Разбирает RSS-фид поиска и применяет client-side фильтрацию по типу закупки.
+        Общая часть sync и async транспорта.
 
-            tenders = []
-            filtered_count = 0
+        С watermark (tender_sniper.rss_watermarks) фид читается до первой
+        записи старше окна, уже разобранные записи пропускаются.
+        """
+        # Парсим RSS
+        feed = feedparser.parse(rss_content)
 
-            # Парсим больше записей, чтобы компенсировать фильтрацию
-            # Для товаров берем в 5 раз больше, так как многие будут отфильтрованы
-            multiplier = 5 if tender_type == "товары" else 3
-            entries_to_check = feed.entries[:max_results * multiplier] if tender_type else feed.entries[:max_results]
+        if feed.bozo and not feed.entries:
+            _log.warning(f"⚠️  Ошибка парсинга RSS: {feed.bozo_exception}")
+            return []
 
-            for entry in entries_to_check:
-                tender = self._parse_rss_entry(entry)
-                if not tender:
+        _log.info(f"   📋 RSS entries: {len(feed.entries)}")
+        if watermark is not None:
+            watermark.fetched = True
+            watermark.bytes += len(rss_content)
+
+        # Диагностика: самая свежая дата в RSS
+        if feed.entries:
+            newest = getattr(feed.entries[0], 'published', getattr(feed.entries[0], 'updated', '?'))
+            _log.info(f"   📅 RSS newest: {newest}")
+
+        tenders = []
+        filtered_count = 0
+
+        # Парсим больше записей, чтобы компенсировать фильтрацию
+        # Для товаров берем в 5 раз больше, так как многие будут отфильтрованы
+        multiplier = 5 if tender_type == "товары" else 3
+        entries_to_check = feed.entries[:max_results * multiplier] if tender_type else feed.entries[:max_results]
+
+        for entry in entries_to_check:
+            if watermark is not None:
+                number = self._extract_number(entry.get('link', ''))
+                published = datetime(*entry.published_parsed[:6]) if entry.get('published_parsed') else None
+                if watermark.is_before_window(published):
+                    # Фид отсортирован по дате: дальше только обработанное
+                    watermark.stopped_early = True
+                    break
+                if watermark.is_seen(number, published):
+                    watermark.skipped_seen += 1
                     continue
-
-                # Client-side фильтрация по типу закупки (если указан)
-                if tender_type == "товары":
-                    # Фильтрация для товаров - исключаем явные услуги и работы
-                    name_lower = tender.get('name', '').lower()
-
-                    # Если название начинается с индикатора товаров - НЕ фильтруем
-                    # (даже если в описании есть "ремонт", "монтаж" и т.д.)
-                    goods_start_indicators = [
-                        'поставка', 'закупка', 'приобретение', 'купля',
-                        'покупка', 'снабжение'
-                    ]
-                    is_goods_by_name = any(name_lower.startswith(ind) for ind in goods_start_indicators)
-
-                    if not is_goods_by_name:
-                        # Проверяем только НАЗВАНИЕ на индикаторы услуг/работ
-                        # (не проверяем summary - слишком много ложных срабатываний)
-                        service_work_indicators = [
-                            'оказание услуг', 'выполнение работ', 'проведение работ',
-                            'оказание услуги', 'выполнение услуг',
-                            'услуги по', 'работы по',
-                            'медицинские услуги', 'медицинская помощь',
-                            'консультирование', 'проектирование',
-                            'техническое обслуживание', 'техобслуживание',
-                            'сервисное обслуживание',
-                        ]
-
-                        is_service_or_work = False
-                        for indicator in service_work_indicators:
-                            if indicator in name_lower:
-                                filtered_count += 1
-                                _log.debug(f"   ⛔ Отфильтрован (услуга/работа, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
-                                is_service_or_work = True
-                                break
-                        if is_service_or_work:
-                            continue
-
-                elif tender_type == "услуги":
-                    # СТРОГАЯ фильтрация для услуг - исключаем товары и работы
-                    name_lower = tender.get('name', '').lower()
-                    summary_lower = tender.get('summary', '').lower()
-                    full_text = name_lower + ' ' + summary_lower
-
-                    # Индикаторы товаров - если они есть явно, это НЕ услуги
-                    goods_indicators = [
-                        'поставка товар', 'закупка товар', 'приобретение товар',
-                        'поставка оборудования', 'закупка оборудования',
-                        'поставка материал', 'закупка материал'
-                    ]
-                    # Индикаторы работ
-                    work_indicators = [
-                        'выполнение работ', 'строительные работы', 'ремонт',
-                        'строительство', 'реконструкция'
+                watermark.observe(number, published)
+
+            tender = self._parse_rss_entry(entry)
+            if not tender:
+                continue
+
+            # Client-side фильтрация по типу закупки (если указан)
+            if tender_type == "товары":
+                # Фильтрация для товаров - исключаем явные услуги и работы
+                name_lower = tender.get('name', '').lower()
+
+                # Если название начинается с индикатора товаров - НЕ фильтруем
+                # (даже если в описании есть "ремонт", "монтаж" и т.д.)
+                goods_start_indicators = [
+                    'поставка', 'закупка', 'приобретение', 'купля',
+                    'покупка', 'снабжение'
+                ]
+                is_goods_by_name = any(name_lower.startswith(ind) for ind in goods_start_indicators)
+
+                if not is_goods_by_name:
+                    # Проверяем только НАЗВАНИЕ на индикаторы услуг/работ
+                    # (не проверяем summary - слишком много ложных срабатываний)
+                    service_work_indicators = [
+                        'оказание услуг', 'выполнение работ', 'проведение работ',
+                        'оказание услуги', 'выполнение услуг',
+                        'услуги по', 'работы по',
+                        'медицинские услуги', 'медицинская помощь',
+                        'консультирование', 'проектирование',
+                        'техническое обслуживание', 'техобслуживание',
+                        'сервисное обслуживание',
                     ]
 
-                    is_goods_or_work = False
-                    for indicator in goods_indicators + work_indicators:
-                        if indicator in full_text:
+                    is_service_or_work = False
+                    for indicator in service_work_indicators:
+                        if indicator in name_lower:
                             filtered_count += 1
-                            _log.debug(f"   ⛔ Отфильтрован (не услуга, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
-                            is_goods_or_work = True
+                            _log.debug(f"   ⛔ Отфильтрован (услуга/работа, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
+                            is_service_or_work = True
                             break
-                    if is_goods_or_work:
+                    if is_service_or_work:
                         continue
 
-                elif tender_type == "работы":
-                    # СТРОГАЯ фильтрация для работ - исключаем товары и услуги
-                    name_lower = tender.get('name', '').lower()
-                    summary_lower = tender.get('summary', '').lower()
-                    full_text = name_lower + ' ' + summary_lower
-
-                    # Индикаторы товаров
-                    goods_indicators = [
-                        'поставка товар', 'закупка товар', 'приобретение товар',
-                        'поставка оборудования', 'закупка оборудования'
-                    ]
-                    # Индикаторы услуг
-                    service_indicators = [
-                        'оказание услуг', 'медицинские услуги', 'консультирование',
-                        'услуги по', 'сопровождение'
-                    ]
+            elif tender_type == "услуги":
+                # СТРОГАЯ фильтрация для услуг - исключаем товары и работы
+                name_lower = tender.get('name', '').lower()
+                summary_lower = tender.get('summary', '').lower()
+                full_text = name_lower + ' ' + summary_lower
+
+                # Индикаторы товаров - если они есть явно, это НЕ услуги
+                goods_indicators = [
+                    'поставка товар', 'закупка товар', 'приобретение товар',
+                    'поставка оборудования', 'закупка оборудования',
+                    'поставка материал', 'закупка материал'
+                ]
+                # Индикаторы работ
+                work_indicators = [
+                    'выполнение работ', 'строительные работы', 'ремонт',
+                    'строительство', 'реконструкция'
+                ]
+
+                is_goods_or_work = False
+                for indicator in goods_indicators + work_indicators:
+                    if indicator in full_text:
+                        filtered_count += 1
+                        _log.debug(f"   ⛔ Отфильтрован (не услуга, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
+                        is_goods_or_work = True
+                        break
+                if is_goods_or_work:
+                    continue
 
-                    is_goods_or_service = False
-                    for indicator in goods_indicators + service_indicators:
-                        if indicator in full_text:
-                            filtered_count += 1
-                            _log.debug(f"   ⛔ Отфильтрован (не работа, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
-                            is_goods_or_service = True
-                            break
-                    if is_goods_or_service:
-                        continue
+            elif tender_type == "работы":
+                # СТРОГАЯ фильтрация для работ - исключаем товары и услуги
+                name_lower = tender.get('name', '').lower()
+                summary_lower = tender.get('summary', '').lower()
+                full_text = name_lower + ' ' + summary_lower
+
+                # Индикаторы товаров
+                goods_indicators = [
+                    'поставка товар', 'закупка товар', 'приобретение товар',
+                    'поставка оборудования', 'закупка оборудования'
+                ]
+                # Индикаторы услуг
+                service_indicators = [
+                    'оказание услуг', 'медицинские услуги', 'консультирование',
+                    'услуги по', 'сопровождение'
+                ]
+
+                is_goods_or_service = False
+                for indicator in goods_indicators + service_indicators:
+                    if indicator in full_text:
+                        filtered_count += 1
+                        _log.debug(f"   ⛔ Отфильтрован (не работа, найдено '{indicator}'): {tender.get('name', '')[:60]}...")
+                        is_goods_or_service = True
+                        break
+                if is_goods_or_service:
+                    continue
 
-                tenders.append(tender)
+            tenders.append(tender)
 
-                # Останавливаемся когда набрали нужное количество
-                if len(tenders) >= max_results:
-                    break
+            # Останавливаемся когда набрали нужное количество
+            if len(tenders) >= max_results:
+                break
 
-            _log.debug(f"✓ Получено тендеров из RSS: {len(tenders)}")
-            if filtered_count > 0:
-                _log.debug(f"   📊 Отфильтровано по типу: {filtered_count}")
-            return tenders
-
-        except Exception as e:
-            print(f"✗ Ошибка получения RSS: {e}")
-            return []
+        _log.debug(f"✓ Получено тендеров из RSS: {len(tenders)}")
+        if filtered_count > 0:
+            _log.debug(f"   📊 Отфильтровано по типу: {filtered_count}")
+        return tenders
 
+    @timed('zakupki_fetch', kind='html')
     def search_tenders_html(
         self,
         keywords: Optional[str] = None,
@@ -523,117 +594,257 @@ class ZakupkiRSSParser:
         Возвращает данные в том же формате что и search_tenders_rss.
         """
         try:
-            from bs4 import BeautifulSoup
-
-            # Используем тот же URL builder но меняем endpoint
-            rss_url = self._build_rss_url(
+            html_url = self._build_html_url(
                 keywords=keywords, price_min=price_min, price_max=price_max,
                 regions=regions, tender_type=tender_type, law_type=law_type,
                 purchase_stage=purchase_stage, purchase_method=purchase_method,
                 date_from=date_from,
             )
-            html_url = rss_url.replace('/rss.html?', '/results.html?')
-            html_url += '&recordsPerPage=_50&pageNumber=1'
 
             _log.info(f"   🌐 HTML fallback: {html_url[:150]}...")
 
-            # Запрос через прокси
-            sessions_to_try = list(self._proxy_sessions) if self._proxy_sessions else [self.session]
-            if self._proxy_sessions:
-                idx = self._current_proxy_idx % len(self._proxy_sessions)
-                sessions_to_try = self._proxy_sessions[idx:] + self._proxy_sessions[:idx]
-
+            # Запрос через прокси (лучший по здоровью первым)
             html_content = None
-            for sess in sessions_to_try:
+            for label, sess in self._ordered_proxy_sessions():
                 try:
-                    self._wait_for_rate_limit()
-                    response = sess.get(html_url, timeout=self.timeout, verify=False)
+                    response = self._proxy_get(label, sess, html_url, self.timeout)
                     if response.status_code in (403, 434):
                         continue
                     response.raise_for_status()
                     html_content = response.text
                     break
                 except Exception as e:
-                    _log.warning(f"⚠️ HTML fallback прокси ошибка: {e}")
+                    _log.warning(f"⚠️ HTML fallback прокси {label} ошибка: {e}")
                     continue
 
             if not html_content:
                 _log.error("❌ HTML fallback: все прокси недоступны")
                 return []
 
-            soup = BeautifulSoup(html_content, 'html.parser')
-            cards = soup.find_all('div', class_='search-registry-entry-block')
-            if not cards:
-                cards = soup.find_all('div', class_='search-registry-entry')
+            return self._parse_html_search_page(html_content, max_results)
 
-            _log.info(f"   🌐 HTML fallback: найдено {len(cards)} карточек")
+        except Exception as e:
+            _log.error(f"❌ HTML fallback ошибка: {e}")
+            return []
 
-            tenders = []
-            for card in cards[:max_results]:
-                try:
-                    tender = {}
-
-                    # Номер и URL
-                    num_div = card.find('div', class_='registry-entry__header-mid__number')
-                    if num_div:
-                        link = num_div.find('a')
-                        if link:
-                            raw_number = link.text.strip().replace('№', '').strip()
-                            tender['number'] = raw_number
-                            href = link.get('href', '')
-                            tender['url'] = self.BASE_URL + href if href.startswith('/') else href
-                            # Извлекаем чистый номер из URL
-                            reg_match = re.search(r'regNumber=([A-Z0-9]+)', href)
-                            if reg_match:
-                                tender['number'] = reg_match.group(1)
-
-                    # Название
-                    body_val = card.find('div', class_='registry-entry__body-value')
-                    if body_val:
-                        tender['name'] = body_val.text.strip()
-
-                    # Цена
-                    price_block = card.find('div', class_='price-block__value')
-                    if price_block:
-                        price_text = price_block.text.strip()
-                        cleaned = re.sub(r'[^\d,.]', '', price_text).replace(',', '.')
-                        try:
-                            tender['price'] = float(cleaned)
-                            tender['price_formatted'] = price_text
-                        except ValueError:
-                            pass
+    # ============================================================
+    # ASYNC ТРАНСПОРТ (aiohttp, пул прокси)
+    # ============================================================
 
-                    # Заказчик
-                    customer_div = card.find('div', class_='registry-entry__body-href')
-                    if customer_div:
-                        tender['customer'] = customer_div.text.strip()
+    @staticmethod
+    def _is_maintenance_page(body: str) -> bool:
+        """Ответ 403/434 со страницей регламентных работ ЕИС."""
+        return is_maintenance_page(body)
 
-                    # Даты
-                    date_blocks = card.find_all('div', class_='data-block__value')
-                    if len(date_blocks) >= 1:
-                        tender['published'] = date_blocks[0].text.strip()
-                    if len(date_blocks) >= 2:
-                        tender['submission_deadline'] = date_blocks[1].text.strip()
+    @timed('zakupki_fetch', kind='rss')
+    async def search_tenders_rss_async(
+        self,
+        keywords: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        max_results: int = 50,
+        regions: Optional[List[str]] = None,
+        tender_type: Optional[str] = None,
+        law_type: Optional[str] = None,
+        purchase_stage: Optional[str] = None,
+        purchase_method: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        watermark=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Асинхронная версия search_tenders_rss.
 
-                    if tender.get('number'):
-                        tenders.append(tender)
+        Запрос идёт через общий AsyncZakupkiClient (keep-alive сессия и
+        token bucket на каждый прокси), разбор фида — в thread executor.
+        """
+        try:
+            rss_url = self._build_rss_url(
+                keywords=keywords, price_min=price_min, price_max=price_max,
+                regions=regions, tender_type=tender_type, law_type=law_type,
+                purchase_stage=purchase_stage, purchase_method=purchase_method,
+                date_from=date_from, date_to=date_to,
+            )
+            _log.debug(f"   📡 RSS URL (async): {rss_url[:200]}...")
 
-                except Exception as e:
-                    _log.debug(f"Ошибка парсинга HTML карточки: {e}")
-                    continue
+            response = await get_async_client().get(rss_url, timeout=self.timeout)
+            if response.status in (403, 434):
+                if self._is_maintenance_page(response.text):
+                    _log.warning("🔧 zakupki.gov.ru проводит регламентные работы — сайт недоступен для всех")
+                else:
+                    _log.error(f"❌ Все прокси недоступны. Последний ответ: HTTP {response.status}")
+                return []
+            response.raise_for_status()
 
-            # Диагностика: самая свежая дата в HTML
-            if tenders:
-                newest_date = tenders[0].get('published', '?')
-                _log.info(f"   🌐 HTML результат: {len(tenders)} тендеров, newest: {newest_date}")
-            else:
-                _log.info(f"   🌐 HTML результат: 0 тендеров")
-            return tenders
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._parse_rss_feed, response.content, max_results, tender_type, watermark
+            )
 
         except Exception as e:
-            _log.error(f"❌ HTML fallback ошибка: {e}")
+            _log.error(f"✗ Ошибка получения RSS: {e!r}")
             return []
 
+    @timed('zakupki_fetch', kind='html')
+    async def search_tenders_html_async(
+        self,
+        keywords: Optional[str] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        max_results: int = 50,
+        regions: Optional[List[str]] = None,
+        tender_type: Optional[str] = None,
+        law_type: Optional[str] = None,
+        purchase_stage: Optional[str] = None,
+        purchase_method: Optional[str] = None,
+        date_from: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Асинхронная версия search_tenders_html."""
+        try:
+            html_url = self._build_html_url(
+                keywords=keywords, price_min=price_min, price_max=price_max,
+                regions=regions, tender_type=tender_type, law_type=law_type,
+                purchase_stage=purchase_stage, purchase_method=purchase_method,
+                date_from=date_from,
+            )
+            _log.info(f"   🌐 HTML fallback (async): {html_url[:150]}...")
+
+            response = await get_async_client().get(html_url, timeout=self.timeout)
+            if response.status in (403, 434):
+                _log.error("❌ HTML fallback: все прокси недоступны")
+                return []
+            response.raise_for_status()
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._parse_html_search_page, response.text, max_results
+            )
+
+        except Exception as e:
+            _log.error(f"❌ HTML fallback ошибка: {e!r}")
+            return []
+
+    @timed('zakupki_fetch', kind='tender_page')
+    async def enrich_tender_from_page_async(self, tender: Dict[str, Any]) -> Dict[str, Any]:
+        """Асинхронная версия enrich_tender_from_page."""
+        url = tender.get('url', '')
+        if not url:
+            _log.debug(f"   ⚠️ Обогащение: URL отсутствует, пропускаем")
+            return tender
+
+        _log.debug(f"   🌐 Загружаем страницу тендера (async): {url[:80]}...")
+        client = get_async_client()
+        loop = asyncio.get_running_loop()
+
+        try:
+            response = await client.get(url, timeout=15)
+            response.raise_for_status()
+            html_content = response.text
+
+            needs_name = await loop.run_in_executor(None, self._apply_tender_page, tender, html_content)
+            if needs_name:
+                purchase_object = self._extract_purchase_object_from_page(html_content)
+
+                # Если не нашли на common-info, пробуем вкладку purchase-objects
+                if not purchase_object or len(purchase_object) <= 10:
+                    purchase_objects_url = url.replace('common-info.html', 'purchase-objects.html')
+                    if purchase_objects_url != url:
+                        _log.debug(f"   🔄 Пробуем вкладку purchase-objects...")
+                        try:
+                            po_response = await client.get(purchase_objects_url, timeout=15)
+                            if po_response.status == 200:
+                                purchase_object = self._extract_purchase_object_from_page(po_response.text)
+                        except Exception as e:
+                            _log.debug(f"   ⚠️ Ошибка загрузки purchase-objects: {e!r}")
+
+                self._apply_purchase_object(tender, purchase_object)
+
+            _log.debug(f"   ✅ Обогащено: цена={tender.get('price', 'Н/Д')}, дедлайн={tender.get('submission_deadline', 'Н/Д')}, регион={tender.get('customer_region', 'Н/Д')}")
+
+        except asyncio.TimeoutError:
+            _log.warning(f"   ⏱️ Таймаут при загрузке страницы тендера: {url[:80]}")
+        except Exception as e:
+            _log.warning(f"   ⚠️ Ошибка обогащения тендера: {e!r}")
+
+        return tender
+
+    def _build_html_url(self, **url_params) -> str:
+        """URL HTML-страницы результатов поиска (тот же URL builder, другой endpoint)."""
+        rss_url = self._build_rss_url(**url_params)
+        html_url = rss_url.replace('/rss.html?', '/results.html?')
+        return html_url + '&recordsPerPage=_50&pageNumber=1'
+
+    def _parse_html_search_page(self, html_content: str, max_results: int) -> List[Dict[str, Any]]:
+        """Разбирает HTML-страницу результатов поиска (results.html) в формат search_tenders_rss."""
+        soup = BeautifulSoup(html_content, 'html.parser')
+        cards = soup.find_all('div', class_='search-registry-entry-block')
+        if not cards:
+            cards = soup.find_all('div', class_='search-registry-entry')
+
+        _log.info(f"   🌐 HTML fallback: найдено {len(cards)} карточек")
+
+        tenders = []
+        for card in cards[:max_results]:
+            try:
+                tender = {}
+
+                # Номер и URL
+                num_div = card.find('div', class_='registry-entry__header-mid__number')
+                if num_div:
+                    link = num_div.find('a')
+                    if link:
+                        raw_number = link.text.strip().replace('№', '').strip()
+                        tender['number'] = raw_number
+                        href = link.get('href', '')
+                        tender['url'] = self.BASE_URL + href if href.startswith('/') else href
+                        # Извлекаем чистый номер из URL
+                        reg_match = re.search(r'regNumber=([A-Z0-9]+)', href)
+                        if reg_match:
+                            tender['number'] = reg_match.group(1)
+
+                # Название
+                body_val = card.find('div', class_='registry-entry__body-value')
+                if body_val:
+                    tender['name'] = body_val.text.strip()
+
+                # Цена
+                price_block = card.find('div', class_='price-block__value')
+                if price_block:
+                    price_text = price_block.text.strip()
+                    cleaned = re.sub(r'[^\d,.]', '', price_text).replace(',', '.')
+                    try:
+                        tender['price'] = float(cleaned)
+                        tender['price_formatted'] = price_text
+                    except ValueError:
+                        pass
+
+                # Заказчик
+                customer_div = card.find('div', class_='registry-entry__body-href')
+                if customer_div:
+                    tender['customer'] = customer_div.text.strip()
+
+                # Даты
+                date_blocks = card.find_all('div', class_='data-block__value')
+                if len(date_blocks) >= 1:
+                    tender['published'] = date_blocks[0].text.strip()
+                if len(date_blocks) >= 2:
+                    tender['submission_deadline'] = date_blocks[1].text.strip()
+
+                if tender.get('number'):
+                    tenders.append(tender)
+
+            except Exception as e:
+                _log.debug(f"Ошибка парсинга HTML карточки: {e}")
+                continue
+
+        # Диагностика: самая свежая дата в HTML
+        if tenders:
+            newest_date = tenders[0].get('published', '?')
+            _log.info(f"   🌐 HTML результат: {len(tenders)} тендеров, newest: {newest_date}")
+        else:
+            _log.info(f"   🌐 HTML результат: 0 тендеров")
+        return tenders
+
     def _build_rss_url(
         self,
         keywords: Optional[str],
@@ -815,6 +1026,11 @@ class ZakupkiRSSParser:
             if deadline:
                 tender['submission_deadline'] = deadline
 
+            # Дата последнего изменения извещения (для инвалидации кэша обогащения)
+            update_date = self._extract_update_date_from_summary(summary) or entry.get('updated', '')
+            if update_date:
+                tender['update_date'] = update_date
+
             # Парсим дату публикации в удобный формат
             if entry.get('published_parsed'):
                 tender['published_datetime'] = datetime(*entry.published_parsed[:6])
@@ -962,6 +1178,13 @@ class ZakupkiRSSParser:
 
         return None
 
+    def _extract_update_date_from_summary(self, summary: str) -> Optional[str]:
+        """Извлекает дату обновления извещения из описания RSS."""
+        match = re.search(r'Обновлено:\s*(?:</strong>)?\s*([0-9.]+(?:\s+[0-9:]+)?)', summary)
+        if match:
+            return match.group(1).strip()
+        return None
+
     def _extract_deadline_from_summary(self, summary: str) -> Optional[str]:
         """Извлекает дату окончания подачи заявок из описания RSS."""
         patterns = [
@@ -1024,6 +1247,7 @@ class ZakupkiRSSParser:
 
         return None
 
+    @timed('zakupki_fetch', kind='tender_page')
     def enrich_tender_from_page(self, tender: Dict[str, Any]) -> Dict[str, Any]:
         """
         Обогащает данные тендера, загружая полную страницу с zakupki.gov.ru.
@@ -1043,78 +1267,13 @@ class ZakupkiRSSParser:
         _log.debug(f"   🌐 Загружаем страницу тендера: {url[:80]}...")
 
         try:
-            # Соблюдаем rate limit
-            self._wait_for_rate_limit()
-
-            # Используем self.session (уже настроена с прокси)
-            response = self.session.get(url, timeout=15, verify=False)
+            # Лучший по здоровью прокси (rate limit соблюдается в _proxy_get)
+            label, sess = self._ordered_proxy_sessions()[0]
+            response = self._proxy_get(label, sess, url, 15)
             response.raise_for_status()
 
             html_content = response.text
-
-            # === Извлекаем НМЦК ===
-            if not tender.get('price'):
-                price = self._extract_price_from_page(html_content)
-                if price:
-                    tender['price'] = price
-                    tender['price_formatted'] = f"{price:,.2f} ₽".replace(',', ' ')
-
-            # === Извлекаем дату окончания подачи заявок ===
-            if not tender.get('submission_deadline'):
-                deadline = self._extract_deadline_from_page(html_content)
-                if deadline:
-                    tender['submission_deadline'] = deadline
-
-            # === Извлекаем адрес и регион заказчика ===
-            address_info = self._extract_address_from_page(html_content)
-            if address_info:
-                tender['customer_address'] = address_info.get('full_address', '')
-                # Регион из адреса — только если ещё не определён из названия заказчика
-                new_region = address_info.get('region', '')
-                if new_region and not tender.get('customer_region'):
-                    from tender_sniper.regions import normalize_region
-                    normalized = normalize_region(new_region)
-                    if normalized:
-                        tender['customer_region'] = normalized
-                new_city = address_info.get('city', '')
-                if new_city:
-                    tender['customer_city'] = new_city
-
-            # === Fallback: регион по ИНН заказчика ===
-            if not tender.get('customer_region'):
-                inn_match = re.search(r'ИНН[:\s]*(\d{10,12})', html_content)
-                if inn_match:
-                    from tender_sniper.regions import region_from_inn
-                    inn_region = region_from_inn(inn_match.group(1))
-                    if inn_region:
-                        tender['customer_region'] = inn_region
-                        _log.debug(f"   📍 Регион из ИНН: {inn_region}")
-
-            # === Извлекаем название заказчика если нет ===
-            if not tender.get('customer'):
-                customer = self._extract_customer_from_page(html_content)
-                if customer:
-                    tender['customer'] = customer
-
-            # === Извлекаем объект закупки со страницы если в name бюрократия ===
-            current_name = tender.get('name', '')
-            _log.debug(f"   📋 Проверка названия тендера: {current_name[:80]}...")
-
-            # Проверяем признаки бюрократического названия
-            bureaucratic_indicators = [
-                'закупка, осуществляемая в соответствии',
-                'в соответствии с частью',
-                'статьи 93',
-                'закона № 44-фз',
-                'закона №44-фз'
-            ]
-            is_bureaucratic = (
-                any(indicator in current_name.lower() for indicator in bureaucratic_indicators)
-                or _is_procedure_type_only(current_name)
-            )
-
-            if is_bureaucratic:
-                _log.debug(f"   ⚠️ Обнаружено бюрократическое название, попытка заменить...")
+            if self._apply_tender_page(tender, html_content):
                 purchase_object = self._extract_purchase_object_from_page(html_content)
 
                 # Если не нашли на common-info, пробуем вкладку purchase-objects
@@ -1123,45 +1282,13 @@ class ZakupkiRSSParser:
                     if purchase_objects_url != url:
                         _log.debug(f"   🔄 Пробуем вкладку purchase-objects...")
                         try:
-                            self._wait_for_rate_limit()
-                            po_response = self.session.get(purchase_objects_url, timeout=15, verify=False)
+                            po_response = self._proxy_get(label, sess, purchase_objects_url, 15)
                             if po_response.status_code == 200:
                                 purchase_object = self._extract_purchase_object_from_page(po_response.text)
                         except Exception as e:
                             _log.debug(f"   ⚠️ Ошибка загрузки purchase-objects: {e}")
 
-                if purchase_object and len(purchase_object) > 10:
-                    old_name = tender['name']
-                    tender['name'] = purchase_object
-                    _log.debug(f"   ✅ Заменено название:")
-                    _log.debug(f"      Было: {old_name[:80]}...")
-                    _log.debug(f"      Стало: {purchase_object[:80]}...")
-                else:
-                    _log.debug(f"   ⚠️ Объект закупки не извлечен, оставляем исходное название")
-            elif len(current_name) < 20:
-                _log.debug(f"   ⚠️ Название слишком короткое ({len(current_name)} символов), попытка заменить...")
-                purchase_object = self._extract_purchase_object_from_page(html_content)
-
-                # Если не нашли на common-info, пробуем вкладку purchase-objects
-                if not purchase_object or len(purchase_object) <= 10:
-                    purchase_objects_url = url.replace('common-info.html', 'purchase-objects.html')
-                    if purchase_objects_url != url:
-                        _log.debug(f"   🔄 Пробуем вкладку purchase-objects...")
-                        try:
-                            self._wait_for_rate_limit()
-                            po_response = self.session.get(purchase_objects_url, timeout=15, verify=False)
-                            if po_response.status_code == 200:
-                                purchase_object = self._extract_purchase_object_from_page(po_response.text)
-                        except Exception as e:
-                            _log.debug(f"   ⚠️ Ошибка загрузки purchase-objects: {e}")
-
-                if purchase_object and len(purchase_object) > 10:
-                    tender['name'] = purchase_object
-                    _log.debug(f"   ✅ Заменено короткое название на: {purchase_object[:60]}...")
-                else:
-                    _log.debug(f"   ⚠️ Объект закупки не извлечен, оставляем исходное название")
-            else:
-                _log.debug(f"   ✓ Название в порядке, замена не требуется")
+                self._apply_purchase_object(tender, purchase_object)
 
             # Логируем что было извлечено
             _log.debug(f"   ✅ Обогащено: цена={tender.get('price', 'Н/Д')}, дедлайн={tender.get('submission_deadline', 'Н/Д')}, регион={tender.get('customer_region', 'Н/Д')}")
@@ -1175,6 +1302,97 @@ class ZakupkiRSSParser:
 
         return tender
 
+    def _apply_tender_page(self, tender: Dict[str, Any], html_content: str) -> bool:
+        """
+        Переносит в тендер данные со страницы common-info.
+        Общая часть sync и async транспорта.
+
+        Returns:
+            True если название тендера бюрократическое/короткое и его нужно
+            заменить объектом закупки
+        """
+        # === Извлекаем НМЦК ===
+        if not tender.get('price'):
+            price = self._extract_price_from_page(html_content)
+            if price:
+                tender['price'] = price
+                tender['price_formatted'] = f"{price:,.2f} ₽".replace(',', ' ')
+
+        # === Извлекаем дату окончания подачи заявок ===
+        if not tender.get('submission_deadline'):
+            deadline = self._extract_deadline_from_page(html_content)
+            if deadline:
+                tender['submission_deadline'] = deadline
+
+        # === Извлекаем адрес и регион заказчика ===
+        address_info = self._extract_address_from_page(html_content)
+        if address_info:
+            tender['customer_address'] = address_info.get('full_address', '')
+            # Регион из адреса — только если ещё не определён из названия заказчика
+            new_region = address_info.get('region', '')
+            if new_region and not tender.get('customer_region'):
+                from tender_sniper.regions import normalize_region
+                normalized = normalize_region(new_region)
+                if normalized:
+                    tender['customer_region'] = normalized
+            new_city = address_info.get('city', '')
+            if new_city:
+                tender['customer_city'] = new_city
+
+        # === Fallback: регион по ИНН заказчика ===
+        if not tender.get('customer_region'):
+            inn_match = re.search(r'ИНН[:\s]*(\d{10,12})', html_content)
+            if inn_match:
+                from tender_sniper.regions import region_from_inn
+                inn_region = region_from_inn(inn_match.group(1))
+                if inn_region:
+                    tender['customer_region'] = inn_region
+                    _log.debug(f"   📍 Регион из ИНН: {inn_region}")
+
+        # === Извлекаем название заказчика если нет ===
+        if not tender.get('customer'):
+            customer = self._extract_customer_from_page(html_content)
+            if customer:
+                tender['customer'] = customer
+
+        # === Проверяем, нужно ли заменить название объектом закупки ===
+        current_name = tender.get('name', '')
+        _log.debug(f"   📋 Проверка названия тендера: {current_name[:80]}...")
+
+        # Проверяем признаки бюрократического названия
+        bureaucratic_indicators = [
+            'закупка, осуществляемая в соответствии',
+            'в соответствии с частью',
+            'статьи 93',
+            'закона № 44-фз',
+            'закона №44-фз'
+        ]
+        is_bureaucratic = (
+            any(indicator in current_name.lower() for indicator in bureaucratic_indicators)
+            or _is_procedure_type_only(current_name)
+        )
+
+        if is_bureaucratic:
+            _log.debug(f"   ⚠️ Обнаружено бюрократическое название, попытка заменить...")
+            return True
+        if len(current_name) < 20:
+            _log.debug(f"   ⚠️ Название слишком короткое ({len(current_name)} символов), попытка заменить...")
+            return True
+
+        _log.debug(f"   ✓ Название в порядке, замена не требуется")
+        return False
+
+    def _apply_purchase_object(self, tender: Dict[str, Any], purchase_object: Optional[str]) -> None:
+        """Заменяет название тендера извлечённым объектом закупки (если он осмысленный)."""
+        if purchase_object and len(purchase_object) > 10:
+            old_name = tender.get('name', '')
+            tender['name'] = purchase_object
+            _log.debug(f"   ✅ Заменено название:")
+            _log.debug(f"      Было: {old_name[:80]}...")
+            _log.debug(f"      Стало: {purchase_object[:80]}...")
+        else:
+            _log.debug(f"   ⚠️ Объект закупки не извлечен, оставляем исходное название")
+
     def _extract_price_from_page(self, html: str) -> Optional[float]:
         """Извлекает НМЦК из HTML страницы тендера."""
         patterns = [
@@ -49,6 +49,7 @@ from database import (
 )
 
 from tender_sniper.admin.metrika import MetrikaService
+from tender_sniper.jobs.stats_rollup import notification_count, notification_series
 
 logger = logging.getLogger(__name__)
 
@@ -115,34 +116,12 @@ async def dashboard(request: Request, username: str = Depends(verify_credentials
         async with DatabaseSession() as session:
             # Общая статистика
             total_users = await session.scalar(select(func.count(SniperUser.id))) or 0
-            active_filters = await session.scalar(
-                select(func.count(SniperFilter.id)).where(SniperFilter.is_active == True)
-            ) or 0
             total_filters = await session.scalar(select(func.count(SniperFilter.id))) or 0
-            total_notifications = await session.scalar(select(func.count(SniperNotification.id))) or 0
 
-            # За сегодня
-            today = datetime.now().date()
-            today_notifications = await session.scalar(
-                select(func.count(SniperNotification.id)).where(
-                    func.date(SniperNotification.sent_at) == today
-                )
-            ) or 0
-
-            # За неделю
-            week_ago = datetime.now() - timedelta(days=7)
-            week_notifications = await session.scalar(
-                select(func.count(SniperNotification.id)).where(
-                    SniperNotification.sent_at >= week_ago
-                )
-            ) or 0
-
-            # Новые пользователи за неделю
-            new_users_week = await session.scalar(
-                select(func.count(SniperUser.id)).where(
-                    SniperUser.created_at >= week_ago
-                )
-            ) or 0
+            # За сегодня — из rollup счётчиков (без COUNT по sniper_notifications)
+            today_notifications = await notification_count(
+                datetime.combine(datetime.now().date(), datetime.min.time()), granularity='day'
+            )
 
             # Статистика по тарифам
             tier_stats_query = (
@@ -155,22 +134,6 @@ async def dashboard(request: Request, username: str = Depends(verify_credentials
             tier_result = await session.execute(tier_stats_query)
             tier_stats = {row[0]: row[1] for row in tier_result.all()}
 
-            # Последние уведомления
-            recent_query = (
-                select(
-                    SniperNotification.sent_at,
-                    SniperNotification.tender_number,
-                    SniperUser.telegram_id,
-                    SniperFilter.name.label('filter_name')
-                )
-                .join(SniperUser, SniperNotification.user_id == SniperUser.id)
-                .join(SniperFilter, SniperNotification.filter_id == SniperFilter.id)
-                .order_by(SniperNotification.sent_at.desc())
-                .limit(10)
-            )
-            recent_result = await session.execute(recent_query)
-            recent_notifications = recent_result.all()
-
             # Активные пользователи (последние 24 часа)
             yesterday = datetime.now() - timedelta(hours=24)
             active_users = await session.scalar(
@@ -1116,28 +1079,14 @@ async def hourly_stats(
 ):
     """Статистика уведомлений по часам."""
     try:
-        async with DatabaseSession() as session:
-            since = datetime.now() - timedelta(hours=hours)
-
-            query = (
-                select(SniperNotification.sent_at)
-                .where(SniperNotification.sent_at >= since)
-                .order_by(SniperNotification.sent_at)
-            )
-            result = await session.execute(query)
-            notifications = result.scalars().all()
-
-            # Группируем по часам
-            from collections import defaultdict
-            hourly = defaultdict(int)
-            for sent_at in notifications:
-                hour_key = sent_at.strftime('%Y-%m-%d %H:00')
-                hourly[hour_key] += 1
+        since = datetime.now() - timedelta(hours=hours)
+        series = await notification_series('hour', since)
+        hourly = sorted(series.get('', {}).items())
 
-            return JSONResponse({
-                "labels": list(hourly.keys()),
-                "data": list(hourly.values())
-            })
+        return JSONResponse({
+            "labels": [bucket.strftime('%Y-%m-%d %H:00') for bucket, _ in hourly],
+            "data": [count for _, count in hourly]
+        })
 
     except Exception as e:
         logger.error(f"Hourly stats error: {e}", exc_info=True)
@@ -1151,30 +1100,54 @@ async def daily_stats(
 ):
     """Статистика уведомлений по дням."""
     try:
-        async with DatabaseSession() as session:
-            since = datetime.now() - timedelta(days=days)
+        since = datetime.now() - timedelta(days=days)
+        series = await notification_series('day', since)
+        daily = sorted(series.get('', {}).items())
 
-            query = (
-                select(SniperNotification.sent_at)
-                .where(SniperNotification.sent_at >= since)
-            )
-            result = await session.execute(query)
-            notifications = result.scalars().all()
+        return JSONResponse({
+            "labels": [bucket.strftime('%Y-%m-%d') for bucket, _ in daily],
+            "data": [count for _, count in daily]
+        })
+
+    except Exception as e:
+        logger.error(f"Daily stats error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Группируем по дням
-            from collections import defaultdict
-            daily = defaultdict(int)
-            for sent_at in notifications:
-                day_key = sent_at.strftime('%Y-%m-%d')
-                daily[day_key] += 1
 
-            return JSONResponse({
-                "labels": list(daily.keys()),
-                "data": list(daily.values())
-            })
+@app.get("/api/stats/breakdown")
+async def breakdown_stats(
+    dimension: str = Query('tier', pattern='^(tier|filter|source)$'),
+    days: int = Query(30, ge=1, le=90),
+    username: str = Depends(verify_credentials)
+):
+    """Уведомления за период в разрезе тарифа, фильтра или источника."""
+    try:
+        since = datetime.now() - timedelta(days=days)
+        series = await notification_series('day', since, dimension=dimension)
+        totals = sorted(
+            ((value, sum(buckets.values())) for value, buckets in series.items()),
+            key=lambda item: item[1], reverse=True
+        )
+
+        labels = [value for value, _ in totals]
+        if dimension == 'filter':
+            filter_ids = [int(value) for value in labels if value.isdigit()]
+            names = {}
+            if filter_ids:
+                async with DatabaseSession() as session:
+                    result = await session.execute(
+                        select(SniperFilter.id, SniperFilter.name).where(SniperFilter.id.in_(filter_ids))
+                    )
+                    names = {str(filter_id): name for filter_id, name in result.all()}
+            labels = [names.get(value, f"#{value}") for value in labels]
+
+        return JSONResponse({
+            "labels": labels,
+            "data": [count for _, count in totals]
+        })
 
     except Exception as e:
-        logger.error(f"Daily stats error: {e}", exc_info=True)
+        logger.error(f"Breakdown stats error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2852,14 +2825,27 @@ async def health_dashboard(
     except Exception as e:
         services['notifications'] = {'status': 'unknown', 'message': str(e)}
 
+    # 7. Proxy health (снимок от процесса мониторинга)
+    from tender_sniper.monitoring import load_proxy_health_snapshot
+    proxy_snapshot = await load_proxy_health_snapshot()
+
     return templates.TemplateResponse("health_dashboard.html", {
         "request": request,
         "username": username,
         "services": services,
+        "proxy_snapshot": proxy_snapshot,
         "checked_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
     })
 
 
+@app.get("/api/proxies")
+async def api_proxies(username: str = Depends(verify_credentials)):
+    """Статистика здоровья прокси (latency, ошибки, 403/434, circuit breaker)."""
+    from tender_sniper.monitoring import load_proxy_health_snapshot
+    snapshot = await load_proxy_health_snapshot()
+    return JSONResponse(snapshot or {'updated_at': None, 'proxies': {}})
+
+
 # ============================================
 # TRIGGER MONITORING
 # ============================================
@@ -2871,6 +2857,17 @@ async def trigger_monitoring(
 ):
     """Ручной запуск мониторинга тендеров."""
     try:
+        from tender_sniper.jobs.queue import get_job_queue, is_queue_mode
+        if is_queue_mode():
+            # Цикл выполнит воркер; повторное нажатие не ставит второй цикл
+            job_id = await get_job_queue().enqueue(
+                'sniper.poll', {'max_tenders_per_poll': 50}, priority=50, dedup_key='sniper.poll'
+            )
+            return JSONResponse({
+                "status": "ok",
+                "message": f"Monitoring job queued (#{job_id})." if job_id else "Monitoring job already queued."
+            })
+
         # Импортируем сервис мониторинга
         from tender_sniper.service import TenderSniperService
 
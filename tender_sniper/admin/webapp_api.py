@@ -5,6 +5,7 @@ Endpoints для просмотра тендеров и экспорта в Goog
 Аутентификация через Telegram WebApp initData (HMAC-SHA256).
 """
 
+import asyncio
 import hashlib
 import hmac
 import json
@@ -247,6 +248,7 @@ async def api_export_tenders(request: Request):
             success_ids = []
             failed_ids = []
             errors = {}
+            queued = []  # (notif, future итога записи строки)
 
             is_premium = user.subscription_tier == 'premium'
             user_columns = set(gs_config.columns or [])
@@ -286,24 +288,31 @@ async def api_export_tenders(request: Request):
                     }
 
                     from tender_sniper.google_sheets_sync import get_weekly_sheet_name
-                    await sheets_sync.append_tender(
+                    future = await sheets_sync.enqueue_tender(
                         spreadsheet_id=gs_config.spreadsheet_id,
                         tender_data=tender_data,
                         match_data=match_data,
                         columns=gs_config.columns or [],
-                        sheet_name=get_weekly_sheet_name()
+                        sheet_name=get_weekly_sheet_name(),
                     )
-
-                    # Mark as exported
-                    notif.sheets_exported = True
-                    notif.sheets_exported_at = datetime.utcnow()
-                    success_ids.append(notif.id)
+                    queued.append((notif, future))
 
                 except Exception as exp_err:
                     logger.warning(f"Export error for notif {notif.id}: {exp_err}")
                     failed_ids.append(notif.id)
                     errors[str(notif.id)] = str(exp_err)
 
+            # Mark as exported — только строки, запись которых подтверждена
+            written = await asyncio.gather(*(future for _, future in queued), return_exceptions=True)
+            for (notif, _), ok in zip(queued, written):
+                if ok is True:
+                    notif.sheets_exported = True
+                    notif.sheets_exported_at = datetime.utcnow()
+                    success_ids.append(notif.id)
+                else:
+                    failed_ids.append(notif.id)
+                    errors[str(notif.id)] = "Не удалось записать строку в таблицу"
+
             return JSONResponse({
                 "success": success_ids,
                 "failed": failed_ids,
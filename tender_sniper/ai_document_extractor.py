@@ -253,6 +253,27 @@ class TenderDocumentExtractor:
                 return {}
         return {}
 
+    async def _run_passes(self, chunk: str, context: str) -> Dict[str, Any]:
+        """Все pass'ы извлечения для одного chunk."""
+        # (prompt, max_tokens, model_override, system_message)
+        passes = [
+            (self.PROMPT_DATES, 500, None, self.PROMPT_SYSTEM_DATES),
+            (self.PROMPT_FINANCE, 500, None, self.PROMPT_SYSTEM_FINANCE),
+            (self.PROMPT_ITEMS, 2000, self.MODEL_ITEMS, self.PROMPT_ITEMS_SYSTEM),
+        ]
+        merged = {}
+        # Run passes sequentially to avoid rate limit bursts
+        for prompt, max_tok, model_override, sys_msg in passes:
+            result = await self._extract_pass(
+                chunk, prompt, context,
+                max_tokens=max_tok,
+                model=model_override,
+                system_message=sys_msg
+            )
+            if isinstance(result, dict):
+                merged.update(result)
+        return merged
+
     def _merge_chunk_results(self, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Объединяет результаты из нескольких chunks."""
         if not all_results:
@@ -403,12 +424,16 @@ class TenderDocumentExtractor:
         self,
         document_text: str,
         subscription_tier: str = 'trial',
-        tender_info: Optional[Dict[str, Any]] = None
+        tender_info: Optional[Dict[str, Any]] = None,
+        early_results: Optional[Dict[str, 'asyncio.Task']] = None
     ) -> Tuple[Dict[str, Any], bool]:
         """
         Извлекает структурированные данные из текста документации.
         Multi-pass: 3 параллельных запроса на каждый chunk.
 
+        early_results: {текст chunk: задача _run_passes}, запущенные до
+        окончания извлечения текста (см. extract_from_file)
+
         Returns:
             Tuple[Dict, bool]: (извлечённые данные, is_ai_extracted)
         """
@@ -427,27 +452,16 @@ class TenderDocumentExtractor:
         context = self._build_context(tender_info)
         chunks = self._chunk_text(document_text)
 
+        early_results = early_results or {}
         try:
             all_results = []
-            # (prompt, max_tokens, model_override, system_message)
-            passes = [
-                (self.PROMPT_DATES, 500, None, self.PROMPT_SYSTEM_DATES),
-                (self.PROMPT_FINANCE, 500, None, self.PROMPT_SYSTEM_FINANCE),
-                (self.PROMPT_ITEMS, 2000, self.MODEL_ITEMS, self.PROMPT_ITEMS_SYSTEM),
-            ]
             for chunk_idx, chunk in enumerate(chunks):
-                merged = {}
-                # Run passes sequentially to avoid rate limit bursts
-                for prompt, max_tok, model_override, sys_msg in passes:
-                    result = await self._extract_pass(
-                        chunk, prompt, context,
-                        max_tokens=max_tok,
-                        model=model_override,
-                        system_message=sys_msg
-                    )
-                    if isinstance(result, dict):
-                        merged.update(result)
-                all_results.append(merged)
+                early = early_results.pop(chunk, None)
+                if early is not None:
+                    # Первый chunk уже обрабатывается, пока дочитывался документ
+                    all_results.append(await early)
+                else:
+                    all_results.append(await self._run_passes(chunk, context))
 
             final = self._merge_chunk_results(all_results)
             final = self._validate_and_normalize(final)
@@ -469,6 +483,9 @@ class TenderDocumentExtractor:
         except Exception as e:
             logger.error(f"Ошибка AI-извлечения: {e}")
             return (self._create_fallback_extraction(document_text, tender_info), False)
+        finally:
+            for task in early_results.values():
+                task.cancel()
 
     def _create_fallback_extraction(
         self,
@@ -575,20 +592,53 @@ class TenderDocumentExtractor:
         subscription_tier: str = 'trial',
         tender_info: Optional[Dict[str, Any]] = None
     ) -> Tuple[Dict[str, Any], bool]:
-        """Извлекает данные напрямую из файла документации."""
-        try:
-            from src.document_processor.text_extractor import TextExtractor
+        """
+        Извлекает данные напрямую из файла документации.
 
-            result = TextExtractor.extract_text(file_path)
-            document_text = result['text']
+        Текст читается потоком (ExtractionEngine, пул процессов): как только
+        набирается первый chunk, его AI-pass'ы стартуют, не дожидаясь
+        разбора остальных страниц.
+        """
+        try:
+            from src.document_processor.extraction_engine import (
+                ExtractionTimeout, get_extraction_engine
+            )
 
-            if not document_text or document_text.startswith('[Не удалось'):
+            can_start_early = (
+                AIFeatureGate(subscription_tier).can_use('summarization')
+                and self.api_key and self.client
+            )
+            context = self._build_context(tender_info)
+            parts: List[str] = []
+            text_len = 0
+            early_results: Dict[str, asyncio.Task] = {}
+            try:
+                async for text in get_extraction_engine().iter_text(file_path):
+                    parts.append(text)
+                    text_len += len(text) + 2
+                    if can_start_early and not early_results and text_len > self.CHUNK_MAX_CHARS:
+                        # Первый chunk зависит только от первых CHUNK_MAX_CHARS символов
+                        first_chunk = self._chunk_text('\n\n'.join(parts))[0]
+                        early_results[first_chunk] = asyncio.create_task(
+                            self._run_passes(first_chunk, context)
+                        )
+            except ExtractionTimeout:
+                logger.warning(f"Извлечение текста {file_path} прервано по таймауту, используем {len(parts)} частей")
+            except BaseException:
+                for task in early_results.values():
+                    task.cancel()
+                raise
+
+            document_text = '\n\n'.join(parts)
+            if not document_text:
                 return ({
                     'error': 'extraction_failed',
                     'message': f"Не удалось извлечь текст из файла: {file_path}"
                 }, False)
 
-            return await self.extract_from_text(document_text, subscription_tier, tender_info)
+            return await self.extract_from_text(
+                document_text, subscription_tier, tender_info, early_results=early_results
+            )
 
         except Exception as e:
             logger.error(f"Ошибка извлечения из файла {file_path}: {e}")
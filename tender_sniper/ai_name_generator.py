@@ -8,12 +8,15 @@ AI Name Generator для тендеров.
 import os
 import re
 import sys
+import asyncio
 import html
 import logging
 import hashlib
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from cachetools import TTLCache
 
 # Добавляем корневую директорию в путь
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -42,11 +45,18 @@ class TenderNameGenerator:
 
     Особенности:
     - Использует LLM для генерации понятных названий
-    - Кэширует результаты в памяти и БД
+    - Кэширует результаты в памяти (ограниченный TTLCache); общий кэш в БД
+      и пакетная генерация — в NameShortener (name_shortener.py)
     - Автоматический fallback на оригинальное название при ошибках
     - Поддержка различных LLM провайдеров
     """
 
+    MEMORY_CACHE_SIZE = 10000
+    MEMORY_CACHE_TTL = 30 * 24 * 3600  # секунды
+
+    # Пакетная генерация: токенов ответа на одно название
+    BATCH_TOKENS_PER_ITEM = 30
+
     def __init__(
         self,
         llm_provider: str = None,
@@ -83,9 +93,12 @@ class TenderNameGenerator:
         self.model = llm_model
         self.cache_enabled = cache_enabled
 
-        # In-memory кэш для быстрого доступа
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_ttl = timedelta(days=30)  # TTL для кэша
+        # In-memory кэш для быстрого доступа (LRU + TTL, не растёт бесконечно)
+        self._memory_cache: TTLCache = TTLCache(maxsize=self.MEMORY_CACHE_SIZE, ttl=self.MEMORY_CACHE_TTL)
+        # TTLCache не потокобезопасен (даже get вытесняет и двигает LRU),
+        # а генератор вызывается и из event loop, и из thread executor
+        self._memory_cache_lock = threading.Lock()
+        self._batch_llm = None
 
         # Создаем LLM адаптер
         try:
@@ -101,36 +114,29 @@ class TenderNameGenerator:
             logger.warning(f"⚠️ Не удалось инициализировать LLM: {e}. AI-генерация отключена.")
             self.llm = None
 
+    @staticmethod
+    def normalize_name(original_name: str) -> str:
+        """Нормализованное название для ключа кэша (регистр, пробелы, кавычки)."""
+        name = re.sub(r'\s+', ' ', original_name).strip().lower()
+        return name.replace('«', '"').replace('»', '"')
+
     def _get_cache_key(self, original_name: str) -> str:
-        """Генерирует ключ кэша на основе оригинального названия."""
-        return hashlib.md5(original_name.encode('utf-8')).hexdigest()
+        """Генерирует ключ кэша на основе нормализованного названия."""
+        return hashlib.md5(self.normalize_name(original_name).encode('utf-8')).hexdigest()
 
     def _get_from_memory_cache(self, cache_key: str) -> Optional[str]:
         """Получает название из in-memory кэша."""
         if not self.cache_enabled:
             return None
-
-        cached = self._memory_cache.get(cache_key)
-        if not cached:
-            return None
-
-        # Проверяем TTL
-        if datetime.now() - cached['timestamp'] > self._cache_ttl:
-            # Кэш устарел
-            del self._memory_cache[cache_key]
-            return None
-
-        return cached['name']
+        with self._memory_cache_lock:
+            return self._memory_cache.get(cache_key)
 
     def _save_to_memory_cache(self, cache_key: str, generated_name: str):
         """Сохраняет название в in-memory кэш."""
         if not self.cache_enabled:
             return
-
-        self._memory_cache[cache_key] = {
-            'name': generated_name,
-            'timestamp': datetime.now()
-        }
+        with self._memory_cache_lock:
+            self._memory_cache[cache_key] = generated_name
 
     _JUNK_RE = re.compile(
         r'^('
@@ -272,8 +278,65 @@ class TenderNameGenerator:
         Returns:
             Короткое AI-сгенерированное название или оригинальное при ошибке
         """
+        ready, original_name = self.prepare_name(original_name, tender_data, max_length)
+        if ready is not None:
+            return ready
+
+        # Проверяем кэш
+        cache_key = self._get_cache_key(original_name)
+        cached_name = self._get_from_memory_cache(cache_key)
+        if cached_name:
+            logger.debug(f"💾 Название найдено в кэше")
+            return self._truncate(cached_name, max_length)
+
+        # Если LLM недоступен, возвращаем fallback
+        if not self.llm:
+            logger.debug("⚠️ LLM недоступен, используем fallback")
+            return self._fallback_short_name(original_name, max_length)
+
+        # Генерируем через LLM
+        try:
+            logger.info(f"🤖 Генерация короткого названия через {self.provider}...")
+
+            user_prompt = f"""Тендер:
+{original_name}
+
+Дай название в 3-5 слов."""
+            user_prompt += self._tender_context(tender_data)
+
+            # Генерируем название
+            generated_name = self.llm.generate(self._SYSTEM_PROMPT, user_prompt)
+            generated_name = generated_name.strip().strip('"').strip("'")
+
+            if not self._validate_no_hallucination(generated_name, original_name, tender_data):
+                logger.warning(f"⚠️ Галлюцинация: '{generated_name}' не из '{original_name[:60]}'. Fallback.")
+                return self._fallback_short_name(original_name, max_length)
+
+            # Сохраняем в кэш
+            self._save_to_memory_cache(cache_key, generated_name)
+
+            logger.info(f"✅ Сгенерировано название: {generated_name[:50]}...")
+            return self._truncate(generated_name, max_length)
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка генерации названия: {e}")
+            return self._fallback_short_name(original_name, max_length)
+
+    def prepare_name(
+        self,
+        original_name: str,
+        tender_data: Optional[Dict[str, Any]] = None,
+        max_length: int = 80
+    ) -> Tuple[Optional[str], str]:
+        """
+        Детерминированная часть генерации (без LLM): чистка префиксов,
+        подстановка предмета закупки из summary.
+
+        Returns:
+            (готовое название или None, если нужен AI; очищенное название)
+        """
         if not original_name or not original_name.strip():
-            return "Без названия"
+            return "Без названия", "Без названия"
 
         original_name = re.sub(r'^[А-ЯA-Z]{1,4}[\-_]\d{2,6}[_\s]+', '', original_name).strip()
 
@@ -302,25 +365,10 @@ class TenderNameGenerator:
         is_org_name = bool(self._JUNK_RE.search(original_name.strip()))
 
         if not is_garbage and not is_org_name and len(original_name) <= max_length:
-            return original_name
+            return original_name, original_name
+        return None, original_name
 
-        # Проверяем кэш
-        cache_key = self._get_cache_key(original_name)
-        cached_name = self._get_from_memory_cache(cache_key)
-        if cached_name:
-            logger.debug(f"💾 Название найдено в кэше")
-            return cached_name
-
-        # Если LLM недоступен, возвращаем fallback
-        if not self.llm:
-            logger.debug("⚠️ LLM недоступен, используем fallback")
-            return self._fallback_short_name(original_name, max_length)
-
-        # Генерируем через LLM
-        try:
-            logger.info(f"🤖 Генерация короткого названия через {self.provider}...")
-
-            system_prompt = """Ты сокращаешь названия тендеров до 3-5 слов.
+    _SYSTEM_PROMPT = """Ты сокращаешь названия тендеров до 3-5 слов.
 
 ГЛАВНОЕ ПРАВИЛО: используй ТОЛЬКО слова из оригинального названия. НИКОГДА не придумывай новые слова, не интерпретируй, не фантазируй. Если название уже короткое — верни как есть.
 
@@ -337,48 +385,93 @@ class TenderNameGenerator:
 
 Отвечай ТОЛЬКО названием (3-5 слов), без пояснений и кавычек."""
 
-            user_prompt = f"""Тендер:
-{original_name}
-
-Дай название в 3-5 слов."""
-
-            # Добавляем контекст из tender_data если есть
-            if tender_data:
-                import re as _re
-                # summary содержит "Наименование объекта закупки" — ключевой источник для мусорных имён
-                summary = tender_data.get('summary', '')
-                if summary:
-                    clean_summary = _re.sub(r'<[^>]+>', ' ', summary)
-                    clean_summary = _re.sub(r'\s+', ' ', clean_summary).strip()[:600]
-                    user_prompt += f"\n\nОписание тендера:\n{clean_summary}"
-                customer = tender_data.get('customer_name') or tender_data.get('customer', '')
-                region = tender_data.get('region') or tender_data.get('customer_region', '')
-                if customer:
-                    user_prompt += f"\n\nЗаказчик: {customer[:100]}"
-                if region:
-                    user_prompt += f"\nРегион: {region}"
-
-            # Генерируем название
-            generated_name = self.llm.generate(system_prompt, user_prompt)
-            generated_name = generated_name.strip().strip('"').strip("'")
+    _BATCH_SYSTEM_PROMPT = _SYSTEM_PROMPT.replace(
+        "Отвечай ТОЛЬКО названием (3-5 слов), без пояснений и кавычек.",
+        "Тебе дают пронумерованный список тендеров. Отвечай ТОЛЬКО списком с теми же "
+        "номерами, по одной строке на тендер: \"N. Название\" (3-5 слов), без пояснений и кавычек."
+    )
 
-            if not self._validate_no_hallucination(generated_name, original_name, tender_data):
-                logger.warning(f"⚠️ Галлюцинация: '{generated_name}' не из '{original_name[:60]}'. Fallback.")
-                return self._fallback_short_name(original_name, max_length)
+    @staticmethod
+    def _tender_context(tender_data: Optional[Dict[str, Any]], summary_limit: int = 600) -> str:
+        """Контекст тендера для промпта: summary, заказчик, регион."""
+        if not tender_data:
+            return ''
+        context = ''
+        # summary содержит "Наименование объекта закупки" — ключевой источник для мусорных имён
+        summary = tender_data.get('summary', '')
+        if summary:
+            clean_summary = re.sub(r'<[^>]+>', ' ', summary)
+            clean_summary = re.sub(r'\s+', ' ', clean_summary).strip()[:summary_limit]
+            context += f"\n\nОписание тендера:\n{clean_summary}"
+        customer = tender_data.get('customer_name') or tender_data.get('customer', '')
+        region = tender_data.get('region') or tender_data.get('customer_region', '')
+        if customer:
+            context += f"\n\nЗаказчик: {customer[:100]}"
+        if region:
+            context += f"\nРегион: {region}"
+        return context
+
+    @staticmethod
+    def _truncate(name: str, max_length: int) -> str:
+        if len(name) > max_length:
+            return name[:max_length-3] + "..."
+        return name
+
+    def _get_batch_llm(self):
+        """LLM адаптер для пакетной генерации (ответ на несколько названий)."""
+        if self._batch_llm is None and self.llm is not None:
+            self._batch_llm = LLMFactory.create(
+                provider=self.provider,
+                api_key=self.api_key,
+                model=self.model,
+                max_tokens=self.BATCH_TOKENS_PER_ITEM * 20,
+                temperature=0.1
+            )
+        return self._batch_llm
 
-            # Проверяем длину и обрезаем если нужно
-            if len(generated_name) > max_length:
-                generated_name = generated_name[:max_length-3] + "..."
+    def generate_batch(
+        self,
+        items: List[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[Optional[str]]:
+        """
+        Генерирует короткие названия для нескольких тендеров одним запросом к LLM.
 
-            # Сохраняем в кэш
-            self._save_to_memory_cache(cache_key, generated_name)
+        Синхронный (блокирующий) вызов — из async кода только через
+        asyncio.to_thread (см. NameShortener). В кэш не пишет: результаты
+        сохраняет вызывающий код в своём потоке.
 
-            logger.info(f"✅ Сгенерировано название: {generated_name[:50]}...")
-            return generated_name
+        Args:
+            items: [(очищенное название из prepare_name, tender_data)], до 20 штук
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка генерации названия: {e}")
-            return self._fallback_short_name(original_name, max_length)
+        Returns:
+            Названия в порядке items; None — LLM не ответил по пункту или
+            ответ не прошёл проверку на галлюцинации
+        """
+        llm = self._get_batch_llm()
+        if not llm or not items:
+            return [None] * len(items)
+
+        parts = []
+        for i, (name, tender_data) in enumerate(items, 1):
+            parts.append(f"{i}. {name}{self._tender_context(tender_data, summary_limit=300)}")
+        user_prompt = "Тендеры:\n\n" + "\n\n".join(parts) + f"\n\nДай {len(items)} названий в 3-5 слов."
+
+        response = llm.generate(self._BATCH_SYSTEM_PROMPT, user_prompt)
+
+        answers: Dict[int, str] = {}
+        for line in response.splitlines():
+            m = re.match(r'^\s*(\d+)[\.\)]\s*(.+)$', line)
+            if m:
+                answers[int(m.group(1))] = m.group(2).strip().strip('"').strip("'")
+
+        results: List[Optional[str]] = []
+        for i, (name, tender_data) in enumerate(items, 1):
+            generated = answers.get(i)
+            if generated and self._validate_no_hallucination(generated, name, tender_data):
+                results.append(generated)
+            else:
+                results.append(None)
+        return results
 
     _STOP_WORDS = {
         'и', 'в', 'на', 'по', 'для', 'с', 'от', 'из', 'к', 'до', 'о', 'об',
@@ -491,7 +584,8 @@ class TenderNameGenerator:
 
     def clear_cache(self):
         """Очищает in-memory кэш."""
-        self._memory_cache.clear()
+        with self._memory_cache_lock:
+            self._memory_cache.clear()
         logger.info("🗑️ Кэш названий очищен")
 
 
@@ -522,6 +616,9 @@ def generate_tender_name(
     """
     Удобная функция для генерации короткого названия тендера.
 
+    Внутри event loop не блокирует: без готового AI-названия возвращает
+    regex fallback и ставит название в очередь NameShortener.
+
     Args:
         original_name: Оригинальное название
         tender_data: Дополнительные данные тендера
@@ -538,8 +635,17 @@ def generate_tender_name(
         >>> print(name)
         'Поставка медицинского оборудования'
     """
-    generator = get_name_generator()
-    return generator.generate_short_name(original_name, tender_data, max_length)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Нет event loop в этом потоке (скрипты, executor) — можно ждать LLM
+        generator = get_name_generator()
+        return generator.generate_short_name(original_name, tender_data, max_length)
+
+    # Внутри event loop синхронный запрос к LLM блокировал бы всё остальное:
+    # отдаём готовое/кэшированное название или fallback, AI-название — в фоне
+    from tender_sniper.name_shortener import get_name_shortener
+    return get_name_shortener().get_name(original_name, tender_data, max_length)
 
 
 # ============================================
@@ -547,7 +653,6 @@ def generate_tender_name(
 # ============================================
 
 if __name__ == '__main__':
-    import asyncio
     from dotenv import load_dotenv
 
     load_dotenv()
@@ -16,9 +16,44 @@ from datetime import datetime, timedelta
 from cachetools import TTLCache
 from openai import OpenAI
 
+from tender_sniper.instrumentation import span, timed
+
 logger = logging.getLogger(__name__)
 
 
+# Принципы оценки — общие для одиночной и пакетной проверки
+_EVALUATION_RULES = """ПРИНЦИП ОЦЕНКИ:
+1. Сначала проверь ТИП — если тип не совпадает (услуга вместо товара и наоборот), ОТКЛОНИ (confidence 5-10)
+2. Затем проверь ТЕМУ — связан ли тендер с запросом по КОНКРЕТНОМУ смыслу
+3. Строго различай ВИДЫ деятельности:
+   - "разработка ПО" ≠ "обслуживание ПО" ≠ "покупка лицензий ПО" ≠ "консультирование по ПО"
+   - "обслуживание КонсультантПлюс/Гарант" — это НЕ разработка ПО (confidence 10-15)
+   - "поставка бумаги/канцелярии" — это НЕ оргтехника и НЕ компьютеры (confidence 5-10)
+   - "ремонт/обслуживание техники" — это НЕ поставка техники (confidence 5-10)
+4. При сомнениях по теме — одобряй с confidence 30-50% ТОЛЬКО если тема хотя бы КОСВЕННО связана
+5. Отклоняй по теме (confidence 5-15) если тема другая, даже если есть общие слова
+
+ПРИМЕРЫ ОТКЛОНЕНИЙ ПО ТИПУ (если фильтр ищет товары):
+- "Услуга по ремонту офисной техники" → relevant=false, confidence=5, reason="услуга, не товар"
+- "Техническое обслуживание компьютеров" → relevant=false, confidence=5, reason="услуга, не товар"
+- "Выполнение работ по монтажу оборудования" → relevant=false, confidence=5, reason="работа, не товар"
+
+ПРИМЕРЫ ОТКЛОНЕНИЙ ПО ТЕМЕ:
+- "Автомобиль легковой HAVAL" при запросе "компьютеры" → relevant=false, confidence=3
+- "Ремонт вооружения, военной техники" при запросе "компьютеры" → relevant=false, confidence=5
+- "Обслуживание справочных систем КонсультантПлюс" при запросе "разработка ПО" → relevant=false, confidence=10
+- "Поставка бумаги для принтера" при запросе "оргтехника" → relevant=false, confidence=5
+- "Мед. изделия" при запросе "разработка ПО" → relevant=false, confidence=3"""
+
+# Дополнительные поля ответа для релевантных тендеров
+_EXTENDED_FIELDS = '''  "simple_name": краткое название тендера 3-5 слов. ВАЖНО: используй ТОЛЬКО слова из оригинального названия тендера. НЕ ПРИДУМЫВАЙ новые слова, НЕ ИНТЕРПРЕТИРУЙ, НЕ ФАНТАЗИРУЙ. Просто сократи исходное название, убрав юридические формулировки, номера, годы, организации. Пример: "Поставка оконных блоков" → "Поставка оконных блоков" (оставь как есть, если уже короткое),
+  "summary": 1-2 предложения о сути закупки,
+  "key_requirements": массив из 1-3 ключевых требований (пусто если неизвестно),
+  "risks": массив из 0-3 рисков (срочные сроки, узкие требования, поставка партиями/по заявкам заказчика на протяжении года с оплатой после всех поставок, и т.п.),
+  "estimated_competition": "низкая" | "средняя" | "высокая",
+  "recommendation": "Рекомендуется" | "Под вопросом" | "Не рекомендуется"'''
+
+
 class AIRelevanceChecker:
     """
     Мягкий AI-проверщик релевантности тендеров.
@@ -54,13 +89,28 @@ class AIRelevanceChecker:
     # Счётчики использования (TTLCache: авто-очистка через 24ч, ограничен 2000 пользователями)
     _usage_counters: TTLCache = TTLCache(maxsize=2000, ttl=86400)
 
-    def __init__(self, api_key: str = None):
+    # Пакетная проверка: тендеров в одном промпте, символов текста тендеров
+    # в промпте, символов описания на тендер, потолок max_tokens ответа
+    BATCH_SIZE = 8
+    BATCH_MAX_CHARS = 4000
+    BATCH_DESCRIPTION_CHARS = 300
+    BATCH_MAX_TOKENS = 3200
+
+    # Одновременных запросов к LLM на процесс (все фильтры и пользователи)
+    LLM_CONCURRENCY = 4
+    _llm_semaphore: Optional[asyncio.Semaphore] = None
+    _llm_semaphore_loop = None
+
+    def __init__(self, api_key: str = None, db=None):
         """
         Инициализация проверщика.
 
         Args:
             api_key: OpenAI API ключ (опционально, читает из env)
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
         """
+        self._db = db
+        self._batch_stats = {'batches': 0, 'single_retries': 0}
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if self.api_key:
             self.client = OpenAI(api_key=self.api_key)
@@ -68,6 +118,12 @@ class AIRelevanceChecker:
             self.client = None
             logger.warning("⚠️ OpenAI API key not found. AI checks disabled.")
 
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database.sqlalchemy_adapter import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
     def _get_cache_key(self, tender_name: str, filter_intent: str) -> str:
         """Генерирует ключ кэша из названия тендера и intent фильтра."""
         content = f"{tender_name.lower().strip()}|{filter_intent.lower().strip()}"
@@ -90,28 +146,49 @@ class AIRelevanceChecker:
         if not self._persistent_cache_enabled:
             return None
         try:
-            from tender_sniper.database.sqlalchemy_adapter import get_sniper_db
-            db = await get_sniper_db()
+            db = await self._get_db()
             data = await db.cache_get(cache_key, 'ai_relevance')
             if data:
                 logger.debug(f"   🗄️ Cache hit (DB): {cache_key[:8]}...")
-                result = {
-                    'is_relevant': data.get('is_relevant', False),
-                    'confidence': data.get('confidence', 0),
-                    'reason': data.get('reason', ''),
-                    'simple_name': data.get('simple_name', ''),
-                    'summary': data.get('summary', ''),
-                    'key_requirements': data.get('key_requirements', []),
-                    'risks': data.get('risks', []),
-                    'estimated_competition': data.get('estimated_competition', ''),
-                    'recommendation': data.get('recommendation', ''),
-                }
+                result = self._result_from_cache_entry(data)
                 self._cache[cache_key] = result
                 return result
         except Exception as e:
             logger.debug(f"Persistent cache get error: {e}")
         return None
 
+    async def _get_many_from_persistent_cache(self, cache_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Получает решения из PostgreSQL кэша одним запросом."""
+        if not self._persistent_cache_enabled or not cache_keys:
+            return {}
+        try:
+            db = await self._get_db()
+            entries = await db.cache_get_many(cache_keys, 'ai_relevance')
+        except Exception as e:
+            logger.debug(f"Persistent cache get_many error: {e}")
+            return {}
+        results = {}
+        for cache_key, data in entries.items():
+            if data:
+                results[cache_key] = self._cache[cache_key] = self._result_from_cache_entry(data)
+        if results:
+            logger.debug(f"   🗄️ Cache hits (DB): {len(results)}/{len(cache_keys)}")
+        return results
+
+    @staticmethod
+    def _result_from_cache_entry(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'is_relevant': data.get('is_relevant', False),
+            'confidence': data.get('confidence', 0),
+            'reason': data.get('reason', ''),
+            'simple_name': data.get('simple_name', ''),
+            'summary': data.get('summary', ''),
+            'key_requirements': data.get('key_requirements', []),
+            'risks': data.get('risks', []),
+            'estimated_competition': data.get('estimated_competition', ''),
+            'recommendation': data.get('recommendation', ''),
+        }
+
     def _save_to_cache(self, cache_key: str, result: Dict[str, Any]):
         """Сохраняет решение в in-memory кэш (TTLCache автоматически ограничивает размер и TTL)."""
         self._cache[cache_key] = result
@@ -121,8 +198,7 @@ class AIRelevanceChecker:
         if not self._persistent_cache_enabled:
             return
         try:
-            from tender_sniper.database.sqlalchemy_adapter import get_sniper_db
-            db = await get_sniper_db()
+            db = await self._get_db()
             await db.cache_set(
                 cache_key, 'ai_relevance',
                 result,
@@ -131,6 +207,16 @@ class AIRelevanceChecker:
         except Exception as e:
             logger.debug(f"Persistent cache set error: {e}")
 
+    async def _save_many_to_persistent_cache(self, results: Dict[str, Dict[str, Any]]):
+        """Сохраняет решения в PostgreSQL кэш одной транзакцией."""
+        if not self._persistent_cache_enabled or not results:
+            return
+        try:
+            db = await self._get_db()
+            await db.cache_set_many(results, 'ai_relevance', ttl_hours=self._CACHE_TTL_HOURS)
+        except Exception as e:
+            logger.debug(f"Persistent cache set_many error: {e}")
+
     def check_quota(self, user_id: int, subscription_tier: str) -> bool:
         """Синхронная проверка квоты из in-memory счётчика."""
         today = datetime.now().date().isoformat()
@@ -146,7 +232,7 @@ class AIRelevanceChecker:
         limit = self.TIER_LIMITS.get(subscription_tier, self.TIER_LIMITS['trial'])
         return counter['count'] < limit
 
-    def increment_usage(self, user_id: int):
+    def increment_usage(self, user_id: int, count: int = 1):
         """Увеличивает in-memory счётчик. Персистентное сохранение — через increment_usage_persistent."""
         today = datetime.now().date().isoformat()
 
@@ -158,7 +244,7 @@ class AIRelevanceChecker:
             counter['date'] = today
             counter['count'] = 0
 
-        counter['count'] += 1
+        counter['count'] += count
 
     async def load_quota_from_db(self, user_id: int):
         """
@@ -166,8 +252,7 @@ class AIRelevanceChecker:
         Вызывать при первом обращении пользователя или после рестарта.
         """
         try:
-            from tender_sniper.database.sqlalchemy_adapter import get_sniper_db
-            db = await get_sniper_db()
+            db = await self._get_db()
             user = await db.get_user_by_id(user_id)
             if not user:
                 return
@@ -189,13 +274,12 @@ class AIRelevanceChecker:
         except Exception as e:
             logger.debug(f"load_quota_from_db: {e}")
 
-    async def increment_usage_persistent(self, user_id: int):
+    async def increment_usage_persistent(self, user_id: int, count: int = 1):
         """Увеличивает счётчик в памяти и сохраняет в БД."""
-        self.increment_usage(user_id)
+        self.increment_usage(user_id, count)
         try:
-            from tender_sniper.database.sqlalchemy_adapter import get_sniper_db
-            db = await get_sniper_db()
-            await db.increment_ai_analyses_count(user_id)
+            db = await self._get_db()
+            await db.increment_ai_analyses_count(user_id, count)
         except Exception as e:
             logger.debug(f"increment_usage_persistent DB error: {e}")
 
@@ -285,6 +369,7 @@ class AIRelevanceChecker:
             # Fallback
             return f"Поиск тендеров по теме: {filter_name}. Ключевые слова: {', '.join(keywords)}"
 
+    @timed('ai_relevance', op='single')
     async def check_relevance(
         self,
         tender_name: str,
@@ -322,13 +407,7 @@ class AIRelevanceChecker:
         # Проверяем квоту
         if user_id and not self.check_quota(user_id, subscription_tier):
             logger.info(f"   ⚠️ Квота AI исчерпана для user {user_id} ({subscription_tier})")
-            return {
-                'is_relevant': True,  # При исчерпании квоты — пропускаем (fallback к keyword)
-                'confidence': 0,  # Без boost — нет AI-проверки, нет бонуса
-                'reason': 'Квота AI проверок исчерпана, используется keyword matching',
-                'source': 'quota_exceeded',
-                'quota_remaining': 0
-            }
+            return self._quota_exceeded_result()
 
         # Проверяем in-memory кэш
         cache_key = self._get_cache_key(tender_name, filter_intent)
@@ -382,13 +461,7 @@ class AIRelevanceChecker:
 
         except Exception as e:
             logger.error(f"❌ Ошибка AI проверки: {e}")
-            return {
-                'is_relevant': True,  # При ошибке — пропускаем (лучше показать, чем потерять)
-                'confidence': 0,  # Без boost — нет AI-проверки, нет бонуса
-                'reason': f'Ошибка AI: {str(e)[:50]}',
-                'source': 'error',
-                'quota_remaining': -1
-            }
+            return self._error_result(e)
 
     @staticmethod
     def _validate_simple_name(simple_name: str, tender_name: str, tender_description: str = '') -> bool:
@@ -411,6 +484,56 @@ class AIRelevanceChecker:
         matched = sum(1 for w in gen_words if any(_same_root(w, sw) for sw in source_words))
         return (matched / len(gen_words)) >= 0.5
 
+    @staticmethod
+    def _type_instruction(tender_types: Optional[List[str]]) -> str:
+        """Блок промпта о типе закупки (товары / услуги)."""
+        if not tender_types:
+            return ""
+        if tender_types == ['товары']:
+            return """
+ТИП ЗАКУПКИ: Пользователь ищет ТОЛЬКО товары (поставки).
+КРИТИЧЕСКИ ВАЖНО: Если тендер — это УСЛУГА или РАБОТА (ремонт, обслуживание, консультирование,
+разработка документации, оказание услуг, выполнение работ, сервисное обслуживание, техническое
+обслуживание, монтаж, демонтаж, проектирование) — ОТКЛОНИ с confidence 5-10.
+Товары = поставка физических предметов (оборудование, техника, материалы, запчасти)."""
+        if tender_types == ['услуги']:
+            return """
+ТИП ЗАКУПКИ: Пользователь ищет ТОЛЬКО услуги.
+Если тендер — это ТОВАР (поставка оборудования, материалов) — ОТКЛОНИ с confidence 5-10."""
+        return f"\nТИП ЗАКУПКИ: {', '.join(tender_types)}"
+
+    @classmethod
+    def _get_llm_semaphore(cls) -> asyncio.Semaphore:
+        """Общий на процесс лимит одновременных запросов к LLM (одиночных и пакетных)."""
+        loop = asyncio.get_running_loop()
+        if cls._llm_semaphore is None or cls._llm_semaphore_loop is not loop:
+            cls._llm_semaphore = asyncio.Semaphore(cls.LLM_CONCURRENCY)
+            cls._llm_semaphore_loop = loop
+        return cls._llm_semaphore
+
+    async def _complete_json(self, prompt: str, max_tokens: int) -> str:
+        """JSON-ответ LLM на промпт (под общим лимитом одновременных запросов)."""
+        async with self._get_llm_semaphore():
+            # Синхронный OpenAI клиент — оборачиваем в executor чтобы не блокировать event loop
+            loop = asyncio.get_event_loop()
+            # Время самого запроса, без ожидания семафора
+            with span('ai_llm'):
+                response = await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        self.client.chat.completions.create,
+                        model=self.MODEL,
+                        messages=[
+                            {"role": "system", "content": "Ты эксперт по госзакупкам. Отвечай СТРОГО в формате JSON."},
+                            {"role": "user", "content": prompt},
+                        ],
+                        temperature=0,
+                        max_tokens=max_tokens,
+                        response_format={"type": "json_object"},
+                    )
+                )
+        return response.choices[0].message.content.strip()
+
     async def _call_ai_check(
         self,
         tender_name: str,
@@ -423,67 +546,23 @@ class AIRelevanceChecker:
 
         description_text = f"\nОписание: {tender_description[:500]}" if tender_description else ""
 
-        # Формируем блок о типе закупки
-        type_instruction = ""
-        if tender_types:
-            types_str = ', '.join(tender_types)
-            if tender_types == ['товары']:
-                type_instruction = f"""
-ТИП ЗАКУПКИ: Пользователь ищет ТОЛЬКО товары (поставки).
-КРИТИЧЕСКИ ВАЖНО: Если тендер — это УСЛУГА или РАБОТА (ремонт, обслуживание, консультирование,
-разработка документации, оказание услуг, выполнение работ, сервисное обслуживание, техническое
-обслуживание, монтаж, демонтаж, проектирование) — ОТКЛОНИ с confidence 5-10.
-Товары = поставка физических предметов (оборудование, техника, материалы, запчасти)."""
-            elif tender_types == ['услуги']:
-                type_instruction = f"""
-ТИП ЗАКУПКИ: Пользователь ищет ТОЛЬКО услуги.
-Если тендер — это ТОВАР (поставка оборудования, материалов) — ОТКЛОНИ с confidence 5-10."""
-            else:
-                type_instruction = f"\nТИП ЗАКУПКИ: {types_str}"
-
         prompt = f"""Ты эксперт по госзакупкам. Определи, насколько тендер релевантен запросу пользователя.
 
 ЗАПРОС ПОЛЬЗОВАТЕЛЯ:
 {filter_intent}
 
 Ключевые слова: {', '.join(filter_keywords)}
-{type_instruction}
+{self._type_instruction(tender_types)}
 ТЕНДЕР:
 Название: "{tender_name}"{description_text}
 
-ПРИНЦИП ОЦЕНКИ:
-1. Сначала проверь ТИП — если тип не совпадает (услуга вместо товара и наоборот), ОТКЛОНИ (confidence 5-10)
-2. Затем проверь ТЕМУ — связан ли тендер с запросом по КОНКРЕТНОМУ смыслу
-3. Строго различай ВИДЫ деятельности:
-   - "разработка ПО" ≠ "обслуживание ПО" ≠ "покупка лицензий ПО" ≠ "консультирование по ПО"
-   - "обслуживание КонсультантПлюс/Гарант" — это НЕ разработка ПО (confidence 10-15)
-   - "поставка бумаги/канцелярии" — это НЕ оргтехника и НЕ компьютеры (confidence 5-10)
-   - "ремонт/обслуживание техники" — это НЕ поставка техники (confidence 5-10)
-4. При сомнениях по теме — одобряй с confidence 30-50% ТОЛЬКО если тема хотя бы КОСВЕННО связана
-5. Отклоняй по теме (confidence 5-15) если тема другая, даже если есть общие слова
-
-ПРИМЕРЫ ОТКЛОНЕНИЙ ПО ТИПУ (если фильтр ищет товары):
-- "Услуга по ремонту офисной техники" → relevant=false, confidence=5, reason="услуга, не товар"
-- "Техническое обслуживание компьютеров" → relevant=false, confidence=5, reason="услуга, не товар"
-- "Выполнение работ по монтажу оборудования" → relevant=false, confidence=5, reason="работа, не товар"
-
-ПРИМЕРЫ ОТКЛОНЕНИЙ ПО ТЕМЕ:
-- "Автомобиль легковой HAVAL" при запросе "компьютеры" → relevant=false, confidence=3
-- "Ремонт вооружения, военной техники" при запросе "компьютеры" → relevant=false, confidence=5
-- "Обслуживание справочных систем КонсультантПлюс" при запросе "разработка ПО" → relevant=false, confidence=10
-- "Поставка бумаги для принтера" при запросе "оргтехника" → relevant=false, confidence=5
-- "Мед. изделия" при запросе "разработка ПО" → relevant=false, confidence=3
+{_EVALUATION_RULES}
 
 Ответь СТРОГО в формате JSON. Обязательные поля — всегда:
   "relevant" (bool), "confidence" (0-100), "reason" (строка на русском).
 
 Если relevant=true — добавь дополнительные поля:
-  "simple_name": краткое название тендера 3-5 слов. ВАЖНО: используй ТОЛЬКО слова из оригинального названия тендера. НЕ ПРИДУМЫВАЙ новые слова, НЕ ИНТЕРПРЕТИРУЙ, НЕ ФАНТАЗИРУЙ. Просто сократи исходное название, убрав юридические формулировки, номера, годы, организации. Пример: "Поставка оконных блоков" → "Поставка оконных блоков" (оставь как есть, если уже короткое),
-  "summary": 1-2 предложения о сути закупки,
-  "key_requirements": массив из 1-3 ключевых требований (пусто если неизвестно),
-  "risks": массив из 0-3 рисков (срочные сроки, узкие требования, поставка партиями/по заявкам заказчика на протяжении года с оплатой после всех поставок, и т.п.),
-  "estimated_competition": "низкая" | "средняя" | "высокая",
-  "recommendation": "Рекомендуется" | "Под вопросом" | "Не рекомендуется"
+{_EXTENDED_FIELDS}
 
 Пример для relevant=true:
 {{"relevant": true, "confidence": 82, "reason": "поставка компьютерного оборудования", "simple_name": "Компьютерное оборудование", "summary": "Поставка ПК и мониторов для нужд образования.", "key_requirements": ["Windows 11", "SSD 256 ГБ"], "risks": [], "estimated_competition": "средняя", "recommendation": "Рекомендуется"}}
@@ -491,75 +570,63 @@ class AIRelevanceChecker:
 Пример для relevant=false:
 {{"relevant": false, "confidence": 5, "reason": "услуга, не товар"}}"""
 
-        # Синхронный OpenAI клиент — оборачиваем в executor чтобы не блокировать event loop
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            functools.partial(
-                self.client.chat.completions.create,
-                model=self.MODEL,
-                messages=[
-                    {"role": "system", "content": "Ты эксперт по госзакупкам. Отвечай СТРОГО в формате JSON."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0,
-                max_tokens=400,
-                response_format={"type": "json_object"},
-            )
-        )
-
-        response_text = response.choices[0].message.content.strip()
+        response_text = await self._complete_json(prompt, max_tokens=400)
 
         # Парсим JSON ответ (response_format гарантирует валидный JSON)
         try:
-            data = json.loads(response_text)
-
-            is_relevant = bool(data.get('relevant', False))
-            confidence = int(data.get('confidence', 50))
-            reason = str(data.get('reason', 'Нет объяснения'))
-
-            # Валидация диапазона confidence
-            confidence = max(0, min(100, confidence))
-
-            # Применяем строгие пороги
-            if confidence < self.CONFIDENCE_THRESHOLD_ACCEPT:
-                is_relevant = False
-                if confidence >= self.CONFIDENCE_THRESHOLD_RECHECK:
-                    reason = f"Недостаточная уверенность ({confidence}%): {reason}"
-
-            logger.info(f"   🤖 AI: {'✅' if is_relevant else '❌'} ({confidence}%) {reason[:50]}...")
-
-            result: Dict[str, Any] = {
-                'is_relevant': is_relevant,
-                'confidence': confidence,
-                'reason': reason,
-                'simple_name': '',
-                'summary': '',
-                'key_requirements': [],
-                'risks': [],
-                'estimated_competition': '',
-                'recommendation': '',
-            }
+            return self._parse_ai_item(json.loads(response_text), tender_name, tender_description)
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"   ⚠️ Не удалось распарсить AI ответ: {response_text[:100]} — {e}")
 
-            # Расширенные поля — только если тендер релевантен
-            if is_relevant:
-                raw_simple = str(data.get('simple_name', ''))
-                if raw_simple and not self._validate_simple_name(raw_simple, tender_name, tender_description):
-                    logger.warning(f"   ⚠️ simple_name галлюцинация: '{raw_simple}' (оригинал: '{tender_name[:50]}')")
-                    raw_simple = ''
-                result['simple_name'] = raw_simple
-                result['summary'] = str(data.get('summary', ''))
-                result['key_requirements'] = [str(r) for r in data.get('key_requirements', []) if r][:3]
-                result['risks'] = [str(r) for r in data.get('risks', []) if r][:2]
-                result['estimated_competition'] = str(data.get('estimated_competition', ''))
-                result['recommendation'] = str(data.get('recommendation', ''))
+        # Fallback если не удалось распарсить
+        return self._unparsed_result()
 
-            return result
+    def _parse_ai_item(self, data: Dict[str, Any], tender_name: str, tender_description: str) -> Dict[str, Any]:
+        """Решение AI по одному тендеру → результат проверки (с порогами и валидацией)."""
+        is_relevant = bool(data.get('relevant', False))
+        confidence = int(data.get('confidence', 50))
+        reason = str(data.get('reason', 'Нет объяснения'))
 
-        except (json.JSONDecodeError, ValueError, TypeError) as e:
-            logger.warning(f"   ⚠️ Не удалось распарсить AI ответ: {response_text[:100]} — {e}")
+        # Валидация диапазона confidence
+        confidence = max(0, min(100, confidence))
 
-        # Fallback если не удалось распарсить
+        # Применяем строгие пороги
+        if confidence < self.CONFIDENCE_THRESHOLD_ACCEPT:
+            is_relevant = False
+            if confidence >= self.CONFIDENCE_THRESHOLD_RECHECK:
+                reason = f"Недостаточная уверенность ({confidence}%): {reason}"
+
+        logger.info(f"   🤖 AI: {'✅' if is_relevant else '❌'} ({confidence}%) {reason[:50]}...")
+
+        result: Dict[str, Any] = {
+            'is_relevant': is_relevant,
+            'confidence': confidence,
+            'reason': reason,
+            'simple_name': '',
+            'summary': '',
+            'key_requirements': [],
+            'risks': [],
+            'estimated_competition': '',
+            'recommendation': '',
+        }
+
+        # Расширенные поля — только если тендер релевантен
+        if is_relevant:
+            raw_simple = str(data.get('simple_name', ''))
+            if raw_simple and not self._validate_simple_name(raw_simple, tender_name, tender_description):
+                logger.warning(f"   ⚠️ simple_name галлюцинация: '{raw_simple}' (оригинал: '{tender_name[:50]}')")
+                raw_simple = ''
+            result['simple_name'] = raw_simple
+            result['summary'] = str(data.get('summary', ''))
+            result['key_requirements'] = [str(r) for r in data.get('key_requirements', []) if r][:3]
+            result['risks'] = [str(r) for r in data.get('risks', []) if r][:2]
+            result['estimated_competition'] = str(data.get('estimated_competition', ''))
+            result['recommendation'] = str(data.get('recommendation', ''))
+
+        return result
+
+    @staticmethod
+    def _unparsed_result() -> Dict[str, Any]:
         return {
             'is_relevant': False,
             'confidence': 0,
@@ -572,16 +639,165 @@ class AIRelevanceChecker:
             'recommendation': '',
         }
 
+    # ============================================
+    # ПАКЕТНАЯ ПРОВЕРКА
+    # ============================================
+
+    def _pack_batches(self, items: List[Tuple[str, str, str]]) -> List[List[Tuple[str, str, str]]]:
+        """
+        Раскладывает тендеры (cache_key, название, описание) по пакетам:
+        не больше BATCH_SIZE тендеров и BATCH_MAX_CHARS символов текста в промпте.
+        """
+        batches: List[List[Tuple[str, str, str]]] = []
+        current: List[Tuple[str, str, str]] = []
+        current_chars = 0
+        for item in items:
+            _, name, description = item
+            chars = len(name) + min(len(description or ''), self.BATCH_DESCRIPTION_CHARS)
+            if current and (len(current) >= self.BATCH_SIZE or current_chars + chars > self.BATCH_MAX_CHARS):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(item)
+            current_chars += chars
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _call_ai_check_batch(
+        self,
+        items: List[Tuple[str, str, str]],
+        filter_intent: str,
+        filter_keywords: List[str],
+        tender_types: List[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Один запрос к LLM по пакету тендеров.
+
+        Returns:
+            {cache_key: результат} — только по тендерам, на которые AI ответил
+        """
+        tender_lines = []
+        for number, (_, name, description) in enumerate(items, 1):
+            line = f'{number}. Название: "{name}"'
+            if description:
+                line += f"\n   Описание: {description[:self.BATCH_DESCRIPTION_CHARS]}"
+            tender_lines.append(line)
+        tenders_block = '\n'.join(tender_lines)
+
+        prompt = f"""Ты эксперт по госзакупкам. Определи, насколько КАЖДЫЙ тендер из списка релевантен запросу пользователя.
+
+ЗАПРОС ПОЛЬЗОВАТЕЛЯ:
+{filter_intent}
+
+Ключевые слова: {', '.join(filter_keywords)}
+{self._type_instruction(tender_types)}
+ТЕНДЕРЫ:
+{tenders_block}
+
+{_EVALUATION_RULES}
+
+Оценивай каждый тендер независимо от остальных.
+Ответь СТРОГО в формате JSON: {{"results": [...]}} — по одному объекту на КАЖДЫЙ тендер списка.
+Обязательные поля объекта — всегда:
+  "id" (номер тендера из списка), "relevant" (bool), "confidence" (0-100), "reason" (строка на русском).
+
+Если relevant=true — добавь в объект дополнительные поля:
+{_EXTENDED_FIELDS}
+
+Пример:
+{{"results": [{{"id": 1, "relevant": true, "confidence": 82, "reason": "поставка компьютерного оборудования", "simple_name": "Компьютерное оборудование", "summary": "Поставка ПК и мониторов для нужд образования.", "key_requirements": ["Windows 11", "SSD 256 ГБ"], "risks": [], "estimated_competition": "средняя", "recommendation": "Рекомендуется"}}, {{"id": 2, "relevant": false, "confidence": 5, "reason": "услуга, не товар"}}]}}"""
+
+        response_text = await self._complete_json(
+            prompt, max_tokens=min(self.BATCH_MAX_TOKENS, 400 * len(items))
+        )
+
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            for data in json.loads(response_text).get('results', []):
+                try:
+                    index = int(data.get('id')) - 1
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                if not 0 <= index < len(items) or items[index][0] in results:
+                    continue
+                cache_key, name, description = items[index]
+                try:
+                    results[cache_key] = self._parse_ai_item(data, name, description)
+                except (ValueError, TypeError, AttributeError):
+                    continue
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"   ⚠️ Не удалось распарсить пакетный AI ответ: {response_text[:100]} — {e}")
+        return results
+
+    async def _check_batch(
+        self,
+        items: List[Tuple[str, str, str]],
+        filter_intent: str,
+        filter_keywords: List[str],
+        tender_types: List[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Пакет тендеров → результаты AI. Тендеры, пропущенные в ответе
+        пакета, проверяются по одному; ошибка запроса — результат 'error'.
+        """
+        try:
+            results = await self._call_ai_check_batch(items, filter_intent, filter_keywords, tender_types)
+            self._batch_stats['batches'] += 1
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетной AI проверки ({len(items)} шт.): {e}")
+            return {cache_key: self._error_result(e) for cache_key, _, _ in items}
+
+        missing = [item for item in items if item[0] not in results]
+        if missing and len(items) > 1:
+            self._batch_stats['single_retries'] += len(missing)
+            logger.info(f"   🔁 AI пропустил {len(missing)}/{len(items)} тендеров пакета — проверяем по одному")
+        for cache_key, name, description in missing:
+            try:
+                results[cache_key] = await self._call_ai_check(
+                    name, description, filter_intent, filter_keywords, tender_types=tender_types
+                )
+            except Exception as e:
+                logger.error(f"❌ Ошибка AI проверки: {e}")
+                results[cache_key] = self._error_result(e)
+        return results
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, Any]:
+        return {
+            'is_relevant': True,  # При ошибке — пропускаем (лучше показать, чем потерять)
+            'confidence': 0,  # Без boost — нет AI-проверки, нет бонуса
+            'reason': f'Ошибка AI: {str(error)[:50]}',
+            'source': 'error',
+            'quota_remaining': -1
+        }
+
+    @staticmethod
+    def _quota_exceeded_result() -> Dict[str, Any]:
+        return {
+            'is_relevant': True,  # При исчерпании квоты — пропускаем (fallback к keyword)
+            'confidence': 0,  # Без boost — нет AI-проверки, нет бонуса
+            'reason': 'Квота AI проверок исчерпана, используется keyword matching',
+            'source': 'quota_exceeded',
+            'quota_remaining': 0
+        }
+
+    @timed('ai_relevance', op='batch')
     async def check_relevance_batch(
         self,
         tenders: List[Dict[str, Any]],
         filter_intent: str,
         filter_keywords: List[str],
         user_id: int = None,
-        subscription_tier: str = 'trial'
+        subscription_tier: str = 'trial',
+        tender_types: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Проверяет релевантность списка тендеров.
+        Проверяет релевантность списка тендеров пакетами.
+
+        Кэш в памяти, затем один запрос к персистентному кэшу на все ключи;
+        непроверенные тендеры упаковываются в пакетные промпты (_pack_batches),
+        пакеты идут к LLM параллельно под общим LLM_CONCURRENCY, результаты
+        сохраняются в БД одной записью (cache_set_many).
 
         Args:
             tenders: Список тендеров (каждый должен иметь 'name' и опционально 'description')
@@ -589,35 +805,90 @@ class AIRelevanceChecker:
             filter_keywords: Ключевые слова
             user_id: ID пользователя
             subscription_tier: Тариф
+            tender_types: Типы закупки фильтра
 
         Returns:
-            Список результатов проверки (в том же порядке)
+            Список результатов проверки (в том же порядке, формат как у check_relevance)
         """
-        results = []
+        if not tenders:
+            return []
 
-        for tender in tenders:
-            result = await self.check_relevance(
-                tender_name=tender.get('name', ''),
-                tender_description=tender.get('description', ''),
-                filter_intent=filter_intent,
-                filter_keywords=filter_keywords,
-                user_id=user_id,
-                subscription_tier=subscription_tier
-            )
-            results.append(result)
-
-            # Если квота исчерпана — остальные без AI проверки
-            if result.get('source') == 'quota_exceeded':
-                for _ in range(len(tenders) - len(results)):
-                    results.append({
-                        'is_relevant': True,
-                        'confidence': 50,
-                        'reason': 'Квота исчерпана',
-                        'source': 'quota_exceeded',
-                        'quota_remaining': 0
-                    })
-                break
+        # Загружаем квоту из БД при первом обращении пользователя (после рестарта)
+        if user_id and user_id not in self._usage_counters:
+            await self.load_quota_from_db(user_id)
 
+        items = [
+            (
+                self._get_cache_key(tender.get('name', '') or '', filter_intent),
+                tender.get('name', '') or '',
+                tender.get('description', '') or '',
+            )
+            for tender in tenders
+        ]
+
+        # Кэш: память, затем БД одним запросом
+        cached: Dict[str, Dict[str, Any]] = {}
+        for cache_key, _, _ in items:
+            hit = self._get_from_cache(cache_key)
+            if hit:
+                cached[cache_key] = hit
+        missing_keys = list(dict.fromkeys(key for key, _, _ in items if key not in cached))
+        if missing_keys:
+            cached.update(await self._get_many_from_persistent_cache(missing_keys))
+
+        # Уникальные непроверенные тендеры (одинаковые названия — одна проверка)
+        pending = list({key: (key, name, description) for key, name, description in items if key not in cached}.values())
+
+        checked: Dict[str, Dict[str, Any]] = {}
+        quota_exceeded: set = set()
+        if pending and self.client:
+            if user_id:
+                self.check_quota(user_id, subscription_tier)  # сброс дневного счётчика
+                allowed = self.get_usage_stats(user_id, subscription_tier)['remaining']
+                if allowed < len(pending):
+                    logger.info(f"   ⚠️ Квота AI: {allowed} из {len(pending)} тендеров для user {user_id} ({subscription_tier})")
+                quota_exceeded = {key for key, _, _ in pending[allowed:]}
+                pending = pending[:allowed]
+
+            batches = self._pack_batches(pending)
+            if batches:
+                logger.info(f"   🤖 AI пакетная проверка: {len(pending)} тендеров, {len(batches)} запросов")
+            for batch_results in await asyncio.gather(
+                *(self._check_batch(batch, filter_intent, filter_keywords, tender_types) for batch in batches)
+            ):
+                checked.update(batch_results)
+
+            fresh = {key: result for key, result in checked.items() if result.get('source') != 'error'}
+            for cache_key, result in fresh.items():
+                self._save_to_cache(cache_key, result)
+            await self._save_many_to_persistent_cache(fresh)
+
+            # Квота списывается за каждый проверенный AI тендер
+            if user_id and fresh:
+                await self.increment_usage_persistent(user_id, count=len(fresh))
+
+        remaining = self.get_usage_stats(user_id, subscription_tier)['remaining'] if user_id else -1
+        results = []
+        for cache_key, _, _ in items:
+            if cache_key in cached:
+                results.append({**cached[cache_key], 'source': 'cache', 'quota_remaining': remaining})
+            elif cache_key in checked:
+                result = checked[cache_key]
+                if result.get('source') == 'error':
+                    results.append(dict(result))
+                else:
+                    results.append({**result, 'source': 'ai', 'quota_remaining': remaining})
+            elif cache_key in quota_exceeded:
+                results.append(self._quota_exceeded_result())
+            else:
+                # Нет API клиента — fallback
+                results.append({
+                    'is_relevant': True,
+                    'confidence': 0,  # Без boost — нет AI-проверки
+                    'reason': 'AI недоступен, используется keyword matching',
+                    'source': 'fallback',
+                    'quota_remaining': -1
+                })
         return results
 
 
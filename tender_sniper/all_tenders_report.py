@@ -2,6 +2,8 @@
 Генератор HTML отчетов для всех тендеров пользователя.
 
 Создает красивый HTML-файл со всеми тендерами из уведомлений.
+Шаблон разбит на части (render_*), чтобы tender_sniper/report_engine.py
+мог писать отчёт в файл по мере чтения тендеров из БД.
 """
 
 import sys
@@ -73,37 +75,9 @@ def format_date(date_str: str) -> str:
         return date_str[:16] if len(date_str) > 16 else date_str
 
 
-def generate_html_report(
-    tenders: List[Dict[str, Any]],
-    username: str = "Пользователь",
-    total_count: int = None,
-    use_ai_naming: bool = False  # По умолчанию отключено для скорости
-) -> str:
-    """
-    Генерация HTML отчета всех тендеров.
-
-    Args:
-        tenders: Список тендеров
-        username: Имя пользователя
-        total_count: Общее количество тендеров (если отображена только часть)
-        use_ai_naming: Использовать AI для генерации названий (медленно, по умолчанию False)
-
-    Returns:
-        HTML строка
-    """
-    if total_count is None:
-        total_count = len(tenders)
-
-    # Группировка по фильтрам
-    tenders_by_filter = {}
-    for tender in tenders:
-        filter_name = tender.get('filter_name', 'Без фильтра')
-        if filter_name not in tenders_by_filter:
-            tenders_by_filter[filter_name] = []
-        tenders_by_filter[filter_name].append(tender)
-
-    # HTML шаблон
-    html_content = f"""<!DOCTYPE html>
+def render_report_head(username: str, total_count: int, filters_count: int, shown_count: int) -> str:
+    """Начало HTML отчёта: стили, шапка со статистикой и панель фильтров."""
+    return f"""<!DOCTYPE html>
 <html lang="ru">
 <head>
     <meta charset="UTF-8">
@@ -547,11 +521,11 @@ def generate_html_report(
                     <div class="label">Всего тендеров</div>
                 </div>
                 <div class="stat-card">
-                    <div class="value">{len(tenders_by_filter)}</div>
+                    <div class="value">{filters_count}</div>
                     <div class="label">Активных фильтров</div>
                 </div>
                 <div class="stat-card">
-                    <div class="value">{len(tenders)}</div>
+                    <div class="value">{shown_count}</div>
                     <div class="label">Отображено</div>
                 </div>
             </div>
@@ -613,48 +587,53 @@ def generate_html_report(
 
             <div class="filter-actions">
                 <button id="resetFilters" class="btn-reset">🔄 Сбросить фильтры</button>
-                <div class="results-count" id="resultsCount">Найдено: {len(tenders)}</div>
+                <div class="results-count" id="resultsCount">Найдено: {shown_count}</div>
             </div>
         </div>
 """
 
-    # Генерируем секции для каждого фильтра
-    if tenders:
-        for filter_name, filter_tenders in tenders_by_filter.items():
-            html_content += f"""
+
+def render_filter_section_open(filter_name: str, count: int) -> str:
+    """Открывающая часть секции фильтра с бейджем количества тендеров."""
+    return f"""
         <!-- Фильтр: {html.escape(filter_name)} -->
         <div class="filter-section">
             <div class="filter-title">
                 📋 {html.escape(filter_name)}
-                <span class="filter-badge">{len(filter_tenders)} тендеров</span>
+                <span class="filter-badge">{count} тендеров</span>
             </div>
 """
 
-            for tender in filter_tenders:
-                tender_url = tender.get('url', '')
-                if tender_url and not tender_url.startswith('http'):
-                    tender_url = f"https://zakupki.gov.ru{tender_url}"
-
-                # Подготавливаем данные для фильтрации
-                original_name = tender.get('name', 'Без названия')
-                # Генерируем короткое название (AI или быстрый fallback)
-                if use_ai_naming:
-                    tender_name = generate_tender_name(
-                        original_name,
-                        tender_data=tender,
-                        max_length=80
-                    )
-                else:
-                    # Быстрая генерация без API вызовов
-                    tender_name = _fast_short_name(original_name, max_length=80)
-                tender_price = tender.get('price', 0) or 0
-                tender_region = tender.get('region', 'Не указан')
-                tender_date = tender.get('published_date', '')
-
-                tender_source = tender.get('source', 'automonitoring')
-
-                tender_num = html.escape(tender.get('number', 'N/A'))
-                html_content += f"""
+
+FILTER_SECTION_CLOSE = "        </div>\n"
+
+
+def render_tender_card(tender: Dict[str, Any], filter_name: str, use_ai_naming: bool = False) -> str:
+    """Карточка одного тендера."""
+    tender_url = tender.get('url', '')
+    if tender_url and not tender_url.startswith('http'):
+        tender_url = f"https://zakupki.gov.ru{tender_url}"
+
+    # Подготавливаем данные для фильтрации
+    original_name = tender.get('name', 'Без названия')
+    # Генерируем короткое название (AI или быстрый fallback)
+    if use_ai_naming:
+        tender_name = generate_tender_name(
+            original_name,
+            tender_data=tender,
+            max_length=80
+        )
+    else:
+        # Быстрая генерация без API вызовов
+        tender_name = _fast_short_name(original_name, max_length=80)
+    tender_price = tender.get('price', 0) or 0
+    tender_region = tender.get('region', 'Не указан')
+    tender_date = tender.get('published_date', '')
+
+    tender_source = tender.get('source', 'automonitoring')
+
+    tender_num = html.escape(tender.get('number', 'N/A'))
+    return f"""
             <div class="tender-card"
                  data-name="{html.escape(tender_name.lower())}"
                  data-price="{tender_price}"
@@ -702,9 +681,8 @@ def generate_html_report(
             </div>
 """
 
-            html_content += "        </div>\n"
-    else:
-        html_content += """
+
+EMPTY_STATE_HTML = """
         <div class="filter-section">
             <div class="empty-state">
                 <div class="empty-state-icon">📭</div>
@@ -714,8 +692,10 @@ def generate_html_report(
         </div>
 """
 
-    # Футер
-    html_content += f"""
+
+def render_report_footer() -> str:
+    """Футер, панель экспорта и JavaScript фильтрации."""
+    return f"""
         <div class="footer">
             <p>🤖 Сгенерировано Tender Sniper Bot</p>
             <p>{datetime.now().strftime('%d.%m.%Y %H:%M')}</p>
@@ -987,7 +967,49 @@ def generate_html_report(
 </html>
 """
 
-    return html_content
+
+def generate_html_report(
+    tenders: List[Dict[str, Any]],
+    username: str = "Пользователь",
+    total_count: int = None,
+    use_ai_naming: bool = False  # По умолчанию отключено для скорости
+) -> str:
+    """
+    Генерация HTML отчета всех тендеров.
+
+    Args:
+        tenders: Список тендеров
+        username: Имя пользователя
+        total_count: Общее количество тендеров (если отображена только часть)
+        use_ai_naming: Использовать AI для генерации названий (медленно, по умолчанию False)
+
+    Returns:
+        HTML строка
+    """
+    if total_count is None:
+        total_count = len(tenders)
+
+    # Группировка по фильтрам
+    tenders_by_filter = {}
+    for tender in tenders:
+        filter_name = tender.get('filter_name', 'Без фильтра')
+        if filter_name not in tenders_by_filter:
+            tenders_by_filter[filter_name] = []
+        tenders_by_filter[filter_name].append(tender)
+
+    parts = [render_report_head(username, total_count, len(tenders_by_filter), len(tenders))]
+
+    # Генерируем секции для каждого фильтра
+    if tenders:
+        for filter_name, filter_tenders in tenders_by_filter.items():
+            parts.append(render_filter_section_open(filter_name, len(filter_tenders)))
+            parts.extend(render_tender_card(tender, filter_name, use_ai_naming) for tender in filter_tenders)
+            parts.append(FILTER_SECTION_CLOSE)
+    else:
+        parts.append(EMPTY_STATE_HTML)
+
+    parts.append(render_report_footer())
+    return "".join(parts)
 
 
 async def generate_all_tenders_html(
@@ -1006,23 +1028,14 @@ async def generate_all_tenders_html(
     Returns:
         Путь к созданному HTML файлу
     """
-    from tender_sniper.database import get_sniper_db
-
-    # Получаем тендеры из БД
-    db = await get_sniper_db()
-    tenders = await db.get_user_tenders(user_id, limit=limit)
-
-    # Генерируем HTML
-    html_content = generate_html_report(tenders, username)
-
-    # Сохраняем в файл
-    output_dir = Path(__file__).parent.parent / 'temp_reports'
-    output_dir.mkdir(exist_ok=True)
-
-    filename = f"all_tenders_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-    output_path = output_dir / filename
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    return output_path
+    from tender_sniper.report_engine import get_report_engine
+
+    # Потоковая генерация с кэшем готового файла (tender_sniper/report_engine.py)
+    result = await get_report_engine().build(
+        user_id,
+        'html',
+        {'filter_expired': False},
+        username=username,
+        max_rows=limit
+    )
+    return result.path
@@ -0,0 +1,22 @@
+"""
+Офлайн-бенчмарк цикла мониторинга: запись ответов zakupki.gov.ru в архив,
+локальный replay-сервер с инъекцией задержек/ошибок и прогон полных циклов
+TenderSniperService на синтетических фильтрах.
+
+    python -m tender_sniper.benchmark run --filters 50 --cycles 3 --out bench.json
+    python -m tender_sniper.benchmark run --filters 50 --baseline bench.json
+    python -m tender_sniper.benchmark record --filters-file filters.json --out fixtures.zip
+"""
+
+from .fixtures import FixtureArchive, SyntheticZakupki, request_key, shift_dates
+from .replay import RecordingClient, ReplayClient, ReplayServer
+
+__all__ = [
+    'FixtureArchive',
+    'SyntheticZakupki',
+    'request_key',
+    'shift_dates',
+    'ReplayServer',
+    'ReplayClient',
+    'RecordingClient',
+]
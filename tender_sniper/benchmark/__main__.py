@@ -0,0 +1,70 @@
+"""CLI бенчмарка цикла мониторинга (см. tender_sniper/benchmark/__init__.py)."""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from tender_sniper.benchmark.runner import compare, format_report, record_fixtures, run_benchmark
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m tender_sniper.benchmark',
+                                     description='Офлайн-бенчмарк цикла мониторинга')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-v', '--verbose', action='store_true', help='логи сервиса')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', parents=[common], help='прогнать циклы на replay-сервере')
+    run.add_argument('--fixtures', help='архив ответов (по умолчанию — синтетические)')
+    run.add_argument('--filters', type=int, default=20, help='число синтетических фильтров')
+    run.add_argument('--filters-file', help='фильтры из JSON вместо синтетических')
+    run.add_argument('--users', type=int, help='число пользователей (по умолчанию filters / 2)')
+    run.add_argument('--cycles', type=int, default=3)
+    run.add_argument('--latency-ms', type=float, default=0)
+    run.add_argument('--jitter-ms', type=float, default=0)
+    run.add_argument('--error-rate', type=float, default=0.0, help='доля ответов 503')
+    run.add_argument('--block-rate', type=float, default=0.0, help='доля ответов 403')
+    run.add_argument('--rate', type=float, help='запросов/с у клиента (0.5 — как в проде)')
+    run.add_argument('--send-delay', type=float, help='пауза между уведомлениями, с')
+    run.add_argument('--database-url', help='пустая БД (по умолчанию — временный SQLite)')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--out', help='сохранить отчёт в JSON (baseline для следующих прогонов)')
+    run.add_argument('--baseline', help='JSON прошлого прогона для сравнения')
+
+    record = sub.add_parser('record', parents=[common], help='записать ответы zakupki.gov.ru в архив')
+    record.add_argument('--filters', type=int, default=20)
+    record.add_argument('--filters-file')
+    record.add_argument('--out', required=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        logging.getLogger('tender_sniper.benchmark').setLevel(logging.INFO)
+
+    if args.command == 'record':
+        archive = asyncio.run(record_fixtures(args.filters_file, args.out, filters=args.filters))
+        print(f"💾 Записано {len(archive)} ответов в {args.out}: {archive.counts()}")
+        return 0
+
+    report = asyncio.run(run_benchmark(
+        filters=args.filters, users=args.users, cycles=args.cycles, fixtures=args.fixtures,
+        filters_file=args.filters_file, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, block_rate=args.block_rate, rate=args.rate,
+        database_url=args.database_url, send_delay=args.send_delay, seed=args.seed,
+    ))
+    deltas = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            deltas = compare(report['summary'], json.load(f)['summary'])
+        report['baseline_delta_pct'] = deltas
+    print(format_report(report, deltas))
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
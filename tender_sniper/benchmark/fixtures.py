@@ -0,0 +1,294 @@
+"""
+Фикстуры ответов zakupki.gov.ru для офлайн-прогона цикла мониторинга.
+
+- FixtureArchive: записанные ответы (RSS-фиды, HTML-страницы поиска,
+  страницы тендеров) в zip: index.json + тела ответов в bodies/;
+- request_key: ключ запроса без меняющихся параметров (publishDateFrom —
+  «сегодня минус 3 дня», запись должна находиться и через неделю);
+- shift_dates: сдвиг дат в теле ответа на время, прошедшее с записи
+  (иначе через месяц все тендеры архивные, а сроки подачи — в прошлом);
+- SyntheticZakupki: генератор правдоподобных ответов для запросов,
+  которых нет в архиве (или вместо архива) — детерминированный по seed.
+"""
+
+import io
+import json
+import re
+import zipfile
+import zlib
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from html import escape
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Параметры запроса, зависящие от даты запуска — в ключ не входят
+VOLATILE_PARAMS = {'publishDateFrom', 'publishDateTo'}
+
+KINDS = ('rss', 'html', 'tender_page', 'other')
+
+ARCHIVE_VERSION = 1
+
+
+def request_key(url: str) -> str:
+    """Путь + отсортированные параметры без VOLATILE_PARAMS (хост не важен)."""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS
+    )
+    return parts.path + ('?' + urlencode(query) if query else '')
+
+
+def classify(url: str) -> str:
+    """Тип запроса: rss / html (страница результатов) / tender_page / other."""
+    path = urlsplit(url).path
+    if path.endswith('/rss.html'):
+        return 'rss'
+    if path.endswith('/results.html'):
+        return 'html'
+    if path.endswith(('common-info.html', 'purchase-objects.html')):
+        return 'tender_page'
+    return 'other'
+
+
+# ============================================
+# СДВИГ ДАТ
+# ============================================
+
+_RU_DATE = re.compile(r'\b(\d{2})\.(\d{2})\.(\d{4})\b')
+_RFC822_DATE = re.compile(r'[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2} (?:[+-]\d{4}|GMT|UTC)')
+
+
+def shift_dates(text: str, days: int) -> str:
+    """Сдвигает даты ДД.ММ.ГГГГ и RFC 822 (pubDate) на days дней."""
+    if not days:
+        return text
+
+    def shift_ru(match):
+        try:
+            moment = datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        except ValueError:
+            return match.group(0)
+        return (moment + timedelta(days=days)).strftime('%d.%m.%Y')
+
+    def shift_rfc822(match):
+        try:
+            moment = parsedate_to_datetime(match.group(0))
+        except (TypeError, ValueError):
+            return match.group(0)
+        return format_datetime(moment + timedelta(days=days))
+
+    return _RFC822_DATE.sub(shift_rfc822, _RU_DATE.sub(shift_ru, text))
+
+
+# ============================================
+# АРХИВ
+# ============================================
+
+class FixtureArchive:
+    """Записанные ответы zakupki.gov.ru по ключу request_key."""
+
+    def __init__(self, recorded_at: Optional[datetime] = None):
+        self.recorded_at = recorded_at or datetime.now()
+        # key → {'url', 'kind', 'status', 'charset', 'body'}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, url: str, status: int, body: bytes, charset: Optional[str] = None) -> None:
+        self.entries[request_key(url)] = {
+            'url': url,
+            'kind': classify(url),
+            'status': status,
+            'charset': charset,
+            'body': body,
+        }
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(request_key(url))
+
+    def by_kind(self, kind: str) -> List[Dict[str, Any]]:
+        """Успешные ответы одного типа (для подстановки вместо отсутствующих)."""
+        return [
+            entry for _, entry in sorted(self.entries.items())
+            if entry['kind'] == kind and entry['status'] == 200
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(KINDS, 0)
+        for entry in self.entries.values():
+            counts[entry['kind']] += 1
+        return counts
+
+    def save(self, path) -> None:
+        index = {'version': ARCHIVE_VERSION, 'recorded_at': self.recorded_at.isoformat(), 'entries': []}
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for i, (key, entry) in enumerate(sorted(self.entries.items()), start=1):
+                body_name = f'bodies/{i:05d}.bin'
+                archive.writestr(body_name, entry['body'])
+                index['entries'].append({
+                    'key': key,
+                    'url': entry['url'],
+                    'kind': entry['kind'],
+                    'status': entry['status'],
+                    'charset': entry['charset'],
+                    'file': body_name,
+                })
+            archive.writestr('index.json', json.dumps(index, ensure_ascii=False, indent=1))
+
+    @classmethod
+    def load(cls, path) -> 'FixtureArchive':
+        with zipfile.ZipFile(path) as archive:
+            index = json.loads(archive.read('index.json'))
+            if index.get('version') != ARCHIVE_VERSION:
+                raise ValueError(f"Неизвестная версия архива фикстур: {index.get('version')}")
+            fixtures = cls(recorded_at=datetime.fromisoformat(index['recorded_at']))
+            for item in index['entries']:
+                fixtures.entries[item['key']] = {
+                    'url': item['url'],
+                    'kind': item['kind'],
+                    'status': item['status'],
+                    'charset': item['charset'],
+                    'body': archive.read(item['file']),
+                }
+        return fixtures
+
+
+# ============================================
+# СИНТЕТИЧЕСКИЕ ОТВЕТЫ
+# ============================================
+
+# Словарь предметов закупок для синтетических фильтров и тендеров
+VOCABULARY = [
+    'ноутбук', 'мебель', 'бумага', 'картридж', 'принтер', 'монитор', 'сервер', 'кресло',
+    'огнетушитель', 'спецодежда', 'перчатки', 'лекарственные препараты', 'шприц', 'бинт',
+    'продукты питания', 'молоко', 'хлеб', 'уголь', 'бензин', 'дизельное топливо',
+    'ремонт кровли', 'уборка помещений', 'охрана объекта', 'вывоз мусора', 'асфальт',
+    'светильник', 'кабель', 'кондиционер', 'холодильник', 'стиральная машина',
+    'учебники', 'канцелярские товары', 'моющие средства', 'строительные материалы',
+    'программное обеспечение', 'видеонаблюдение', 'медицинское оборудование', 'рентген',
+    'автомобиль', 'шины',
+]
+
+_CUSTOMERS = [
+    ('ГБУЗ «ГОРОДСКАЯ БОЛЬНИЦА № {n}» г. Москвы', '7701{n:06d}'),
+    ('МБОУ «СРЕДНЯЯ ШКОЛА № {n}» Свердловская область', '6601{n:06d}'),
+    ('ФКУ «УПРАВЛЕНИЕ № {n}» Краснодарский край', '2301{n:06d}'),
+    ('АДМИНИСТРАЦИЯ МУНИЦИПАЛЬНОГО ОБРАЗОВАНИЯ № {n} Новосибирская область', '5401{n:06d}'),
+]
+
+_TENDER_PAGE_FILLER = (
+    '<div class="blockInfo__section section"><span class="section__title">Информация о процедуре</span>'
+    '<span class="section__info">Электронный аукцион. Сведения о закупке размещены в единой информационной '
+    'системе в соответствии с требованиями законодательства о контрактной системе.</span></div>\n'
+)
+
+
+def _stable_rng(*parts) -> 'random.Random':
+    import random
+    return random.Random(zlib.crc32('|'.join(str(p) for p in parts).encode('utf-8')))
+
+
+class SyntheticZakupki:
+    """
+    Детерминированные ответы в формате zakupki.gov.ru.
+
+    RSS-фид по searchString: часть записей содержит ключевое слово запроса,
+    часть — случайные предметы; номера тендеров зависят от запроса и позиции,
+    поэтому одинаковые запросы разных фильтров дают одни и те же тендеры.
+    """
+
+    def __init__(self, seed: int = 0, entries_per_feed: int = 30, relevant_share: float = 0.6,
+                 page_kb: int = 60, now: Optional[datetime] = None):
+        self.seed = seed
+        self.entries_per_feed = entries_per_feed
+        self.relevant_share = relevant_share
+        self.page_kb = page_kb
+        self.now = now or datetime.now()
+
+    def render(self, url: str) -> Tuple[int, bytes]:
+        """(HTTP статус, тело) для запроса."""
+        kind = classify(url)
+        if kind == 'rss':
+            return 200, self.rss_feed(url).encode('utf-8')
+        if kind == 'html':
+            # Карточек нет: HTML fallback сервиса возвращает пустой результат
+            return 200, '<html><body><div class="search-results"></div></body></html>'.encode('utf-8')
+        if kind == 'tender_page':
+            return 200, self.tender_page(url).encode('utf-8')
+        return 404, b'not found'
+
+    def _tender(self, query: str, position: int) -> Dict[str, Any]:
+        rng = _stable_rng(self.seed, query, position)
+        relevant = bool(query) and rng.random() < self.relevant_share
+        subject = query if relevant else rng.choice(VOCABULARY)
+        customer_template, inn_template = rng.choice(_CUSTOMERS)
+        n = rng.randint(1, 999)
+        number = f"03{zlib.crc32(f'{self.seed}|{subject}|{position % 20}'.encode('utf-8')) % 10 ** 17:017d}"
+        published = self.now - timedelta(minutes=rng.randint(5, 3 * 24 * 60))
+        return {
+            'number': number,
+            'name': f"Поставка: {subject} для нужд учреждения (партия {position % 7 + 1})",
+            'customer': customer_template.format(n=n),
+            'inn': inn_template.format(n=n),
+            'price': round(rng.uniform(50_000, 20_000_000), 2),
+            'published': published,
+            'deadline': published + timedelta(days=rng.randint(7, 20)),
+        }
+
+    def rss_feed(self, url: str) -> str:
+        params = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+        query = params.get('searchString', '')
+        # Как на zakupki.gov.ru (sortBy=UPDATE_DATE): новые сверху
+        tenders = sorted(
+            (self._tender(query, position) for position in range(self.entries_per_feed)),
+            key=lambda t: t['published'], reverse=True,
+        )
+        items = []
+        for tender in tenders:
+            price = f"{tender['price']:,.2f}".replace(',', ' ').replace('.', ',')
+            summary = (
+                f"<strong>Наименование объекта закупки: </strong>{escape(tender['name'])}<br/>"
+                f"<strong>Размещение заказа: </strong>Поставка товаров<br/>"
+                f"<strong>Наименование Заказчика: </strong>{escape(tender['customer'])}<br/>"
+                f"<strong>Начальная (максимальная) цена контракта: </strong>{price}<br/>"
+                f"<strong>Окончание подачи заявок: </strong>{tender['deadline'].strftime('%d.%m.%Y %H:%M')}<br/>"
+                f"<strong>Обновлено: </strong>{tender['published'].strftime('%d.%m.%Y')}"
+            )
+            items.append(
+                '<item>'
+                f'<title>Электронный аукцион № {tender["number"]}</title>'
+                f'<link>/epz/order/notice/ea20/view/common-info.html?regNumber={tender["number"]}</link>'
+                f'<description>{escape(summary)}</description>'
+                f'<pubDate>{format_datetime(tender["published"].astimezone())}</pubDate>'
+                '</item>'
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            '<title>Результаты поиска</title><link>https://zakupki.gov.ru</link>'
+            + ''.join(items) + '</channel></rss>'
+        )
+
+    def tender_page(self, url: str) -> str:
+        params = dict(parse_qsl(urlsplit(url).query))
+        number = params.get('regNumber', '')
+        rng = _stable_rng(self.seed, 'page', number)
+        customer_template, inn_template = rng.choice(_CUSTOMERS)
+        n = rng.randint(1, 999)
+        deadline = self.now + timedelta(days=rng.randint(7, 20))
+        price = f"{rng.uniform(50_000, 20_000_000):,.2f}".replace(',', ' ').replace('.', ',')
+        body = io.StringIO()
+        body.write('<html><body><div class="cardMainInfo">')
+        body.write(f'<span class="cardMainInfo__title">Заказчик</span>'
+                   f'<span class="cardMainInfo__content">{escape(customer_template.format(n=n))}</span>')
+        body.write('</div>')
+        body.write('<span class="section__title">Максимальное значение цены контракта </span>'
+                   f'<span class="section__info">{price}</span>')
+        body.write('<span class="section__title">Дата и время окончания срока подачи заявок </span>'
+                   f'<span class="section__info">{deadline.strftime("%d.%m.%Y")} 10:00</span>')
+        body.write(f'<span class="section__title">ИНН</span><span class="section__info">ИНН: {inn_template.format(n=n)}</span>')
+        filler_count = max(0, self.page_kb * 1024 // len(_TENDER_PAGE_FILLER.encode('utf-8')))
+        body.write(_TENDER_PAGE_FILLER * filler_count)
+        body.write('</body></html>')
+        return body.getvalue()
@@ -0,0 +1,184 @@
+"""
+Локальная подмена zakupki.gov.ru для офлайн-прогона цикла мониторинга.
+
+ReplayServer (aiohttp.web на 127.0.0.1) отдаёт ответы из FixtureArchive,
+для отсутствующих в архиве запросов — синтетические (SyntheticZakupki) или
+записанный ответ того же типа. Задержка, джиттер, доля 503 и 403
+настраиваются — так проверяется поведение цикла при медленном или
+блокирующем сайте.
+
+ReplayClient — AsyncZakupkiClient, который отправляет запросы парсера на
+ReplayServer: rate limit, повторы на 5xx и ProxyHealthManager работают
+как в проде. RecordingClient — обычный клиент, который дополнительно
+складывает ответы в архив (команда record).
+"""
+
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from src.parsers import async_http
+from src.parsers.async_http import AsyncZakupkiClient, HttpResponse
+from src.parsers.proxy_health import ProxyHealthManager
+
+from tender_sniper.benchmark.fixtures import FixtureArchive, SyntheticZakupki, classify, shift_dates
+
+_CONTENT_TYPES = {
+    'rss': 'application/rss+xml',
+    'html': 'text/html',
+    'tender_page': 'text/html',
+    'other': 'text/html',
+}
+
+
+class ReplayServer:
+    """HTTP-сервер с ответами zakupki.gov.ru из архива/генератора."""
+
+    def __init__(
+        self,
+        archive: Optional[FixtureArchive] = None,
+        synthetic: Optional[SyntheticZakupki] = None,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        block_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        if archive is None and synthetic is None:
+            synthetic = SyntheticZakupki(seed=seed)
+        self.archive = archive
+        self.synthetic = synthetic
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self._rng = random.Random(seed)
+        # Записи сдвигаются на дни, прошедшие с записи архива
+        self._shift_days = (datetime.now() - archive.recorded_at).days if archive else 0
+        self._fallback_cursor: Counter = Counter()
+
+        self.requests: Counter = Counter()  # по типам запросов
+        self.responses: Counter = Counter()  # archive / synthetic / fallback / missing / error / blocked
+        self._runner = None
+        self.base_url: Optional[str] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Запускает сервер (port=0 — свободный порт). Возвращает базовый URL."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_route('GET', '/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.base_url = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_stats(self) -> None:
+        self.requests.clear()
+        self.responses.clear()
+
+    def resolve(self, url: str):
+        """(статус, тело, charset, источник) для запроса без инъекции ошибок."""
+        kind = classify(url)
+        entry = self.archive.get(url) if self.archive else None
+        source = 'archive'
+        if entry is None and self.synthetic is not None:
+            status, body = self.synthetic.render(url)
+            return status, body, 'utf-8', 'synthetic' if status == 200 else 'missing'
+        if entry is None and self.archive is not None:
+            # Запроса нет в архиве — подставляем записанный ответ того же типа
+            candidates = self.archive.by_kind(kind)
+            if not candidates:
+                return 404, b'not found', 'utf-8', 'missing'
+            entry = candidates[self._fallback_cursor[kind] % len(candidates)]
+            self._fallback_cursor[kind] += 1
+            source = 'fallback'
+
+        body = entry['body']
+        charset = entry['charset'] or 'utf-8'
+        if self._shift_days and kind != 'other':
+            try:
+                body = shift_dates(body.decode(charset), self._shift_days).encode(charset)
+            except (UnicodeError, LookupError):
+                pass
+        return entry['status'], body, charset, source
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        url = request.path_qs
+        kind = classify(url)
+        self.requests[kind] += 1
+
+        delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self._rng.random()
+        if roll < self.error_rate:
+            self.responses['error'] += 1
+            return web.Response(status=503, text='Service Unavailable')
+        if roll < self.error_rate + self.block_rate:
+            self.responses['blocked'] += 1
+            return web.Response(status=403, text='Forbidden')
+
+        status, body, charset, source = self.resolve(url)
+        self.responses[source] += 1
+        return web.Response(
+            status=status, body=body,
+            headers={'Content-Type': f"{_CONTENT_TYPES[kind]}; charset={charset}"},
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {'requests': dict(self.requests), 'responses': dict(self.responses)}
+
+
+class ReplayClient(AsyncZakupkiClient):
+    """
+    AsyncZakupkiClient, направляющий запросы на ReplayServer.
+
+    По умолчанию rate limit практически снят (меряем цикл, а не ожидание
+    токенов); rate=0.5, burst=1 воспроизводят прод без прокси.
+    """
+
+    def __init__(self, base_url: str, rate: float = 1000.0, burst: float = 1000.0,
+                 health: Optional[ProxyHealthManager] = None):
+        super().__init__(proxy_urls=[], rate=rate, burst=burst, health=health or ProxyHealthManager())
+        self.base_url = base_url.rstrip('/')
+
+    async def get(self, url: str, timeout: float = 60) -> HttpResponse:
+        parts = urlsplit(url)
+        local_url = self.base_url + parts.path + (f'?{parts.query}' if parts.query else '')
+        response = await super().get(local_url, timeout=timeout)
+        # Парсер видит исходный URL zakupki.gov.ru
+        response.url = url
+        return response
+
+
+class RecordingClient(AsyncZakupkiClient):
+    """AsyncZakupkiClient, складывающий ответы в FixtureArchive."""
+
+    def __init__(self, archive: FixtureArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    async def get(self, url: str, timeout: float = 60) -> HttpResponse:
+        response = await super().get(url, timeout=timeout)
+        if response.status < 500:
+            self.archive.add(url, response.status, response.content, response.charset)
+        return response
+
+
+def install_client(client: Optional[AsyncZakupkiClient]) -> None:
+    """Подменяет общий клиент get_async_client() (None — вернуть прод-клиент)."""
+    async_http._client = client
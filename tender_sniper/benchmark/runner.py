@@ -0,0 +1,428 @@
+"""
+Прогон цикла мониторинга (TenderSniperService._process_new_tenders) офлайн.
+
+Поднимает ReplayServer, подменяет HTTP-клиент парсера на ReplayClient,
+заводит в пустой БД N синтетических пользователей и фильтров и гоняет
+полные циклы. По каждому циклу:
+
+- wall_s — время цикла;
+- http_requests / http_per_filter — запросы к «zakupki.gov.ru» (по типам);
+- db_roundtrips / db_per_filter — выполненные SQL-запросы;
+- matcher_cpu_s — CPU SmartMatcher и CompiledFilter (вложенные вызовы
+  не считаются дважды);
+- notifications / notifications_per_s — отправленные уведомления.
+
+Итог — медианы по циклам; с baseline (JSON прошлого прогона) печатается
+изменение в процентах. Запуск: python -m tender_sniper.benchmark --help
+"""
+
+import json
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from tender_sniper.benchmark.fixtures import VOCABULARY, FixtureArchive
+
+logger = logging.getLogger(__name__)
+
+# Ключи внешних сервисов: офлайн-прогон не должен ходить в LLM и Telegram.
+# Пустая строка, а не удаление — load_dotenv не перезаписывает заданные переменные
+OFFLINE_ENV_VARS = (
+    'OPENAI_API_KEY', 'ANTHROPIC_API_KEY', 'GROQ_API_KEY', 'GEMINI_API_KEY',
+    'TELEGRAM_BOT_TOKEN', 'BOT_TOKEN', 'MAX_BOT_TOKEN',
+)
+PROXY_ENV_VARS = ('PROXY_URL', 'PROXY_URL_2', 'PROXY_URL_3', 'PROXY_URL_4', 'PROXY_URL_5')
+
+# Метрики, по которым считаются медианы и сравнение с baseline
+SUMMARY_METRICS = (
+    'wall_s', 'http_requests', 'http_per_filter', 'db_roundtrips', 'db_per_filter',
+    'matcher_cpu_s', 'matcher_calls', 'notifications', 'notifications_per_s',
+)
+
+
+# ============================================
+# ИНСТРУМЕНТАЦИЯ
+# ============================================
+
+class CpuTimer:
+    """CPU-время потока внутри обёрнутых функций (внешний вызов — один замер)."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._depth = 0
+
+    def reset(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+
+    def wrap(self, func):
+        timer = self
+
+        def timed(*args, **kwargs):
+            if timer._depth:
+                return func(*args, **kwargs)
+            timer._depth += 1
+            timer.calls += 1
+            started = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.seconds += time.thread_time() - started
+                timer._depth -= 1
+
+        timed.__wrapped__ = func
+        return timed
+
+
+@contextmanager
+def instrument_matcher(timer: CpuTimer):
+    """Оборачивает SmartMatcher.match_tender и методы CompiledFilter на время прогона."""
+    from tender_sniper.matching import CompiledFilter, SmartMatcher
+
+    targets = [(SmartMatcher, 'match_tender')] + [
+        (CompiledFilter, name)
+        for name in ('find_keyword', 'has_keyword_root', 'find_excluded', 'customer_matches')
+    ]
+    originals = [(cls, name, cls.__dict__[name]) for cls, name in targets]
+    for cls, name, func in originals:
+        setattr(cls, name, timer.wrap(func))
+    try:
+        yield timer
+    finally:
+        for cls, name, func in originals:
+            setattr(cls, name, func)
+
+
+class QueryCounter:
+    """Счётчик SQL-запросов (before_cursor_execute) на async engine."""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    @contextmanager
+    def attach(self, async_engine):
+        from sqlalchemy import event
+
+        sync_engine = async_engine.sync_engine
+        event.listen(sync_engine, 'before_cursor_execute', self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(sync_engine, 'before_cursor_execute', self._on_execute)
+
+
+class BenchNotifier:
+    """Заглушка TelegramNotifier: считает уведомления вместо отправки."""
+
+    def __init__(self):
+        self.blocked_chat_ids: set = set()
+        self.sent = 0
+        self.quota_exceeded = 0
+        self.monitoring_errors = 0
+
+    async def send_tender_notification(self, **kwargs) -> bool:
+        self.sent += 1
+        return True
+
+    async def send_quota_exceeded_notification(self, **kwargs) -> bool:
+        self.quota_exceeded += 1
+        return True
+
+    async def send_monitoring_error_notification(self, **kwargs) -> bool:
+        self.monitoring_errors += 1
+        return True
+
+    async def close(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'sent': self.sent, 'quota_exceeded': self.quota_exceeded}
+
+
+# ============================================
+# ОКРУЖЕНИЕ И ДАННЫЕ
+# ============================================
+
+def prepare_env(database_url: Optional[str], keep_proxies: bool = False) -> Optional[str]:
+    """
+    Отключает внешние сервисы и задаёт DATABASE_URL (до импорта database).
+
+    Returns:
+        Временный каталог SQLite, если БД не задана (удалить после прогона)
+    """
+    for name in OFFLINE_ENV_VARS + (() if keep_proxies else PROXY_ENV_VARS):
+        os.environ[name] = ''
+    tmp_dir = None
+    if not database_url:
+        tmp_dir = tempfile.mkdtemp(prefix='sniper-bench-')
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ['DATABASE_URL'] = database_url
+    return tmp_dir
+
+
+def synthetic_filters(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Фильтры из словаря VOCABULARY: 1–2 ключевых слова, часть слов общая у разных фильтров."""
+    import random
+
+    rng = random.Random(seed)
+    filters = []
+    for i in range(count):
+        keywords = [VOCABULARY[i % len(VOCABULARY)]]
+        if rng.random() < 0.5:
+            keywords.append(rng.choice(VOCABULARY))
+        filters.append({'name': f"Бенчмарк {i + 1}: {keywords[0]}", 'keywords': list(dict.fromkeys(keywords))})
+    return filters
+
+
+def load_filters(path: str) -> List[Dict[str, Any]]:
+    """Фильтры из JSON: [{"name": ..., "keywords": [...], ...параметры create_filter}]."""
+    with open(path, encoding='utf-8') as f:
+        filters = json.load(f)
+    for i, item in enumerate(filters):
+        if not item.get('keywords'):
+            raise ValueError(f"Фильтр #{i + 1} без keywords")
+        item.setdefault('name', f"Фильтр {i + 1}")
+    return filters
+
+
+async def seed_database(db, filters: List[Dict[str, Any]], users: int) -> None:
+    """Пользователи (тариф pro на 30 дней) и фильтры, распределённые по кругу."""
+    from sqlalchemy import func, select
+
+    from database import DatabaseSession, SniperUser
+
+    async with DatabaseSession() as session:
+        if await session.scalar(select(func.count()).select_from(SniperUser)):
+            raise RuntimeError('Бенчмарку нужна пустая БД: в sniper_users уже есть пользователи')
+
+    expires_at = datetime.utcnow() + timedelta(days=30)
+    user_ids = []
+    for i in range(max(1, users)):
+        user_id = await db.create_or_update_user(telegram_id=9_000_000_000 + i, username=f'bench_{i}')
+        await db.update_user_subscription(user_id, 'pro', filters_limit=len(filters),
+                                          notifications_limit=9999, expires_at=expires_at)
+        user_ids.append(user_id)
+
+    for i, item in enumerate(filters):
+        params = dict(item)
+        await db.create_filter(user_ids[i % len(user_ids)], params.pop('name'), **params)
+
+
+# ============================================
+# ПРОГОН
+# ============================================
+
+async def _run_cycles(client, filters: List[Dict[str, Any]], users: int, cycles: int,
+                      send_delay: Optional[float], server=None) -> List[Dict[str, Any]]:
+    """Заводит данные, подменяет клиент и гоняет циклы сервиса."""
+    import database
+    from tender_sniper.benchmark.replay import install_client
+    from tender_sniper.database import get_sniper_db
+    from tender_sniper.service import TenderSniperService
+
+    await database.init_database()
+    db = await get_sniper_db()
+    await seed_database(db, filters, users)
+
+    service = TenderSniperService(bot_token='benchmark')
+    service.db = db
+    service.notifier = notifier = BenchNotifier()
+    if send_delay is not None:
+        service.NOTIFICATION_SEND_DELAY = send_delay
+
+    timer = CpuTimer()
+    queries = QueryCounter()
+    results = []
+    install_client(client)
+    try:
+        with instrument_matcher(timer), queries.attach(database._engine):
+            for cycle in range(1, cycles + 1):
+                timer.reset()
+                queries.count = 0
+                sent_before = notifier.sent
+                errors_before = service.stats['errors']
+                http_before = dict(server.requests) if server else {}
+
+                started = time.perf_counter()
+                await service._process_new_tenders([])
+                wall = time.perf_counter() - started
+
+                http_by_kind = {
+                    kind: count - http_before.get(kind, 0)
+                    for kind, count in (server.requests.items() if server else ())
+                }
+                http_total = sum(http_by_kind.values())
+                notifications = notifier.sent - sent_before
+                result = {
+                    'cycle': cycle,
+                    'wall_s': round(wall, 3),
+                    'filters': len(filters),
+                    'http_requests': http_total,
+                    'http_per_filter': round(http_total / len(filters), 2),
+                    'http_by_kind': http_by_kind,
+                    'db_roundtrips': queries.count,
+                    'db_per_filter': round(queries.count / len(filters), 2),
+                    'matcher_cpu_s': round(timer.seconds, 4),
+                    'matcher_calls': timer.calls,
+                    'notifications': notifications,
+                    'notifications_per_s': round(notifications / wall, 2) if wall else 0.0,
+                    'errors': service.stats['errors'] - errors_before,
+                }
+                results.append(result)
+                logger.info(f"⏱️ Цикл {cycle}: {format_cycle(result)}")
+    finally:
+        install_client(None)
+        await client.close()
+        await database.close_database()
+    return results
+
+
+async def run_benchmark(
+    filters: int = 20,
+    users: Optional[int] = None,
+    cycles: int = 3,
+    fixtures: Optional[str] = None,
+    filters_file: Optional[str] = None,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    error_rate: float = 0.0,
+    block_rate: float = 0.0,
+    rate: Optional[float] = None,
+    database_url: Optional[str] = None,
+    send_delay: Optional[float] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Офлайн-прогон циклов мониторинга.
+
+    Args:
+        fixtures: архив FixtureArchive; без него — синтетические ответы
+        filters_file: фильтры из JSON вместо синтетических (filters игнорируется)
+        rate: запросов в секунду у ReplayClient (None — без ограничения, 0.5 — как в проде)
+        database_url: пустая БД (по умолчанию — временный SQLite)
+        send_delay: пауза между уведомлениями (None — как в сервисе)
+
+    Returns:
+        {'config', 'cycles', 'summary'}
+    """
+    tmp_dir = prepare_env(database_url)
+    from tender_sniper.benchmark.replay import ReplayClient, ReplayServer
+
+    filter_specs = load_filters(filters_file) if filters_file else synthetic_filters(filters, seed)
+    users = users or max(1, len(filter_specs) // 2)
+    archive = FixtureArchive.load(fixtures) if fixtures else None
+
+    server = ReplayServer(
+        archive=archive, latency_ms=latency_ms, jitter_ms=jitter_ms,
+        error_rate=error_rate, block_rate=block_rate, seed=seed,
+    )
+    base_url = await server.start()
+    client_kwargs = {'rate': rate, 'burst': 1} if rate else {}
+    client = ReplayClient(base_url, **client_kwargs)
+    try:
+        cycles_results = await _run_cycles(client, filter_specs, users, cycles, send_delay, server=server)
+    finally:
+        await server.stop()
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return {
+        'config': {
+            'filters': len(filter_specs),
+            'users': users,
+            'cycles': cycles,
+            'fixtures': fixtures or 'synthetic',
+            'latency_ms': latency_ms,
+            'jitter_ms': jitter_ms,
+            'error_rate': error_rate,
+            'block_rate': block_rate,
+            'rate': rate,
+            'database': 'sqlite (temp)' if tmp_dir else database_url.split('://', 1)[0],
+            'send_delay': send_delay,
+            'seed': seed,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'cycles': cycles_results,
+        'summary': summarize(cycles_results),
+        'responses': server.get_stats()['responses'],
+    }
+
+
+async def record_fixtures(filters_file: Optional[str], out: str, filters: int = 20) -> FixtureArchive:
+    """
+    Один цикл против настоящего zakupki.gov.ru (прокси из PROXY_URL*)
+    с записью всех ответов в архив.
+    """
+    tmp_dir = prepare_env(None, keep_proxies=True)
+    from tender_sniper.benchmark.replay import RecordingClient
+
+    filter_specs = load_filters(filters_file) if filters_file else synthetic_filters(filters)
+    archive = FixtureArchive()
+    client = RecordingClient(archive)
+    try:
+        await _run_cycles(client, filter_specs, max(1, len(filter_specs) // 2), 1, send_delay=0)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    archive.save(out)
+    return archive
+
+
+# ============================================
+# ОТЧЁТ
+# ============================================
+
+def summarize(cycles: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Медианы метрик по циклам."""
+    if not cycles:
+        return {}
+    return {
+        metric: round(statistics.median(c[metric] for c in cycles), 4)
+        for metric in SUMMARY_METRICS
+    }
+
+
+def compare(summary: Dict[str, float], baseline: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """Изменение медиан относительно baseline в процентах (None — база нулевая)."""
+    deltas = {}
+    for metric in SUMMARY_METRICS:
+        if metric not in summary or metric not in baseline:
+            continue
+        base = baseline[metric]
+        deltas[metric] = round((summary[metric] - base) / base * 100, 1) if base else None
+    return deltas
+
+
+def format_cycle(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['wall_s']:.2f}с, HTTP {result['http_requests']} ({result['http_per_filter']}/фильтр), "
+        f"SQL {result['db_roundtrips']} ({result['db_per_filter']}/фильтр), "
+        f"matcher CPU {result['matcher_cpu_s'] * 1000:.1f}мс / {result['matcher_calls']} вызовов, "
+        f"уведомлений {result['notifications']} ({result['notifications_per_s']}/с)"
+    )
+
+
+def format_report(report: Dict[str, Any], deltas: Optional[Dict[str, Optional[float]]] = None) -> str:
+    lines = [f"📊 Бенчмарк цикла мониторинга: {json.dumps(report['config'], ensure_ascii=False)}"]
+    for result in report['cycles']:
+        lines.append(f"   Цикл {result['cycle']}: {format_cycle(result)}")
+        if result['errors']:
+            lines.append(f"      ❌ Ошибок цикла: {result['errors']}")
+    lines.append(f"   Ответы сервера: {report['responses']}")
+    lines.append('   Медианы:')
+    for metric, value in report['summary'].items():
+        line = f"      {metric:<22} {value}"
+        if deltas and metric in deltas:
+            delta = deltas[metric]
+            line += '   (база 0)' if delta is None else f"   ({delta:+.1f}% к baseline)"
+        lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,111 @@
+"""
+Persistent Cache — кодирование значений и метрики таблицы cache_entries.
+
+CacheEntry — общий кэш процессов и рестартов: AI-релевантность,
+обогащение тендеров, тексты документов, короткие названия и т.д.
+TenderSniperDB.cache_* читают и пишут его пачками (INSERT ... ON CONFLICT
+(cache_type, cache_key) DO UPDATE), здесь — то, что от БД не зависит:
+
+- encode_cache_value / decode_cache_value: большие JSON значения
+  (>= COMPRESS_MIN_BYTES) хранятся сжатыми zlib в base64 внутри того же
+  JSON столбца ({"__zlib__": "..."}); старые несжатые записи читаются как есть;
+- CacheMetrics: попадания/промахи/записи/удаления по cache_type.
+
+Чистка просроченных записей — tender_sniper/jobs/cache_sweeper.py.
+"""
+
+import base64
+import json
+import threading
+import zlib
+from typing import Any, Dict
+
+# Значения короче (в байтах JSON) хранятся без сжатия
+COMPRESS_MIN_BYTES = 4096
+COMPRESS_LEVEL = 6
+
+_COMPRESSED_MARKER = '__zlib__'
+
+
+def encode_cache_value(value: Any, cache_type: str = '') -> Any:
+    """
+    Значение для записи в JSON столбец: как есть или сжатое.
+
+    Сжатие применяется, только если оно действительно уменьшает запись.
+    """
+    raw = json.dumps(value, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+    if len(raw) < COMPRESS_MIN_BYTES:
+        get_cache_metrics().record_write(cache_type, len(raw), len(raw))
+        return value
+    packed = base64.b64encode(zlib.compress(raw, COMPRESS_LEVEL)).decode('ascii')
+    if len(packed) >= len(raw):
+        get_cache_metrics().record_write(cache_type, len(raw), len(raw))
+        return value
+    get_cache_metrics().record_write(cache_type, len(raw), len(packed))
+    return {_COMPRESSED_MARKER: packed}
+
+
+def decode_cache_value(stored: Any) -> Any:
+    """Значение из JSON столбца (распаковывает сжатое)."""
+    if isinstance(stored, dict) and len(stored) == 1 and _COMPRESSED_MARKER in stored:
+        return json.loads(zlib.decompress(base64.b64decode(stored[_COMPRESSED_MARKER])).decode('utf-8'))
+    return stored
+
+
+class CacheMetrics:
+    """Счётчики персистентного кэша по cache_type (на процесс)."""
+
+    _FIELDS = ('hits', 'misses', 'writes', 'compressed', 'bytes_raw', 'bytes_stored', 'expired_deleted')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type: Dict[str, Dict[str, int]] = {}
+
+    def _counters(self, cache_type: str) -> Dict[str, int]:
+        counters = self._by_type.get(cache_type)
+        if counters is None:
+            counters = self._by_type[cache_type] = dict.fromkeys(self._FIELDS, 0)
+        return counters
+
+    def record_lookup(self, cache_type: str, hits: int, misses: int) -> None:
+        with self._lock:
+            counters = self._counters(cache_type)
+            counters['hits'] += hits
+            counters['misses'] += misses
+
+    def record_write(self, cache_type: str, raw_bytes: int, stored_bytes: int) -> None:
+        with self._lock:
+            counters = self._counters(cache_type)
+            counters['writes'] += 1
+            counters['bytes_raw'] += raw_bytes
+            counters['bytes_stored'] += stored_bytes
+            if stored_bytes < raw_bytes:
+                counters['compressed'] += 1
+
+    def record_expired(self, cache_type: str, count: int) -> None:
+        with self._lock:
+            self._counters(cache_type or '*')['expired_deleted'] += count
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """{cache_type: счётчики + hit_rate}."""
+        with self._lock:
+            stats = {}
+            for cache_type, counters in self._by_type.items():
+                lookups = counters['hits'] + counters['misses']
+                stats[cache_type] = {
+                    **counters,
+                    'hit_rate': round(counters['hits'] / lookups, 3) if lookups else None,
+                }
+            return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_type.clear()
+
+
+_metrics = CacheMetrics()
+
+
+def get_cache_metrics() -> CacheMetrics:
+    """Общие на процесс метрики персистентного кэша."""
+    return _metrics
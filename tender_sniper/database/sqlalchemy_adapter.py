@@ -4,10 +4,11 @@ SQLAlchemy adapter для tender_sniper/database.
 Обертка над unified database.py для обратной совместимости.
 """
 
+import base64
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple, AsyncIterator
 from sqlalchemy import select, update, delete, func, and_, or_
 from sqlalchemy.exc import IntegrityError
 
@@ -28,12 +29,14 @@ from database import (
     ViewedTender as ViewedTenderModel,
     GoogleSheetsConfig as GoogleSheetsConfigModel,
     CacheEntry as CacheEntryModel,
+    FilterChatRecipient as FilterChatRecipientModel,
     CompanyProfile as CompanyProfileModel,
     GeneratedDocument as GeneratedDocumentModel,
     WebSession as WebSessionModel,
     get_session,
     DatabaseSession
 )
+from tender_sniper.instrumentation import instrument_methods
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +52,66 @@ def serialize_for_json(obj: Any) -> Any:
     return obj
 
 
+def _strip_tz(value: Optional[datetime]) -> Optional[datetime]:
+    """PostgreSQL TIMESTAMP WITHOUT TIME ZONE не принимает timezone — убираем."""
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _parse_published_date(date_str: Any) -> Optional[datetime]:
+    """Дата публикации: ISO или RFC 2822 (GMT формат из RSS)."""
+    if isinstance(date_str, datetime):
+        return date_str
+    try:
+        return datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        try:
+            from email.utils import parsedate_to_datetime
+            return parsedate_to_datetime(date_str)
+        except Exception as e:
+            logger.warning(f"   ⚠️  Не удалось распарсить дату '{date_str}': {e}")
+            return None
+
+
+def _parse_deadline_date(deadline_str: Any) -> Optional[datetime]:
+    """Срок подачи заявки: ISO, RFC 2822 или распространённые форматы даты."""
+    if isinstance(deadline_str, datetime):
+        return deadline_str
+    try:
+        return datetime.fromisoformat(deadline_str)
+    except (ValueError, TypeError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return parsedate_to_datetime(deadline_str)
+    except (ValueError, TypeError):
+        pass
+    for fmt in ['%d.%m.%Y', '%Y-%m-%d', '%d.%m.%Y %H:%M', '%Y-%m-%d %H:%M']:
+        try:
+            return datetime.strptime(deadline_str, fmt)
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def _encode_tenders_cursor(sent_at: datetime, notification_id: int) -> str:
+    """Курсор keyset-пагинации тендеров: позиция последней строки страницы."""
+    raw = f"{sent_at.isoformat()}|{notification_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_tenders_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Обратное к _encode_tenders_cursor. ValueError при мусоре во входе."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sent_at, notification_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(sent_at), int(notification_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Некорректный cursor: {cursor[:40]}") from e
+
+
+@instrument_methods('db')
 class TenderSniperDB:
     """
     SQLAlchemy adapter для Tender Sniper DB.
@@ -171,13 +234,13 @@ class TenderSniperDB:
                     })
             return out
 
-    async def increment_ai_analyses_count(self, user_id: int) -> None:
+    async def increment_ai_analyses_count(self, user_id: int, count: int = 1) -> None:
         """Атомарно увеличивает счётчик AI-проверок (по первичному ключу)."""
         async with DatabaseSession() as session:
             await session.execute(
                 update(SniperUserModel)
                 .where(SniperUserModel.id == user_id)
-                .values(ai_analyses_used_month=SniperUserModel.ai_analyses_used_month + 1)
+                .values(ai_analyses_used_month=SniperUserModel.ai_analyses_used_month + count)
             )
 
     async def mark_user_bot_blocked(self, telegram_id: int) -> bool:
@@ -375,13 +438,13 @@ class TenderSniperDB:
             )
             return result.scalar() or 0
 
-    async def increment_notifications_count(self, user_id: int):
+    async def increment_notifications_count(self, user_id: int, count: int = 1):
         """Инкремент счетчика уведомлений."""
         async with DatabaseSession() as session:
             await session.execute(
                 update(SniperUserModel)
                 .where(SniperUserModel.id == user_id)
-                .values(notifications_sent_today=SniperUserModel.notifications_sent_today + 1)
+                .values(notifications_sent_today=SniperUserModel.notifications_sent_today + count)
             )
 
     async def check_notification_quota(self, user_id: int, daily_limit: int) -> bool:
@@ -407,9 +470,9 @@ class TenderSniperDB:
             # Проверяем квоту
             return user.notifications_sent_today < daily_limit
 
-    async def increment_notification_quota(self, user_id: int):
+    async def increment_notification_quota(self, user_id: int, count: int = 1):
         """Алиас для increment_notifications_count (для обратной совместимости)."""
-        await self.increment_notifications_count(user_id)
+        await self.increment_notifications_count(user_id, count)
 
     # ============================================
     # FILTERS
@@ -449,7 +512,29 @@ class TenderSniperDB:
             )
             session.add(filter_obj)
             await session.flush()
-            return filter_obj.id
+            filter_id = filter_obj.id
+        await self._refresh_filter_index(filter_id)
+        return filter_id
+
+    async def _refresh_filter_index(self, filter_id: int) -> None:
+        """Обновляет фильтр в индексе матчинга процесса (если индекс уже создан)."""
+        from tender_sniper.matching.filter_index import peek_filter_index
+        index = peek_filter_index()
+        if index is None:
+            return
+        try:
+            async with DatabaseSession() as session:
+                filter_obj = await session.scalar(
+                    select(SniperFilterModel).where(SniperFilterModel.id == filter_id)
+                )
+                filter_dict = self._filter_to_dict(filter_obj) if filter_obj else None
+            if filter_dict and filter_obj.is_active and filter_obj.deleted_at is None:
+                index.refresh_filter(filter_dict)
+            else:
+                index.remove_filter(filter_id)
+        except Exception as e:
+            # Индекс догонит БД при следующем sync()
+            logger.warning(f"⚠️ FilterIndex: не удалось обновить фильтр {filter_id}: {e}")
 
     async def get_user_filters(self, user_id: int, active_only: bool = True) -> List[Dict[str, Any]]:
         """Получение фильтров пользователя (исключая удалённые)."""
@@ -503,6 +588,59 @@ class TenderSniperDB:
                 .values(**values)
             )
 
+            if 'notify_chat_ids' in kwargs:
+                await self._sync_filter_chat_recipients(session, filter_id, kwargs['notify_chat_ids'])
+        await self._refresh_filter_index(filter_id)
+
+    @staticmethod
+    def _parse_chat_ids(notify_chat_ids) -> List[int]:
+        chat_ids = []
+        for chat_id in notify_chat_ids or []:
+            try:
+                chat_ids.append(int(chat_id))
+            except (TypeError, ValueError):
+                continue
+        return list(dict.fromkeys(chat_ids))
+
+    async def _sync_filter_chat_recipients(self, session, filter_id: int, notify_chat_ids) -> None:
+        """Обновляет таблицу чат → пользователи для одного фильтра."""
+        await session.execute(
+            delete(FilterChatRecipientModel).where(FilterChatRecipientModel.filter_id == filter_id)
+        )
+        chat_ids = self._parse_chat_ids(notify_chat_ids)
+        if not chat_ids:
+            return
+        user_id = await session.scalar(
+            select(SniperFilterModel.user_id).where(SniperFilterModel.id == filter_id)
+        )
+        if user_id is None:
+            return
+        session.add_all([
+            FilterChatRecipientModel(chat_id=chat_id, filter_id=filter_id, user_id=user_id)
+            for chat_id in chat_ids
+        ])
+
+    async def rebuild_filter_chat_recipients(self) -> int:
+        """
+        Полностью перестраивает таблицу чат → пользователи из sniper_filters.notify_chat_ids.
+
+        Returns:
+            Количество записей
+        """
+        async with DatabaseSession() as session:
+            result = await session.execute(
+                select(SniperFilterModel.id, SniperFilterModel.user_id, SniperFilterModel.notify_chat_ids)
+                .where(SniperFilterModel.notify_chat_ids.isnot(None))
+            )
+            rows = [
+                FilterChatRecipientModel(chat_id=chat_id, filter_id=filter_id, user_id=user_id)
+                for filter_id, user_id, notify_chat_ids in result.all()
+                for chat_id in self._parse_chat_ids(notify_chat_ids)
+            ]
+            await session.execute(delete(FilterChatRecipientModel))
+            session.add_all(rows)
+            return len(rows)
+
     async def delete_filter(self, filter_id: int):
         """Мягкое удаление фильтра (перемещение в корзину)."""
         async with DatabaseSession() as session:
@@ -511,6 +649,7 @@ class TenderSniperDB:
                 .where(SniperFilterModel.id == filter_id)
                 .values(deleted_at=datetime.utcnow(), is_active=False)
             )
+        await self._refresh_filter_index(filter_id)
 
     async def permanently_delete_filter(self, filter_id: int):
         """Безвозвратное удаление фильтра из БД."""
@@ -518,6 +657,7 @@ class TenderSniperDB:
             await session.execute(
                 delete(SniperFilterModel).where(SniperFilterModel.id == filter_id)
             )
+        await self._refresh_filter_index(filter_id)
 
     async def restore_filter(self, filter_id: int):
         """Восстановление фильтра из корзины."""
@@ -527,6 +667,7 @@ class TenderSniperDB:
                 .where(SniperFilterModel.id == filter_id)
                 .values(deleted_at=None, is_active=True)
             )
+        await self._refresh_filter_index(filter_id)
 
     async def get_deleted_filters(self, user_id: int) -> List[Dict[str, Any]]:
         """Получение удалённых фильтров пользователя (корзина)."""
@@ -656,7 +797,18 @@ class TenderSniperDB:
                 }
                 filters.append(filter_dict)
 
-            return filters
+        self._sync_filter_index(filters)
+        return filters
+
+    @staticmethod
+    def _sync_filter_index(filters: List[Dict[str, Any]]) -> None:
+        """Приводит индекс матчинга процесса к полному списку активных фильтров."""
+        from tender_sniper.matching.filter_index import get_filter_index
+        try:
+            get_filter_index().sync(filters)
+        except Exception as e:
+            # Индекс догонит БД при следующем get_all_active_filters()
+            logger.warning(f"⚠️ FilterIndex: не удалось синхронизировать фильтры: {e}")
 
     def _filter_to_dict(self, filter_obj: SniperFilterModel) -> Dict[str, Any]:
         """Конвертация фильтра в dict."""
@@ -872,6 +1024,48 @@ class TenderSniperDB:
     # NOTIFICATIONS
     # ============================================
 
+    @staticmethod
+    def _notification_row(
+        user_id: int,
+        filter_id: int,
+        filter_name: str,
+        tender_data: Dict[str, Any],
+        score: int,
+        matched_keywords: List[str],
+        telegram_message_id: Optional[int] = None,
+        source: str = 'automonitoring',
+        match_info: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Поля SniperNotification из данных тендера (общая часть одиночного и пакетного сохранения)."""
+        # Даты, уже разобранные на этапе матчинга, не парсим повторно
+        published_date = tender_data.get('published_dt')
+        if published_date is None and tender_data.get('published_date'):
+            published_date = _parse_published_date(tender_data['published_date'])
+
+        submission_deadline = tender_data.get('submission_deadline_dt')
+        deadline_str = tender_data.get('submission_deadline') or tender_data.get('deadline') or tender_data.get('end_date')
+        if submission_deadline is None and deadline_str:
+            submission_deadline = _parse_deadline_date(deadline_str)
+
+        return dict(
+            user_id=user_id,
+            filter_id=filter_id,
+            filter_name=filter_name,
+            tender_number=tender_data.get('number', ''),
+            tender_name=tender_data.get('name', ''),
+            tender_price=tender_data.get('price'),
+            tender_url=tender_data.get('url'),
+            tender_region=tender_data.get('region'),
+            tender_customer=tender_data.get('customer_name'),
+            score=score,
+            matched_keywords=matched_keywords,
+            published_date=_strip_tz(published_date),
+            submission_deadline=_strip_tz(submission_deadline),
+            tender_source=source,
+            telegram_message_id=telegram_message_id,
+            match_info=match_info,
+        )
+
     async def save_notification(
         self,
         user_id: int,
@@ -892,70 +1086,11 @@ class TenderSniperDB:
             logger.debug(f"   💾 save_notification: number={tender_number}, "
                         f"region='{tender_data.get('region')}', customer='{tender_data.get('customer_name')}'")
 
-            # Парсинг даты публикации (поддержка RFC 2822 и ISO форматов)
-            published_date = None
-            if tender_data.get('published_date'):
-                date_str = tender_data['published_date']
-                try:
-                    # Сначала пробуем ISO формат
-                    published_date = datetime.fromisoformat(date_str)
-                except (ValueError, TypeError):
-                    try:
-                        # Если не ISO, пробуем RFC 2822 (GMT формат)
-                        from email.utils import parsedate_to_datetime
-                        published_date = parsedate_to_datetime(date_str)
-                    except Exception as e:
-                        logger.warning(f"   ⚠️  Не удалось распарсить дату '{date_str}': {e}")
-
-                # КРИТИЧНО: PostgreSQL TIMESTAMP WITHOUT TIME ZONE не принимает timezone
-                # Убираем timezone если есть
-                if published_date and published_date.tzinfo is not None:
-                    published_date = published_date.replace(tzinfo=None)
-
-            # Парсинг срока подачи заявки (submission_deadline)
-            submission_deadline = None
-            if tender_data.get('submission_deadline') or tender_data.get('deadline') or tender_data.get('end_date'):
-                deadline_str = tender_data.get('submission_deadline') or tender_data.get('deadline') or tender_data.get('end_date')
-                try:
-                    # Пробуем ISO формат
-                    submission_deadline = datetime.fromisoformat(deadline_str)
-                except (ValueError, TypeError):
-                    try:
-                        # Пробуем RFC 2822
-                        from email.utils import parsedate_to_datetime
-                        submission_deadline = parsedate_to_datetime(deadline_str)
-                    except (ValueError, TypeError):
-                        # Пробуем распространенные форматы даты
-                        for fmt in ['%d.%m.%Y', '%Y-%m-%d', '%d.%m.%Y %H:%M', '%Y-%m-%d %H:%M']:
-                            try:
-                                submission_deadline = datetime.strptime(deadline_str, fmt)
-                                break
-                            except ValueError:
-                                continue
-
-                # Убираем timezone если есть
-                if submission_deadline and submission_deadline.tzinfo is not None:
-                    submission_deadline = submission_deadline.replace(tzinfo=None)
-
             try:
-              notification = SniperNotificationModel(
-                user_id=user_id,
-                filter_id=filter_id,
-                filter_name=filter_name,
-                tender_number=tender_data.get('number', ''),
-                tender_name=tender_data.get('name', ''),
-                tender_price=tender_data.get('price'),
-                tender_url=tender_data.get('url'),
-                tender_region=tender_data.get('region'),
-                tender_customer=tender_data.get('customer_name'),
-                score=score,
-                matched_keywords=matched_keywords,
-                published_date=published_date,
-                submission_deadline=submission_deadline,
-                tender_source=source,
-                telegram_message_id=telegram_message_id,
-                match_info=match_info,
-            )
+              notification = SniperNotificationModel(**self._notification_row(
+                  user_id, filter_id, filter_name, tender_data, score, matched_keywords,
+                  telegram_message_id=telegram_message_id, source=source, match_info=match_info,
+              ))
               session.add(notification)
               await session.flush()
 
@@ -982,6 +1117,81 @@ class TenderSniperDB:
               logger.warning(f"   ⚠️ Дубликат уведомления (IntegrityError): tender={tender_number}, user={user_id}")
               return None
 
+    async def save_notifications_bulk(self, notifications: List[Dict[str, Any]]) -> int:
+        """
+        Пакетное сохранение уведомлений одной транзакцией.
+
+        INSERT ... ON CONFLICT (user_id, tender_number) DO NOTHING для всей пачки
+        и один UPDATE match_count на фильтр (только по реально вставленным).
+
+        Args:
+            notifications: словари с аргументами save_notification
+                (user_id, filter_id, filter_name, tender_data, score, matched_keywords,
+                опционально telegram_message_id, source, match_info). В tender_data
+                можно передать уже разобранные даты: published_dt, submission_deadline_dt.
+
+        Returns:
+            Количество сохранённых (не дубликатов) уведомлений
+        """
+        rows, seen = [], set()
+        now = datetime.utcnow()
+        for notif in notifications:
+            row = self._notification_row(**notif)
+            key = (row['user_id'], row['tender_number'])
+            if key in seen:
+                continue
+            seen.add(key)
+            row.update(sent_at=now, sheets_exported=False, bitrix24_exported=False)
+            rows.append(row)
+
+        if not rows:
+            return 0
+
+        async with DatabaseSession() as session:
+            dialect = session.bind.dialect.name
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            elif dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                dialect_insert = None
+
+            if dialect_insert is None:
+                # Диалект без ON CONFLICT — по одному
+                saved_filters = []
+                for notif in notifications:
+                    if await self.save_notification(**notif):
+                        saved_filters.append(notif.get('filter_id'))
+                return len(saved_filters)
+
+            result = await session.execute(
+                dialect_insert(SniperNotificationModel)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=['user_id', 'tender_number'])
+                .returning(SniperNotificationModel.filter_id)
+            )
+            inserted_filter_ids = [row[0] for row in result.all()]
+
+            # Счётчики совпадений фильтров — одним UPDATE на фильтр
+            per_filter: Dict[int, int] = {}
+            for filter_id in inserted_filter_ids:
+                if filter_id:
+                    per_filter[filter_id] = per_filter.get(filter_id, 0) + 1
+            for filter_id, count in per_filter.items():
+                await session.execute(
+                    update(SniperFilterModel)
+                    .where(SniperFilterModel.id == filter_id)
+                    .values(
+                        match_count=SniperFilterModel.match_count + count,
+                        last_match_at=now,
+                    )
+                )
+
+        skipped = len(rows) - len(inserted_filter_ids)
+        if skipped:
+            logger.debug(f"   ⚠️ Пропущено дубликатов уведомлений: {skipped}")
+        return len(inserted_filter_ids)
+
     async def get_user_tenders(self, user_id: int, limit: int = 100) -> List[Dict[str, Any]]:
         """Получение тендеров пользователя."""
         async with DatabaseSession() as session:
@@ -1001,22 +1211,239 @@ class TenderSniperDB:
                 logger.debug(f"   🔍 Первое уведомление: number={first.tender_number}, "
                            f"region='{first.tender_region}', customer='{first.tender_customer}'")
 
-            tenders = [{
-                'number': n.tender_number,
-                'name': n.tender_name,
-                'price': n.tender_price,
-                'url': n.tender_url,
-                'region': n.tender_region,
-                'customer_name': n.tender_customer,
-                'filter_name': n.filter_name,
-                'score': n.score,
-                'published_date': n.published_date.isoformat() if n.published_date else None,
-                'submission_deadline': n.submission_deadline.isoformat() if n.submission_deadline else None,
-                'source': n.tender_source,
-                'sent_at': n.sent_at.isoformat() if n.sent_at else None
-            } for n in notifications]
+            return [self._notification_to_tender(n) for n in notifications]
+
+    @staticmethod
+    def _notification_to_tender(n: SniperNotificationModel) -> Dict[str, Any]:
+        """Уведомление → словарь тендера для кабинета и API."""
+        return {
+            'number': n.tender_number,
+            'name': n.tender_name,
+            'price': n.tender_price,
+            'url': n.tender_url,
+            'region': n.tender_region,
+            'customer_name': n.tender_customer,
+            'filter_name': n.filter_name,
+            'score': n.score,
+            'published_date': n.published_date.isoformat() if n.published_date else None,
+            'submission_deadline': n.submission_deadline.isoformat() if n.submission_deadline else None,
+            'source': n.tender_source,
+            'sent_at': n.sent_at.isoformat() if n.sent_at else None
+        }
+
+    async def get_user_tenders_page(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Страница тендеров пользователя (keyset-пагинация по (sent_at, id)).
+
+        В отличие от OFFSET стоимость любой страницы одинакова: запрос
+        продолжает обход индекса ix_sniper_notifications_user_sent с
+        позиции курсора, а не перебирает все предыдущие строки.
+
+        Args:
+            user_id: ID пользователя
+            limit: размер страницы
+            cursor: next_cursor предыдущей страницы (None — первая страница)
+
+        Returns:
+            (тендеры, курсор следующей страницы или None, если это последняя)
+
+        Raises:
+            ValueError: некорректный курсор
+        """
+        query = select(SniperNotificationModel).where(SniperNotificationModel.user_id == user_id)
+        if cursor:
+            sent_at, last_id = _decode_tenders_cursor(cursor)
+            query = query.where(
+                or_(
+                    SniperNotificationModel.sent_at < sent_at,
+                    and_(
+                        SniperNotificationModel.sent_at == sent_at,
+                        SniperNotificationModel.id < last_id,
+                    ),
+                )
+            )
+
+        async with DatabaseSession() as session:
+            result = await session.execute(
+                query
+                .order_by(SniperNotificationModel.sent_at.desc(), SniperNotificationModel.id.desc())
+                .limit(limit + 1)
+            )
+            notifications = result.scalars().all()
+
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            last = notifications[-1]
+            next_cursor = _encode_tenders_cursor(last.sent_at, last.id)
+
+        return [self._notification_to_tender(n) for n in notifications], next_cursor
+
+    # ============================================
+    # ВЫБОРКИ ДЛЯ ОТЧЁТОВ (tender_sniper/report_engine.py)
+    # ============================================
+
+    @staticmethod
+    def _report_conditions(user_id: int, criteria: Dict[str, Any]) -> list:
+        """
+        WHERE-условия выборки уведомлений для отчёта.
+
+        criteria: not_expired, sent_after, price_min, price_max, region,
+        filter_prefix, without_filter, min_id — все ключи необязательны.
+        """
+        model = SniperNotificationModel
+        conditions = [model.user_id == user_id]
+        if criteria.get('not_expired'):
+            conditions.append(or_(
+                model.submission_deadline.is_(None),
+                model.submission_deadline >= datetime.now(),
+            ))
+        if criteria.get('sent_after'):
+            conditions.append(model.sent_at >= criteria['sent_after'])
+        if criteria.get('price_min') is not None:
+            conditions.append(model.tender_price >= criteria['price_min'])
+        if criteria.get('price_max') is not None:
+            conditions.append(model.tender_price <= criteria['price_max'])
+        if criteria.get('region'):
+            conditions.append(func.lower(model.tender_region).contains(criteria['region'].lower(), autoescape=True))
+        if criteria.get('without_filter'):
+            conditions.append(model.filter_name.is_(None))
+        elif criteria.get('filter_prefix'):
+            conditions.append(model.filter_name.startswith(criteria['filter_prefix'], autoescape=True))
+        if criteria.get('min_id'):
+            conditions.append(model.id >= criteria['min_id'])
+        return conditions
+
+    async def get_user_report_groups(
+        self,
+        user_id: int,
+        criteria: Dict[str, Any],
+        max_rows: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Секции отчёта: число уведомлений по фильтрам (GROUP BY в БД).
+
+        В отчёт попадают только max_rows последних уведомлений — граница
+        возвращается как min_id и передаётся в iter_user_report_tenders.
+
+        Returns:
+            ([{'filter_name', 'count', 'last_id'}] — свежие секции первыми, min_id или None)
+        """
+        model = SniperNotificationModel
+        conditions = self._report_conditions(user_id, criteria)
+        name = func.coalesce(model.filter_name, 'Без фильтра').label('name')
+        last_id = func.max(model.id).label('last_id')
+
+        async with DatabaseSession() as session:
+            min_id = await session.scalar(
+                select(model.id)
+                .where(*conditions)
+                .order_by(model.id.desc())
+                .offset(max_rows - 1)
+                .limit(1)
+            )
+            if min_id is not None:
+                conditions.append(model.id >= min_id)
 
-            return tenders
+            result = await session.execute(
+                select(name, func.count(model.id).label('count'), last_id)
+                .where(*conditions)
+                .group_by(name)
+                .order_by(last_id.desc())
+            )
+            groups = [
+                {'filter_name': row.name, 'count': row.count, 'last_id': row.last_id}
+                for row in result.all()
+            ]
+        return groups, min_id
+
+    async def iter_user_report_tenders(
+        self,
+        user_id: int,
+        criteria: Dict[str, Any],
+        filter_name: Optional[str] = None,
+        sort_by: str = 'date_desc',
+        batch_size: int = 500
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Тендеры отчёта пачками через курсор на стороне сервера (yield_per).
+
+        Args:
+            filter_name: секция отчёта (как в get_user_report_groups) или None — все
+            sort_by: date_desc, date_asc, price_desc, price_asc, score_desc, deadline_asc
+
+        Yields:
+            Списки словарей тендеров (формат _notification_to_tender)
+        """
+        model = SniperNotificationModel
+        order = {
+            'date_asc': [model.sent_at.asc()],
+            'price_desc': [model.tender_price.desc().nulls_last()],
+            'price_asc': [model.tender_price.asc().nulls_first()],
+            'score_desc': [model.score.desc()],
+            'deadline_asc': [model.submission_deadline.asc().nulls_last()],
+        }.get(sort_by, [model.sent_at.desc()])
+
+        conditions = self._report_conditions(user_id, criteria)
+        if filter_name is not None:
+            conditions.append(func.coalesce(model.filter_name, 'Без фильтра') == filter_name)
+
+        columns = (
+            model.tender_number, model.tender_name, model.tender_price, model.tender_url,
+            model.tender_region, model.tender_customer, model.filter_name, model.score,
+            model.published_date, model.submission_deadline, model.tender_source, model.sent_at,
+        )
+        query = (
+            select(*columns)
+            .where(*conditions)
+            .order_by(*order, model.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+
+        async with DatabaseSession() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield [
+                    {
+                        'number': row.tender_number,
+                        'name': row.tender_name,
+                        'price': row.tender_price,
+                        'url': row.tender_url,
+                        'region': row.tender_region,
+                        'customer_name': row.tender_customer,
+                        'filter_name': row.filter_name,
+                        'score': row.score,
+                        'published_date': row.published_date.isoformat() if row.published_date else None,
+                        'submission_deadline': row.submission_deadline.isoformat() if row.submission_deadline else None,
+                        'source': row.tender_source,
+                        'sent_at': row.sent_at.isoformat() if row.sent_at else None,
+                    }
+                    for row in rows
+                ]
+
+    async def get_user_filter_counts(self, user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Топ фильтров пользователя по числу уведомлений (GROUP BY в БД).
+
+        Returns:
+            [{'name': имя фильтра, 'count': уведомлений}] по убыванию count
+        """
+        name = func.coalesce(SniperNotificationModel.filter_name, 'Без фильтра').label('name')
+        count = func.count(SniperNotificationModel.id).label('count')
+        async with DatabaseSession() as session:
+            result = await session.execute(
+                select(name, count)
+                .where(SniperNotificationModel.user_id == user_id)
+                .group_by(name)
+                .order_by(count.desc(), name)
+                .limit(limit)
+            )
+            return [{'name': row.name, 'count': row.count} for row in result.all()]
 
     async def count_user_tenders(self, user_id: int, hours: int = 24) -> Dict[str, int]:
         """Возвращает реальное число тендеров (всего и за последние N часов)."""
@@ -1065,30 +1492,113 @@ class TenderSniperDB:
         имеют фильтры, совпадающие с одним и тем же тендером.
         """
         async with DatabaseSession() as session:
-            # Находим всех пользователей, чьи фильтры шлют в этот чат
-            # Используем cast к text для совместимости с JSON (не JSONB)
-            from database import SniperFilter as SniperFilterModel_
-            from sqlalchemy import cast, String
-            filter_result = await session.execute(
-                select(SniperFilterModel_.user_id).where(
-                    cast(SniperFilterModel_.notify_chat_ids, String).like(f'%{chat_id}%')
-                ).distinct()
-            )
-            user_ids = [row[0] for row in filter_result.all()]
-
-            if not user_ids:
-                return False
-
+            # Пользователи, чьи фильтры шлют в этот чат — из таблицы чат → пользователи
             result = await session.execute(
-                select(SniperNotificationModel.id).where(
+                select(SniperNotificationModel.id)
+                .join(
+                    FilterChatRecipientModel,
+                    FilterChatRecipientModel.user_id == SniperNotificationModel.user_id
+                )
+                .where(
                     and_(
-                        SniperNotificationModel.tender_number == tender_number,
-                        SniperNotificationModel.user_id.in_(user_ids)
+                        FilterChatRecipientModel.chat_id == chat_id,
+                        SniperNotificationModel.tender_number == tender_number
                     )
                 ).limit(1)
             )
             return result.first() is not None
 
+    async def bulk_notification_precheck(
+        self,
+        user_pairs: Iterable[Tuple[int, str]],
+        chat_pairs: Iterable[Tuple[int, str]] = (),
+    ) -> Dict[str, Any]:
+        """
+        Пакетная проверка перед отправкой уведомлений за цикл мониторинга.
+
+        Заменяет is_tender_notified / is_tender_sent_to_chat /
+        check_notification_quota на каждый тендер тремя запросами на весь цикл.
+
+        Args:
+            user_pairs: (user_id, tender_number) — кандидаты в личные уведомления
+            chat_pairs: (chat_id, tender_number) — кандидаты в групповые чаты
+
+        Returns:
+            {
+                'notified': {(user_id, tender_number)} — уже отправленные пользователю,
+                'sent_to_chat': {(chat_id, tender_number)} — уже отправленные в чат
+                    любым пользователем, чьи фильтры шлют в этот чат,
+                'quota_used': {user_id: уведомлений за сутки} — для найденных
+                    пользователей; просроченные суточные счётчики сбрасываются
+            }
+        """
+        user_pairs = set(user_pairs)
+        chat_pairs = set(chat_pairs)
+        notified: Set[Tuple[int, str]] = set()
+        sent_to_chat: Set[Tuple[int, str]] = set()
+        quota_used: Dict[int, int] = {}
+
+        user_ids = {user_id for user_id, _ in user_pairs}
+
+        async with DatabaseSession() as session:
+            if user_pairs:
+                numbers = {number for _, number in user_pairs}
+                result = await session.execute(
+                    select(SniperNotificationModel.user_id, SniperNotificationModel.tender_number)
+                    .where(
+                        and_(
+                            SniperNotificationModel.user_id.in_(user_ids),
+                            SniperNotificationModel.tender_number.in_(numbers)
+                        )
+                    ).distinct()
+                )
+                notified = {(row[0], row[1]) for row in result.all()} & user_pairs
+
+            if chat_pairs:
+                chat_ids = {chat_id for chat_id, _ in chat_pairs}
+                numbers = {number for _, number in chat_pairs}
+                result = await session.execute(
+                    select(FilterChatRecipientModel.chat_id, SniperNotificationModel.tender_number)
+                    .join(
+                        SniperNotificationModel,
+                        SniperNotificationModel.user_id == FilterChatRecipientModel.user_id
+                    )
+                    .where(
+                        and_(
+                            FilterChatRecipientModel.chat_id.in_(chat_ids),
+                            SniperNotificationModel.tender_number.in_(numbers)
+                        )
+                    ).distinct()
+                )
+                sent_to_chat = {(row[0], row[1]) for row in result.all()} & chat_pairs
+
+            if user_ids:
+                result = await session.execute(
+                    select(
+                        SniperUserModel.id,
+                        SniperUserModel.notifications_sent_today,
+                        SniperUserModel.last_notification_reset
+                    ).where(SniperUserModel.id.in_(user_ids))
+                )
+                now = datetime.utcnow()
+                to_reset = []
+                for user_id, sent_today, last_reset in result.all():
+                    # Прошли сутки с последнего сброса — сбрасываем счётчик
+                    if last_reset and now - last_reset > timedelta(days=1):
+                        to_reset.append(user_id)
+                        quota_used[user_id] = 0
+                    else:
+                        quota_used[user_id] = sent_today or 0
+
+                if to_reset:
+                    await session.execute(
+                        update(SniperUserModel)
+                        .where(SniperUserModel.id.in_(to_reset))
+                        .values(notifications_sent_today=0, last_notification_reset=now)
+                    )
+
+        return {'notified': notified, 'sent_to_chat': sent_to_chat, 'quota_used': quota_used}
+
     async def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """
         Получение статистики пользователя.
@@ -1306,7 +1816,8 @@ class TenderSniperDB:
                 .values(is_active=False)
             )
             await session.commit()
-            return True
+        await self._refresh_filter_index(filter_id)
+        return True
 
     async def resume_filter(self, filter_id: int) -> bool:
         """
@@ -1325,7 +1836,8 @@ class TenderSniperDB:
                 .values(is_active=True)
             )
             await session.commit()
-            return True
+        await self._refresh_filter_index(filter_id)
+        return True
 
     async def get_filter_status(self, filter_id: int) -> Optional[bool]:
         """
@@ -2816,62 +3328,141 @@ class TenderSniperDB:
     # PERSISTENT CACHE
     # ============================================
 
+    # Строк в одном INSERT ... ON CONFLICT и в одном DELETE чистки
+    CACHE_WRITE_CHUNK = 500
+    CACHE_SWEEP_CHUNK = 1000
+
     async def cache_get(self, cache_key: str, cache_type: str) -> Optional[Dict[str, Any]]:
         """Получить значение из персистентного кэша."""
+        entries = await self.cache_get_many([cache_key], cache_type)
+        return entries.get(cache_key)
+
+    async def cache_set(self, cache_key: str, cache_type: str, value: Dict[str, Any], ttl_hours: int = 24):
+        """Сохранить значение в персистентный кэш."""
+        await self.cache_set_many({cache_key: value}, cache_type, ttl_hours=ttl_hours)
+
+    async def cache_get_many(self, cache_keys: List[str], cache_type: str) -> Dict[str, Dict[str, Any]]:
+        """Получить несколько значений из персистентного кэша одним запросом."""
+        from tender_sniper.database.persistent_cache import decode_cache_value, get_cache_metrics
+
+        keys = list(dict.fromkeys(cache_keys))
+        if not keys:
+            return {}
         try:
             async with DatabaseSession() as session:
                 result = await session.execute(
-                    select(CacheEntryModel).where(
-                        CacheEntryModel.cache_key == cache_key,
+                    select(CacheEntryModel.cache_key, CacheEntryModel.value).where(
                         CacheEntryModel.cache_type == cache_type,
+                        CacheEntryModel.cache_key.in_(keys),
                         CacheEntryModel.expires_at > datetime.utcnow()
                     )
                 )
-                entry = result.scalar_one_or_none()
-                if entry:
-                    return entry.value
-                return None
+                entries = {row.cache_key: decode_cache_value(row.value) for row in result}
         except Exception as e:
-            logger.debug(f"Cache get error: {e}")
-            return None
-
-    async def cache_set(self, cache_key: str, cache_type: str, value: Dict[str, Any], ttl_hours: int = 24):
-        """Сохранить значение в персистентный кэш."""
+            logger.debug(f"Cache get_many error: {e}")
+            return {}
+        get_cache_metrics().record_lookup(cache_type, len(entries), len(keys) - len(entries))
+        return entries
+
+    async def cache_set_many(self, entries: Dict[str, Dict[str, Any]], cache_type: str, ttl_hours: int = 24):
+        """
+        Сохранить несколько значений в персистентный кэш.
+
+        Upsert: INSERT ... ON CONFLICT (cache_type, cache_key) DO UPDATE пачками
+        по CACHE_WRITE_CHUNK строк; большие значения сжимаются (persistent_cache).
+        """
+        from tender_sniper.database.persistent_cache import encode_cache_value
+
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                'cache_key': cache_key,
+                'cache_type': cache_type,
+                'value': encode_cache_value(value, cache_type),
+                'created_at': now,
+                'expires_at': now + timedelta(hours=ttl_hours),
+            }
+            for cache_key, value in entries.items()
+        ]
         try:
             async with DatabaseSession() as session:
-                # Upsert: удаляем старую запись и вставляем новую
-                await session.execute(
-                    delete(CacheEntryModel).where(
-                        CacheEntryModel.cache_key == cache_key,
-                        CacheEntryModel.cache_type == cache_type,
+                dialect = session.bind.dialect.name
+                if dialect == 'postgresql':
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                elif dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                else:
+                    dialect_insert = None
+
+                for i in range(0, len(rows), self.CACHE_WRITE_CHUNK):
+                    chunk = rows[i:i + self.CACHE_WRITE_CHUNK]
+                    if dialect_insert is None:
+                        # Диалект без ON CONFLICT — удаление и вставка в одной транзакции
+                        await session.execute(
+                            delete(CacheEntryModel).where(
+                                CacheEntryModel.cache_type == cache_type,
+                                CacheEntryModel.cache_key.in_([row['cache_key'] for row in chunk]),
+                            )
+                        )
+                        session.add_all([CacheEntryModel(**row) for row in chunk])
+                        continue
+                    stmt = dialect_insert(CacheEntryModel).values(chunk)
+                    await session.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=['cache_type', 'cache_key'],
+                            set_={
+                                'value': stmt.excluded.value,
+                                'created_at': stmt.excluded.created_at,
+                                'expires_at': stmt.excluded.expires_at,
+                            }
+                        )
                     )
-                )
-                entry = CacheEntryModel(
-                    cache_key=cache_key,
-                    cache_type=cache_type,
-                    value=value,
-                    created_at=datetime.utcnow(),
-                    expires_at=datetime.utcnow() + timedelta(hours=ttl_hours),
-                )
-                session.add(entry)
         except Exception as e:
-            logger.debug(f"Cache set error: {e}")
+            logger.debug(f"Cache set_many error: {e}")
+
+    async def cache_delete_expired(self, cache_type: Optional[str] = None, limit: Optional[int] = None) -> int:
+        """
+        Удаляет одну пачку просроченных записей (не больше limit строк).
+
+        Короткая транзакция по id — без долгих блокировок таблицы;
+        чистку целиком делает CacheSweeper пачка за пачкой.
+        """
+        from tender_sniper.database.persistent_cache import get_cache_metrics
+
+        limit = limit or self.CACHE_SWEEP_CHUNK
+        async with DatabaseSession() as session:
+            expired = (
+                select(CacheEntryModel.id)
+                .where(CacheEntryModel.expires_at <= datetime.utcnow())
+                .order_by(CacheEntryModel.expires_at)
+                .limit(limit)
+            )
+            if cache_type:
+                expired = expired.where(CacheEntryModel.cache_type == cache_type)
+            ids = list((await session.execute(expired)).scalars())
+            if not ids:
+                return 0
+            result = await session.execute(delete(CacheEntryModel).where(CacheEntryModel.id.in_(ids)))
+        count = result.rowcount or 0
+        get_cache_metrics().record_expired(cache_type or '*', count)
+        return count
 
     async def cache_cleanup(self, cache_type: Optional[str] = None):
-        """Удалить просроченные записи из кэша."""
+        """Удалить просроченные записи из кэша (пачками по CACHE_SWEEP_CHUNK)."""
+        total = 0
         try:
-            async with DatabaseSession() as session:
-                query = delete(CacheEntryModel).where(
-                    CacheEntryModel.expires_at <= datetime.utcnow()
-                )
-                if cache_type:
-                    query = query.where(CacheEntryModel.cache_type == cache_type)
-                result = await session.execute(query)
-                count = result.rowcount
-                if count > 0:
-                    logger.info(f"🗑️ Очищено {count} записей из кэша")
+            while True:
+                count = await self.cache_delete_expired(cache_type)
+                total += count
+                if count < self.CACHE_SWEEP_CHUNK:
+                    break
+            if total > 0:
+                logger.info(f"🗑️ Очищено {total} записей из кэша")
         except Exception as e:
             logger.debug(f"Cache cleanup error: {e}")
+        return total
 
     # ============================================
     # COMPANY PROFILE
@@ -0,0 +1,395 @@
+"""
+Document Store - общий кэш документации тендеров.
+
+Раньше каждый потребитель (TenderGPT analyze_documentation, /analyze в
+webapp, AI-обогащение Google Sheets, ТЗ для pipeline в кабинете,
+integrated_tender_system) сам вызывал ZakupkiDocumentDownloader и
+TextExtractor: одни и те же ZIP/PDF тендера скачивались и разбирались
+заново для каждой функции и каждого пользователя.
+
+Здесь:
+- список документов тендера (манифест) хранится в CacheEntry и
+  перечитывается с zakupki.gov.ru не чаще LIST_REFRESH_HOURS;
+- файлы адресуются по SHA-256 содержимого: blob на диске
+  (blobs/ab/<sha256>.<ext>), одинаковые файлы разных тендеров хранятся один
+  раз; уже скачанный URL повторно не качается (ссылки filestore на
+  zakupki.gov.ru адресуют неизменяемый файл; ETag сохраняется в манифесте
+  только для диагностики);
+- между скачиваниями файлов — пауза DOWNLOAD_DELAY, как в
+  ZakupkiDocumentDownloader.download_documents;
+- извлечённый текст хранится в CacheEntry по SHA-256 — разбор файла
+  выполняется один раз для всех процессов;
+- параллельные запросы одного тендера (и одного файла) объединяются
+  в одну задачу.
+
+Единый API: get_tender_documents_text(tender_number).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def default_tender_url(tender_number: str) -> str:
+    return f"https://zakupki.gov.ru/epz/order/notice/ea44/view/common-info.html?regNumber={tender_number}"
+
+
+def _is_failed_text(text: str) -> bool:
+    return not text or text.startswith('[Не удалось')
+
+
+class TenderDocumentStore:
+    """Content-addressed кэш документов тендеров (диск + CacheEntry)."""
+
+    MANIFEST_TYPE = 'tender_documents'
+    MANIFEST_PREFIX = 'docs:'
+    TEXT_TYPE = 'document_text'
+    TEXT_PREFIX = 'doctext:'
+
+    # Как часто перечитывать список документов тендера (часы)
+    LIST_REFRESH_HOURS = 6
+    MANIFEST_TTL_HOURS = 30 * 24
+    TEXT_TTL_HOURS = 30 * 24
+
+    # Пауза между скачиваниями файлов с zakupki.gov.ru (секунды)
+    DOWNLOAD_DELAY = 0.5
+
+    # Больше не храним в БД (полный текст огромных смет не нужен ни одному потребителю)
+    MAX_STORED_TEXT = 500_000
+
+    def __init__(
+        self,
+        blob_dir: Optional[Path] = None,
+        db=None,
+        downloader_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            blob_dir: каталог файлов (по умолчанию TENDER_DOCUMENTS_DIR или /tmp/tender_documents)
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
+            downloader_factory: фабрика ZakupkiDocumentDownloader (для тестов)
+        """
+        self.blob_dir = Path(blob_dir or os.getenv('TENDER_DOCUMENTS_DIR', '/tmp/tender_documents'))
+        self._db = db
+        self._downloader_factory = downloader_factory
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            'manifest_hits': 0,
+            'manifest_refreshes': 0,
+            'downloads': 0,
+            'download_reused': 0,
+            'text_hits': 0,
+            'extractions': 0,
+            'deduplicated': 0,
+        }
+
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
+    def _new_downloader(self):
+        if self._downloader_factory is not None:
+            return self._downloader_factory()
+        from src.parsers.zakupki_document_downloader import ZakupkiDocumentDownloader
+        return ZakupkiDocumentDownloader(download_dir=self.blob_dir / 'tmp')
+
+    async def _dedup(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Одна задача на ключ: параллельные вызовы ждут результат первого."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._stats['deduplicated'] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    # ============================================
+    # ДОКУМЕНТЫ (МАНИФЕСТ + BLOB)
+    # ============================================
+
+    def blob_path(self, sha256: str, ext: str) -> Path:
+        return self.blob_dir / 'blobs' / sha256[:2] / f"{sha256}.{ext or 'bin'}"
+
+    async def _load_manifest(self, tender_number: str) -> Optional[Dict[str, Any]]:
+        try:
+            db = await self._get_db()
+            return await db.cache_get(self.MANIFEST_PREFIX + tender_number, self.MANIFEST_TYPE)
+        except Exception as e:
+            logger.debug(f"Document store manifest get error: {e}")
+            return None
+
+    async def _save_manifest(self, tender_number: str, manifest: Dict[str, Any]) -> None:
+        try:
+            db = await self._get_db()
+            await db.cache_set(
+                self.MANIFEST_PREFIX + tender_number, self.MANIFEST_TYPE, manifest,
+                ttl_hours=self.MANIFEST_TTL_HOURS,
+            )
+        except Exception as e:
+            logger.debug(f"Document store manifest set error: {e}")
+
+    def _manifest_usable(self, manifest: Optional[Dict[str, Any]]) -> bool:
+        """Манифест свежий и все его файлы есть на диске."""
+        if not manifest or not manifest.get('documents'):
+            return False
+        try:
+            fetched_at = datetime.fromisoformat(manifest['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if datetime.utcnow() - fetched_at > timedelta(hours=self.LIST_REFRESH_HOURS):
+            return False
+        return all(Path(d['path']).exists() for d in manifest['documents'])
+
+    async def get_documents(
+        self,
+        tender_number: str,
+        tender_url: Optional[str] = None,
+        refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Документы тендера (скачанные файлы в content-addressed хранилище).
+
+        Returns:
+            [{'url', 'title', 'type', 'filename', 'sha256', 'path', 'real_type',
+              'size_kb', 'etag'}] в порядке карточки тендера
+        """
+        manifest = await self._load_manifest(tender_number)
+        if not refresh and self._manifest_usable(manifest):
+            self._stats['manifest_hits'] += 1
+            return manifest['documents']
+
+        known = {d['url']: d for d in (manifest or {}).get('documents', [])}
+        return await self._dedup(
+            f"docs:{tender_number}",
+            lambda: self._refresh_documents(tender_number, tender_url or default_tender_url(tender_number), known),
+        )
+
+    async def _refresh_documents(
+        self,
+        tender_number: str,
+        tender_url: str,
+        known: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        self._stats['manifest_refreshes'] += 1
+        documents = await asyncio.to_thread(self._fetch_documents_sync, tender_url, tender_number, known)
+        if documents:
+            await self._save_manifest(tender_number, {
+                'fetched_at': datetime.utcnow().isoformat(),
+                'documents': documents,
+            })
+        return documents
+
+    def _fetch_documents_sync(
+        self,
+        tender_url: str,
+        tender_number: str,
+        known: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Sync (для asyncio.to_thread): список документов + скачивание новых файлов."""
+        downloader = self._new_downloader()
+        listing = downloader.get_tender_documents(tender_url, tender_number)
+
+        documents = []
+        downloaded = 0
+        for doc in listing:
+            previous = known.get(doc['url'])
+            if previous and Path(previous['path']).exists():
+                self._stats['download_reused'] += 1
+                documents.append({**previous, 'title': doc['title'], 'type': doc['type']})
+                continue
+            if downloaded and self.DOWNLOAD_DELAY:
+                time.sleep(self.DOWNLOAD_DELAY)  # не перегружаем zakupki.gov.ru
+            downloaded += 1
+            try:
+                content, etag = downloader.fetch_document(doc['url'])
+            except Exception as e:
+                logger.warning(f"⚠️ Документ {doc['title'][:50]} тендера {tender_number}: {e}")
+                continue
+            self._stats['downloads'] += 1
+            documents.append(self._store_blob(downloader, doc, content, etag))
+        return documents
+
+    def _store_blob(self, downloader, doc: Dict[str, Any], content: bytes, etag: Optional[str]) -> Dict[str, Any]:
+        """Сохраняет файл по SHA-256 (атомарно, один раз на содержимое)."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        ext = doc.get('extension') or 'bin'
+
+        staging_dir = self.blob_dir / 'tmp'
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=staging_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        real_type = downloader._detect_file_type(Path(tmp_name))
+
+        path = self.blob_path(sha256, real_type or ext)
+        if path.exists():
+            os.unlink(tmp_name)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, path)
+
+        filename = doc['filename']
+        if real_type and not filename.lower().endswith('.' + real_type):
+            filename = Path(filename).stem + '.' + real_type
+
+        return {
+            'url': doc['url'],
+            'title': doc['title'],
+            'type': doc['type'],
+            'filename': filename,
+            'sha256': sha256,
+            'path': str(path),
+            'real_type': real_type,
+            'size_kb': round(len(content) / 1024, 2),
+            'etag': etag,
+        }
+
+    # ============================================
+    # ТЕКСТ
+    # ============================================
+
+    async def get_texts(self, documents: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Извлечённый текст документов (по SHA-256): кэш из БД одним запросом,
+        остальное — ExtractionEngine в пуле процессов.
+
+        Returns:
+            {sha256: {'text', 'file_type', 'char_count'}}
+        """
+        hashes = list(dict.fromkeys(d['sha256'] for d in documents))
+        found: Dict[str, Dict[str, Any]] = {}
+        try:
+            db = await self._get_db()
+            cached = await db.cache_get_many([self.TEXT_PREFIX + h for h in hashes], self.TEXT_TYPE)
+            found = {key[len(self.TEXT_PREFIX):]: value for key, value in cached.items()}
+        except Exception as e:
+            logger.debug(f"Document store text get error: {e}")
+        self._stats['text_hits'] += len(found)
+
+        by_hash = {d['sha256']: d for d in documents}
+        missing = [h for h in hashes if h not in found]
+        extracted = await asyncio.gather(
+            *(self._dedup(f"text:{h}", lambda h=h: self._extract(by_hash[h])) for h in missing)
+        )
+        fresh = {h: result for h, result in zip(missing, extracted) if result is not None}
+        found.update(fresh)
+
+        # Обрезанный по таймауту текст не кэшируем — в следующий раз попробуем целиком
+        complete = {h: value for h, value in fresh.items() if not value.get('truncated')}
+        if complete:
+            try:
+                db = await self._get_db()
+                await db.cache_set_many(
+                    {self.TEXT_PREFIX + h: value for h, value in complete.items()},
+                    self.TEXT_TYPE, ttl_hours=self.TEXT_TTL_HOURS,
+                )
+            except Exception as e:
+                logger.debug(f"Document store text set error: {e}")
+        return found
+
+    async def _extract(self, document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        from src.document_processor.extraction_engine import get_extraction_engine
+
+        try:
+            result = await get_extraction_engine().extract_text(document['path'])
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось извлечь текст из {document['filename']}: {e}")
+            return None
+        self._stats['extractions'] += 1
+        text = result.get('text') or ''
+        if _is_failed_text(text):
+            text = ''
+        extracted = {
+            'text': text[:self.MAX_STORED_TEXT],
+            'file_type': result.get('file_type'),
+            'char_count': len(text),
+        }
+        if result.get('truncated'):
+            extracted['truncated'] = True
+        return extracted
+
+    async def get_tender_documents_text(
+        self,
+        tender_number: str,
+        tender_url: Optional[str] = None,
+        max_files: Optional[int] = None,
+        sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Документы тендера с извлечённым текстом.
+
+        Args:
+            tender_number: номер тендера
+            tender_url: URL карточки (по умолчанию строится по номеру)
+            max_files: сколько документов разбирать (после сортировки)
+            sort_key: порядок документов (по умолчанию — как в карточке)
+
+        Returns:
+            {'tender_number', 'documents': [документ + 'text', 'file_type',
+             'char_count'], 'text': объединённый текст с заголовками
+             "=== название ==="}. Пустой текст документа — извлечь не удалось.
+        """
+        documents = await self.get_documents(tender_number, tender_url)
+        if sort_key:
+            documents = sorted(documents, key=sort_key)
+        if max_files:
+            documents = documents[:max_files]
+
+        texts = await self.get_texts(documents) if documents else {}
+        result_documents = []
+        for doc in documents:
+            extracted = texts.get(doc['sha256']) or {}
+            result_documents.append({
+                **doc,
+                'text': extracted.get('text', ''),
+                'file_type': extracted.get('file_type'),
+                'char_count': extracted.get('char_count', 0),
+            })
+
+        combined = '\n\n'.join(
+            f"=== {doc['title'] or doc['filename']} ===\n{doc['text']}"
+            for doc in result_documents if doc['text']
+        )
+        return {
+            'tender_number': tender_number,
+            'documents': result_documents,
+            'text': combined,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'in_flight': len(self._inflight)}
+
+
+_store: Optional[TenderDocumentStore] = None
+
+
+def get_document_store() -> TenderDocumentStore:
+    """Общее на процесс хранилище документов."""
+    global _store
+    if _store is None:
+        _store = TenderDocumentStore()
+    return _store
+
+
+async def get_tender_documents_text(
+    tender_number: str,
+    tender_url: Optional[str] = None,
+    max_files: Optional[int] = None,
+    sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> Dict[str, Any]:
+    """Документы тендера с текстом через общее хранилище (см. TenderDocumentStore)."""
+    return await get_document_store().get_tender_documents_text(
+        tender_number, tender_url=tender_url, max_files=max_files, sort_key=sort_key
+    )
@@ -0,0 +1,240 @@
+"""
+Enrichment Store - общий кэш данных со страниц тендеров.
+
+Раньше InstantSearch держал class-level TTLCache на 500 тендеров: после
+рестарта, в каждом процессе (bot, cabinet, bot_max) и при переполнении
+страница zakupki.gov.ru для enrich_tender_from_page скачивалась заново.
+
+Два уровня:
+- память: TTLCache (LRU-вытеснение + TTL) — горячие тендеры текущего процесса;
+- БД: CacheEntry (cache_type='enrichment') — переживает рестарты и общий
+  для всех процессов.
+
+Чтение пакетное: get_many() на весь результат поиска делает один запрос
+в БД для промахов памяти. Запись отложенная (write-behind): put() кладёт
+данные в память сразу, в БД — пачкой через FLUSH_DELAY секунд.
+
+Инвалидация: вместе с данными хранится дата изменения извещения из RSS
+(«Обновлено:»). Если у тендера в новой выдаче дата другая — запись
+считается устаревшей и тендер обогащается заново.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# Поля, которые переносит обогащение со страницы тендера
+ENRICHED_FIELDS = (
+    'price',
+    'price_formatted',
+    'submission_deadline',
+    'customer_region',
+    'customer_city',
+    'customer',
+    'customer_address',
+)
+
+
+class EnrichmentStore:
+    """Двухуровневый кэш обогащения тендеров (память + CacheEntry)."""
+
+    CACHE_TYPE = 'enrichment'
+    KEY_PREFIX = 'enrich:'
+
+    MEMORY_SIZE = 5000
+    MEMORY_TTL = 7200            # секунды
+    DB_TTL_HOURS = 72
+
+    # Write-behind: пауза перед записью и размер пачки
+    FLUSH_DELAY = 2.0
+    FLUSH_BATCH = 200
+
+    def __init__(self, db=None, persistent: bool = True):
+        """
+        Args:
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
+            persistent: False — только память (тесты, скрипты без БД)
+        """
+        self._memory: TTLCache = TTLCache(maxsize=self.MEMORY_SIZE, ttl=self.MEMORY_TTL)
+        self._db = db
+        self._persistent = persistent
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'invalidated': 0,
+            'writes': 0,
+        }
+
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
+    @staticmethod
+    def _version(tender: Dict[str, Any]) -> str:
+        return tender.get('update_date') or ''
+
+    def _is_fresh(self, entry: Dict[str, Any], tender: Dict[str, Any]) -> bool:
+        """Запись актуальна, если дата изменения в выдаче не отличается от сохранённой."""
+        version = self._version(tender)
+        return not version or not entry.get('version') or entry['version'] == version
+
+    # ============================================
+    # ЧТЕНИЕ
+    # ============================================
+
+    async def get_many(self, tenders: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Пакетный read-through поиск обогащённых данных.
+
+        Args:
+            tenders: тендеры выдачи (нужны 'number' и, если есть, 'update_date')
+
+        Returns:
+            {номер тендера: обогащённые поля} для найденных актуальных записей
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, Dict[str, Any]] = {}
+
+        for tender in tenders:
+            number = tender.get('number')
+            if not number or number in found:
+                continue
+            entry = self._memory.get(number)
+            if entry is not None:
+                if self._is_fresh(entry, tender):
+                    found[number] = entry['fields']
+                    self._stats['memory_hits'] += 1
+                    continue
+                self._invalidate(number)
+            missing[number] = tender
+
+        if missing and self._persistent:
+            entries = {}
+            try:
+                db = await self._get_db()
+                entries = await db.cache_get_many(
+                    [self.KEY_PREFIX + number for number in missing], self.CACHE_TYPE
+                )
+            except Exception as e:
+                logger.debug(f"Enrichment store get error: {e}")
+
+            for key, entry in entries.items():
+                number = key[len(self.KEY_PREFIX):]
+                tender = missing.get(number)
+                if tender is None or not isinstance(entry, dict) or 'fields' not in entry:
+                    continue
+                if not self._is_fresh(entry, tender):
+                    self._stats['invalidated'] += 1
+                    continue
+                self._memory[number] = entry
+                found[number] = entry['fields']
+                self._stats['db_hits'] += 1
+
+        self._stats['misses'] += sum(1 for number in missing if number not in found)
+        return found
+
+    def _invalidate(self, number: str) -> None:
+        self._memory.pop(number, None)
+        self._pending.pop(number, None)
+        self._stats['invalidated'] += 1
+
+    # ============================================
+    # ЗАПИСЬ
+    # ============================================
+
+    def put(self, tender: Dict[str, Any], enriched: Dict[str, Any]) -> None:
+        """
+        Сохраняет обогащённые поля тендера.
+
+        Args:
+            tender: тендер из выдачи (номер и дата изменения)
+            enriched: результат enrich_tender_from_page
+        """
+        number = tender.get('number') or enriched.get('number')
+        if not number:
+            return
+        entry = {
+            'version': self._version(tender) or self._version(enriched),
+            'fields': {field: enriched.get(field) for field in ENRICHED_FIELDS},
+        }
+        self._memory[number] = entry
+        if self._persistent:
+            self._pending[number] = entry
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # нет event loop — запишем при явном flush()
+        self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        if len(self._pending) < self.FLUSH_BATCH:
+            await asyncio.sleep(self.FLUSH_DELAY)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Записывает накопленные данные в БД.
+
+        Returns:
+            Количество записанных тендеров
+        """
+        written = 0
+        while self._pending:
+            numbers = list(self._pending)[:self.FLUSH_BATCH]
+            batch = {self.KEY_PREFIX + n: self._pending.pop(n) for n in numbers}
+            try:
+                db = await self._get_db()
+                await db.cache_set_many(batch, self.CACHE_TYPE, ttl_hours=self.DB_TTL_HOURS)
+                written += len(batch)
+            except Exception as e:
+                logger.debug(f"Enrichment store flush error: {e}")
+                break
+        self._stats['writes'] += written
+        return written
+
+    # ============================================
+    # СЛУЖЕБНОЕ
+    # ============================================
+
+    def clear_memory(self) -> int:
+        """Очищает уровень памяти (БД не трогает). Возвращает число удалённых записей."""
+        size = len(self._memory)
+        self._memory.clear()
+        return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats['memory_hits'] + self._stats['db_hits'] + self._stats['misses']
+        hits = self._stats['memory_hits'] + self._stats['db_hits']
+        return {
+            **self._stats,
+            'size': len(self._memory),
+            'max_size': self.MEMORY_SIZE,
+            'pending': len(self._pending),
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_store: Optional[EnrichmentStore] = None
+
+
+def get_enrichment_store() -> EnrichmentStore:
+    """Общий на процесс кэш обогащения."""
+    global _store
+    if _store is None:
+        _store = EnrichmentStore()
+    return _store
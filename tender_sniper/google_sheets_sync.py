@@ -2,21 +2,28 @@
 Google Sheets Sync для Tender Sniper.
 
 Автоматически добавляет строки с тендерами в Google-таблицу пользователя.
+
+Запись строк — write-behind: append_tender ставит строку в буфер листа
+(spreadsheet_id, sheet_name), буфер через FLUSH_DELAY уходит одним
+append_rows. Хэндл листа и счётчик строк (для № заявки) кэшируются и
+сверяются с таблицей раз в RECONCILE_SECONDS или после ошибки; на 429
+буфер повторяет запись с экспоненциальной паузой в фоне.
 """
 
 import os
 import json
+import time
 import asyncio
 import functools
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Маппинг колонок: ключ → (заголовок RU, функция извлечения данных)
 COLUMN_DEFINITIONS = {
-    'request_number': ('№ заявки', lambda t, m: ''),  # Заполняется динамически в _append_row_sync
+    'request_number': ('№ заявки', lambda t, m: ''),  # Заполняется динамически в _append_rows_sync
     'link': ('Ссылка', lambda t, m: t.get('url', '')),
     'name': ('Объект закупки', lambda t, m: t.get('name', '')),
     'customer': ('Заказчик', lambda t, m: t.get('customer_name') or t.get('customer', '')),
@@ -374,9 +381,42 @@ def _format_price(price) -> str:
         return str(price)
 
 
+def _is_rate_limited(error: Exception) -> bool:
+    """429 от Sheets API (квота запросов в минуту)."""
+    if getattr(error, 'code', None) == 429:
+        return True
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+class _SheetBuffer:
+    """Буфер строк одного листа + кэш хэндла листа и счётчика строк."""
+
+    def __init__(self):
+        # (строка, индекс колонки № заявки, колонки, future итога записи)
+        self.pending: List[Tuple[List[str], int, List[str], asyncio.Future]] = []
+        self.worksheet = None
+        self.next_row: Optional[int] = None  # номер строки, куда ляжет следующая запись
+        self.reconciled_at = 0.0
+        self.flush_task: Optional[asyncio.Task] = None
+
+
 class GoogleSheetsSync:
     """Синхронизация тендеров с Google Sheets."""
 
+    # Пауза перед записью буфера: строки цикла/экспорта успевают собраться в пачку
+    FLUSH_DELAY = 1.0
+    # Строк в одном append_rows
+    MAX_BATCH_ROWS = 200
+    # Ограничение буфера листа (при долгом 429 не копим бесконечно)
+    MAX_PENDING_ROWS = 1000
+    # Сверка локального счётчика строк с таблицей (ручные правки пользователя)
+    RECONCILE_SECONDS = 600
+    # Повторы при 429: 5, 10, 20, 40, 80 секунд
+    RATE_LIMIT_RETRIES = 5
+    RATE_LIMIT_BASE_DELAY = 5.0
+    RATE_LIMIT_MAX_DELAY = 120.0
+
     def __init__(self, credentials_json: Optional[str] = None):
         """
         Инициализация.
@@ -388,6 +428,17 @@ class GoogleSheetsSync:
         self._credentials_json = credentials_json or os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON', '')
         self._client = None
         self._verified_sheets: set = set()  # (spreadsheet_id, sheet_name) — уже проверены заголовки
+        self._spreadsheets: Dict[str, Any] = {}  # spreadsheet_id → открытая таблица
+        self._buffers: Dict[Tuple[str, str], _SheetBuffer] = {}
+        self._stats = {
+            'rows_queued': 0,
+            'rows_written': 0,
+            'rows_failed': 0,
+            'rows_dropped': 0,
+            'batches': 0,
+            'rate_limited': 0,
+            'reconciles': 0,
+        }
 
     def _get_client(self):
         """Создаёт или возвращает gspread клиент (синхронный)."""
@@ -465,28 +516,58 @@ class GoogleSheetsSync:
         })
         logger.info(f"📊 Google Sheets: заголовки обновлены ({len(headers)} колонок)")
 
-    def _append_row_sync(self, spreadsheet_id: str, row: List[str], sheet_name: str,
-                         columns: Optional[List[str]] = None):
-        """Добавляет строку в таблицу (синхронно)."""
-        from datetime import datetime
-
-        spreadsheet = self._open_spreadsheet(spreadsheet_id)
-        worksheet = self._get_or_create_sheet(spreadsheet, sheet_name)
-        cache_key = (spreadsheet_id, sheet_name)
-        if columns and cache_key not in self._verified_sheets:
+    def _buffer(self, key: Tuple[str, str]) -> _SheetBuffer:
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _SheetBuffer()
+        return buffer
+
+    def _get_worksheet(self, spreadsheet_id: str, sheet_name: str):
+        """Лист из кэша; открывает таблицу и лист только при первом обращении (синхронно)."""
+        buffer = self._buffer((spreadsheet_id, sheet_name))
+        if buffer.worksheet is None:
+            spreadsheet = self._spreadsheets.get(spreadsheet_id)
+            if spreadsheet is None:
+                spreadsheet = self._open_spreadsheet(spreadsheet_id)
+                self._spreadsheets[spreadsheet_id] = spreadsheet
+            buffer.worksheet = self._get_or_create_sheet(spreadsheet, sheet_name)
+        return buffer.worksheet
+
+    def _invalidate_sheet(self, key: Tuple[str, str]):
+        """Сбрасывает кэш листа: после ошибки заново откроем таблицу и сверим счётчик."""
+        buffer = self._buffer(key)
+        buffer.worksheet = None
+        buffer.next_row = None
+        self._spreadsheets.pop(key[0], None)
+        self._verified_sheets.discard(key)
+
+    def _append_rows_sync(self, spreadsheet_id: str, sheet_name: str,
+                          items: List[Tuple[List[str], int, List[str]]]):
+        """Добавляет пачку строк одним запросом (синхронно)."""
+        key = (spreadsheet_id, sheet_name)
+        buffer = self._buffer(key)
+        worksheet = self._get_worksheet(spreadsheet_id, sheet_name)
+        columns = items[0][2]
+        if columns and key not in self._verified_sheets:
             self._ensure_headers_exist(worksheet, columns)
-            self._verified_sheets.add(cache_key)
+            self._verified_sheets.add(key)
+
+        now = time.monotonic()
+        if buffer.next_row is None or now - buffer.reconciled_at > self.RECONCILE_SECONDS:
+            buffer.next_row = len(worksheet.col_values(1)) + 1  # строк с данными в колонке A
+            buffer.reconciled_at = now
+            self._stats['reconciles'] += 1
 
         # Заполняем № заявки: "Заявка XXYY" (XX=строка, YY=день)
-        if columns and 'request_number' in columns:
-            idx = list(columns).index('request_number')
-            if idx < len(row):
-                existing_rows = len(worksheet.col_values(1))  # строк с данными в колонке A
-                next_row = existing_rows + 1
-                day = datetime.now().strftime('%d')
-                row[idx] = f"{next_row:02d}{day}"
+        day = datetime.now().strftime('%d')
+        rows = []
+        for offset, (row, number_idx, _) in enumerate(items):
+            if number_idx < len(row):
+                row[number_idx] = f"{buffer.next_row + offset:02d}{day}"
+            rows.append(row)
 
-        worksheet.append_row(row, value_input_option='USER_ENTERED')
+        worksheet.append_rows(rows, value_input_option='USER_ENTERED')
+        buffer.next_row += len(rows)
 
     def _check_access_sync(self, spreadsheet_id: str) -> bool:
         """Проверяет доступ к таблице (синхронно)."""
@@ -516,8 +597,7 @@ class GoogleSheetsSync:
                               tender_url: str, tender_number: str,
                               columns: List[str], ai_data: Dict[str, Any]) -> bool:
         """Находит строку по URL/номеру тендера и обновляет AI-ячейки (синхронно)."""
-        spreadsheet = self._open_spreadsheet(spreadsheet_id)
-        worksheet = self._get_or_create_sheet(spreadsheet, sheet_name)
+        worksheet = self._get_worksheet(spreadsheet_id, sheet_name)
 
         # Ищем строку по URL тендера или номеру
         all_values = worksheet.get_all_values()
@@ -590,43 +670,180 @@ class GoogleSheetsSync:
                 )
             )
         except Exception as e:
+            self._invalidate_sheet((spreadsheet_id, sheet_name))
             logger.error(f"❌ update_tender_ai_data error: {e}")
             return False
 
     async def append_tender(self, spreadsheet_id: str, tender_data: Dict[str, Any],
                            match_data: Dict[str, Any], columns: List[str],
-                           sheet_name: str = None) -> bool:
+                           sheet_name: str = None, wait: bool = True) -> bool:
         """
         Добавляет строку с тендером в Google Sheets.
 
+        Строка ставится в буфер листа и записывается пачкой вместе с
+        соседними (см. FLUSH_DELAY).
+
         Args:
             spreadsheet_id: ID таблицы
             tender_data: Данные тендера
             match_data: Данные из match_info + filter_name + ai_data
             columns: Список колонок для заполнения
             sheet_name: Имя листа
+            wait: False — не ждать записи (мониторинг, fire-and-forget);
+                  массовому экспорту нужен итог по строке — enqueue_tender()
 
         Returns:
-            True если успешно
+            True если строка записана (при wait=False — если принята в буфер)
         """
         try:
-            if sheet_name is None:
-                sheet_name = get_weekly_sheet_name()
-            if not columns:
-                columns = DEFAULT_COLUMNS
-            if 'request_number' not in columns:
-                columns = ['request_number'] + list(columns)
-            row = self._format_row(tender_data, match_data, columns)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None, functools.partial(self._append_row_sync, spreadsheet_id, row, sheet_name, columns)
+            future = await self.enqueue_tender(
+                spreadsheet_id, tender_data, match_data, columns, sheet_name, block=wait
             )
-            logger.info(f"📊 Google Sheets: добавлен тендер {tender_data.get('number', '?')}")
-            return True
+            if future is None:
+                return False
+            if not wait:
+                return True
+
+            if await future:
+                logger.info(f"📊 Google Sheets: добавлен тендер {tender_data.get('number', '?')}")
+                return True
+            return False
         except Exception as e:
             logger.error(f"❌ Google Sheets ошибка: {e}")
             return False
 
+    async def enqueue_tender(self, spreadsheet_id: str, tender_data: Dict[str, Any],
+                             match_data: Dict[str, Any], columns: List[str],
+                             sheet_name: str = None, block: bool = True) -> Optional[asyncio.Future]:
+        """
+        Ставит строку в буфер листа, не дожидаясь записи.
+
+        Args:
+            block: при переполненном буфере ждать его разгрузки
+                (False — сразу вернуть None)
+
+        Returns:
+            Future итога записи пачки со строкой (True — записана, False —
+            ошибка или запись отменена); None — строка не принята
+        """
+        if sheet_name is None:
+            sheet_name = get_weekly_sheet_name()
+        if not columns:
+            columns = DEFAULT_COLUMNS
+        if 'request_number' not in columns:
+            columns = ['request_number'] + list(columns)
+        row = self._format_row(tender_data, match_data, columns)
+        number_idx = list(columns).index('request_number')
+
+        buffer = self._buffer((spreadsheet_id, sheet_name))
+        if len(buffer.pending) >= self.MAX_PENDING_ROWS:
+            if not block:
+                self._stats['rows_dropped'] += 1
+                logger.warning(f"⚠️ Google Sheets: буфер листа переполнен, тендер {tender_data.get('number', '?')} не добавлен")
+                return None
+            # Backpressure: ждём, пока фон разгрузит буфер
+            while len(buffer.pending) >= self.MAX_PENDING_ROWS and buffer.flush_task is not None:
+                await asyncio.wait([buffer.flush_task])
+
+        future = asyncio.get_running_loop().create_future()
+        buffer.pending.append((row, number_idx, columns, future))
+        self._stats['rows_queued'] += 1
+        self._schedule_flush((spreadsheet_id, sheet_name))
+        return future
+
+    async def flush(self, spreadsheet_id: Optional[str] = None) -> Dict[Tuple[str, str], bool]:
+        """
+        Дожидается записи всех буферизованных строк (всех таблиц или одной).
+
+        Returns:
+            {(spreadsheet_id, лист): все ли пачки записаны}
+        """
+        keys = []
+        tasks = []
+        for key, buffer in self._buffers.items():
+            if buffer.flush_task is not None and (spreadsheet_id is None or key[0] == spreadsheet_id):
+                keys.append(key)
+                tasks.append(buffer.flush_task)
+        if not tasks:
+            return {}
+        results = await asyncio.gather(*(asyncio.shield(t) for t in tasks), return_exceptions=True)
+        return {key: result is True for key, result in zip(keys, results)}
+
+    def _schedule_flush(self, key: Tuple[str, str]):
+        buffer = self._buffers[key]
+        if buffer.flush_task is not None and not buffer.flush_task.done():
+            return
+        buffer.flush_task = asyncio.get_running_loop().create_task(self._flush_later(key))
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[List[str], int, List[str], asyncio.Future]], ok: bool) -> None:
+        for *_, future in batch:
+            if not future.done():
+                future.set_result(ok)
+
+    async def _flush_later(self, key: Tuple[str, str]) -> bool:
+        """
+        Фоновая запись буфера листа пачками, пока он не опустеет.
+
+        Returns:
+            True — все пачки записаны
+        """
+        buffer = self._buffers[key]
+        batch: List[Tuple[List[str], int, List[str], asyncio.Future]] = []
+        all_ok = True
+        try:
+            if len(buffer.pending) < self.MAX_BATCH_ROWS:
+                await asyncio.sleep(self.FLUSH_DELAY)
+            while buffer.pending:
+                batch = buffer.pending[:self.MAX_BATCH_ROWS]
+                del buffer.pending[:self.MAX_BATCH_ROWS]
+                ok = await self._write_batch(key, batch)
+                self._resolve(batch, ok)
+                all_ok = all_ok and ok
+            return all_ok
+        except asyncio.CancelledError:
+            # Остановка процесса: ожидающие не должны висеть и не должны
+            # считать строки записанными (текущая пачка могла не дойти)
+            pending, buffer.pending = buffer.pending, []
+            self._stats['rows_failed'] += len(pending) + sum(1 for *_, f in batch if not f.done())
+            self._resolve(batch + pending, False)
+            raise
+        finally:
+            buffer.flush_task = None
+
+    async def _write_batch(self, key: Tuple[str, str],
+                           batch: List[Tuple[List[str], int, List[str], asyncio.Future]]) -> bool:
+        """Одна пачка: append_rows в потоке, повторы с паузой при 429."""
+        items = [(row, number_idx, columns) for row, number_idx, columns, _ in batch]
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            try:
+                await asyncio.to_thread(self._append_rows_sync, key[0], key[1], items)
+            except Exception as e:
+                if _is_rate_limited(e) and attempt < self.RATE_LIMIT_RETRIES:
+                    self._stats['rate_limited'] += 1
+                    delay = min(self.RATE_LIMIT_BASE_DELAY * 2 ** attempt, self.RATE_LIMIT_MAX_DELAY)
+                    logger.warning(f"⏳ Google Sheets 429: {len(items)} строк, повтор через {delay:.0f}с")
+                    await asyncio.sleep(delay)
+                    continue
+                self._invalidate_sheet(key)
+                self._stats['rows_failed'] += len(items)
+                logger.error(f"❌ Google Sheets ошибка ({len(items)} строк, лист {key[1]}): {e}")
+                return False
+
+            self._stats['batches'] += 1
+            self._stats['rows_written'] += len(items)
+            if len(items) > 1:
+                logger.info(f"📊 Google Sheets: записано {len(items)} строк одним запросом (лист {key[1]})")
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'pending': sum(len(b.pending) for b in self._buffers.values()),
+            'sheets': len(self._buffers),
+        }
+
     def _format_row(self, tender_data: Dict[str, Any], match_data: Dict[str, Any],
                     columns: List[str]) -> List[str]:
         """Формирует строку данных для таблицы."""
@@ -654,37 +871,20 @@ async def enrich_tender_with_ai(tender_number: str, tender_price=None,
         Плоский dict для ai_data, или пустой dict при ошибке.
     """
     try:
-        from src.parsers.zakupki_document_downloader import ZakupkiDocumentDownloader
-        from src.document_processor.text_extractor import TextExtractor
+        from tender_sniper.document_store import get_tender_documents_text
         from tender_sniper.ai_document_extractor import get_document_extractor
 
-        # 1. Скачиваем документы
-        downloader = ZakupkiDocumentDownloader()
-        tender_url = (
-            f"https://zakupki.gov.ru/epz/order/notice/ea44/view/"
-            f"common-info.html?regNumber={tender_number}"
-        )
-
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: downloader.download_documents(tender_url, tender_number, None)
-        )
+        # 1-2. Документы и текст (до 3 файлов) из общего хранилища
+        result = await get_tender_documents_text(tender_number, max_files=3)
 
-        if not result or result.get('downloaded', 0) == 0:
+        if not result['documents']:
             logger.info(f"📄 AI enrichment: нет документов для {tender_number}")
             return {}
 
-        # 2. Извлекаем текст (до 3 файлов)
         combined_text = ""
-        for doc_info in result.get('files', [])[:3]:
-            doc_path = doc_info.get('path')
-            if not doc_path:
-                continue
-            try:
-                extract_result = TextExtractor.extract_text(doc_path)
-                if extract_result['text'] and not extract_result['text'].startswith('[Не удалось'):
-                    combined_text += f"\n\n=== {extract_result['file_name']} ===\n{extract_result['text']}"
-            except Exception as e:
-                logger.warning(f"   Не удалось извлечь текст из {doc_path}: {e}")
+        for doc in result['documents']:
+            if doc['text']:
+                combined_text += f"\n\n=== {doc['filename']} ===\n{doc['text']}"
 
         if not combined_text:
             logger.info(f"📄 AI enrichment: не удалось извлечь текст для {tender_number}")
@@ -5,13 +5,11 @@ Instant Search - мгновенный поиск тендеров по крит
 """
 
 import sys
-import re
 import asyncio
 import functools
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from cachetools import TTLCache
 import logging
 
 # Добавляем корень проекта в путь
@@ -20,8 +18,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.parsers.zakupki_rss_parser import ZakupkiRSSParser
 from tender_sniper.matching import SmartMatcher
 from tender_sniper.matching.smart_matcher import detect_red_flags
+from tender_sniper.matching.compiled_filter import (
+    GOODS_ONLY_SERVICE_INDICATORS, GOODS_ONLY_SERVICE_START, compile_filter, is_service_tender
+)
 from src.utils.transliterator import Transliterator
-from tender_sniper.ai_relevance_checker import get_relevance_checker, check_tender_relevance
+from tender_sniper.ai_relevance_checker import get_relevance_checker
+from tender_sniper.query_pool import QueryPool, merge_search_results, run_rss_and_html
+from tender_sniper.enrichment_store import get_enrichment_store
+from tender_sniper.instrumentation import timed
 
 logger = logging.getLogger(__name__)
 
@@ -29,34 +33,144 @@ logger = logging.getLogger(__name__)
 class InstantSearch:
     """Мгновенный поиск тендеров по фильтру."""
 
-    # Кэш обогащённых тендеров (по номеру тендера)
-    # TTLCache: автоочистка через 2 часа, максимум 500 записей
-    _enrichment_cache: TTLCache = TTLCache(maxsize=500, ttl=7200)
-    _cache_max_size = 500  # Максимум кэшированных тендеров
-
     # Минимальный pre-score для обогащения (без обогащения - пропускаем)
     MIN_PRESCORE_FOR_ENRICHMENT = 1
 
-    def __init__(self):
-        """Инициализация компонентов поиска."""
+    # Одновременных загрузок страниц тендеров на один поиск
+    ENRICH_CONCURRENCY = 5
+    # Общий дедлайн обогащения (секунды): после него возвращаем что успели
+    ENRICH_DEADLINE = 60.0
+
+    # Загрузки страниц в полёте (номер тендера → задача), общие для всех поисков:
+    # два фильтра, запросившие один тендер, ждут одну загрузку
+    _enrich_inflight: Dict[str, asyncio.Task] = {}
+
+    def __init__(
+        self,
+        query_pool: Optional[QueryPool] = None,
+        enrich_concurrency: Optional[int] = None,
+        enrich_deadline: Optional[float] = None
+    ):
+        """
+        Инициализация компонентов поиска.
+
+        Args:
+            query_pool: Общий пул запросов цикла мониторинга (опционально).
+                Если задан, одинаковые запросы разных фильтров выполняются один раз.
+            enrich_concurrency: Лимит параллельных загрузок страниц (по умолчанию ENRICH_CONCURRENCY)
+            enrich_deadline: Дедлайн обогащения в секундах (по умолчанию ENRICH_DEADLINE)
+        """
         self.parser = ZakupkiRSSParser()
         self.matcher = SmartMatcher()
+        self.query_pool = query_pool
+        self.enrich_concurrency = enrich_concurrency or self.ENRICH_CONCURRENCY
+        self.enrich_deadline = enrich_deadline or self.ENRICH_DEADLINE
+        # Кэш обогащённых тендеров: память + БД, общий для процессов
+        self.enrichment_store = get_enrichment_store()
 
     @classmethod
     def clear_cache(cls):
-        """Очищает кэш обогащённых тендеров."""
-        cache_size = len(cls._enrichment_cache)
-        cls._enrichment_cache.clear()
+        """Очищает кэш обогащённых тендеров (уровень памяти)."""
+        cache_size = get_enrichment_store().clear_memory()
         logger.info(f"🗑️ Кэш обогащения очищен ({cache_size} записей)")
 
     @classmethod
-    def get_cache_stats(cls) -> Dict[str, int]:
+    def get_cache_stats(cls) -> Dict[str, Any]:
         """Возвращает статистику кэша."""
-        return {
-            'size': len(cls._enrichment_cache),
-            'max_size': cls._cache_max_size
-        }
+        return get_enrichment_store().get_stats()
+
+    async def _enrich_tenders(
+        self,
+        candidates: List[Tuple[int, Dict[str, Any]]],
+        cached: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Параллельное обогащение тендеров со страниц zakupki.gov.ru.
+
+        Тендеры с большим pre-score загружаются первыми, одновременно не больше
+        enrich_concurrency страниц. По истечении enrich_deadline возвращаются
+        все тендеры: не успевшие — с данными RSS (как при ошибке загрузки).
+        Такие тендеры помечаются '_enrich_failed'.
+
+        Args:
+            candidates: (pre-score, тендер) прошедшие pre-scoring
+            cached: номера тендеров, уже обогащённых из кэша
+
+        Returns:
+            Тендеры в порядке убывания pre-score
+        """
+        ordered = [tender for _, tender in sorted(candidates, key=lambda c: c[0], reverse=True)]
+        semaphore = asyncio.Semaphore(self.enrich_concurrency)
+
+        async def enrich_one(tender: Dict[str, Any]) -> None:
+            async with semaphore:
+                # shield: отмена по дедлайну не должна отменять общую загрузку
+                enriched = await asyncio.shield(self._shared_enrichment(tender))
+            if enriched is not None:
+                tender.update(enriched)
+            else:
+                tender['_enrich_failed'] = True
+
+        to_fetch = [t for t in ordered if t.get('number', '') not in cached]
+        if not to_fetch:
+            return ordered
+
+        tasks = [asyncio.ensure_future(enrich_one(t)) for t in to_fetch]
+        done, pending = await asyncio.wait(tasks, timeout=self.enrich_deadline)
+        for tender, task in zip(to_fetch, tasks):
+            if task in pending:
+                task.cancel()
+                tender['_enrich_failed'] = True
+        if pending:
+            logger.warning(
+                f"   ⏱️ Дедлайн обогащения {self.enrich_deadline:.0f}с: "
+                f"{len(pending)} из {len(tasks)} тендеров без данных со страницы"
+            )
+        return ordered
+
+    def _shared_enrichment(self, tender: Dict[str, Any]) -> asyncio.Future:
+        """Загрузка страницы тендера; параллельные запросы одного номера ждут одну задачу."""
+        number = tender.get('number', '')
+        loop = asyncio.get_running_loop()
+
+        task = self._enrich_inflight.get(number) if number else None
+        if task is not None and not task.done() and task.get_loop() is loop:
+            logger.debug(f"      🔗 Обогащение {number} уже в процессе, ждём его")
+            return task
+
+        task = loop.create_task(self._fetch_enrichment(dict(tender)))
+        if number:
+            self._enrich_inflight[number] = task
+
+            def _forget(finished, number=number):
+                if self._enrich_inflight.get(number) is finished:
+                    del self._enrich_inflight[number]
 
+            task.add_done_callback(_forget)
+        return task
+
+    async def _fetch_enrichment(self, tender: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Обогащает копию тендера и сохраняет результат в кэш. None при ошибке."""
+        tender_number = tender.get('number', '')
+        try:
+            if self.parser.async_transport:
+                enriched = await self.parser.enrich_tender_from_page_async(tender)
+            else:
+                # Синхронный HTTP в thread executor
+                loop = asyncio.get_running_loop()
+                enriched = await loop.run_in_executor(
+                    None, self.parser.enrich_tender_from_page, tender
+                )
+        except Exception as e:
+            logger.error(f"      ⚠️ Ошибка обогащения {tender_number}: {e}")
+            return None
+
+        # Сохраняем в кэш (только обогащённые поля; в БД — отложенно)
+        if tender_number:
+            self.enrichment_store.put(tender, enriched)
+        return enriched
+
+    @timed('instant_search')
     async def search_by_filter(
         self,
         filter_data: Dict[str, Any],
@@ -138,6 +252,9 @@ class InstantSearch:
             search_queries.extend(extra_keywords)
 
         logger.debug(f"   🔑 Запросы ({len(search_queries)}): {', '.join(search_queries)}")
+
+        # Текстовые правила фильтра — одна скомпилированная версия на все тендеры
+        compiled = compile_filter(original_keywords, exclude_keywords, customer_keywords)
         logger.debug(f"   💰 Цена: {price_min} - {price_max}, 📍 Регионы: {regions if regions else 'Все'}")
 
         # По умолчанию ищем только АКТИВНЫЕ тендеры (идёт приём заявок)
@@ -148,6 +265,7 @@ class InstantSearch:
             # Это OR логика - тендер найдётся если содержит ЛЮБОЕ из слов
             all_results = []
             seen_numbers = set()
+            unenriched: List[str] = []
 
             results_per_query = max(10, max_tenders // len(search_queries) + 5)
 
@@ -175,72 +293,23 @@ class InstantSearch:
                         # 2 типа - без фильтрации на RSS уровне
                         tender_type_for_rss = None
 
-                    # Запускаем RSS и HTML параллельно для максимального покрытия
-                    loop = asyncio.get_event_loop()
-
                     from datetime import datetime as _dt, timedelta as _td
                     _date_from = (_dt.utcnow() - _td(days=3)).strftime('%d.%m.%Y')
 
-                    rss_future = loop.run_in_executor(
-                        None,
-                        functools.partial(
-                            self.parser.search_tenders_rss,
-                            keywords=variant,
-                            price_min=price_min,
-                            price_max=price_max,
-                            regions=regions,
-                            max_results=results_per_query,
-                            tender_type=tender_type_for_rss,
-                            law_type=law_type,
-                            purchase_stage=effective_purchase_stage,
-                            purchase_method=purchase_method,
-                            date_from=_date_from,
-                        )
-                    )
-
-                    html_future = loop.run_in_executor(
-                        None,
-                        functools.partial(
-                            self.parser.search_tenders_html,
-                            keywords=variant,
-                            price_min=price_min,
-                            price_max=price_max,
-                            max_results=results_per_query,
-                            regions=regions,
-                            tender_type=tender_type_for_rss,
-                            law_type=law_type,
-                            purchase_stage=effective_purchase_stage,
-                            purchase_method=purchase_method,
-                            date_from=_date_from,
-                        )
-                    )
-
-                    rss_results, html_results = await asyncio.gather(
-                        rss_future, html_future, return_exceptions=True
+                    results = await self._fetch_query_results(
+                        consumer=filter_data.get('id'),
+                        keywords=variant,
+                        price_min=price_min,
+                        price_max=price_max,
+                        regions=regions,
+                        max_results=results_per_query,
+                        tender_type=tender_type_for_rss,
+                        law_type=law_type,
+                        purchase_stage=effective_purchase_stage,
+                        purchase_method=purchase_method,
+                        date_from=_date_from,
                     )
 
-                    # Объединяем результаты, RSS приоритетнее (больше данных)
-                    results = []
-                    merged_numbers = set()
-
-                    if isinstance(rss_results, list):
-                        for t in rss_results:
-                            num = t.get('number')
-                            if num:
-                                merged_numbers.add(num)
-                            results.append(t)
-
-                    if isinstance(html_results, list):
-                        html_new = 0
-                        for t in html_results:
-                            num = t.get('number')
-                            if num and num not in merged_numbers:
-                                merged_numbers.add(num)
-                                results.append(t)
-                                html_new += 1
-                        if html_new > 0:
-                            logger.info(f"      🌐 HTML добавил {html_new} новых тендеров (не было в RSS)")
-
                     # Дедупликация по номеру тендера + client-side фильтрация
                     for tender in results:
                         number = tender.get('number')
@@ -257,51 +326,22 @@ class InstantSearch:
                             customer_name = tender.get('customer', '') or tender.get('customer_name', '')
 
                             # Проверяем исключающие слова (с границами слов для точности)
-                            if exclude_keywords:
-                                skip = False
-                                for exclude_word in exclude_keywords:
-                                    # Используем regex с границами слов для избежания ложных срабатываний
-                                    pattern = r'\b' + re.escape(exclude_word.lower()) + r'\b' if len(exclude_word) < 4 else r'\b' + re.escape(exclude_word.lower())
-                                    if re.search(pattern, tender_text, re.IGNORECASE):
-                                        logger.debug(f"      ⛔ Исключен (содержит '{exclude_word}'): {tender.get('name', '')[:50]}")
-                                        skip = True
-                                        break
-                                if skip:
-                                    continue
+                            excluded_word = compiled.find_excluded(tender_text)
+                            if excluded_word:
+                                logger.debug(f"      ⛔ Исключен (содержит '{excluded_word}'): {tender.get('name', '')[:50]}")
+                                continue
 
                             # === ФИЛЬТРАЦИЯ ПО КЛЮЧЕВЫМ СЛОВАМ ===
                             # RSS API может возвращать нерелевантные результаты
-                            # Проверяем, что тендер содержит хотя бы одно ключевое слово
-                            keyword_found = False
-                            for keyword in original_keywords:
-                                kw_lower = keyword.lower()
-                                # Проверяем точное вхождение слова (с границами для коротких слов)
-                                if len(kw_lower) <= 4:
-                                    pattern = r'\b' + re.escape(kw_lower) + r'\b'
-                                else:
-                                    # Для длинных слов - минимум 7 символов корня (было 5)
-                                    # "разработка" → "разрабо" (не "разра" → ловит "разгрузка")
-                                    min_chars = min(len(kw_lower), max(7, len(kw_lower) - 3))
-                                    pattern = r'\b' + re.escape(kw_lower[:min_chars])
-
-                                if re.search(pattern, tender_text, re.IGNORECASE):
-                                    keyword_found = True
-                                    break
-
-                            if not keyword_found:
+                            # Проверяем, что тендер содержит корень хотя бы одного ключевого слова
+                            if not compiled.has_keyword_root(tender_text):
                                 logger.debug(f"      ⛔ Не содержит ключевых слов: {tender.get('name', '')[:60]}")
                                 continue
 
                             # Проверяем ключевые слова заказчика
-                            if customer_keywords and customer_name:
-                                customer_match = False
-                                for kw in customer_keywords:
-                                    if kw.lower() in customer_name.lower():
-                                        customer_match = True
-                                        break
-                                if not customer_match:
-                                    logger.debug(f"      ⛔ Заказчик не совпадает: {customer_name[:50]}")
-                                    continue
+                            if customer_name and not compiled.customer_matches(customer_name):
+                                logger.debug(f"      ⛔ Заказчик не совпадает: {customer_name[:50]}")
+                                continue
 
                             # === ОБЯЗАТЕЛЬНАЯ ПРОВЕРКА: дедлайн не просрочен ===
                             # Отсекаем тендеры с просроченным дедлайном (баг zakupki.gov.ru)
@@ -399,14 +439,16 @@ class InstantSearch:
                 tenders_to_enrich = []
                 tenders_skipped = 0
 
+                # Кэш обогащённых тендеров: один пакетный запрос на всю выдачу
+                cached_enrichment = await self.enrichment_store.get_many(search_results)
+
                 for tender in search_results:
                     tender_number = tender.get('number', '')
 
                     # Проверяем кэш обогащённых тендеров
-                    if tender_number and tender_number in self._enrichment_cache:
+                    if tender_number and tender_number in cached_enrichment:
                         # Используем кэшированные данные
-                        cached = self._enrichment_cache[tender_number]
-                        tender.update(cached)
+                        tender.update(cached_enrichment[tender_number])
 
                         # Кэшированные тендеры уже обогащены → полная проверка с регионом
                         pre_match = self.matcher.match_tender(tender, temp_filter, user_negative_keywords or None)
@@ -415,7 +457,7 @@ class InstantSearch:
                             logger.debug(f"      ⏭️ Кэш: отклонён SmartMatcher: {tender.get('name', '')[:50]}")
                             continue
 
-                        tenders_to_enrich.append(tender)
+                        tenders_to_enrich.append((pre_match.get('score', 0), tender))
                         logger.debug(f"      💾 Из кэша: {tender_number}")
                         continue
 
@@ -430,7 +472,7 @@ class InstantSearch:
                         logger.debug(f"      ⏭️ Pre-score {pre_score} < {self.MIN_PRESCORE_FOR_ENRICHMENT}, пропускаем обогащение: {tender.get('name', '')[:50]}")
                         continue
 
-                    tenders_to_enrich.append(tender)
+                    tenders_to_enrich.append((pre_score, tender))
 
                 if tenders_skipped > 0:
                     logger.debug(f"   ⏭️ Пропущено по pre-score: {tenders_skipped}")
@@ -438,41 +480,8 @@ class InstantSearch:
                 # 3. Обогащаем только отобранные тендеры
                 if tenders_to_enrich:
                     logger.debug(f"   📥 Загрузка данных для {len(tenders_to_enrich)} тендеров (из {len(search_results)})...")
-                    enriched_results = []
-
-                    for i, tender in enumerate(tenders_to_enrich):
-                        tender_number = tender.get('number', '')
-
-                        # Уже обогащён из кэша - пропускаем
-                        if tender_number in self._enrichment_cache:
-                            enriched_results.append(tender)
-                            continue
-
-                        try:
-                            # Синхронный HTTP в thread executor
-                            loop = asyncio.get_event_loop()
-                            enriched = await loop.run_in_executor(
-                                None, self.parser.enrich_tender_from_page, tender
-                            )
-                            enriched_results.append(enriched)
-
-                            # Сохраняем в кэш (TTLCache автоматически ограничивает размер)
-                            if tender_number:
-                                # Кэшируем только обогащённые поля
-                                self._enrichment_cache[tender_number] = {
-                                    'price': enriched.get('price'),
-                                    'price_formatted': enriched.get('price_formatted'),
-                                    'submission_deadline': enriched.get('submission_deadline'),
-                                    'customer_region': enriched.get('customer_region'),
-                                    'customer_city': enriched.get('customer_city'),
-                                    'customer': enriched.get('customer'),
-                                    'customer_address': enriched.get('customer_address'),
-                                }
-                        except Exception as e:
-                            logger.error(f"      ⚠️ Ошибка обогащения {tender_number}: {e}")
-                            enriched_results.append(tender)
-
-                    search_results = enriched_results
+                    search_results = await self._enrich_tenders(tenders_to_enrich, cached_enrichment)
+                    unenriched = [t['number'] for t in search_results if t.get('_enrich_failed') and t.get('number')]
                     logger.debug(f"   ✅ Данные обогащены")
                 else:
                     search_results = []
@@ -545,6 +554,7 @@ class InstantSearch:
                     'tenders': [],
                     'total_found': 0,
                     'matches': [],
+                    'unenriched': unenriched,
                     'stats': {
                         'search_queries': search_queries,
                         'search_query': ', '.join(search_queries),  # Для совместимости с HTML шаблоном
@@ -565,139 +575,14 @@ class InstantSearch:
             # RSS API zakupki.gov.ru может возвращать нерелевантные результаты,
             # поэтому ВСЕГДА проверяем что тендер содержит хотя бы одно ключевое слово
 
-            def check_keyword_match(tender_text: str, keywords_list: List[str]) -> Optional[str]:
-                """Проверяет содержит ли тендер ключевое слово.
-
-                Главное: для одиночных слов используем границу слова (\b),
-                иначе короткое «фен» матчится во «фенацетин», «батарей» в
-                «батарейк» и т.п. — это давало кучу мусорных совпадений.
-
-                - фраза (есть пробел) → подстрока (фразу случайно не поймать)
-                - одиночное слово ≤4 → строгий \bword\b
-                - одиночное слово ≥5 → \bword (морфология: «батарейка»→«батарейки»)
-                """
-                import re as _re
-                tender_lower = tender_text.lower()
-
-                for kw in keywords_list:
-                    kw_lower = kw.lower().strip()
-
-                    # Пропускаем стоп-слова и очень короткие слова
-                    if len(kw_lower) < 2 or kw_lower in {'закупка', 'закупки', 'услуга', 'услуги',
-                                                          'поставка', 'поставки', 'работа', 'работы',
-                                                          'для', 'нужд', 'оказание', 'выполнение'}:
-                        continue
-
-                    if ' ' in kw_lower:
-                        # Многословная фраза («тарелка столовая»): подстрока ок
-                        if kw_lower in tender_lower:
-                            return kw
-                    else:
-                        # Одиночное слово: границы слова, чтобы не ловить
-                        # подстроки вроде «фен» в «фенацетин».
-                        try:
-                            if len(kw_lower) <= 4:
-                                pattern = r'\b' + _re.escape(kw_lower) + r'\b'
-                            else:
-                                pattern = r'\b' + _re.escape(kw_lower)
-                            if _re.search(pattern, tender_lower, _re.UNICODE):
-                                return kw
-                        except _re.error:
-                            if kw_lower in tender_lower:
-                                return kw
-
-                    # Латинские бренды: транслитерация (тоже через границы слова)
-                    if kw.isascii():
-                        cyrillic_variants = Transliterator.generate_variants(kw)
-                        for variant in cyrillic_variants:
-                            v_low = variant.lower()
-                            if v_low == kw_lower:
-                                continue
-                            try:
-                                v_pattern = (r'\b' + _re.escape(v_low) + r'\b'
-                                             if len(v_low) <= 4
-                                             else r'\b' + _re.escape(v_low))
-                                if _re.search(v_pattern, tender_lower, _re.UNICODE):
-                                    return kw
-                            except _re.error:
-                                if v_low in tender_lower:
-                                    return kw
-
-                    # Известные синонимы (тоже через границу слова)
-                    synonyms_map = {
-                        'linux': ['линукс', 'ubuntu', 'убунту', 'debian', 'centos', 'redhat', 'astra', 'астра', 'альт'],
-                        'линукс': ['linux', 'ubuntu', 'убунту', 'debian', 'centos', 'redhat', 'astra', 'астра'],
-                        'lenovo': ['леново', 'thinkpad', 'синкпад'],
-                        'dell': ['делл'],
-                        'hp': ['hewlett', 'packard', 'хьюлетт', 'паккард'],
-                        'cisco': ['циско'],
-                        'аутентификация': ['авторизация', '2fa', 'mfa', 'двухфакторн', 'многофакторн'],
-                        'сервер': ['серверн', 'blade'],
-                        'антивирус': ['касперский', 'dr.web', 'eset', 'антивирусн'],
-                    }
-                    for synonym in synonyms_map.get(kw_lower, []):
-                        s_low = synonym.lower()
-                        try:
-                            s_pattern = (r'\b' + _re.escape(s_low) + r'\b'
-                                         if len(s_low) <= 4
-                                         else r'\b' + _re.escape(s_low))
-                            if _re.search(s_pattern, tender_lower, _re.UNICODE):
-                                return kw
-                        except _re.error:
-                            if s_low in tender_lower:
-                                return kw
-
-                return None
-
             # ВСЕГДА фильтруем по ключевым словам (и для точного, и для расширенного поиска)
             filtered_results = []
-            keywords_to_check = original_keywords if original_keywords else search_queries
+            keyword_filter = compiled if original_keywords else compile_filter(search_queries)
 
-            # Анти-сервисные префиксы — отбрасываем тендеры на услуги/работы/
+            # Анти-сервисный фильтр — отбрасываем тендеры на услуги/работы/
             # ТО, если в фильтре пользователя нет таких ключей (а у Николая
             # все фильтры исключительно «поставка товаров»).
-            SERVICE_PREFIXES = (
-                'оказание услуг', 'выполнение услуг',
-                'выполнение работ', 'выполнения работ',
-                'оказание услуги',
-                'техническое обслуживание', 'техобслуживание',
-                'сервисное обслуживание',
-                'обслуживание оборудования', 'обслуживание системы',
-                'ремонт и обслуживание', 'обслуживание и ремонт',
-                'текущий ремонт', 'капитальный ремонт',
-                'выполнение комплекса работ',
-                'на оказание услуг', 'на выполнение работ',
-                'оказании услуг', 'выполнении работ',
-                'выполнение пусконаладочных', 'пусконаладочные работы',
-                'демонтаж', 'монтажные работы',
-                'диагностика', 'поверка',
-            )
-
-            def _filter_allows_services(kws: list[str]) -> bool:
-                """True если в keywords явно есть слова про услуги/работы/ремонт —
-                значит пользователь сам хочет такие тендеры."""
-                joined = ' '.join((kws or [])).lower()
-                return any(t in joined for t in (
-                    'услуг', 'работ', 'обслуживан', 'ремонт',
-                    'монтаж', 'установк', 'демонтаж', 'диагностик',
-                    'поверк', 'наладк',
-                ))
-
-            filter_allows_services = _filter_allows_services(keywords_to_check)
-
-            def _is_service_tender(name: str) -> bool:
-                low = (name or '').lower().strip()
-                # стартует с сервисного маркера
-                for p in SERVICE_PREFIXES:
-                    if low.startswith(p):
-                        return True
-                # «на … услуг/работ» в первых ~120 символах названия
-                head = low[:140]
-                if 'оказание услуг' in head or 'выполнение работ' in head:
-                    return True
-                if 'техническое обслуживание' in head or 'техобслуживание' in head:
-                    return True
-                return False
+            filter_allows_services = keyword_filter.allows_services
 
             for tender in search_results:
                 # Матчим только по названию + краткому summary, БЕЗ description.
@@ -712,7 +597,7 @@ class InstantSearch:
                 # работ/обслуживан' в keywords), а тендер начинается со
                 # «Техническое обслуживание/Оказание услуг/Выполнение работ» —
                 # пропускаем.
-                if not filter_allows_services and _is_service_tender(name_text):
+                if not filter_allows_services and is_service_tender(name_text):
                     logger.debug(f"   ⛔ Сервисный тендер (фильтр на товары): {name_text[:80]}")
                     continue
 
@@ -720,7 +605,8 @@ class InstantSearch:
                 if not tender_text:
                     # fallback: если RSS не отдал name/summary — последний шанс
                     tender_text = tender.get('description', '') or ''
-                matched_kw = check_keyword_match(tender_text, keywords_to_check)
+                # Одна альтернация: ключевые слова, транслитерация, синонимы
+                matched_kw = keyword_filter.find_keyword(tender_text)
                 if matched_kw:
                     tender['_matched_original_keyword'] = matched_kw
                     filtered_results.append(tender)
@@ -768,26 +654,12 @@ class InstantSearch:
                     # Если выбраны только товары - исключаем явные услуги
                     if tender_types == ['товары']:
                         # ШАГ 1: Название НАЧИНАЕТСЯ с сервисного слова → точно услуга
-                        service_start = ['услуга ', 'услуги ', 'ремонт ', 'обслуживание ',
-                                        'выполнение ', 'оказание ', 'работы по ',
-                                        'техническое обслуживание', 'сервисное обслуживание',
-                                        'монтаж ', 'демонтаж ', 'проектирование ',
-                                        'разработка проект', 'консультирование ',
-                                        'заправка ', 'восстановление ', 'диагностика ',
-                                        'расчет ', 'расчёт ', 'создание ']
-                        if any(tender_name.startswith(s) for s in service_start):
+                        if tender_name.startswith(GOODS_ONLY_SERVICE_START):
                             logger.debug(f"      ⛔ Исключен (услуга по началу): {tender.get('name', '')[:60]}")
                             continue
 
                         # ШАГ 2: Содержит индикаторы услуг ВЕЗДЕ в названии
-                        service_indicators = ['оказание услуг', 'выполнение работ', 'проведение работ',
-                                             'медицинские услуги', 'услуги по', 'услуга по',
-                                             'работы по ', 'ремонт и обслуживание',
-                                             'техническое обслуживание', 'сервисное обслуживание',
-                                             'текущий ремонт', 'капитальный ремонт',
-                                             'заправка картридж', 'восстановление картридж',
-                                             'заправка и восстановление', 'диагностика и ремонт']
-                        if any(ind in tender_name for ind in service_indicators):
+                        if any(ind in tender_name for ind in GOODS_ONLY_SERVICE_INDICATORS):
                             logger.debug(f"      ⛔ Исключен (индикатор услуги): {tender.get('name', '')[:60]}")
                             continue
 
@@ -832,72 +704,87 @@ class InstantSearch:
 
             if use_ai_check and ai_intent and matches:
 
+                # Высокий score (>=85) — пропускаем без AI проверки
+                to_check = []
                 for tender in matches:
-                    tender_score = tender.get('match_score', 0)
-
-                    # Высокий score (>=85) — пропускаем без AI проверки
-                    if tender_score >= 85:
+                    if tender.get('match_score', 0) >= 85:
                         tender['ai_verified'] = False
                         tender['ai_skipped'] = True
+                    else:
+                        to_check.append(tender)
+
+                # Остальные — пакетной проверкой: один запрос к кэшу в БД,
+                # несколько тендеров на промпт, пакеты параллельно
+                try:
+                    ai_results = await get_relevance_checker().check_relevance_batch(
+                        [
+                            {
+                                'name': tender.get('name', ''),
+                                'description': tender.get('description', '') or tender.get('summary', ''),
+                            }
+                            for tender in to_check
+                        ],
+                        filter_intent=ai_intent,
+                        filter_keywords=original_keywords,
+                        user_id=user_id,
+                        subscription_tier=subscription_tier,
+                        tender_types=tender_types
+                    )
+                except Exception as e:
+                    logger.warning(f"      ⚠️ Ошибка AI: {e}")
+                    # При ошибке — пропускаем тендеры (лучше показать)
+                    ai_results = [{'source': 'exception', 'error': str(e)}] * len(to_check)
+
+                ai_by_tender = {id(tender): result for tender, result in zip(to_check, ai_results)}
+                quota_logged = False
+
+                for tender in matches:
+                    ai_result = ai_by_tender.get(id(tender))
+                    if ai_result is None:
                         ai_filtered_matches.append(tender)
                         continue
 
-                    # Проверяем через AI
-                    try:
-                        ai_result = await check_tender_relevance(
-                            tender_name=tender.get('name', ''),
-                            filter_intent=ai_intent,
-                            filter_keywords=original_keywords,
-                            tender_description=tender.get('description', '') or tender.get('summary', ''),
-                            user_id=user_id,
-                            subscription_tier=subscription_tier,
-                            tender_types=tender_types
-                        )
-
-                        if ai_result.get('is_relevant', True):
-                            # AI подтвердил релевантность
-                            confidence = ai_result.get('confidence', 0)
-                            ai_source = ai_result.get('source', '')
-                            tender['ai_verified'] = ai_source == 'ai'
-                            tender['ai_confidence'] = confidence
-                            tender['ai_reason'] = ai_result.get('reason', '')
-                            # Расширенный анализ
-                            tender['ai_simple_name'] = ai_result.get('simple_name', '')
-                            tender['ai_summary'] = ai_result.get('summary', '')
-                            tender['ai_key_requirements'] = ai_result.get('key_requirements', [])
-                            tender['ai_risks'] = ai_result.get('risks', [])
-                            tender['ai_estimated_competition'] = ai_result.get('estimated_competition', '')
-                            tender['ai_recommendation'] = ai_result.get('recommendation', '')
-
-                            # Composite score: SmartMatcher + AI boost
-                            # Boost ТОЛЬКО для реальных AI-проверок (не fallback/error/quota)
-                            if ai_source in ('ai', 'cache'):
-                                if confidence >= 60:
-                                    tender['match_score'] = min(100, tender['match_score'] + 15)
-                                elif confidence >= 40:
-                                    tender['match_score'] = min(100, tender['match_score'] + 10)
-
-                            ai_filtered_matches.append(tender)
-                        else:
-                            ai_rejected_count += 1
+                    ai_source = ai_result.get('source', '')
+                    if ai_source == 'exception':
+                        tender['ai_verified'] = False
+                        tender['ai_error'] = ai_result['error']
+                        ai_filtered_matches.append(tender)
+                        continue
 
-                        # Проверяем квоту
-                        if ai_result.get('source') == 'quota_exceeded':
+                    if ai_source == 'quota_exceeded':
+                        if not quota_logged:
                             logger.warning(f"   ⚠️ Квота AI исчерпана, остальные без проверки")
-                            # Добавляем оставшиеся без AI проверки
-                            remaining_idx = matches.index(tender) + 1
-                            for remaining in matches[remaining_idx:]:
-                                remaining['ai_verified'] = False
-                                remaining['ai_skipped'] = True
-                                ai_filtered_matches.append(remaining)
-                            break
-
-                    except Exception as e:
-                        logger.warning(f"      ⚠️ Ошибка AI: {e}")
-                        # При ошибке — пропускаем тендер (лучше показать)
+                            quota_logged = True
                         tender['ai_verified'] = False
-                        tender['ai_error'] = str(e)
+                        tender['ai_skipped'] = True
                         ai_filtered_matches.append(tender)
+                        continue
+
+                    if ai_result.get('is_relevant', True):
+                        # AI подтвердил релевантность
+                        confidence = ai_result.get('confidence', 0)
+                        tender['ai_verified'] = ai_source == 'ai'
+                        tender['ai_confidence'] = confidence
+                        tender['ai_reason'] = ai_result.get('reason', '')
+                        # Расширенный анализ
+                        tender['ai_simple_name'] = ai_result.get('simple_name', '')
+                        tender['ai_summary'] = ai_result.get('summary', '')
+                        tender['ai_key_requirements'] = ai_result.get('key_requirements', [])
+                        tender['ai_risks'] = ai_result.get('risks', [])
+                        tender['ai_estimated_competition'] = ai_result.get('estimated_competition', '')
+                        tender['ai_recommendation'] = ai_result.get('recommendation', '')
+
+                        # Composite score: SmartMatcher + AI boost
+                        # Boost ТОЛЬКО для реальных AI-проверок (не fallback/error/quota)
+                        if ai_source in ('ai', 'cache'):
+                            if confidence >= 60:
+                                tender['match_score'] = min(100, tender['match_score'] + 15)
+                            elif confidence >= 40:
+                                tender['match_score'] = min(100, tender['match_score'] + 10)
+
+                        ai_filtered_matches.append(tender)
+                    else:
+                        ai_rejected_count += 1
 
                 matches = ai_filtered_matches
                 logger.info(f"   🤖 AI результат: {len(ai_filtered_matches)} одобрено, {ai_rejected_count} отклонено")
@@ -912,6 +799,8 @@ class InstantSearch:
                 'tenders': search_results,
                 'total_found': len(search_results),
                 'matches': matches,
+                # Номера без данных со страницы (ошибка/дедлайн обогащения)
+                'unenriched': unenriched,
                 'stats': {
                     'search_queries': search_queries,
                     'search_query': ', '.join(search_queries),  # Для совместимости с HTML шаблоном
@@ -938,6 +827,26 @@ class InstantSearch:
                 'error': str(e)
             }
 
+    async def _fetch_query_results(self, consumer: Any = None, **params) -> List[Dict[str, Any]]:
+        """
+        RSS + HTML поиск по одному варианту запроса.
+
+        Через общий пул цикла (если задан) — иначе напрямую, RSS и HTML
+        параллельно для максимального покрытия. consumer — id фильтра для пула.
+        """
+        if self.query_pool is not None:
+            return await self.query_pool.fetch(self.parser, consumer=consumer, **params)
+
+        rss_results, html_results = await asyncio.gather(
+            *run_rss_and_html(self.parser, **params), return_exceptions=True
+        )
+
+        # Объединяем результаты, RSS приоритетнее (больше данных)
+        results, html_new = merge_search_results(rss_results, html_results)
+        if html_new > 0:
+            logger.info(f"      🌐 HTML добавил {html_new} новых тендеров (не было в RSS)")
+        return results
+
     async def generate_html_report(
         self,
         search_results: Dict[str, Any],
@@ -0,0 +1,282 @@
+"""
+Тайминги этапов конвейера Tender Sniper.
+
+Этап (stage) — именованный участок: запрос к zakupki.gov.ru, поиск по
+фильтру, проверка AI, вызов TenderSniperDB, отправка в Telegram. Время
+меряется по time.perf_counter и складывается в гистограмму этапа
+(+ счётчик исключений). Использование:
+
+    with span('zakupki_fetch', kind='rss'):
+        ...
+
+    @timed('telegram_send')
+    async def send_tender_notification(...): ...
+
+    @instrument_methods('db')      # все публичные async-методы, label op=<метод>
+    class TenderSniperDB: ...
+
+Гистограммы отдаются в формате Prometheus на /metrics (bot/health_check.py),
+сводка за цикл мониторинга пишется в лог (TenderSniperService).
+Один реестр на процесс — get_stage_metrics().
+"""
+
+import functools
+import inspect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Границы бакетов, секунды: от SQL-запроса до медленной страницы через прокси
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = 'sniper'
+
+# (stage, ((label, value), ...))
+StageKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """Гистограмма длительностей одного этапа (бакеты не кумулятивные)."""
+
+    __slots__ = ('bucket_counts', 'count', 'sum', 'max', 'errors')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.bucket_counts = [0] * (len(buckets) + 1)  # последний — +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+
+class StageMetrics:
+    """Реестр гистограмм этапов."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[StageKey, Histogram] = {}
+
+    @staticmethod
+    def _key(stage: str, labels: Dict[str, Any]) -> StageKey:
+        return stage, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, stage: str, seconds: float, error: bool = False, **labels) -> None:
+        key = self._key(stage, labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.bucket_counts[index] += 1
+            histogram.count += 1
+            histogram.sum += seconds
+            histogram.max = max(histogram.max, seconds)
+            if error:
+                histogram.errors += 1
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, error, **labels)
+
+    def timed(self, stage: str, **labels):
+        """Декоратор: вызов функции (sync или async) — один span."""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ============================================
+    # СВОДКИ
+    # ============================================
+
+    def snapshot(self) -> Dict[StageKey, Tuple[int, float, int]]:
+        """(count, sum, errors) по этапам — для сводки «с момента snapshot»."""
+        with self._lock:
+            return {key: (h.count, h.sum, h.errors) for key, h in self._histograms.items()}
+
+    def summary_since(self, snapshot: Dict[StageKey, Tuple[int, float, int]]) -> List[Dict[str, Any]]:
+        """Вызовы этапов после snapshot, по убыванию суммарного времени."""
+        rows = []
+        for key, (count, total, errors) in self.snapshot().items():
+            prev_count, prev_total, prev_errors = snapshot.get(key, (0, 0.0, 0))
+            if count == prev_count:
+                continue
+            rows.append({
+                'stage': key[0],
+                'labels': dict(key[1]),
+                'count': count - prev_count,
+                'seconds': total - prev_total,
+                'errors': errors - prev_errors,
+            })
+        rows.sort(key=lambda row: row['seconds'], reverse=True)
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    # ============================================
+    # PROMETHEUS
+    # ============================================
+
+    def render_prometheus(self) -> str:
+        """Гистограммы и счётчики ошибок в текстовом формате Prometheus."""
+        with self._lock:
+            items = sorted(
+                (key, list(h.bucket_counts), h.count, h.sum, h.errors)
+                for key, h in self._histograms.items()
+            )
+        name = f'{METRIC_PREFIX}_stage_duration_seconds'
+        lines = [
+            f'# HELP {name} Duration of sniper pipeline stages.',
+            f'# TYPE {name} histogram',
+        ]
+        for (stage, labels), bucket_counts, count, total, _ in items:
+            base = (('stage', stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(base + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(base)} {total:.6f}')
+            lines.append(f'{name}_count{_labels(base)} {count}')
+
+        errors_name = f'{METRIC_PREFIX}_stage_errors_total'
+        lines.append(f'# HELP {errors_name} Stage calls that raised an exception.')
+        lines.append(f'# TYPE {errors_name} counter')
+        for (stage, labels), _, _, _, errors in items:
+            lines.append(f'{errors_name}{_labels((("stage", stage),) + labels)} {errors}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + '}'
+
+
+def _metric_name(*parts: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', '_'.join(p for p in parts if p))
+
+
+def render_stats(name: str, stats: Dict[str, Any], label: Optional[str] = None) -> str:
+    """
+    get_stats() компонента как gauges Prometheus.
+
+    Args:
+        name: префикс метрик (sniper_<name>_<ключ>)
+        stats: {ключ: число} или, с label, {значение label: {ключ: число}}
+    """
+    rows: Dict[str, List[str]] = {}
+    groups = stats.items() if label else [(None, stats)]
+    for label_value, values in groups:
+        if not isinstance(values, dict):
+            continue
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            metric = _metric_name(METRIC_PREFIX, name, key)
+            pairs = ((label, label_value),) if label else ()
+            rows.setdefault(metric, []).append(f'{metric}{_labels(pairs)} {value}')
+    lines = []
+    for metric, samples in rows.items():
+        lines.append(f'# TYPE {metric} gauge')
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def format_stage_summary(rows: List[Dict[str, Any]], top_ops: int = 3) -> str:
+    """
+    Строка для лога: этапы по убыванию суммарного времени.
+
+    Вызовы параллельны, поэтому суммы больше длительности цикла.
+    Для этапов с label op (db, ai_relevance) — самые дорогие операции.
+    """
+    by_stage: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        stage = by_stage.setdefault(row['stage'], {'count': 0, 'seconds': 0.0, 'errors': 0, 'ops': []})
+        stage['count'] += row['count']
+        stage['seconds'] += row['seconds']
+        stage['errors'] += row['errors']
+        if 'op' in row['labels']:
+            stage['ops'].append(row)
+
+    parts = []
+    for name, stage in sorted(by_stage.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        part = f"{name} {stage['count']}× {stage['seconds']:.2f}с"
+        if stage['errors']:
+            part += f" ({stage['errors']} ошибок)"
+        if stage['ops']:
+            ops = sorted(stage['ops'], key=lambda row: row['seconds'], reverse=True)[:top_ops]
+            part += ' [' + ', '.join(f"{op['labels']['op']} {op['count']}× {op['seconds']:.2f}с" for op in ops) + ']'
+        parts.append(part)
+    return '; '.join(parts)
+
+
+# ============================================
+# ОБЩИЙ РЕЕСТР
+# ============================================
+
+_metrics = StageMetrics()
+
+
+def get_stage_metrics() -> StageMetrics:
+    """Общий на процесс реестр таймингов этапов."""
+    return _metrics
+
+
+def span(stage: str, **labels):
+    """Контекстный менеджер: время блока → гистограмма этапа."""
+    return _metrics.span(stage, **labels)
+
+
+def timed(stage: str, **labels):
+    """Декоратор для sync/async функций (см. StageMetrics.timed)."""
+    return _metrics.timed(stage, **labels)
+
+
+def instrument_methods(stage: str, exclude: Iterable[str] = ()):
+    """
+    Декоратор класса: каждый публичный async-метод — span этапа stage
+    с label op=<имя метода>. Async-генераторы и sync-методы не трогаем.
+    """
+    excluded = set(exclude)
+
+    def decorator(cls):
+        for attr, func in list(vars(cls).items()):
+            if attr.startswith('_') or attr in excluded or not inspect.iscoroutinefunction(func):
+                continue
+            setattr(cls, attr, _metrics.timed(stage, op=attr)(func))
+        return cls
+    return decorator
@@ -0,0 +1,61 @@
+"""Background job: удаляет просроченные записи персистентного кэша (cache_entries).
+
+Запускается из bot/main.py (роль scheduler, только на лидере). Чистит
+пачками по TenderSniperDB.CACHE_SWEEP_CHUNK строк: каждая пачка — короткая
+транзакция DELETE по id, между пачками пауза, чтобы не держать блокировки
+и не мешать запросам кэша на горячем пути.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 3600  # раз в час
+CHUNK_PAUSE_SECONDS = 0.5
+# Потолок пачек за один проход (остальное — в следующий)
+MAX_CHUNKS_PER_SWEEP = 200
+
+
+async def sweep_expired(db=None, max_chunks: int = MAX_CHUNKS_PER_SWEEP, pause: float = CHUNK_PAUSE_SECONDS) -> int:
+    """
+    Один проход чистки.
+
+    Returns:
+        Количество удалённых записей
+    """
+    if db is None:
+        from tender_sniper.database import get_sniper_db
+        db = await get_sniper_db()
+
+    total = 0
+    for _ in range(max_chunks):
+        count = await db.cache_delete_expired(limit=db.CACHE_SWEEP_CHUNK)
+        total += count
+        if count < db.CACHE_SWEEP_CHUNK:
+            break
+        if pause:
+            await asyncio.sleep(pause)
+    return total
+
+
+async def sweep_loop(interval: Optional[int] = None):
+    """Бесконечный цикл чистки кэша."""
+    from tender_sniper.database.persistent_cache import get_cache_metrics
+
+    # Стартовая задержка чтобы не упереться в одновременные старты при деплое
+    await asyncio.sleep(300)
+    while True:
+        try:
+            deleted = await sweep_expired()
+            if deleted:
+                logger.info(f'🗑️ Cache sweeper: удалено {deleted} просроченных записей')
+            stats = get_cache_metrics().get_stats()
+            if stats:
+                logger.info('📊 Cache: ' + ', '.join(
+                    f"{cache_type} {s['hits']}/{s['hits'] + s['misses']} hit, {s['writes']} writes"
+                    for cache_type, s in sorted(stats.items()) if cache_type != '*'
+                ))
+        except Exception as e:
+            logger.error(f'Cache sweeper failed: {e}', exc_info=True)
+        await asyncio.sleep(interval or SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,81 @@
+"""
+Обработчики задач очереди (tender_sniper/jobs/queue.py).
+
+Импортируется воркером (bot.main --role worker): модуль регистрирует
+обработчики через @job_handler. Задачи ставят:
+- report.tenders — меню «Все тендеры» (bot/handlers/all_tenders.py);
+- bitrix24.analyze — вебхук Битрикс24 (bot/health_check.py);
+- sniper.poll — ручной запуск мониторинга из админ-панели.
+"""
+
+import logging
+from typing import Any, Dict
+
+from tender_sniper.jobs.queue import job_handler
+
+logger = logging.getLogger(__name__)
+
+
+_bot = None
+_poll_service = None
+
+
+def _get_bot():
+    """Bot API клиент воркера для отправки результатов пользователям."""
+    global _bot
+    if _bot is None:
+        from aiogram import Bot
+        from bot.config import BotConfig
+        _bot = Bot(token=BotConfig.BOT_TOKEN)
+    return _bot
+
+
+async def close_handler_resources() -> None:
+    """Закрывает HTTP-сессию Bot при остановке воркера."""
+    global _bot
+    if _bot is not None:
+        await _bot.session.close()
+        _bot = None
+
+
+@job_handler('report.tenders')
+async def run_tenders_report(payload: Dict[str, Any]) -> None:
+    """Генерирует отчёт по тендерам (HTML/Excel) и присылает файлом."""
+    from aiogram.types import FSInputFile
+    from bot.handlers.all_tenders import build_tenders_report
+
+    report = await build_tenders_report(
+        payload['user_id'],
+        payload.get('format', 'html'),
+        payload.get('params'),
+    )
+    await _get_bot().send_document(
+        payload['chat_id'],
+        document=FSInputFile(report.path, filename=report.filename),
+        caption=payload.get('caption'),
+        parse_mode="HTML"
+    )
+
+
+@job_handler('bitrix24.analyze')
+async def run_bitrix24_analyze(payload: Dict[str, Any]) -> None:
+    """AI-анализ документации по сделке Битрикс24."""
+    from bot.health_check import _process_bitrix24_ai_analyze
+    await _process_bitrix24_ai_analyze(str(payload['deal_id']))
+
+
+@job_handler('sniper.poll')
+async def run_sniper_poll(payload: Dict[str, Any]) -> None:
+    """Один цикл мониторинга по всем фильтрам."""
+    global _poll_service
+    if _poll_service is None:
+        from bot.config import BotConfig
+        from tender_sniper.service import TenderSniperService
+        service = TenderSniperService(
+            bot_token=BotConfig.BOT_TOKEN,
+            poll_interval=300,
+            max_tenders_per_poll=payload.get('max_tenders_per_poll', 50)
+        )
+        await service.initialize()
+        _poll_service = service
+    await _poll_service.run_single_poll()
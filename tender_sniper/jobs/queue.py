@@ -0,0 +1,461 @@
+"""
+Очередь фоновых задач в БД и выбор лидера между репликами.
+
+bot.main раньше запускал всё (polling, мониторинг, планировщики, отчёты,
+AI-анализ) как asyncio.create_task в одном процессе. Теперь процесс
+запускается с ролью (--role bot|sniper|scheduler|web|worker, см. bot/main.py),
+а тяжёлая работа передаётся воркерам через таблицу background_jobs:
+
+- enqueue() — задача с приоритетом, отложенным стартом и dedup_key
+  (не больше одной незавершённой задачи с этим ключом);
+- воркер забирает задачи SELECT ... FOR UPDATE SKIP LOCKED и держит
+  аренду (locked_until), продлевая её, пока задача выполняется; аренда
+  упавшего воркера истекает — задачу заберёт другой;
+- ошибка → повтор с экспоненциальной задержкой до max_attempts, затем failed.
+
+LeaderElector — аренда в leader_leases: периодические задачи (планировщики,
+цикл мониторинга) работают только на одной реплике; если лидер пропал,
+после LEASE_SECONDS лидерство забирает другая.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import BackgroundJob, DatabaseSession, LeaderLease
+
+logger = logging.getLogger(__name__)
+
+
+# Обработчики задач: job_type → async handler(payload)
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+
+
+def job_handler(job_type: str):
+    """Декоратор регистрации обработчика задачи."""
+    def decorator(func_):
+        JOB_HANDLERS[job_type] = func_
+        return func_
+    return decorator
+
+
+def is_queue_mode() -> bool:
+    """
+    Задачи уходят в очередь воркерам (JOB_QUEUE_ENABLED=1).
+
+    Выставляется при запуске bot.main с ролью, отличной от 'all'; без него
+    тяжёлая работа выполняется в текущем процессе, как раньше.
+    """
+    return os.getenv('JOB_QUEUE_ENABLED') == '1'
+
+
+def get_instance_id() -> str:
+    """Идентификатор процесса для аренды задач и лидерства."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============================================
+# ОЧЕРЕДЬ
+# ============================================
+
+class JobQueue:
+    """Durable очередь задач поверх таблицы background_jobs."""
+
+    # Аренда задачи воркером; продлевается каждые LEASE_SECONDS / 3
+    LEASE_SECONDS = 300
+
+    # Повтор после ошибки: RETRY_BASE_DELAY * 2^(попытка-1), не больше RETRY_MAX_DELAY
+    RETRY_BASE_DELAY = 30
+    RETRY_MAX_DELAY = 3600
+
+    DEFAULT_PRIORITY = 100
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = DEFAULT_PRIORITY,
+        delay_seconds: float = 0,
+        dedup_key: Optional[str] = None,
+        max_attempts: int = 3
+    ) -> Optional[int]:
+        """
+        Ставит задачу в очередь.
+
+        Args:
+            priority: меньше — раньше (интерактивные задачи пользователей < 100)
+            dedup_key: если незавершённая задача с этим ключом уже есть — не ставим
+
+        Returns:
+            id задачи или None (дубликат по dedup_key)
+        """
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload or {},
+            priority=priority,
+            run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            dedup_key=dedup_key,
+            max_attempts=max_attempts,
+        )
+        try:
+            async with DatabaseSession() as session:
+                session.add(job)
+                await session.flush()
+                job_id = job.id
+        except IntegrityError:
+            if dedup_key is None:
+                raise
+            logger.debug(f"Job {job_type} ({dedup_key}) уже в очереди")
+            return None
+        logger.info(f"📥 Задача #{job_id} {job_type} поставлена в очередь (priority={priority})")
+        return job_id
+
+    async def lease(
+        self,
+        worker_id: str,
+        job_types: Optional[Iterable[str]] = None,
+        limit: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Забирает до limit готовых задач (pending или с истёкшей арендой).
+
+        Конкурентные воркеры не блокируют друг друга: строки, уже захваченные
+        другим воркером, пропускаются (FOR UPDATE SKIP LOCKED; на SQLite
+        запись и так сериализована).
+        """
+        now = datetime.utcnow()
+        ready = and_(
+            BackgroundJob.run_after <= now,
+            or_(
+                BackgroundJob.status == 'pending',
+                and_(BackgroundJob.status == 'running', BackgroundJob.locked_until < now),
+            ),
+        )
+        query = select(BackgroundJob).where(ready)
+        if job_types:
+            query = query.where(BackgroundJob.job_type.in_(list(job_types)))
+        query = (
+            query.order_by(BackgroundJob.priority, BackgroundJob.run_after, BackgroundJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        async with DatabaseSession() as session:
+            jobs = (await session.execute(query)).scalars().all()
+            leased = []
+            for job in jobs:
+                job.status = 'running'
+                job.locked_by = worker_id
+                job.locked_until = now + timedelta(seconds=self.LEASE_SECONDS)
+                job.attempts = (job.attempts or 0) + 1
+                leased.append({
+                    'id': job.id,
+                    'job_type': job.job_type,
+                    'payload': job.payload or {},
+                    'attempts': job.attempts,
+                    'max_attempts': job.max_attempts,
+                })
+        return leased
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Продлевает аренду. False — задачу уже забрал другой воркер."""
+        async with DatabaseSession() as session:
+            result = await session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id, BackgroundJob.locked_by == worker_id)
+                .values(locked_until=datetime.utcnow() + timedelta(seconds=self.LEASE_SECONDS))
+            )
+            return result.rowcount > 0
+
+    async def release(self, job_id: int) -> None:
+        """Возвращает задачу в очередь без траты попытки (остановка воркера)."""
+        async with DatabaseSession() as session:
+            await session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .values(
+                    status='pending', attempts=BackgroundJob.attempts - 1,
+                    locked_by=None, locked_until=None,
+                )
+            )
+
+    async def complete(self, job_id: int) -> None:
+        async with DatabaseSession() as session:
+            await session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .values(
+                    status='done', finished_at=datetime.utcnow(),
+                    locked_by=None, locked_until=None, dedup_key=None,
+                )
+            )
+
+    async def fail(self, job_id: int, error: str, attempts: int, max_attempts: int) -> bool:
+        """
+        Фиксирует ошибку задачи.
+
+        Returns:
+            True — задача будет повторена, False — попытки исчерпаны (failed)
+        """
+        values: Dict[str, Any] = {
+            'last_error': error[:2000],
+            'locked_by': None,
+            'locked_until': None,
+        }
+        retry = attempts < max_attempts
+        if retry:
+            delay = min(self.RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0)), self.RETRY_MAX_DELAY)
+            values.update(status='pending', run_after=datetime.utcnow() + timedelta(seconds=delay))
+        else:
+            values.update(status='failed', finished_at=datetime.utcnow(), dedup_key=None)
+        async with DatabaseSession() as session:
+            await session.execute(
+                update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values)
+            )
+        return retry
+
+    async def get_stats(self) -> Dict[str, int]:
+        """Количество задач по статусам."""
+        async with DatabaseSession() as session:
+            rows = await session.execute(
+                select(BackgroundJob.status, func.count()).group_by(BackgroundJob.status)
+            )
+            return {status: count for status, count in rows.all()}
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
+
+
+# ============================================
+# ВОРКЕР
+# ============================================
+
+class JobWorker:
+    """Забирает задачи из очереди и выполняет зарегистрированные обработчики."""
+
+    POLL_INTERVAL = 2.0  # секунды между опросами пустой очереди
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        job_types: Optional[Iterable[str]] = None,
+        concurrency: int = 2,
+        worker_id: Optional[str] = None
+    ):
+        self.queue = queue or get_job_queue()
+        self.job_types = list(job_types) if job_types else None
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or get_instance_id()
+        self._running = False
+        self._active: set = set()
+        self._wakeup = asyncio.Event()
+        self._stats = {'done': 0, 'retried': 0, 'failed': 0}
+
+    async def run(self) -> None:
+        """Основной цикл воркера (до stop())."""
+        self._running = True
+        types = ', '.join(self.job_types) if self.job_types else 'все'
+        logger.info(f"👷 Воркер {self.worker_id} запущен (задачи: {types}, параллельно: {self.concurrency})")
+        while self._running:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._active)
+            jobs = []
+            if free > 0:
+                try:
+                    jobs = await self.queue.lease(self.worker_id, self.job_types, free)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка чтения очереди задач: {e}")
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._active.add(task)
+                task.add_done_callback(self._on_done)
+            # Ждём освобождения слота или следующего опроса очереди
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self._wakeup.set()
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        job_id, job_type = job['id'], job['job_type']
+        handler = JOB_HANDLERS.get(job_type)
+        if handler is None:
+            await self.queue.fail(job_id, f"Нет обработчика для {job_type}", job['max_attempts'], job['max_attempts'])
+            self._stats['failed'] += 1
+            logger.error(f"❌ Задача #{job_id}: нет обработчика {job_type}")
+            return
+        if job['attempts'] > job['max_attempts']:
+            # Аренда истекала max_attempts раз — воркер падает на этой задаче
+            await self.queue.fail(job_id, 'Аренда истекла: воркер не завершил задачу', job['attempts'], job['max_attempts'])
+            self._stats['failed'] += 1
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        started = time.monotonic()
+        try:
+            await handler(job['payload'])
+        except asyncio.CancelledError:
+            # Остановка воркера — вернём задачу в очередь без траты попытки
+            await asyncio.shield(self.queue.release(job_id))
+            raise
+        except Exception as e:
+            retry = await self.queue.fail(job_id, f"{type(e).__name__}: {e}", job['attempts'], job['max_attempts'])
+            self._stats['retried' if retry else 'failed'] += 1
+            logger.error(
+                f"❌ Задача #{job_id} {job_type} (попытка {job['attempts']}/{job['max_attempts']}): {e}",
+                exc_info=True
+            )
+        else:
+            await self.queue.complete(job_id)
+            self._stats['done'] += 1
+            logger.info(f"✅ Задача #{job_id} {job_type} выполнена за {time.monotonic() - started:.1f}с")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.queue.LEASE_SECONDS / 3)
+            try:
+                await self.queue.heartbeat(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось продлить аренду задачи #{job_id}: {e}")
+
+    async def stop(self, timeout: float = 30) -> None:
+        """Останавливает приём задач и ждёт текущие (не дольше timeout)."""
+        self._running = False
+        self._wakeup.set()
+        if not self._active:
+            return
+        done, pending = await asyncio.wait(set(self._active), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'active': len(self._active)}
+
+
+# ============================================
+# ВЫБОР ЛИДЕРА
+# ============================================
+
+class LeaderElector:
+    """Аренда лидерства по имени: одна реплика выполняет периодические задачи."""
+
+    LEASE_SECONDS = 60
+
+    def __init__(self, name: str, holder: Optional[str] = None, lease_seconds: Optional[int] = None):
+        self.name = name
+        self.holder = holder or get_instance_id()
+        self.lease_seconds = lease_seconds or self.LEASE_SECONDS
+
+    async def try_acquire(self) -> bool:
+        """Берёт или продлевает аренду. True — эта реплика лидер."""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        async with DatabaseSession() as session:
+            result = await session.execute(
+                update(LeaderLease)
+                .where(
+                    LeaderLease.name == self.name,
+                    or_(LeaderLease.holder == self.holder, LeaderLease.expires_at < now),
+                )
+                .values(holder=self.holder, expires_at=expires_at)
+            )
+            if result.rowcount > 0:
+                return True
+        try:
+            async with DatabaseSession() as session:
+                session.add(LeaderLease(name=self.name, holder=self.holder, expires_at=expires_at))
+                await session.flush()
+        except IntegrityError:
+            return False  # аренда есть и действует у другой реплики
+        return True
+
+    async def release(self) -> None:
+        async with DatabaseSession() as session:
+            await session.execute(
+                update(LeaderLease)
+                .where(LeaderLease.name == self.name, LeaderLease.holder == self.holder)
+                .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+
+    async def run_while_leader(self, factory: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Выполняет factory() только пока эта реплика — лидер.
+
+        Standby-реплики ждут и пробуют взять аренду каждые LEASE_SECONDS / 3.
+        Если продлить аренду не удалось до её истечения, задача отменяется
+        (лидерство уже могло перейти к другой реплике).
+        """
+        renew_every = self.lease_seconds / 3
+        announced_standby = False
+        while True:
+            try:
+                acquired = await self.try_acquire()
+            except Exception as e:
+                logger.warning(f"⚠️ Лидерство {self.name}: ошибка БД: {e}")
+                acquired = False
+            if not acquired:
+                if not announced_standby:
+                    logger.info(f"⏸️ {self.name}: лидер — другая реплика, ждём")
+                    announced_standby = True
+                await asyncio.sleep(renew_every)
+                continue
+
+            announced_standby = False
+            logger.info(f"👑 {self.name}: эта реплика ({self.holder}) — лидер")
+            valid_until = time.monotonic() + self.lease_seconds
+            task = asyncio.create_task(factory())
+            try:
+                while not task.done():
+                    await asyncio.wait({task}, timeout=renew_every)
+                    if task.done():
+                        break
+                    try:
+                        if await self.try_acquire():
+                            valid_until = time.monotonic() + self.lease_seconds
+                            continue
+                        logger.warning(f"⚠️ {self.name}: лидерство перехвачено, останавливаемся")
+                    except Exception as e:
+                        logger.warning(f"⚠️ {self.name}: не удалось продлить лидерство: {e}")
+                        if time.monotonic() < valid_until:
+                            continue
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    break
+            except asyncio.CancelledError:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                try:
+                    await self.release()
+                except Exception:
+                    pass
+                raise
+
+            if task.done() and not task.cancelled():
+                if task.exception():
+                    logger.error(f"❌ {self.name}: задача лидера упала: {task.exception()}")
+                    await asyncio.sleep(renew_every)
+                else:
+                    # Задача лидера завершилась штатно — отдаём лидерство
+                    await self.release()
+                    return
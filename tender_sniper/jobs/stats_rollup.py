@@ -0,0 +1,316 @@
+"""Background job: rollup счётчиков уведомлений для админки.
+
+Графики /api/stats/* и дашборд админки читают notification_stats_rollup
+(O(бакетов)) вместо выборки всех sent_at из sniper_notifications.
+
+Rollup пополняется инкрементально: проход берёт уведомления с id больше
+watermark (stats_rollup_state) пачками по COMPACT_CHUNK, считает их по часам
+и дням (всего / тариф / фильтр / источник) и прибавляет к счётчикам upsert'ом.
+Ещё не учтённый хвост (id > watermark) читатели досчитывают сами, поэтому
+цифры точные и между проходами.
+
+Запускается из bot/main.py (роль scheduler, только на лидере). Первый проход
+на пустом rollup сам догоняет историю; пересчёт с нуля:
+
+    python -m tender_sniper.jobs.stats_rollup --rebuild
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+
+from database import (
+    DatabaseSession, NotificationStatsRollup, SniperNotification, SniperUser, StatsRollupState
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = 'notifications'
+COMPACT_INTERVAL_SECONDS = 300  # каждые 5 минут
+COMPACT_CHUNK = 2000
+CHUNK_PAUSE_SECONDS = 0.2
+# Потолок пачек за один проход (догон истории — несколькими проходами)
+MAX_CHUNKS_PER_PASS = 50
+# Свежие уведомления откладываем до следующего прохода: транзакция
+# с меньшим id могла ещё не закоммититься
+SETTLE_SECONDS = 60
+# Часовые бакеты нужны только графику за последние 7 дней
+HOURLY_RETENTION_DAYS = 14
+
+GRANULARITIES = ('hour', 'day')
+DIMENSIONS = ('total', 'tier', 'filter', 'source')
+
+# (granularity, dimension, dimension_value, bucket_start) → count
+RollupCounts = Dict[Tuple[str, str, str, datetime], int]
+
+
+# ============================================
+# АГРЕГАЦИЯ
+# ============================================
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Начало часа/дня, в который попадает момент."""
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def aggregate_notifications(
+    rows: Iterable[Sequence],
+    granularities: Sequence[str] = GRANULARITIES,
+    dimensions: Sequence[str] = DIMENSIONS,
+) -> RollupCounts:
+    """
+    Счётчики по строкам уведомлений.
+
+    Args:
+        rows: (id, sent_at, filter_id, tender_source, subscription_tier)
+    """
+    counts: RollupCounts = defaultdict(int)
+    for _, sent_at, filter_id, source, tier in rows:
+        values = {
+            'total': '',
+            'tier': tier or 'unknown',
+            'filter': str(filter_id) if filter_id else 'none',
+            'source': source or 'automonitoring',
+        }
+        for granularity in granularities:
+            bucket = bucket_start(sent_at, granularity)
+            for dimension in dimensions:
+                counts[(granularity, dimension, values[dimension], bucket)] += 1
+    return counts
+
+
+def _notification_rows(after_id: int):
+    """Уведомления с id > after_id в порядке id (с тарифом владельца)."""
+    return (
+        select(
+            SniperNotification.id,
+            SniperNotification.sent_at,
+            SniperNotification.filter_id,
+            SniperNotification.tender_source,
+            SniperUser.subscription_tier,
+        )
+        .outerjoin(SniperUser, SniperNotification.user_id == SniperUser.id)
+        .where(SniperNotification.id > after_id)
+        .order_by(SniperNotification.id)
+    )
+
+
+async def _add_counts(session, counts: RollupCounts):
+    """Прибавляет счётчики: INSERT ... ON CONFLICT DO UPDATE count = count + excluded.count."""
+    if not counts:
+        return
+    rows = [
+        {'granularity': g, 'dimension': d, 'dimension_value': v, 'bucket_start': b, 'count': c}
+        for (g, d, v, b), c in counts.items()
+    ]
+    dialect = session.bind.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    if dialect_insert is None:
+        # Диалект без ON CONFLICT — построчно
+        for row in rows:
+            existing = await session.scalar(
+                select(NotificationStatsRollup).where(
+                    NotificationStatsRollup.granularity == row['granularity'],
+                    NotificationStatsRollup.dimension == row['dimension'],
+                    NotificationStatsRollup.dimension_value == row['dimension_value'],
+                    NotificationStatsRollup.bucket_start == row['bucket_start'],
+                )
+            )
+            if existing:
+                existing.count += row['count']
+            else:
+                session.add(NotificationStatsRollup(**row))
+        return
+
+    for i in range(0, len(rows), 500):
+        stmt = dialect_insert(NotificationStatsRollup).values(rows[i:i + 500])
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['granularity', 'dimension', 'dimension_value', 'bucket_start'],
+                set_={'count': NotificationStatsRollup.count + stmt.excluded.count},
+            )
+        )
+
+
+# ============================================
+# ПОПОЛНЕНИЕ
+# ============================================
+
+async def compact_once(chunk: int = COMPACT_CHUNK) -> int:
+    """
+    Учитывает одну пачку новых уведомлений (одна транзакция).
+
+    Returns:
+        Количество учтённых уведомлений
+    """
+    settled_before = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    async with DatabaseSession() as session:
+        state = await session.get(StatsRollupState, ROLLUP_NAME)
+        last_id = state.last_id if state else 0
+        rows = (await session.execute(_notification_rows(last_id).limit(chunk))).all()
+
+        settled = []
+        for row in rows:
+            if row.sent_at > settled_before:
+                break
+            settled.append(row)
+        if not settled:
+            return 0
+
+        await _add_counts(session, aggregate_notifications(settled))
+        if state is None:
+            state = StatsRollupState(name=ROLLUP_NAME)
+            session.add(state)
+        state.last_id = settled[-1].id
+        state.updated_at = datetime.utcnow()
+    return len(settled)
+
+
+async def compact(max_chunks: Optional[int] = MAX_CHUNKS_PER_PASS, pause: float = CHUNK_PAUSE_SECONDS) -> int:
+    """
+    Проход: пачки до конца хвоста или до max_chunks (None — без ограничения).
+
+    Returns:
+        Количество учтённых уведомлений
+    """
+    total = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        count = await compact_once()
+        total += count
+        chunks += 1
+        if count < COMPACT_CHUNK:
+            break
+        if pause:
+            await asyncio.sleep(pause)
+    return total
+
+
+async def prune_hourly(retention_days: int = HOURLY_RETENTION_DAYS) -> int:
+    """Удаляет часовые бакеты старше retention_days (дневные хранятся всегда)."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    async with DatabaseSession() as session:
+        result = await session.execute(
+            delete(NotificationStatsRollup).where(
+                NotificationStatsRollup.granularity == 'hour',
+                NotificationStatsRollup.bucket_start < cutoff,
+            )
+        )
+        return result.rowcount or 0
+
+
+async def rebuild() -> int:
+    """
+    Пересчёт rollup с нуля по всем уведомлениям в БД.
+
+    Уведомления, удалённые чисткой старых данных, из истории пропадут.
+
+    Returns:
+        Количество учтённых уведомлений
+    """
+    async with DatabaseSession() as session:
+        await session.execute(delete(NotificationStatsRollup))
+        await session.execute(delete(StatsRollupState).where(StatsRollupState.name == ROLLUP_NAME))
+    total = await compact(max_chunks=None, pause=0)
+    await prune_hourly()
+    return total
+
+
+async def rollup_loop(interval: Optional[int] = None):
+    """Бесконечный цикл пополнения rollup."""
+    # Стартовая задержка чтобы не упереться в одновременные старты при деплое
+    await asyncio.sleep(90)
+    while True:
+        delay = interval or COMPACT_INTERVAL_SECONDS
+        try:
+            processed = await compact()
+            if processed:
+                logger.info(f'📊 Stats rollup: учтено {processed} уведомлений')
+            if processed >= MAX_CHUNKS_PER_PASS * COMPACT_CHUNK:
+                delay = CHUNK_PAUSE_SECONDS  # догоняем историю
+            else:
+                await prune_hourly()
+        except Exception as e:
+            logger.error(f'Stats rollup failed: {e}', exc_info=True)
+        await asyncio.sleep(delay)
+
+
+# ============================================
+# ЧТЕНИЕ (админка)
+# ============================================
+
+async def notification_series(
+    granularity: str,
+    since: datetime,
+    dimension: str = 'total',
+) -> Dict[str, Dict[datetime, int]]:
+    """
+    Счётчики уведомлений по бакетам начиная с бакета, содержащего since.
+
+    Returns:
+        {dimension_value: {bucket_start: count}}; для dimension='total' ключ ''
+    """
+    start = bucket_start(since, granularity)
+    series: Dict[str, Dict[datetime, int]] = defaultdict(dict)
+    async with DatabaseSession() as session:
+        last_id = await session.scalar(
+            select(StatsRollupState.last_id).where(StatsRollupState.name == ROLLUP_NAME)
+        ) or 0
+        result = await session.execute(
+            select(
+                NotificationStatsRollup.dimension_value,
+                NotificationStatsRollup.bucket_start,
+                NotificationStatsRollup.count,
+            ).where(
+                NotificationStatsRollup.granularity == granularity,
+                NotificationStatsRollup.dimension == dimension,
+                NotificationStatsRollup.bucket_start >= start,
+            )
+        )
+        for value, bucket, count in result.all():
+            series[value][bucket] = count
+
+        # Хвост, который rollup ещё не учёл
+        tail = (await session.execute(
+            _notification_rows(last_id).where(SniperNotification.sent_at >= start)
+        )).all()
+
+    for (_, _, value, bucket), count in aggregate_notifications(tail, (granularity,), (dimension,)).items():
+        series[value][bucket] = series[value].get(bucket, 0) + count
+    return series
+
+
+async def notification_count(since: datetime, granularity: str = 'hour') -> int:
+    """Уведомлений с начала бакета, содержащего since."""
+    series = await notification_series(granularity, since)
+    return sum(series.get('', {}).values())
+
+
+async def _main(rebuild_all: bool):
+    if rebuild_all:
+        total = await rebuild()
+        print(f'Rollup пересчитан: {total} уведомлений')
+    else:
+        total = await compact(max_chunks=None, pause=0)
+        print(f'Учтено новых уведомлений: {total}')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rollup счётчиков уведомлений для админки')
+    parser.add_argument('--rebuild', action='store_true', help='пересчитать rollup с нуля')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.rebuild))
@@ -15,8 +15,19 @@ Example usage:
 
     # Batch matching
     results = matcher.batch_match(tenders, filters, min_score=75)
+
+    # Поток тендеров против всех активных фильтров (инвертированный индекс)
+    index = FilterIndex()
+    index.build(filters)
+    matches = index.match(tender, min_score=75)
+
+    # Текстовые правила фильтра, скомпилированные один раз на версию фильтра
+    compiled = compile_filter(keywords, exclude_keywords)
+    compiled.find_keyword(text)
 """
 
 from .smart_matcher import SmartMatcher
+from .filter_index import FilterIndex, get_filter_index
+from .compiled_filter import CompiledFilter, compile_filter
 
-__all__ = ['SmartMatcher']
+__all__ = ['SmartMatcher', 'FilterIndex', 'get_filter_index', 'CompiledFilter', 'compile_filter']
@@ -0,0 +1,247 @@
+"""
+CompiledFilter — текстовые правила фильтра, собранные один раз.
+
+InstantSearch.search_by_filter для каждого тендера заново строил regex по
+каждому ключевому слову, слову-исключению, варианту транслитерации и
+синониму (вложенные циклы), а таблицы синонимов и сервисных маркеров
+создавались при каждом вызове. Здесь правила компилируются один раз на
+версию фильтра: ключ кэша — содержимое keywords / exclude_keywords /
+customer_keywords, поэтому правка фильтра даёт новый объект, а все поиски
+и тендеры одной версии используют готовый.
+
+- include — одна альтернация по ключевым словам, их транслитерациям
+  и синонимам (клиентская проверка InstantSearch);
+- roots — одна альтернация по корням ключевых слов (первичный отсев
+  выдачи RSS);
+- exclude — одна альтернация по словам-исключениям, семантика
+  SmartMatcher._word_boundary_match (общая для InstantSearch и SmartMatcher);
+- разбиение ключевых слов SmartMatcher на составные фразы и значимые слова.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Слова, которые не считаются ключевыми в клиентской проверке InstantSearch
+INCLUDE_STOP_WORDS = frozenset({
+    'закупка', 'закупки', 'услуга', 'услуги',
+    'поставка', 'поставки', 'работа', 'работы',
+    'для', 'нужд', 'оказание', 'выполнение',
+})
+
+# Известные синонимы ключевых слов (тоже через границу слова)
+KEYWORD_SYNONYMS: Dict[str, List[str]] = {
+    'linux': ['линукс', 'ubuntu', 'убунту', 'debian', 'centos', 'redhat', 'astra', 'астра', 'альт'],
+    'линукс': ['linux', 'ubuntu', 'убунту', 'debian', 'centos', 'redhat', 'astra', 'астра'],
+    'lenovo': ['леново', 'thinkpad', 'синкпад'],
+    'dell': ['делл'],
+    'hp': ['hewlett', 'packard', 'хьюлетт', 'паккард'],
+    'cisco': ['циско'],
+    'аутентификация': ['авторизация', '2fa', 'mfa', 'двухфакторн', 'многофакторн'],
+    'сервер': ['серверн', 'blade'],
+    'антивирус': ['касперский', 'dr.web', 'eset', 'антивирусн'],
+}
+
+# Маркеры ключевых слов, при которых пользователь сам ищет услуги/работы
+SERVICE_KEYWORD_MARKERS = (
+    'услуг', 'работ', 'обслуживан', 'ремонт',
+    'монтаж', 'установк', 'демонтаж', 'диагностик',
+    'поверк', 'наладк',
+)
+
+# Начало названия, по которому тендер — услуга/работы, а не поставка
+SERVICE_PREFIXES = (
+    'оказание услуг', 'выполнение услуг',
+    'выполнение работ', 'выполнения работ',
+    'оказание услуги',
+    'техническое обслуживание', 'техобслуживание',
+    'сервисное обслуживание',
+    'обслуживание оборудования', 'обслуживание системы',
+    'ремонт и обслуживание', 'обслуживание и ремонт',
+    'текущий ремонт', 'капитальный ремонт',
+    'выполнение комплекса работ',
+    'на оказание услуг', 'на выполнение работ',
+    'оказании услуг', 'выполнении работ',
+    'выполнение пусконаладочных', 'пусконаладочные работы',
+    'демонтаж', 'монтажные работы',
+    'диагностика', 'поверка',
+)
+
+# Фильтр «только товары»: услуга по началу названия и по индикаторам в нём
+GOODS_ONLY_SERVICE_START = (
+    'услуга ', 'услуги ', 'ремонт ', 'обслуживание ',
+    'выполнение ', 'оказание ', 'работы по ',
+    'техническое обслуживание', 'сервисное обслуживание',
+    'монтаж ', 'демонтаж ', 'проектирование ',
+    'разработка проект', 'консультирование ',
+    'заправка ', 'восстановление ', 'диагностика ',
+    'расчет ', 'расчёт ', 'создание ',
+)
+GOODS_ONLY_SERVICE_INDICATORS = (
+    'оказание услуг', 'выполнение работ', 'проведение работ',
+    'медицинские услуги', 'услуги по', 'услуга по',
+    'работы по ', 'ремонт и обслуживание',
+    'техническое обслуживание', 'сервисное обслуживание',
+    'текущий ремонт', 'капитальный ремонт',
+    'заправка картридж', 'восстановление картридж',
+    'заправка и восстановление', 'диагностика и ремонт',
+)
+
+
+def is_service_tender(name: str) -> bool:
+    """Название тендера на услуги/работы/ТО (а не на поставку товара)."""
+    low = (name or '').lower().strip()
+    # стартует с сервисного маркера
+    if low.startswith(SERVICE_PREFIXES):
+        return True
+    # «на … услуг/работ» в первых ~140 символах названия
+    head = low[:140]
+    return any(marker in head for marker in (
+        'оказание услуг', 'выполнение работ', 'техническое обслуживание', 'техобслуживание'
+    ))
+
+
+def _word_regex(word: str, strict_max_len: int) -> Tuple[str, bool]:
+    """
+    Слово с границами: короткое (<= strict_max_len) — целиком \\bword\\b,
+    длинное — по началу слова \\bword (морфология: «батарейка» → «батарейки»).
+
+    Returns:
+        (терм без ведущего \\b, терм с начала слова)
+    """
+    escaped = re.escape(word)
+    return (rf'{escaped}\b' if len(word) <= strict_max_len else escaped), True
+
+
+def _alternation(terms: Sequence[Tuple[str, bool]], flags: int = re.IGNORECASE) -> Optional[re.Pattern]:
+    """
+    Одна regex-альтернация с группой k<i> на каждый терм (или None).
+
+    Общий \\b термов «с начала слова» вынесен за скобки: иначе re перебирает
+    все альтернативы на каждой позиции текста, а так — только на границах слов.
+    """
+    if not terms:
+        return None
+    at_word_start = '|'.join(f'(?P<k{i}>{body})' for i, (body, bounded) in enumerate(terms) if bounded)
+    parts = [rf'\b(?:{at_word_start})'] if at_word_start else []
+    parts += [f'(?P<k{i}>{body})' for i, (body, bounded) in enumerate(terms) if not bounded]
+    return re.compile('|'.join(parts), flags)
+
+
+class CompiledFilter:
+    """Предкомпилированные текстовые правила одной версии фильтра."""
+
+    def __init__(
+        self,
+        keywords: Tuple[str, ...],
+        exclude_keywords: Tuple[str, ...] = (),
+        customer_keywords: Tuple[str, ...] = ()
+    ):
+        from src.utils.transliterator import Transliterator
+
+        self.keywords = keywords
+        self.exclude_keywords = exclude_keywords
+        self.customer_keywords = tuple(kw.lower() for kw in customer_keywords)
+
+        # include: ключевое слово / транслитерация / синоним → исходное ключевое слово
+        include_terms: List[Tuple[str, bool]] = []
+        self._include_owner: List[str] = []
+        for kw in keywords:
+            kw_lower = kw.lower().strip()
+            if len(kw_lower) < 2 or kw_lower in INCLUDE_STOP_WORDS:
+                continue
+            # Фраза (есть пробел) → подстрока; одиночное слово → границы слова,
+            # чтобы «фен» не ловился в «фенацетин»
+            variants = [(re.escape(kw_lower), False) if ' ' in kw_lower else _word_regex(kw_lower, 4)]
+            # Латинские бренды: транслитерация
+            if kw.isascii():
+                variants += [
+                    _word_regex(v.lower(), 4)
+                    for v in Transliterator.generate_variants(kw)
+                    if v.lower() != kw_lower
+                ]
+            variants += [_word_regex(s.lower(), 4) for s in KEYWORD_SYNONYMS.get(kw_lower, [])]
+            include_terms += variants
+            self._include_owner += [kw] * len(variants)
+        # Текст уже в нижнем регистре — сравнение как было, без IGNORECASE
+        self.include_pattern = _alternation(include_terms, flags=0)
+
+        # roots: короткие слова целиком, длинные — по корню не короче 7 символов
+        # ("разработка" → "разрабо", а не "разра", которое ловит "разгрузка")
+        root_terms = []
+        for kw in keywords:
+            kw_lower = kw.lower()
+            if len(kw_lower) <= 4:
+                root_terms.append(_word_regex(kw_lower, 4))
+            else:
+                min_chars = min(len(kw_lower), max(7, len(kw_lower) - 3))
+                root_terms.append((re.escape(kw_lower[:min_chars]), True))
+        self.root_pattern = _alternation(root_terms)
+
+        # exclude: как SmartMatcher._word_boundary_match (< 4 символов — целиком)
+        exclude_words = [kw for kw in exclude_keywords if kw.strip()]
+        self._exclude_owner = exclude_words
+        self.exclude_pattern = _alternation([_word_regex(kw.lower().strip(), 3) for kw in exclude_words])
+
+        joined = ' '.join(keywords).lower()
+        self.allows_services = any(marker in joined for marker in SERVICE_KEYWORD_MARKERS)
+
+        self._split: Optional[tuple] = None
+
+    @staticmethod
+    def _owner(match: Optional[re.Match], owners: List[str]) -> Optional[str]:
+        return owners[int(match.lastgroup[1:])] if match else None
+
+    def find_keyword(self, text: str) -> Optional[str]:
+        """Ключевое слово фильтра, найденное в тексте (с транслитерацией и синонимами)."""
+        if self.include_pattern is None:
+            return None
+        return self._owner(self.include_pattern.search(text.lower()), self._include_owner)
+
+    def has_keyword_root(self, text: str) -> bool:
+        """Есть ли в тексте корень хотя бы одного ключевого слова."""
+        return self.root_pattern is not None and self.root_pattern.search(text.lower()) is not None
+
+    def find_excluded(self, text: str) -> Optional[str]:
+        """Слово-исключение, найденное в тексте, или None."""
+        if self.exclude_pattern is None:
+            return None
+        return self._owner(self.exclude_pattern.search(text.lower()), self._exclude_owner)
+
+    def customer_matches(self, customer_name: str) -> bool:
+        """Подходит ли заказчик под customer_keywords (пустой список — любой)."""
+        if not self.customer_keywords:
+            return True
+        customer_lower = customer_name.lower()
+        return any(kw in customer_lower for kw in self.customer_keywords)
+
+    def split_keywords(self, matcher) -> tuple:
+        """SmartMatcher._split_keywords, посчитанный один раз на версию фильтра."""
+        if self._split is None:
+            self._split = matcher._split_keywords(list(self.keywords))
+        return self._split
+
+
+@lru_cache(maxsize=4096)
+def _compile(
+    keywords: Tuple[str, ...],
+    exclude_keywords: Tuple[str, ...],
+    customer_keywords: Tuple[str, ...]
+) -> CompiledFilter:
+    return CompiledFilter(keywords, exclude_keywords, customer_keywords)
+
+
+def compile_filter(
+    keywords: Optional[Sequence[str]],
+    exclude_keywords: Optional[Sequence[str]] = None,
+    customer_keywords: Optional[Sequence[str]] = None
+) -> CompiledFilter:
+    """
+    CompiledFilter для версии фильтра (кэш по содержимому списков).
+
+    Args:
+        keywords: ключевые слова (уже распарсенный JSON)
+        exclude_keywords: слова-исключения
+        customer_keywords: ключевые слова заказчика
+    """
+    return _compile(tuple(keywords or ()), tuple(exclude_keywords or ()), tuple(customer_keywords or ()))
@@ -0,0 +1,515 @@
+"""
+Filter Index - инвертированный индекс активных фильтров для SmartMatcher.
+
+Перебор «тендер × все фильтры» в match_against_filters на каждом фильтре
+заново парсит JSON полей и прогоняет десятки regex. При 10k+ фильтров и
+потоке свежих тендеров от RealtimeParser это основная стоимость матчинга.
+
+Индекс компилирует фильтры один раз:
+- каждый критерий фильтра (слово, корень, синоним, бренд, аббревиатура,
+  составная фраза) превращается в «терм» с ключом — первыми 4 символами
+  его первого токена (`\\w+`);
+- ключ → {терм → id фильтров}; одинаковые термы разных фильтров
+  проверяются на тендере один раз;
+- однотокенные подстроки (синонимы COMPOUND_PHRASES вроде «по») лежат в
+  отдельной таблице и проверяются через `in`;
+- ценовые границы и группы регионов проверяются до полного скоринга;
+  регионы — битовой маской по уникальным наборам регионов фильтров
+  (результат _check_region_match кэшируется на строку региона тендера).
+
+Индекс даёт только кандидатов (надмножество совпадений) — итоговый score
+по-прежнему считает SmartMatcher.match_tender, поэтому поведение совпадает
+с полным перебором.
+
+Обновление инкрементальное: upsert_filter / remove_filter, либо sync() со
+списком из get_all_active_filters() — перекомпилируются только изменённые
+фильтры (сначала сверяется updated_at, отпечаток критериев — только если
+его нет). Индекс один на процесс (get_filter_index()): его синхронизирует
+TenderSniperDB.get_all_active_filters() полным списком и обновляет при
+создании, изменении и удалении фильтра; SmartMatcher.batch_match без
+списка фильтров матчит по нему. sync() удаляет всё, чего нет в списке, —
+вызывать его на общем индексе можно только с полным списком.
+"""
+
+import json
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .smart_matcher import SmartMatcher
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Длина префикса токена, по которому строится индекс
+KEY_PREFIX_LEN = 4
+
+# Виды термов
+TERM_BOUNDARY = 'b'   # SmartMatcher._word_boundary_match по всей строке
+TERM_ALL_WORDS = 'w'  # каждое слово строки через _word_boundary_match
+TERM_SUBSTRING = 's'  # вхождение подстроки
+
+
+class FilterIndex:
+    """
+    Скомпилированный индекс фильтров для матчинга тендера со всеми фильтрами сразу.
+
+    Example:
+        index = FilterIndex()
+        index.build(await db.get_all_active_filters())
+        matches = index.match(tender, min_score=75)
+    """
+
+    def __init__(self, matcher: Optional[SmartMatcher] = None):
+        self.matcher = matcher or SmartMatcher()
+
+        self._filters: Dict[Any, Dict[str, Any]] = {}
+        self._fingerprints: Dict[Any, str] = {}
+        # filter_id → updated_at версии фильтра в индексе
+        self._versions: Dict[Any, Any] = {}
+        # filter_id → список термов (для удаления из индекса)
+        self._filter_terms: Dict[Any, List[tuple]] = {}
+        # filter_id → (price_min, price_max, region_group)
+        self._constraints: Dict[Any, tuple] = {}
+
+        # ключ префикса → {терм → {filter_id}}
+        self._prefix_index: Dict[str, Dict[tuple, Set[Any]]] = {}
+        # однотокенные подстроки: терм → {filter_id}
+        self._substring_terms: Dict[tuple, Set[Any]] = {}
+        # фильтры, которые нельзя проиндексировать — всегда кандидаты
+        self._always: Set[Any] = set()
+
+        # Группы регионов: кортеж регионов → номер бита
+        self._region_groups: Dict[tuple, int] = {}
+        self._region_group_refs: Dict[int, int] = {}
+        # Кэш: регион тендера → битовая маска групп, которые его принимают
+        self._region_mask_cache: Dict[str, int] = {}
+
+        self.stats = {
+            'tenders': 0,
+            'candidates': 0,
+            'scored': 0,
+            'matches': 0,
+        }
+
+    # ============================================
+    # ПОСТРОЕНИЕ И ОБНОВЛЕНИЕ
+    # ============================================
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def build(self, filters: Iterable[Dict[str, Any]]) -> None:
+        """Полная перестройка индекса."""
+        self.clear()
+        for filter_config in filters:
+            self.upsert_filter(filter_config)
+        logger.info(
+            f"🗂️ FilterIndex: {len(self._filters)} фильтров, "
+            f"{sum(len(b) for b in self._prefix_index.values())} термов, "
+            f"{len(self._region_groups)} групп регионов"
+        )
+
+    def clear(self) -> None:
+        """Очистка индекса."""
+        self._filters.clear()
+        self._fingerprints.clear()
+        self._versions.clear()
+        self._filter_terms.clear()
+        self._constraints.clear()
+        self._prefix_index.clear()
+        self._substring_terms.clear()
+        self._always.clear()
+        self._region_groups.clear()
+        self._region_group_refs.clear()
+        self._region_mask_cache.clear()
+
+    def sync(self, filters: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Приводит индекс к актуальному списку фильтров.
+
+        Перекомпилируются только новые и изменённые фильтры, исчезнувшие
+        (удалённые/выключенные) — удаляются.
+
+        Returns:
+            {'added': N, 'updated': N, 'removed': N}
+        """
+        result = {'added': 0, 'updated': 0, 'removed': 0}
+        seen = set()
+
+        for filter_config in filters:
+            filter_id = filter_config.get('id')
+            seen.add(filter_id)
+            version = filter_config.get('updated_at')
+            if filter_id not in self._filters:
+                result['added'] += 1
+                self.upsert_filter(filter_config)
+            elif version is not None and version == self._versions.get(filter_id):
+                # Та же версия фильтра — без сериализации критериев
+                self._filters[filter_id] = filter_config
+            elif self._fingerprints.get(filter_id) != self._fingerprint(filter_config):
+                result['updated'] += 1
+                self.upsert_filter(filter_config)
+            else:
+                # Критерии не менялись — обновляем только данные фильтра
+                # (имя, telegram_id и т.п. нужны в результате матчинга)
+                self._filters[filter_id] = filter_config
+                self._versions[filter_id] = version
+
+        for filter_id in [fid for fid in self._filters if fid not in seen]:
+            result['removed'] += 1
+            self.remove_filter(filter_id)
+
+        if any(result.values()):
+            logger.info(
+                f"🗂️ FilterIndex sync: +{result['added']} ~{result['updated']} "
+                f"-{result['removed']} (всего {len(self._filters)})"
+            )
+        return result
+
+    def upsert_filter(self, filter_config: Dict[str, Any]) -> None:
+        """Добавляет фильтр в индекс или перекомпилирует существующий."""
+        filter_id = filter_config.get('id')
+        if filter_id in self._filters:
+            self.remove_filter(filter_id)
+
+        self._filters[filter_id] = filter_config
+        self._fingerprints[filter_id] = self._fingerprint(filter_config)
+        self._versions[filter_id] = filter_config.get('updated_at')
+
+        terms, always = self._compile_terms(filter_config)
+        self._filter_terms[filter_id] = terms
+        if always:
+            self._always.add(filter_id)
+
+        for term in terms:
+            key = self._term_key(term)
+            if key is None:
+                self._substring_terms.setdefault(term, set()).add(filter_id)
+            else:
+                self._prefix_index.setdefault(key, {}).setdefault(term, set()).add(filter_id)
+
+        self._constraints[filter_id] = self._compile_constraints(filter_config)
+
+    def refresh_filter(self, filter_config: Dict[str, Any]) -> None:
+        """
+        Обновляет фильтр после изменения в БД (TenderSniperDB).
+
+        Поля, которых нет в строке фильтра (telegram_id, user_data из
+        get_all_active_filters), сохраняются до следующего sync().
+        """
+        filter_id = filter_config.get('id')
+        previous = self._filters.get(filter_id)
+        merged = {**previous, **filter_config} if previous else filter_config
+        if previous is not None and self._fingerprints.get(filter_id) == self._fingerprint(merged):
+            self._filters[filter_id] = merged
+            self._versions[filter_id] = merged.get('updated_at')
+            return
+        self.upsert_filter(merged)
+
+    def remove_filter(self, filter_id: Any) -> None:
+        """Удаляет фильтр из индекса (если он там есть)."""
+        if self._filters.pop(filter_id, None) is None:
+            return
+        self._fingerprints.pop(filter_id, None)
+        self._versions.pop(filter_id, None)
+        self._always.discard(filter_id)
+
+        for term in self._filter_terms.pop(filter_id, []):
+            key = self._term_key(term)
+            if key is None:
+                bucket = self._substring_terms
+            else:
+                bucket = self._prefix_index.get(key, {})
+            ids = bucket.get(term)
+            if ids is not None:
+                ids.discard(filter_id)
+                if not ids:
+                    del bucket[term]
+            if key is not None and not bucket:
+                self._prefix_index.pop(key, None)
+
+        constraints = self._constraints.pop(filter_id, None)
+        if constraints and constraints[2] is not None:
+            self._release_region_group(constraints[2])
+
+    # ============================================
+    # КОМПИЛЯЦИЯ ФИЛЬТРА
+    # ============================================
+
+    @staticmethod
+    def _fingerprint(filter_config: Dict[str, Any]) -> str:
+        """Отпечаток полей, влияющих на индекс."""
+        return json.dumps(
+            [
+                filter_config.get('keywords'),
+                filter_config.get('price_min'),
+                filter_config.get('price_max'),
+                filter_config.get('regions'),
+            ],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+
+    def _compile_terms(self, filter_config: Dict[str, Any]) -> Tuple[List[tuple], bool]:
+        """
+        Собирает термы фильтра — необходимые условия хотя бы одного
+        совпадения в SmartMatcher._match_tender_internal (шаги 4-5).
+
+        Returns:
+            (термы, нужно ли всегда считать фильтр кандидатом)
+        """
+        m = self.matcher
+        keywords = m._parse_json_field(filter_config.get('keywords', '[]'))
+        if not keywords:
+            # Фильтр без ключевых слов никогда не матчится
+            return [], False
+
+        compound_phrases, meaningful_keywords = m._split_keywords(keywords)
+        terms = set()
+
+        for phrase in compound_phrases:
+            phrase_lower = phrase.lower().strip()
+            terms.add((TERM_SUBSTRING, phrase_lower))
+            for synonym in m.COMPOUND_PHRASES.get(phrase_lower, []):
+                terms.add((TERM_SUBSTRING, synonym.lower()))
+
+            if ' ' in phrase_lower and phrase_lower not in m.COMPOUND_PHRASES:
+                # AND по словам фразы: достаточно проиндексировать одно слово
+                phrase_words = [
+                    w for w in phrase_lower.split()
+                    if not m._is_stop_word(w) and (len(w) >= 2 or m._is_short_keyword_whitelisted(w))
+                ]
+                if phrase_words:
+                    word = phrase_words[0]
+                    terms.add((TERM_BOUNDARY, word))
+                    for expansion in m.ABBREVIATIONS.get(word, []):
+                        terms.add((TERM_ALL_WORDS, expansion))
+                    for synonym in m.SYNONYMS.get(word, []):
+                        terms.add((TERM_ALL_WORDS, synonym))
+
+        for keyword in meaningful_keywords:
+            keyword_lower = keyword.lower().strip()
+            if not keyword_lower or m._is_stop_word(keyword_lower):
+                continue
+            terms.add((TERM_BOUNDARY, keyword_lower))
+            if len(keyword_lower) >= 5:
+                terms.add((TERM_BOUNDARY, keyword_lower[:max(5, len(keyword_lower) - 2)]))
+            for synonym in m.SYNONYMS.get(keyword_lower, []):
+                terms.add((TERM_BOUNDARY, synonym.lower()))
+            for brand_syn in m.BRAND_SYNONYMS.get(keyword_lower, []):
+                terms.add((TERM_BOUNDARY, brand_syn.lower()))
+            for abbrev_syn in m.ABBREVIATIONS.get(keyword_lower, []):
+                terms.add((TERM_BOUNDARY, abbrev_syn.lower()))
+
+        compiled = []
+        always = False
+        for kind, value in terms:
+            value = value.strip().lower()
+            if not value:
+                continue
+            if kind != TERM_SUBSTRING and not _TOKEN_RE.match(value):
+                # \b перед не-буквенным символом ведёт себя иначе — проверяем
+                # как подстроку (необходимое условие совпадения)
+                if kind == TERM_ALL_WORDS:
+                    value = value.split()[0]
+                kind = TERM_SUBSTRING
+            if kind == TERM_SUBSTRING and not _TOKEN_RE.search(value):
+                always = True
+                continue
+            compiled.append((kind, value))
+
+        return compiled, always
+
+    @staticmethod
+    def _term_key(term: tuple) -> Optional[str]:
+        """
+        Ключ префикса терма. None — терм проверяется через подстроку.
+
+        Для \\b-термов токен тендера начинается с первого токена терма.
+        Для подстрок из 2+ токенов второй токен в тексте стоит в начале
+        токена (перед ним не-буквенный символ фразы).
+        """
+        kind, value = term
+        tokens = _TOKEN_RE.findall(value)
+        if kind == TERM_SUBSTRING:
+            if len(tokens) < 2:
+                return None
+            return tokens[1][:KEY_PREFIX_LEN]
+        return tokens[0][:KEY_PREFIX_LEN]
+
+    def _compile_constraints(self, filter_config: Dict[str, Any]) -> tuple:
+        """Ценовые границы и группа регионов фильтра."""
+        regions = self.matcher._parse_json_field(filter_config.get('regions', '[]'))
+        region_group = None
+        if regions:
+            group_key = tuple(sorted(r.lower().strip() for r in regions))
+            region_group = self._region_groups.get(group_key)
+            if region_group is None:
+                region_group = self._allocate_region_bit()
+                self._region_groups[group_key] = region_group
+                self._region_mask_cache.clear()
+            self._region_group_refs[region_group] = self._region_group_refs.get(region_group, 0) + 1
+
+        return (
+            filter_config.get('price_min'),
+            filter_config.get('price_max'),
+            region_group,
+        )
+
+    def _allocate_region_bit(self) -> int:
+        used = set(self._region_groups.values())
+        bit = 0
+        while bit in used:
+            bit += 1
+        return bit
+
+    def _release_region_group(self, bit: int) -> None:
+        refs = self._region_group_refs.get(bit, 0) - 1
+        if refs > 0:
+            self._region_group_refs[bit] = refs
+            return
+        self._region_group_refs.pop(bit, None)
+        for group_key, group_bit in list(self._region_groups.items()):
+            if group_bit == bit:
+                del self._region_groups[group_key]
+        self._region_mask_cache.clear()
+
+    # ============================================
+    # МАТЧИНГ
+    # ============================================
+
+    def _region_mask(self, tender_region: str) -> int:
+        """Битовая маска групп регионов, принимающих регион тендера."""
+        mask = self._region_mask_cache.get(tender_region)
+        if mask is None:
+            mask = 0
+            for group_key, bit in self._region_groups.items():
+                if self.matcher._check_region_match(list(group_key), tender_region):
+                    mask |= 1 << bit
+            self._region_mask_cache[tender_region] = mask
+        return mask
+
+    def _term_matches(self, term: tuple, text: str) -> bool:
+        kind, value = term
+        if kind == TERM_SUBSTRING:
+            return value in text
+        if kind == TERM_BOUNDARY:
+            return self.matcher._word_boundary_match(value, text)
+        return all(self.matcher._word_boundary_match(w, text) for w in value.split())
+
+    def candidates(self, tender: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Фильтры-кандидаты для тендера (надмножество совпадений match_tender).
+        """
+        name = tender.get('name', '').lower()
+        description = (tender.get('description', '') or tender.get('summary', '')).lower()
+        text = f"{name} {description}"
+
+        prefixes = set()
+        for token in set(_TOKEN_RE.findall(text)):
+            for i in range(1, min(len(token), KEY_PREFIX_LEN) + 1):
+                prefixes.add(token[:i])
+
+        filter_ids = set(self._always)
+        for prefix in prefixes:
+            bucket = self._prefix_index.get(prefix)
+            if not bucket:
+                continue
+            for term, ids in bucket.items():
+                if not ids.issubset(filter_ids) and self._term_matches(term, text):
+                    filter_ids |= ids
+        for term, ids in self._substring_terms.items():
+            if not ids.issubset(filter_ids) and term[1] in text:
+                filter_ids |= ids
+
+        if not filter_ids:
+            return []
+
+        tender_price = tender.get('price')
+        if not isinstance(tender_price, (int, float)):
+            tender_price = None
+        region_mask = None
+
+        result = []
+        for filter_id in filter_ids:
+            price_min, price_max, region_group = self._constraints[filter_id]
+            if tender_price is not None:
+                if price_min is not None and tender_price < price_min:
+                    continue
+                if price_max is not None and tender_price > price_max:
+                    continue
+            if region_group is not None:
+                if region_mask is None:
+                    tender_region = (tender.get('region', '') or tender.get('customer_region', '') or '').lower()
+                    region_mask = self._region_mask(tender_region)
+                if not region_mask >> region_group & 1:
+                    continue
+            result.append(self._filters[filter_id])
+        return result
+
+    def match(
+        self,
+        tender: Dict[str, Any],
+        min_score: int = 75,
+        user_negative_keywords: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Аналог SmartMatcher.match_against_filters по всем фильтрам индекса.
+
+        Returns:
+            Список совпадений (отсортирован по score)
+        """
+        self.stats['tenders'] += 1
+
+        searchable_text = (
+            tender.get('name', '') + ' ' +
+            (tender.get('description', '') or tender.get('summary', '') or '')
+        )
+        if self.matcher._check_negative_patterns(searchable_text) and min_score > 5:
+            # Негативный паттерн даёт score 5 любому фильтру — ниже порога
+            return []
+        if min_score <= 5:
+            filters = list(self._filters.values())
+        else:
+            filters = self.candidates(tender)
+
+        self.stats['candidates'] += len(filters)
+        matches = []
+        for filter_config in filters:
+            self.stats['scored'] += 1
+            match_result = self.matcher.match_tender(tender, filter_config, user_negative_keywords)
+            if match_result and match_result['score'] >= min_score:
+                matches.append(match_result)
+
+        matches.sort(key=lambda x: x['score'], reverse=True)
+        self.stats['matches'] += len(matches)
+        return matches
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика индекса."""
+        stats = self.stats.copy()
+        stats['filters'] = len(self._filters)
+        stats['terms'] = sum(len(b) for b in self._prefix_index.values()) + len(self._substring_terms)
+        stats['region_groups'] = len(self._region_groups)
+        return stats
+
+
+# ============================================
+# ОБЩИЙ ИНДЕКС ПРОЦЕССА
+# ============================================
+
+_filter_index: Optional[FilterIndex] = None
+
+
+def get_filter_index() -> FilterIndex:
+    """Общий на процесс индекс фильтров (создаётся при первом матчинге)."""
+    global _filter_index
+    if _filter_index is None:
+        _filter_index = FilterIndex()
+    return _filter_index
+
+
+def peek_filter_index() -> Optional[FilterIndex]:
+    """Индекс процесса, если он уже создан (для обновлений из TenderSniperDB)."""
+    return _filter_index
@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional, Set
 from datetime import datetime, timedelta
 import logging
 
+from tender_sniper.matching.compiled_filter import compile_filter
+
 logger = logging.getLogger(__name__)
 
 
@@ -424,56 +426,6 @@ class SmartMatcher:
         'по': ['программное обеспечение', 'программного обеспечения', 'программный продукт'],
     }
 
-    # Федеральные округа для раскрытия
-    FEDERAL_DISTRICTS = {
-        "центральный": [
-            "москва", "московская область", "белгородская область", "брянская область",
-            "владимирская область", "воронежская область", "ивановская область",
-            "калужская область", "костромская область", "курская область",
-            "липецкая область", "орловская область", "рязанская область",
-            "смоленская область", "тамбовская область", "тверская область",
-            "тульская область", "ярославская область"
-        ],
-        "северо-западный": [
-            "санкт-петербург", "ленинградская область", "архангельская область",
-            "вологодская область", "калининградская область", "республика карелия",
-            "республика коми", "мурманская область", "ненецкий автономный округ",
-            "новгородская область", "псковская область"
-        ],
-        "южный": [
-            "ростовская область", "астраханская область", "волгоградская область",
-            "республика адыгея", "республика калмыкия", "краснодарский край",
-            "республика крым", "крым", "севастополь"
-        ],
-        "северо-кавказский": [
-            "ставропольский край", "республика дагестан", "республика ингушетия",
-            "кабардино-балкарская республика", "карачаево-черкесская республика",
-            "республика северная осетия", "чеченская республика"
-        ],
-        "приволжский": [
-            "нижегородская область", "кировская область", "самарская область",
-            "оренбургская область", "пензенская область", "пермский край",
-            "саратовская область", "ульяновская область", "республика башкортостан",
-            "республика марий эл", "республика мордовия", "республика татарстан",
-            "удмуртская республика", "чувашская республика"
-        ],
-        "уральский": [
-            "свердловская область", "челябинская область", "курганская область",
-            "тюменская область", "ханты-мансийский", "югра", "ямало-ненецкий"
-        ],
-        "сибирский": [
-            "новосибирская область", "алтайский край", "республика алтай",
-            "иркутская область", "кемеровская область", "красноярский край",
-            "омская область", "томская область", "республика тыва", "республика хакасия"
-        ],
-        "дальневосточный": [
-            "хабаровский край", "приморский край", "амурская область",
-            "камчатский край", "магаданская область", "сахалинская область",
-            "республика саха", "якутия", "еврейская автономная область",
-            "чукотский автономный округ", "республика бурятия", "забайкальский край"
-        ]
-    }
-
     # Алиасы регионов (сокращения и альтернативные названия)
     REGION_ALIASES = {
         # Города федерального значения
@@ -523,34 +475,6 @@ class SmartMatcher:
             'low_score_matches': 0,  # score < 50
         }
 
-    def _expand_federal_districts(self, regions: List[str]) -> List[str]:
-        """
-        Раскрывает федеральные округа в список отдельных регионов.
-
-        Например: "Центральный федеральный округ" → ["Москва", "Московская область", ...]
-        """
-        expanded = []
-        for region in regions:
-            region_lower = region.lower().strip()
-
-            # Проверяем, является ли это федеральным округом
-            found_district = False
-            for district_key, district_regions in self.FEDERAL_DISTRICTS.items():
-                # Проверяем разные варианты написания ФО
-                if (district_key in region_lower or
-                    f"{district_key} федеральный" in region_lower or
-                    f"{district_key} фо" in region_lower):
-                    expanded.extend(district_regions)
-                    found_district = True
-                    logger.debug(f"   📍 Раскрыт ФО '{region}' → {len(district_regions)} регионов")
-                    break
-
-            if not found_district:
-                # Это обычный регион, добавляем как есть
-                expanded.append(region_lower)
-
-        return expanded
-
     def _normalize_region(self, region: str) -> str:
         """Нормализует название региона, убирая лишние слова."""
         region = region.lower().strip()
@@ -567,10 +491,11 @@ class SmartMatcher:
         """
         Проверяет соответствие региона тендера фильтру.
 
-        Использует fuzzy matching с учётом:
-        - Вариаций написания (СПб = Санкт-Петербург)
-        - Сокращений (ЯНАО = Ямало-Ненецкий АО)
-        - Частичного совпадения
+        Регионы фильтра компилируются в битсет (ФО раскрыты, результат
+        кэшируется в compile_regions), регион тендера — в id через единый
+        справочник; проверка — одна битовая операция. Строковое сравнение
+        (вариации написания, сокращения, частичное совпадение) остаётся
+        только для того, что справочник не распознал.
 
         Args:
             filter_regions: Список регионов из фильтра
@@ -587,14 +512,36 @@ class SmartMatcher:
             logger.info(f"   ⛔ Регион тендера пустой, но фильтр требует: {filter_regions[:3]}...")
             return False
 
-        # Нормализуем регион тендера через единый справочник
-        try:
-            from tender_sniper.regions import normalize_region as _norm_region
-            canonical_tender = _norm_region(tender_region)
-            if canonical_tender:
-                tender_region = canonical_tender
-        except ImportError:
-            pass
+        from tender_sniper.regions import REGION_NAMES, compile_regions, region_names_from_mask, resolve_region_id
+
+        compiled = compile_regions(tuple(filter_regions))
+        tender_id = resolve_region_id(tender_region)
+
+        if tender_id is not None:
+            if compiled.mask >> tender_id & 1:
+                logger.debug(f"   ✅ Регион в фильтре: {REGION_NAMES[tender_id]}")
+                return True
+            if self._legacy_region_match(compiled.unresolved, REGION_NAMES[tender_id]):
+                return True
+        elif self._legacy_region_match(
+            list(compiled.unresolved) + region_names_from_mask(compiled.mask), tender_region
+        ):
+            return True
+
+        logger.info(f"   ⛔ Регион не совпадает: tender='{tender_region}', filter={filter_regions[:3]}...")
+        return False
+
+    def _legacy_region_match(self, filter_regions: List[str], tender_region: str) -> bool:
+        """
+        Строковое сравнение регионов, не распознанных справочником.
+
+        Использует fuzzy matching с учётом:
+        - Вариаций написания (СПб = Санкт-Петербург)
+        - Сокращений (ЯНАО = Ямало-Ненецкий АО)
+        - Частичного совпадения
+        """
+        if not filter_regions:
+            return False
 
         tender_region_lower = tender_region.lower().strip()
         tender_region_normalized = self._normalize_region(tender_region_lower)
@@ -651,8 +598,6 @@ class SmartMatcher:
                     logger.debug(f"   ✅ Совпадение по алиасу тендера: {tender_region_normalized} -> {alias_lower}")
                     return True
 
-        # Ничего не совпало
-        logger.info(f"   ⛔ Регион не совпадает: tender='{tender_region_lower}', filter={filter_regions[:3]}...")
         return False
 
     def _is_short_keyword_whitelisted(self, word: str) -> bool:
@@ -809,6 +754,36 @@ class SmartMatcher:
 
         return compound_found, remaining
 
+    def _split_keywords(self, keywords: List[str]) -> tuple:
+        """
+        Разбивает ключевые слова фильтра на критерии матчинга.
+
+        Returns:
+            (compound_phrases, meaningful_keywords)
+        """
+        # ШАГ 1: Извлекаем составные фразы и отдельные ключевые слова
+        compound_phrases, remaining_keywords = self._extract_compound_phrases(keywords)
+
+        # ШАГ 2: Фильтруем стоп-слова из оставшихся ключевых слов
+        meaningful_keywords = []
+        for keyword in remaining_keywords:
+            keyword_lower = keyword.lower().strip()
+            if not keyword_lower:
+                continue
+            # Пропускаем стоп-слова
+            if self._is_stop_word(keyword_lower):
+                logger.debug(f"   ⏭️ Пропускаем стоп-слово: {keyword}")
+                continue
+            meaningful_keywords.append(keyword)
+
+        # ШАГ 3: Если после фильтрации не осталось значимых слов - пробуем извлечь из фраз
+        if not meaningful_keywords and not compound_phrases:
+            for keyword in keywords:
+                extracted = self._extract_meaningful_keywords(keyword)
+                meaningful_keywords.extend(extracted)
+
+        return compound_phrases, meaningful_keywords
+
     def apply_feedback_penalty(
         self,
         score: int,
@@ -945,12 +920,12 @@ class SmartMatcher:
             }
 
         # 1.2 Проверка пользовательских исключающих слов (с границами слов)
-        if exclude_keywords:
-            for keyword in exclude_keywords:
-                # Используем проверку с границами слов для точности
-                if self._word_boundary_match(keyword, searchable_text):
-                    logger.debug(f"   ⛔ Исключено по ключевому слову: {keyword}")
-                    return None
+        # Правила фильтра скомпилированы один раз на версию фильтра (общие с InstantSearch)
+        compiled = compile_filter(keywords, exclude_keywords)
+        excluded_word = compiled.find_excluded(searchable_text)
+        if excluded_word:
+            logger.debug(f"   ⛔ Исключено по ключевому слову: {excluded_word}")
+            return None
 
         # ============================================
         # 2. ПРОВЕРКА ОБЯЗАТЕЛЬНЫХ УСЛОВИЙ
@@ -969,11 +944,8 @@ class SmartMatcher:
 
         # Проверка региона (СТРОГАЯ - если указан регион в фильтре, тендер ДОЛЖЕН соответствовать)
         if regions:
-            # Раскрываем федеральные округа в отдельные регионы
-            expanded_regions = self._expand_federal_districts(regions)
-
-            # Используем умный метод сравнения с поддержкой алиасов
-            if not self._check_region_match(expanded_regions, tender_region):
+            # ФО раскрываются при компиляции регионов фильтра в битсет
+            if not self._check_region_match(regions, tender_region):
                 return None  # СТРОГАЯ ФИЛЬТРАЦИЯ: отклоняем тендеры из других регионов!
 
         # Проверка типа тендера (не строгая - не отклоняем если тип не указан)
@@ -998,26 +970,8 @@ class SmartMatcher:
         matched_keywords = []
 
         if keywords:
-            # ШАГ 1: Извлекаем составные фразы и отдельные ключевые слова
-            compound_phrases, remaining_keywords = self._extract_compound_phrases(keywords)
-
-            # ШАГ 2: Фильтруем стоп-слова из оставшихся ключевых слов
-            meaningful_keywords = []
-            for keyword in remaining_keywords:
-                keyword_lower = keyword.lower().strip()
-                if not keyword_lower:
-                    continue
-                # Пропускаем стоп-слова
-                if self._is_stop_word(keyword_lower):
-                    logger.debug(f"   ⏭️ Пропускаем стоп-слово: {keyword}")
-                    continue
-                meaningful_keywords.append(keyword)
-
-            # ШАГ 3: Если после фильтрации не осталось значимых слов - пробуем извлечь из фраз
-            if not meaningful_keywords and not compound_phrases:
-                for keyword in keywords:
-                    extracted = self._extract_meaningful_keywords(keyword)
-                    meaningful_keywords.extend(extracted)
+            # ШАГ 1-3: Составные фразы и значимые ключевые слова
+            compound_phrases, meaningful_keywords = compiled.split_keywords(self)
 
             # Общее количество критериев для процентного скоринга
             total_criteria = len(compound_phrases) + len(meaningful_keywords)
@@ -1257,7 +1211,7 @@ class SmartMatcher:
     def batch_match(
         self,
         tenders: List[Dict[str, Any]],
-        filters: List[Dict[str, Any]],
+        filters: Optional[List[Dict[str, Any]]] = None,
         min_score: int = 75
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -1265,19 +1219,32 @@ class SmartMatcher:
 
         Args:
             tenders: Список тендеров
-            filters: Список фильтров
+            filters: Список фильтров; None — все активные фильтры из общего
+                индекса процесса (его ведут get_all_active_filters() и
+                изменения фильтров в TenderSniperDB)
             min_score: Минимальный score
 
         Returns:
             Словарь {tender_number: [matches]}
         """
-        logger.info(f"\n🔄 Пакетная обработка: {len(tenders)} тендеров x {len(filters)} фильтров")
+        from .filter_index import FilterIndex, get_filter_index
+
+        # Каждый тендер скорится только против фильтров-кандидатов из
+        # инвертированного индекса. Общий индекс процесса не трогаем
+        # чужим списком: sync() удалил бы из него остальные фильтры
+        if filters is None:
+            index = get_filter_index()
+        else:
+            index = FilterIndex(matcher=self)
+            index.build(filters)
+
+        logger.info(f"\n🔄 Пакетная обработка: {len(tenders)} тендеров x {len(index)} фильтров")
 
         results = {}
 
         for tender in tenders:
             tender_number = tender.get('number')
-            matches = self.match_against_filters(tender, filters, min_score)
+            matches = index.match(tender, min_score)
 
             if matches:
                 results[tender_number] = matches
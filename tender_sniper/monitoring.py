@@ -571,6 +571,80 @@ def send_error_to_telegram_sync(
         logger.error(f"❌ Не удалось отправить ошибку в Telegram: {e}")
 
 
+# ============================================
+# ЗДОРОВЬЕ ПРОКСИ
+# ============================================
+
+# Снимок статистики прокси в персистентном кэше (CacheEntry):
+# админка работает в отдельном процессе и читает его оттуда
+PROXY_HEALTH_CACHE_KEY = 'proxy_health'
+PROXY_HEALTH_CACHE_TYPE = 'monitoring'
+
+
+def get_proxy_health_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Статистика прокси текущего процесса: latency p50/p95, доля ошибок,
+    доля 403/434, состояние circuit breaker.
+    """
+    try:
+        from src.parsers.proxy_health import get_proxy_health
+    except ImportError:
+        return {}
+    return get_proxy_health().get_stats()
+
+
+def log_proxy_health():
+    """Пишет сводку по прокси в лог."""
+    for label, st in get_proxy_health_stats().items():
+        if not st.get('requests'):
+            continue
+        icon = '🟢' if st['state'] == 'closed' else ('🟡' if st['state'] == 'half_open' else '🔴')
+        logger.info(
+            f"   {icon} Прокси {label}: {st['state']}, p50={st['p50_ms']}мс p95={st['p95_ms']}мс, "
+            f"ошибки {st['error_rate']:.0%}, 403/434 {st['blocked_ratio']:.0%}, запросов {st['requests']}"
+        )
+
+
+async def publish_proxy_health(db=None):
+    """Сохраняет снимок статистики прокси для админки."""
+    stats = get_proxy_health_stats()
+    if not stats:
+        return
+
+    try:
+        from datetime import datetime
+
+        if db is None:
+            from tender_sniper.database import get_sniper_db
+            db = await get_sniper_db()
+
+        await db.cache_set(
+            PROXY_HEALTH_CACHE_KEY,
+            PROXY_HEALTH_CACHE_TYPE,
+            {'updated_at': datetime.utcnow().isoformat(), 'proxies': stats},
+            ttl_hours=1
+        )
+    except Exception as e:
+        logger.debug(f"Не удалось сохранить статистику прокси: {e}")
+
+
+async def load_proxy_health_snapshot(db=None) -> Optional[Dict[str, Any]]:
+    """
+    Последний снимок статистики прокси от процесса мониторинга.
+
+    Returns:
+        {'updated_at': ISO, 'proxies': {label: stats}} или None
+    """
+    try:
+        if db is None:
+            from tender_sniper.database import get_sniper_db
+            db = await get_sniper_db()
+        return await db.cache_get(PROXY_HEALTH_CACHE_KEY, PROXY_HEALTH_CACHE_TYPE)
+    except Exception as e:
+        logger.debug(f"Не удалось загрузить статистику прокси: {e}")
+        return None
+
+
 # ============================================
 # ПРИМЕР ИСПОЛЬЗОВАНИЯ
 # ============================================
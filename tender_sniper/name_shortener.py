@@ -0,0 +1,304 @@
+"""
+Name Shortener - асинхронное пакетное сокращение названий тендеров.
+
+TenderNameGenerator.generate_short_name делает синхронный HTTP запрос к LLM.
+Вызванный из корутины (цикл мониторинга, меню «Все тендеры», уведомления)
+он останавливал event loop на секунды: Telegram polling, кабинет и всё
+остальное ждали ответа LLM по каждому длинному названию.
+
+Здесь:
+- get_name() не блокирует: детерминированная чистка, кэш в памяти, а если
+  AI-названия ещё нет — regex fallback сразу, название ставится в очередь;
+- очередь разбирается в фоне пачками по BATCH_SIZE названий на один
+  запрос к LLM (generate_batch), не больше CONCURRENCY запросов
+  одновременно, сам вызов — в потоке (asyncio.to_thread);
+- результаты пишутся в CacheEntry (cache_type='tender_name') по хэшу
+  нормализованного названия — общий кэш для всех процессов и рестартов;
+- warm() одним запросом к БД подтягивает уже сгенерированные названия
+  для всей выдачи перед рендером.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class NameShortener:
+    """Неблокирующий сервис коротких названий поверх TenderNameGenerator."""
+
+    CACHE_TYPE = 'tender_name'
+    KEY_PREFIX = 'tname:'
+    DB_TTL_HOURS = 30 * 24
+
+    # Названий в одном запросе к LLM и одновременных запросов
+    BATCH_SIZE = 10
+    CONCURRENCY = 2
+
+    # Пауза перед разбором очереди: названия цикла успевают собраться в пачку
+    DRAIN_DELAY = 1.0
+
+    # Ограничение очереди (при недоступном LLM не копим бесконечно)
+    MAX_PENDING = 1000
+
+    # Названия, по которым LLM ответил галлюцинацией, не повторяем столько секунд
+    REJECT_TTL = 6 * 3600
+
+    def __init__(self, generator=None, db=None, persistent: bool = True):
+        """
+        Args:
+            generator: TenderNameGenerator (по умолчанию общий get_name_generator())
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
+            persistent: False — без кэша в БД (тесты, скрипты)
+        """
+        self._generator = generator
+        self._db = db
+        self._persistent = persistent
+        # cache_key → (очищенное название, tender_data)
+        self._pending: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        self._in_flight: set = set()
+        self._rejected: TTLCache = TTLCache(maxsize=5000, ttl=self.REJECT_TTL)
+        self._drain_task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._stats = {
+            'ready': 0,
+            'memory_hits': 0,
+            'db_hits': 0,
+            'fallbacks': 0,
+            'llm_batches': 0,
+            'llm_names': 0,
+            'llm_rejected': 0,
+            'llm_errors': 0,
+        }
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from tender_sniper.ai_name_generator import get_name_generator
+            self._generator = get_name_generator()
+        return self._generator
+
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.CONCURRENCY)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    # ============================================
+    # ЧТЕНИЕ
+    # ============================================
+
+    def get_name(
+        self,
+        original_name: str,
+        tender_data: Optional[Dict[str, Any]] = None,
+        max_length: int = 80
+    ) -> str:
+        """
+        Короткое название без ожидания LLM.
+
+        Returns:
+            Готовое название (не требует AI или уже в кэше) либо regex
+            fallback; во втором случае название ставится в очередь на AI
+        """
+        generator = self.generator
+        ready, cleaned = generator.prepare_name(original_name, tender_data, max_length)
+        if ready is not None:
+            self._stats['ready'] += 1
+            return ready
+
+        cache_key = generator._get_cache_key(cleaned)
+        cached = generator._get_from_memory_cache(cache_key)
+        if cached:
+            self._stats['memory_hits'] += 1
+            return generator._truncate(cached, max_length)
+
+        self._stats['fallbacks'] += 1
+        self._enqueue(cache_key, cleaned, tender_data)
+        return generator._fallback_short_name(cleaned, max_length)
+
+    async def warm(self, items: Iterable[Tuple[str, Optional[Dict[str, Any]]]], max_length: int = 80) -> int:
+        """
+        Подтягивает в память сгенерированные ранее названия из БД (один запрос).
+
+        Args:
+            items: [(исходное название, tender_data)]
+
+        Returns:
+            Сколько названий найдено в БД
+        """
+        if not self._persistent:
+            return 0
+        generator = self.generator
+        missing: Dict[str, str] = {}
+        for original_name, tender_data in items:
+            ready, cleaned = generator.prepare_name(original_name, tender_data, max_length)
+            if ready is not None:
+                continue
+            cache_key = generator._get_cache_key(cleaned)
+            if generator._get_from_memory_cache(cache_key) is None:
+                missing[self.KEY_PREFIX + cache_key] = cache_key
+        if not missing:
+            return 0
+
+        try:
+            db = await self._get_db()
+            entries = await db.cache_get_many(list(missing), self.CACHE_TYPE)
+        except Exception as e:
+            logger.debug(f"Name shortener warm error: {e}")
+            return 0
+
+        for key, name in entries.items():
+            if isinstance(name, str) and name:
+                generator._save_to_memory_cache(missing[key], name)
+        self._stats['db_hits'] += len(entries)
+        return len(entries)
+
+    async def shorten_many(
+        self,
+        items: List[Tuple[str, Optional[Dict[str, Any]]]],
+        max_length: int = 80,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """
+        Короткие названия для пачки тендеров.
+
+        Кэш из БД подтягивается заранее; недостающие названия уходят в LLM.
+        С timeout ждём генерацию не дольше timeout секунд, затем отдаём то,
+        что готово (остальное — fallback, AI-название появится позже).
+        """
+        await self.warm(items, max_length)
+        names = [self.get_name(name, data, max_length) for name, data in items]
+        if timeout and (self._pending or self._in_flight):
+            try:
+                await asyncio.wait_for(asyncio.shield(self._settle()), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f"Name shortener: не дождались AI-названий за {timeout}с")
+            names = [self.get_name(name, data, max_length) for name, data in items]
+        return names
+
+    async def _settle(self) -> None:
+        """Ждёт генерации всего, что сейчас в очереди и в работе."""
+        task = self._drain_task
+        await self.drain()
+        if task is not None and not task.done():
+            await task
+
+    # ============================================
+    # ОЧЕРЕДЬ И ГЕНЕРАЦИЯ
+    # ============================================
+
+    def _enqueue(self, cache_key: str, cleaned: str, tender_data: Optional[Dict[str, Any]]) -> None:
+        if not self.generator.llm:
+            return
+        if cache_key in self._pending or cache_key in self._in_flight or cache_key in self._rejected:
+            return
+        if len(self._pending) >= self.MAX_PENDING:
+            return
+        self._pending[cache_key] = (cleaned, tender_data)
+        self._schedule_drain()
+
+    def _schedule_drain(self) -> None:
+        if self._drain_task is not None and not self._drain_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # нет event loop — разберём при явном drain()
+        self._drain_task = loop.create_task(self._drain_later())
+
+    async def _drain_later(self) -> None:
+        if len(self._pending) < self.BATCH_SIZE:
+            await asyncio.sleep(self.DRAIN_DELAY)
+        await self.drain()
+
+    async def drain(self) -> int:
+        """
+        Разбирает очередь: пачки по BATCH_SIZE, до CONCURRENCY запросов к LLM.
+
+        Returns:
+            Количество сгенерированных названий
+        """
+        batches = []
+        while self._pending:
+            keys = list(self._pending)[:self.BATCH_SIZE]
+            batch = [(key, self._pending.pop(key)) for key in keys]
+            self._in_flight.update(keys)
+            batches.append(batch)
+        if not batches:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._process_batch(batch) for batch in batches), return_exceptions=True
+        )
+        return sum(r for r in results if isinstance(r, int))
+
+    async def _process_batch(self, batch: List[Tuple[str, Tuple[str, Optional[Dict[str, Any]]]]]) -> int:
+        generator = self.generator
+        try:
+            async with self._get_semaphore():
+                names = await asyncio.to_thread(generator.generate_batch, [item for _, item in batch])
+        except Exception as e:
+            self._stats['llm_errors'] += 1
+            logger.warning(f"⚠️ Пакетная генерация названий ({len(batch)} шт.): {e}")
+            return 0
+        finally:
+            self._in_flight.difference_update(key for key, _ in batch)
+
+        self._stats['llm_batches'] += 1
+        generated = {key: name for (key, _), name in zip(batch, names) if name}
+        # Кэш генератора заполняется здесь, в потоке event loop
+        for key, name in generated.items():
+            generator._save_to_memory_cache(key, name)
+        for key, _ in batch:
+            if key not in generated:
+                self._rejected[key] = True
+        self._stats['llm_names'] += len(generated)
+        self._stats['llm_rejected'] += len(batch) - len(generated)
+
+        if generated and self._persistent:
+            try:
+                db = await self._get_db()
+                await db.cache_set_many(
+                    {self.KEY_PREFIX + key: name for key, name in generated.items()},
+                    self.CACHE_TYPE,
+                    ttl_hours=self.DB_TTL_HOURS,
+                )
+            except Exception as e:
+                logger.debug(f"Name shortener save error: {e}")
+
+        logger.info(f"🤖 Пакет названий: {len(generated)}/{len(batch)} сгенерировано")
+        return len(generated)
+
+    # ============================================
+    # СЛУЖЕБНОЕ
+    # ============================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'pending': len(self._pending),
+            'in_flight': len(self._in_flight),
+        }
+
+
+_shortener: Optional[NameShortener] = None
+
+
+def get_name_shortener() -> NameShortener:
+    """Общий на процесс сервис коротких названий."""
+    global _shortener
+    if _shortener is None:
+        _shortener = NameShortener()
+    return _shortener
@@ -17,9 +17,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
 
 from bot.utils import safe_callback_data
+from tender_sniper.instrumentation import timed
 
 # Импортируем форматтер карточки
 try:
@@ -40,7 +41,7 @@ logger = logging.getLogger(__name__)
 
 class _TelegramRateLimiter:
     """
-    Token-bucket rate limiter для Telegram Bot API.
+    Планировщик отправки для Telegram Bot API.
 
     Telegram лимиты:
     - Глобальный: 30 сообщений/секунду
@@ -48,46 +49,136 @@ class _TelegramRateLimiter:
 
     Мы используем 25/с глобально и 1.1 с между сообщениями в один чат
     для надёжного запаса.
+
+    Каждый чат — своя очередь: acquire() резервирует слот чата (FIFO,
+    с шагом PER_CHAT_INTERVAL) и ждёт его без общего lock, поэтому
+    «болтливый» чат не задерживает остальные. Когда слот чата наступил,
+    берётся токен глобального bucket. RetryAfter от Telegram ставит на
+    паузу только свой чат (pause_chat).
     """
     GLOBAL_RATE = 25        # токенов/сек (Telegram лимит 30, берём с запасом)
     PER_CHAT_INTERVAL = 1.1  # минимум секунд между сообщениями в один чат
 
-    def __init__(self):
-        self._tokens = float(self.GLOBAL_RATE)
+    # Границы гистограммы времени ожидания (секунды)
+    WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60)
+
+    # Чистка состояния давно неактивных чатов
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self, global_rate: Optional[float] = None, per_chat_interval: Optional[float] = None):
+        self.global_rate = global_rate or self.GLOBAL_RATE
+        self.per_chat_interval = per_chat_interval or self.PER_CHAT_INTERVAL
+
+        self._tokens = float(self.global_rate)
         self._last_refill = time.monotonic()
-        self._per_chat_last: Dict[int, float] = {}
-        self._lock = asyncio.Lock()
+
+        self._chat_next: Dict[int, float] = {}     # время следующего свободного слота чата
+        self._paused_until: Dict[int, float] = {}  # пауза чата после RetryAfter
+        self._queued: Dict[int, int] = {}          # ожидающие отправки по чатам
+
+        self._wait_histogram = [0] * (len(self.WAIT_BUCKETS) + 1)
+        self._stats = {'acquired': 0, 'retry_after': 0, 'max_queue_depth': 0}
+
+    def _reserve_chat_slot(self, chat_id: int) -> float:
+        now = time.monotonic()
+        slot = max(now, self._chat_next.get(chat_id, 0.0), self._paused_until.get(chat_id, 0.0))
+        self._chat_next[chat_id] = slot + self.per_chat_interval
+        return slot - now
+
+    async def _acquire_global(self) -> None:
+        """Токен глобального bucket (резервируется сразу, баланс может уйти в минус)."""
+        now = time.monotonic()
+        self._tokens = min(float(self.global_rate), self._tokens + (now - self._last_refill) * self.global_rate)
+        self._last_refill = now
+        self._tokens -= 1.0
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.global_rate)
 
     async def acquire(self, chat_id: int):
         """Ожидает разрешения перед отправкой сообщения в chat_id."""
-        async with self._lock:
-            now = time.monotonic()
-
-            # Пополняем глобальный bucket
-            elapsed = now - self._last_refill
-            self._tokens = min(float(self.GLOBAL_RATE), self._tokens + elapsed * self.GLOBAL_RATE)
-            self._last_refill = now
-
-            # Ждём глобальный токен
-            if self._tokens < 1.0:
-                wait = (1.0 - self._tokens) / self.GLOBAL_RATE
-                await asyncio.sleep(wait)
-                self._tokens = 0.0
-            else:
-                self._tokens -= 1.0
+        enqueued_at = time.monotonic()
+        self._queued[chat_id] = self._queued.get(chat_id, 0) + 1
+        depth = sum(self._queued.values())
+        if depth > self._stats['max_queue_depth']:
+            self._stats['max_queue_depth'] = depth
+
+        try:
+            while True:
+                wait = self._reserve_chat_slot(chat_id)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                # Пока ждали, чат мог получить RetryAfter — перерезервируем слот
+                if self._paused_until.get(chat_id, 0.0) <= time.monotonic():
+                    break
+
+            await self._acquire_global()
+        finally:
+            self._queued[chat_id] -= 1
+            if not self._queued[chat_id]:
+                del self._queued[chat_id]
+
+        self._record_wait(time.monotonic() - enqueued_at)
+        self._stats['acquired'] += 1
+        if len(self._chat_next) > self.PRUNE_THRESHOLD:
+            self._prune()
+
+    def pause_chat(self, chat_id: int, seconds: float):
+        """Пауза отправки в чат (RetryAfter от Telegram). Остальные чаты не затрагиваются."""
+        until = time.monotonic() + seconds
+        self._paused_until[chat_id] = max(self._paused_until.get(chat_id, 0.0), until)
+        self._chat_next[chat_id] = max(self._chat_next.get(chat_id, 0.0), until)
+        self._stats['retry_after'] += 1
+        logger.warning(f"⏸️ Telegram RetryAfter: чат {chat_id} на паузе {seconds:.0f}с")
+
+    def _record_wait(self, wait: float):
+        for i, bound in enumerate(self.WAIT_BUCKETS):
+            if wait <= bound:
+                self._wait_histogram[i] += 1
+                return
+        self._wait_histogram[-1] += 1
+
+    def _prune(self):
+        now = time.monotonic()
+        for chat_id in [c for c, t in self._chat_next.items() if t < now and c not in self._queued]:
+            del self._chat_next[chat_id]
+        for chat_id in [c for c, t in self._paused_until.items() if t < now]:
+            del self._paused_until[chat_id]
 
-            # Ждём per-chat лимит
-            last_send = self._per_chat_last.get(chat_id, 0.0)
-            chat_wait = self.PER_CHAT_INTERVAL - (time.monotonic() - last_send)
-            if chat_wait > 0:
-                await asyncio.sleep(chat_wait)
-            self._per_chat_last[chat_id] = time.monotonic()
+    def get_stats(self) -> Dict[str, Any]:
+        """Глубина очередей, паузы и гистограмма ожидания."""
+        now = time.monotonic()
+        labels = [f"<={b}s" for b in self.WAIT_BUCKETS] + [f">{self.WAIT_BUCKETS[-1]}s"]
+        return {
+            **self._stats,
+            'queue_depth': sum(self._queued.values()),
+            'queued_chats': len(self._queued),
+            'paused_chats': sum(1 for t in self._paused_until.values() if t > now),
+            'wait_histogram': dict(zip(labels, self._wait_histogram)),
+        }
 
 
 # Singleton rate limiter — единый для всего процесса
 _rate_limiter = _TelegramRateLimiter()
 
 
+async def send_rate_limited(bot: Bot, chat_id: int, max_retry_after: int = 2, **kwargs):
+    """
+    bot.send_message через общий планировщик отправок процесса.
+
+    Для рассылок вне TelegramNotifier (дайджесты, напоминания): лимиты
+    Telegram общие на бота, поэтому и очередь должна быть общей.
+    При RetryAfter ставит чат на паузу и повторяет до max_retry_after раз.
+    """
+    for attempt in range(max_retry_after + 1):
+        await _rate_limiter.acquire(chat_id)
+        try:
+            return await bot.send_message(chat_id=chat_id, **kwargs)
+        except TelegramRetryAfter as e:
+            _rate_limiter.pause_chat(chat_id, e.retry_after)
+            if attempt == max_retry_after:
+                raise
+
+
 class TelegramNotifier:
     """
     Сервис уведомлений в Telegram для Tender Sniper.
@@ -119,6 +210,16 @@ class TelegramNotifier:
         # Chat IDs, заблокировавшие бота (обнаруживается при TelegramForbiddenError)
         self.blocked_chat_ids: set = set()
 
+    # Повторов отправки после RetryAfter от Telegram
+    MAX_RETRY_AFTER_ATTEMPTS = 2
+
+    async def _send_message(self, chat_id: int, **kwargs):
+        """send_message через планировщик; при RetryAfter ставит чат на паузу и повторяет."""
+        return await send_rate_limited(
+            self.bot, chat_id, max_retry_after=self.MAX_RETRY_AFTER_ATTEMPTS, **kwargs
+        )
+
+    @timed('telegram_send')
     async def send_tender_notification(
         self,
         telegram_id: int,
@@ -156,10 +257,9 @@ class TelegramNotifier:
                 message = self._format_tender_message(tender, match_info, filter_name, subscription_tier)
                 keyboard = self._create_tender_keyboard(tender, is_auto_notification, subscription_tier)
 
-            # Rate limiting перед отправкой (25 msg/s глобально, 1 msg/s на чат)
-            await _rate_limiter.acquire(telegram_id)
-            await self.bot.send_message(
-                chat_id=telegram_id,
+            # Rate limiting (25 msg/s глобально, 1 msg/s на чат) + повтор после RetryAfter
+            await self._send_message(
+                telegram_id,
                 text=message,
                 reply_markup=keyboard,
                 parse_mode='HTML',
@@ -487,9 +587,8 @@ class TelegramNotifier:
                 [InlineKeyboardButton(text="📊 Моя статистика", callback_data="my_stats")]
             ])
 
-            await _rate_limiter.acquire(telegram_id)
-            await self.bot.send_message(
-                chat_id=telegram_id,
+            await self._send_message(
+                telegram_id,
                 text=message,
                 reply_markup=keyboard,
                 parse_mode='HTML'
@@ -539,9 +638,8 @@ class TelegramNotifier:
                 [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")]
             ])
 
-            await _rate_limiter.acquire(telegram_id)
-            await self.bot.send_message(
-                chat_id=telegram_id,
+            await self._send_message(
+                telegram_id,
                 text=message,
                 reply_markup=keyboard,
                 parse_mode='HTML'
@@ -567,9 +665,8 @@ class TelegramNotifier:
             keyboard: Опциональная клавиатура
         """
         try:
-            await _rate_limiter.acquire(telegram_id)
-            await self.bot.send_message(
-                chat_id=telegram_id,
+            await self._send_message(
+                telegram_id,
                 text=message,
                 reply_markup=keyboard,
                 parse_mode='HTML'
@@ -579,7 +676,9 @@ class TelegramNotifier:
 
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики уведомлений."""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats['rate_limiter'] = _rate_limiter.get_stats()
+        return stats
 
     async def close(self):
         """Закрытие сессии бота."""
@@ -158,17 +158,21 @@ class RealtimeParser:
             logger.info(f"\n📡 Опрос #{self.stats['polls'] + 1} ({datetime.now().strftime('%H:%M:%S')})")
 
             # Получаем тендеры через RSS
-            tenders = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.rss_parser.search_tenders_rss(
-                    keywords=keywords,
-                    price_min=price_min,
-                    price_max=price_max,
-                    max_results=self.max_tenders_per_poll,
-                    regions=regions,
-                    tender_type=tender_type
-                )
+            rss_params = dict(
+                keywords=keywords,
+                price_min=price_min,
+                price_max=price_max,
+                max_results=self.max_tenders_per_poll,
+                regions=regions,
+                tender_type=tender_type
             )
+            if self.rss_parser.async_transport:
+                tenders = await self.rss_parser.search_tenders_rss_async(**rss_params)
+            else:
+                tenders = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: self.rss_parser.search_tenders_rss(**rss_params)
+                )
 
             self.stats['polls'] += 1
             self.stats['last_poll'] = datetime.now()
@@ -0,0 +1,378 @@
+"""
+Query Pool - общий пул результатов RSS/HTML поиска на один цикл мониторинга.
+
+Сотни фильтров часто ищут одно и то же («бумага», «ноутбук») с одинаковыми
+регионами/законом/этапом. Без пула каждый фильтр делает свой запрос к
+zakupki.gov.ru через 2-секундный rate limit. Пул канонизирует параметры
+запроса в ключ, выполняет каждый уникальный запрос ОДИН раз за цикл
+(параллельные одинаковые запросы ждут один и тот же future) и раздаёт
+копии результатов всем фильтрам.
+
+Расширение до надмножества: ценовые границы НЕ отправляются на сервер —
+запрос делается без цены, а диапазон фильтра применяется на клиенте.
+Так фильтры с разными ценовыми диапазонами делят один HTTP запрос.
+Лимит результатов входит в ключ. Если общий запрос упёрся в лимит и
+в ценовой диапазон фильтра попало меньше max_results, для фильтра
+выполняется отдельный запрос с ценой на сервере: диапазон мог оказаться
+за обрезкой.
+
+Инкрементальный режим (watermarks=RssWatermarkStore, только цикл
+мониторинга): запрос уходит с окном от водяного знака прошлых циклов и
+возвращает только новые записи (см. rss_watermarks.py). Пул помнит,
+какие фильтры (consumer) получили результаты каждого запроса: водяной
+знак запроса продвигается, только если все они обработаны (mark_incomplete,
+withhold), а фильтр, впервые пришедший к запросу, получает полное окно
+отдельным запросом.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def merge_search_results(
+    rss_results: Any,
+    html_results: Any
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Объединяет результаты RSS и HTML поиска (RSS приоритетнее — больше данных).
+
+    Args:
+        rss_results: Список тендеров из RSS (или Exception из asyncio.gather)
+        html_results: Список тендеров из HTML (или Exception)
+
+    Returns:
+        (объединённый список, сколько новых тендеров добавил HTML)
+    """
+    results = []
+    merged_numbers = set()
+
+    if isinstance(rss_results, list):
+        for t in rss_results:
+            num = t.get('number')
+            if num:
+                merged_numbers.add(num)
+            results.append(t)
+
+    html_new = 0
+    if isinstance(html_results, list):
+        for t in html_results:
+            num = t.get('number')
+            if num and num not in merged_numbers:
+                merged_numbers.add(num)
+                results.append(t)
+                html_new += 1
+
+    return results, html_new
+
+
+def run_rss_and_html(parser: Any, watermark: Any = None, **params) -> Tuple[Awaitable, Awaitable]:
+    """
+    Awaitable RSS и HTML поиска: через async транспорт парсера (aiohttp,
+    пул прокси), если он доступен, иначе sync методы в thread executor.
+
+    watermark (RssWatermark) передаётся только RSS поиску.
+    """
+    rss_params = dict(params, watermark=watermark) if watermark is not None else params
+    if getattr(parser, 'async_transport', False):
+        return (
+            parser.search_tenders_rss_async(**rss_params),
+            parser.search_tenders_html_async(**params),
+        )
+
+    loop = asyncio.get_event_loop()
+    return (
+        loop.run_in_executor(None, functools.partial(parser.search_tenders_rss, **rss_params)),
+        loop.run_in_executor(None, functools.partial(parser.search_tenders_html, **params)),
+    )
+
+
+def _price_in_range(tender: Dict[str, Any], price_min: Optional[float], price_max: Optional[float]) -> bool:
+    """Клиентская проверка цены. Тендер без цены пропускаем (цена появится при обогащении)."""
+    price = tender.get('price')
+    if price is None:
+        return True
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return True
+    if price_min and price < price_min:
+        return False
+    if price_max and price > price_max:
+        return False
+    return True
+
+
+class QueryPool:
+    """
+    Пул результатов поисковых запросов на один цикл мониторинга.
+
+    Создаётся заново на каждый цикл (результаты не живут дольше цикла).
+    """
+
+    # Сколько результатов запрашивать на уникальный запрос.
+    # HTML отдаёт максимум 50 карточек на странице (recordsPerPage=_50).
+    RESULTS_PER_QUERY = 50
+
+    # Запрашивать без ценовых границ и фильтровать цену на клиенте
+    WIDEN_PRICE_BOUNDS = True
+
+    def __init__(self, results_per_query: Optional[int] = None, watermarks: Any = None):
+        """
+        Args:
+            watermarks: RssWatermarkStore — инкрементальный опрос (цикл мониторинга);
+                None — полное окно запроса (поиск по кнопке, первичный поиск фильтра)
+        """
+        self.results_per_query = results_per_query or self.RESULTS_PER_QUERY
+        self.watermarks = watermarks
+        self._watermark_updates: Dict[str, Dict[str, Any]] = {}
+        # Водяной знак → фильтры цикла, получившие его результаты
+        self._consumers: Dict[str, Set[Any]] = {}
+        self._incomplete: Set[Any] = set()
+        self._withheld: Dict[Any, Set[str]] = {}
+        self._futures: Dict[tuple, asyncio.Future] = {}
+        self.stats = {
+            'requests': 0,        # запросов от фильтров
+            'unique_queries': 0,  # реальных запросов к zakupki.gov.ru
+            'pool_hits': 0,       # запросов, обслуженных из пула
+            'errors': 0,
+            'narrowed': 0,        # повторов с ценой на сервере (общий запрос обрезан)
+            'incremental': 0,     # запросов с окном от водяного знака
+            'joined': 0,          # полных окон для новых потребителей запроса
+            'held_back': 0,       # водяных знаков, не продвинутых из-за ошибок фильтров
+        }
+
+    @staticmethod
+    def make_key(
+        keywords: str,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        regions: Optional[List[str]] = None,
+        tender_type: Optional[str] = None,
+        law_type: Optional[str] = None,
+        purchase_stage: Optional[str] = None,
+        purchase_method: Optional[str] = None,
+        date_from: Optional[str] = None,
+        widen_price: bool = True,
+        result_cap: Optional[int] = None,
+    ) -> tuple:
+        """
+        Канонический ключ запроса (дата — последний элемент).
+
+        Ключевое слово нормализуется (регистр, пробелы), регионы — как
+        отсортированное множество. При widen_price ценовой диапазон не
+        входит в ключ. result_cap — сколько результатов запрошено у сервера.
+        """
+        norm_keywords = ' '.join((keywords or '').lower().split())
+        norm_regions = tuple(sorted({r.strip().lower() for r in (regions or []) if r and r.strip()}))
+        price_band = (None, None) if widen_price else (price_min or None, price_max or None)
+        return (
+            norm_keywords,
+            price_band,
+            norm_regions,
+            (tender_type or '').lower() or None,
+            law_type or None,
+            purchase_stage or None,
+            purchase_method or None,
+            result_cap,
+            date_from or None,
+        )
+
+    async def fetch(
+        self,
+        parser: Any,
+        keywords: str,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        regions: Optional[List[str]] = None,
+        max_results: int = 50,
+        tender_type: Optional[str] = None,
+        law_type: Optional[str] = None,
+        purchase_stage: Optional[str] = None,
+        purchase_method: Optional[str] = None,
+        date_from: Optional[str] = None,
+        consumer: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает результаты RSS+HTML поиска для запроса, выполняя его
+        не более одного раза за цикл.
+
+        Args:
+            parser: ZakupkiRSSParser запрашивающего фильтра (используется
+                только если запрос ещё не выполнялся)
+            consumer: id фильтра (инкрементальный режим: учёт потребителей
+                водяного знака)
+            остальные: параметры как у ZakupkiRSSParser.search_tenders_rss
+
+        Returns:
+            Копии тендеров (каждый фильтр может свободно их модифицировать),
+            отфильтрованные по цене фильтра и обрезанные до max_results.
+        """
+        self.stats['requests'] += 1
+        params = dict(
+            keywords=keywords, price_min=price_min, price_max=price_max, regions=regions,
+            max_results=max_results, tender_type=tender_type, law_type=law_type,
+            purchase_stage=purchase_stage, purchase_method=purchase_method, date_from=date_from,
+        )
+        widen = self.WIDEN_PRICE_BOUNDS and bool(price_min or price_max)
+
+        results, truncated = await self._shared_query(parser, widen, consumer, **params)
+        out = self._select(results, max_results, price_min, price_max, widen)
+        if widen and truncated and len(out) < max_results:
+            # Диапазон фильтра мог остаться за обрезкой общего запроса
+            self.stats['narrowed'] += 1
+            results, _ = await self._shared_query(parser, False, consumer, **params)
+            out = self._select(results, max_results, price_min, price_max, False)
+        return out
+
+    @staticmethod
+    def _select(
+        results: List[Dict[str, Any]],
+        max_results: int,
+        price_min: Optional[float],
+        price_max: Optional[float],
+        price_filter: bool,
+    ) -> List[Dict[str, Any]]:
+        out = []
+        for tender in results:
+            if price_filter and not _price_in_range(tender, price_min, price_max):
+                continue
+            out.append(dict(tender))
+            if len(out) >= max_results:
+                break
+        return out
+
+    async def _shared_query(
+        self,
+        parser: Any,
+        widen: bool,
+        consumer: Any,
+        keywords: str,
+        price_min: Optional[float],
+        price_max: Optional[float],
+        max_results: int,
+        date_from: Optional[str],
+        **filters,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Результаты запроса из пула (выполняет его, если ещё не выполнялся)."""
+        cap = max(max_results, self.results_per_query)
+        key = self.make_key(
+            keywords, price_min, price_max, date_from=date_from,
+            widen_price=widen, result_cap=cap, **filters,
+        )
+
+        watermark_key = None
+        full_window = False
+        if self.watermarks is not None:
+            watermark_key = self.watermarks.make_key(key[:-1])  # без даты
+            if consumer is not None:
+                self._consumers.setdefault(watermark_key, set()).add(consumer)
+                if not await self.watermarks.knows_consumer(watermark_key, consumer):
+                    # Новый фильтр запроса: уже увиденные другими записи ему
+                    # не показывались — полное окно отдельным запросом
+                    full_window = True
+                    key = key + ('full',)
+
+        future = self._futures.get(key)
+        if future is None:
+            self.stats['unique_queries'] += 1
+            if full_window:
+                self.stats['joined'] += 1
+            future = asyncio.ensure_future(self._run_query(
+                parser,
+                watermark_key=watermark_key,
+                full_window=full_window,
+                keywords=keywords,
+                price_min=None if widen else price_min,
+                price_max=None if widen else price_max,
+                max_results=cap,
+                date_from=date_from,
+                **filters,
+            ))
+            self._futures[key] = future
+        else:
+            self.stats['pool_hits'] += 1
+            logger.debug(f"   ♻️ Query pool: '{keywords}' уже запрошен в этом цикле")
+
+        return await asyncio.shield(future)
+
+    async def _run_query(
+        self, parser: Any, watermark_key: Optional[str] = None, full_window: bool = False, **params
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Выполняет RSS и HTML запрос параллельно.
+
+        Returns:
+            (объединённые результаты, упёрся ли RSS или HTML в max_results)
+        """
+        watermark = None
+        if watermark_key is not None:
+            watermark = await self.watermarks.begin(watermark_key, full=full_window)
+            if not watermark.full:
+                self.stats['incremental'] += 1
+                params['date_from'] = watermark.date_from(params.get('date_from'))
+
+        rss_results, html_results = await asyncio.gather(
+            *run_rss_and_html(parser, watermark=watermark, **params), return_exceptions=True
+        )
+        if isinstance(rss_results, Exception) and isinstance(html_results, Exception):
+            self.stats['errors'] += 1
+
+        if watermark is not None:
+            if not watermark.full and isinstance(html_results, list):
+                # HTML без дат изменения: уже разобранные RSS номера пропускаем
+                html_results = [t for t in html_results if t.get('number') not in watermark.seen]
+            self.watermarks.complete(watermark, self._watermark_updates)
+
+        cap = params['max_results']
+        truncated = any(isinstance(r, list) and len(r) >= cap for r in (rss_results, html_results))
+
+        results, html_new = merge_search_results(rss_results, html_results)
+        if html_new > 0:
+            logger.info(f"      🌐 HTML добавил {html_new} новых тендеров (не было в RSS)")
+        return results, truncated
+
+    def mark_incomplete(self, consumer: Any) -> None:
+        """Фильтр не обработал результаты (ошибка поиска) — его запросы не продвигаются."""
+        self._incomplete.add(consumer)
+
+    def withhold(self, consumer: Any, numbers: Iterable[str]) -> None:
+        """Тендеры фильтра, не доставленные в этом цикле: следующий цикл разберёт их снова."""
+        self._withheld.setdefault(consumer, set()).update(n for n in numbers if n)
+
+    async def commit_watermarks(self) -> int:
+        """Продвигает водяные знаки запросов цикла (вызывать после обработки результатов)."""
+        if self.watermarks is None:
+            return 0
+        updates, self._watermark_updates = self._watermark_updates, {}
+        ready = {}
+        for key, record in updates.items():
+            consumers = self._consumers.get(key, set())
+            if consumers & self._incomplete:
+                self.stats['held_back'] += 1
+                continue
+            withheld = set()
+            for consumer in consumers:
+                withheld |= self._withheld.get(consumer, set())
+            self.watermarks.settle(record, consumers, withheld)
+            ready[key] = record
+        return await self.watermarks.commit(ready)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Статистика пула за цикл."""
+        return self.stats.copy()
+
+    def log_stats(self) -> None:
+        """Пишет итог работы пула в лог."""
+        s = self.stats
+        if not s['requests']:
+            return
+        saved = s['requests'] - s['unique_queries']
+        logger.info(
+            f"   ♻️ Query pool: {s['requests']} запросов фильтров → "
+            f"{s['unique_queries']} уникальных к zakupki.gov.ru (сэкономлено {saved})"
+            + (f", инкрементальных {s['incremental']}" if self.watermarks is not None else '')
+        )
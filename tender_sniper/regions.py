@@ -4,13 +4,15 @@
 Функции:
 - Справочник ФО и регионов (все 85 субъектов)
 - Нормализация и валидация регионов (normalize_region)
+- ID регионов и битсеты для матчинга (resolve_region_id, compile_regions)
 - Определение региона по ИНН (region_from_inn)
 - Fuzzy matching для распознавания регионов
 - Парсинг множественных регионов через запятую
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, NamedTuple, Tuple, Optional
 from difflib import get_close_matches
+from functools import lru_cache
 import re
 import logging
 
@@ -378,12 +380,14 @@ for _r in ALL_REGIONS:
     _CANONICAL_MAP[_r.lower()] = _r
 
 
+@lru_cache(maxsize=8192)
 def normalize_region(raw_text: str) -> Optional[str]:
     """
     Нормализация и валидация извлечённого региона.
 
     Принимает «сырой» текст из enrichment и возвращает каноничное имя региона,
-    либо None если текст мусорный или нераспознанный.
+    либо None если текст мусорный или нераспознанный. Результат запоминается
+    (LRU): одни и те же строки регионов приходят с каждым тендером.
 
     Args:
         raw_text: Сырой текст региона из парсера
@@ -438,28 +442,137 @@ def normalize_region(raw_text: str) -> Optional[str]:
             if official_lower in _CANONICAL_MAP:
                 return _CANONICAL_MAP[official_lower]
 
-    # 5. Отсечение района: "ЧЕЛЯБИНСКАЯ ОБЛАСТЬ КОРКИНСКИЙ" → "Челябинская область"
-    #    Ищем самый длинный совпавший регион в тексте
-    best_match = None
-    best_len = 0
-    for canonical_lower, canonical_name in _CANONICAL_MAP.items():
-        if canonical_lower in cleaned and len(canonical_lower) > best_len:
-            best_match = canonical_name
-            best_len = len(canonical_lower)
-
-    if best_match:
-        return best_match
-
-    # 6. Проверяем каждый алиас как подстроку
-    for alias_lower, official_lower in ALIAS_TO_REGION.items():
-        # Только алиасы >= 4 символов (иначе слишком много false positive)
-        if len(alias_lower) >= 4 and alias_lower in cleaned:
-            if official_lower in _CANONICAL_MAP:
-                return _CANONICAL_MAP[official_lower]
+    # 5-6. Регион или алиас внутри текста:
+    #    "ЧЕЛЯБИНСКАЯ ОБЛАСТЬ КОРКИНСКИЙ" → "Челябинская область"
+    region_id = _scan_region_id(cleaned)
+    if region_id is not None:
+        return REGION_NAMES[region_id]
+
+    return None
+
+
+# ============================================
+# ID РЕГИОНОВ И БИТОВЫЕ МАСКИ
+# ============================================
+#
+# Каждый субъект — небольшое целое (индекс в ALL_REGIONS), набор регионов
+# фильтра — int-битсет с уже раскрытыми федеральными округами. Проверка
+# региона тендера на горячем пути матчинга — один сдвиг и AND вместо
+# строковых замен и перебора алиасов на каждую пару фильтр × тендер.
+
+REGION_NAMES: List[str] = list(ALL_REGIONS)
+REGION_IDS: Dict[str, int] = {name: i for i, name in enumerate(REGION_NAMES)}
+
+# Федеральный округ → маска его регионов; ключи — как пишут в фильтрах
+DISTRICT_MASKS: Dict[str, int] = {}
+for _district, _data in FEDERAL_DISTRICTS.items():
+    _mask = 0
+    for _r in _data["regions"]:
+        _mask |= 1 << REGION_IDS[_r]
+    DISTRICT_MASKS[_district.lower()] = _mask
+    DISTRICT_MASKS[_data["code"].lower()] = _mask
+
+# Предкомпилированные шаблоны по каноничным именам и алиасам (>= 4 символов,
+# иначе слишком много false positive). Просмотр вперёд даёт перекрывающиеся
+# вхождения («томская» не прячет «омская»), длинные альтернативы — первыми.
+# Цель шаблона → (ранг, id региона); меньший ранг побеждает.
+
+
+def _lookahead_pattern(targets) -> re.Pattern:
+    alternation = '|'.join(re.escape(t) for t in sorted(targets, key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))')
+
+
+# Каноничные имена: побеждает самое длинное, при равной длине — первое в справочнике
+_CANONICAL_TARGETS: Dict[str, Tuple[Tuple[int, int], int]] = {
+    _canonical: ((-len(_canonical), _i), REGION_IDS[_name])
+    for _i, (_canonical, _name) in enumerate(_CANONICAL_MAP.items())
+}
+
+# Алиасы: побеждает стоящий раньше в ALIAS_TO_REGION. В позиции шаблон
+# находит только самое длинное вхождение, поэтому цель сразу хранит лучший
+# из алиасов-префиксов ("ленинград" внутри "ленинградская обл").
+_ALIAS_RANKS: Dict[str, Tuple[int, int]] = {
+    _alias: (_i, REGION_IDS[_CANONICAL_MAP[_official]])
+    for _i, (_alias, _official) in enumerate(ALIAS_TO_REGION.items())
+    if len(_alias) >= 4 and _official in _CANONICAL_MAP
+}
+_ALIAS_TARGETS: Dict[str, Tuple[int, int]] = {
+    _alias: min(rank for prefix, rank in _ALIAS_RANKS.items() if _alias.startswith(prefix))
+    for _alias in _ALIAS_RANKS
+}
+
+_CANONICAL_PATTERN = _lookahead_pattern(_CANONICAL_TARGETS)
+_ALIAS_PATTERN = _lookahead_pattern(_ALIAS_TARGETS)
+
+
+def _scan_region_id(text: str) -> Optional[int]:
+    """
+    Регион по вхождению в текст: самое длинное каноничное имя,
+    иначе алиас, стоящий раньше в справочнике.
+    """
+    for pattern, targets in ((_CANONICAL_PATTERN, _CANONICAL_TARGETS),
+                             (_ALIAS_PATTERN, _ALIAS_TARGETS)):
+        found = [targets[m.group(1)] for m in pattern.finditer(text)]
+        if found:
+            return min(found)[1]
+    return None
+
+
+def resolve_region_id(raw_text: str) -> Optional[int]:
+    """ID региона (индекс в REGION_NAMES) по сырому тексту или None."""
+    name = normalize_region(raw_text)
+    return REGION_IDS[name] if name is not None else None
+
+
+def region_names_from_mask(mask: int) -> List[str]:
+    """Каноничные имена регионов битсета."""
+    return [name for i, name in enumerate(REGION_NAMES) if mask >> i & 1]
 
+
+def district_mask(region_input: str) -> Optional[int]:
+    """
+    Маска регионов, если строка — федеральный округ
+    ("Центральный", "Центральный федеральный округ", "ЦФО"), иначе None.
+    """
+    text = region_input.lower().strip()
+    for key, mask in DISTRICT_MASKS.items():
+        if key in text if len(key) > 4 else key in text.split():
+            return mask
     return None
 
 
+class CompiledRegions(NamedTuple):
+    """Регионы фильтра: битсет распознанных + строки, которые не распознались."""
+    mask: int
+    unresolved: Tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def compile_regions(regions: Tuple[str, ...]) -> CompiledRegions:
+    """
+    Компиляция регионов фильтра: ФО раскрываются, регионы → биты.
+
+    Args:
+        regions: кортеж строк регионов из фильтра (как есть)
+    """
+    mask = 0
+    unresolved = []
+    for region in regions:
+        if not region or not region.strip():
+            continue
+        expanded = district_mask(region)
+        if expanded is not None:
+            mask |= expanded
+            continue
+        region_id = resolve_region_id(region)
+        if region_id is not None:
+            mask |= 1 << region_id
+        else:
+            unresolved.append(region.lower().strip())
+    return CompiledRegions(mask, tuple(unresolved))
+
+
 def region_from_inn(inn: str) -> Optional[str]:
     """
     Определение региона по ИНН заказчика.
@@ -0,0 +1,323 @@
+"""
+Report Engine - потоковая генерация отчётов «Все тендеры» (HTML и Excel).
+
+Раньше меню «Все тендеры» держало в памяти до 1000 тендеров
+(get_all_user_tenders), HTML собирался одной огромной f-строкой и писался
+в файл прямо в обработчике, Excel строился целой книгой в памяти.
+
+Здесь:
+- уведомления читаются курсором на стороне сервера (yield_per) пачками
+  по BATCH_SIZE, сразу в порядке секций отчёта (фильтр → сортировка);
+  число тендеров в секциях считается GROUP BY до чтения строк;
+- каждая пачка рендерится и дописывается в файл в потоке
+  (asyncio.to_thread) — event loop не блокируется ни рендерингом,
+  ни записью; Excel пишется в режиме write_only (ExcelReportWriter);
+- готовый файл кэшируется на диске по ключу (пользователь, формат,
+  параметры выборки, число строк, id последнего уведомления): пока новых
+  уведомлений нет, повторный запрос отдаёт файл сразу.
+
+Параметры отчёта (params) — filter_params меню «Все тендеры»: sort_by,
+price_min, price_max, region, filter, period_days, period_hours,
+filter_expired.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReportSummary(NamedTuple):
+    """Что попадёт в отчёт: секции по фильтрам и ключ кэша."""
+    count: int
+    groups: List[Dict[str, Any]]
+    criteria: Dict[str, Any]
+    cache_key: str
+
+
+class ReportResult(NamedTuple):
+    """Готовый файл отчёта."""
+    path: Path
+    filename: str
+    count: int
+    cached: bool
+
+
+def _report_tender(tender: Dict[str, Any]) -> Dict[str, Any]:
+    """Дефолты вместо None для HTML шаблона."""
+    return {
+        'number': tender.get('number') or 'N/A',
+        'name': tender.get('name') or 'Без названия',
+        'price': tender.get('price'),  # None это OK для цены
+        'url': tender.get('url') or '',
+        'customer_name': tender.get('customer_name') or 'Не указан',
+        'region': tender.get('region') or 'Не указан',
+        'published_date': tender.get('published_date') or '',
+        'submission_deadline': tender.get('submission_deadline'),
+        'sent_at': tender.get('sent_at') or datetime.now().isoformat(),
+        'source': tender.get('source') or 'automonitoring',
+    }
+
+
+class _HtmlReportWriter:
+    """Последовательная запись HTML отчёта (синхронно — вызывается через to_thread)."""
+
+    def __init__(self, path: Path, username: str, total: int, filters_count: int):
+        from tender_sniper.all_tenders_report import render_report_head
+
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(render_report_head(username, total, filters_count, total))
+
+    def open_section(self, filter_name: str, count: int) -> None:
+        from tender_sniper.all_tenders_report import render_filter_section_open
+        self._file.write(render_filter_section_open(filter_name, count))
+
+    def write_cards(self, filter_name: str, tenders: List[Dict[str, Any]]) -> None:
+        from tender_sniper.all_tenders_report import render_tender_card
+        self._file.write(''.join(
+            render_tender_card(_report_tender(tender), filter_name) for tender in tenders
+        ))
+
+    def close_section(self) -> None:
+        from tender_sniper.all_tenders_report import FILTER_SECTION_CLOSE
+        self._file.write(FILTER_SECTION_CLOSE)
+
+    def finish(self, empty: bool) -> None:
+        from tender_sniper.all_tenders_report import EMPTY_STATE_HTML, render_report_footer
+        if empty:
+            self._file.write(EMPTY_STATE_HTML)
+        self._file.write(render_report_footer())
+        self._file.close()
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+class TenderReportEngine:
+    """Потоковые отчёты по уведомлениям пользователя с файловым кэшем."""
+
+    # Строк из БД за одно чтение курсора и одну запись в файл
+    BATCH_SIZE = 500
+    # Последних уведомлений в отчёте (как прежний limit get_all_user_tenders)
+    MAX_ROWS = 1000
+    # Готовых файлов на пользователя, остальные удаляются (LRU по mtime)
+    MAX_CACHED_PER_USER = 10
+
+    EXTENSIONS = {'html': 'html', 'excel': 'xlsx'}
+
+    def __init__(self, cache_dir: Optional[Path] = None, db=None):
+        """
+        Args:
+            cache_dir: каталог готовых отчётов (по умолчанию REPORTS_CACHE_DIR или reports/cache)
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv('REPORTS_CACHE_DIR', 'reports/cache'))
+        self._db = db
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._stats = {'built': 0, 'cache_hits': 0, 'rows_written': 0}
+
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
+    # ============================================
+    # ПАРАМЕТРЫ И КЛЮЧ КЭША
+    # ============================================
+
+    @staticmethod
+    def _criteria(params: Dict[str, Any]) -> Dict[str, Any]:
+        """filter_params меню → условия выборки TenderSniperDB._report_conditions."""
+        criteria: Dict[str, Any] = {
+            'not_expired': params.get('filter_expired', True),
+            'price_min': params.get('price_min'),
+            'price_max': params.get('price_max'),
+            'region': params.get('region'),
+        }
+
+        # Даты в БД — naive UTC
+        hours = params.get('period_hours') or (params.get('period_days') or 0) * 24
+        if hours:
+            criteria['sent_after'] = datetime.utcnow() - timedelta(hours=hours)
+
+        selected_filter = params.get('filter')
+        if selected_filter == 'Без фильтра':
+            criteria['without_filter'] = True
+        elif selected_filter:
+            criteria['filter_prefix'] = selected_filter
+        return criteria
+
+    async def summarize(
+        self,
+        user_id: int,
+        report_format: str = 'html',
+        params: Optional[Dict[str, Any]] = None,
+        username: str = 'Пользователь',
+        max_rows: Optional[int] = None
+    ) -> ReportSummary:
+        """
+        Секции и ключ кэша отчёта — два агрегирующих запроса, без чтения строк.
+
+        Args:
+            user_id: ID пользователя в БД (sniper_users.id)
+            report_format: 'html' или 'excel'
+            params: filter_params меню «Все тендеры»
+            username: имя в шапке HTML
+            max_rows: сколько последних уведомлений включать (по умолчанию MAX_ROWS)
+        """
+        params = params or {}
+        max_rows = max_rows or self.MAX_ROWS
+        db = await self._get_db()
+
+        criteria = self._criteria(params)
+        groups, min_id = await db.get_user_report_groups(user_id, criteria, max_rows)
+        if min_id is not None:
+            criteria['min_id'] = min_id
+
+        count = sum(group['count'] for group in groups)
+        last_id = max((group['last_id'] for group in groups), default=0)
+        # Период входит в ключ как params (а не как дата отсечки): тендеры,
+        # выпавшие из окна, меняют count — и ключ вместе с ним
+        key_source = json.dumps(
+            [user_id, report_format, params, username, max_rows, count, last_id],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        cache_key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:32]
+        return ReportSummary(count, groups, criteria, cache_key)
+
+    # ============================================
+    # ГЕНЕРАЦИЯ
+    # ============================================
+
+    async def build(
+        self,
+        user_id: int,
+        report_format: str = 'html',
+        params: Optional[Dict[str, Any]] = None,
+        username: str = 'Пользователь',
+        max_rows: Optional[int] = None
+    ) -> ReportResult:
+        """
+        Файл отчёта: из кэша, если с прошлой генерации ничего не изменилось,
+        иначе потоковая генерация.
+
+        Args: как у summarize.
+        """
+        params = params or {}
+        extension = self.EXTENSIONS.get(report_format, 'html')
+        summary = await self.summarize(user_id, report_format, params, username, max_rows)
+
+        user_dir = self.cache_dir / f"user_{user_id}"
+        path = user_dir / f"{summary.cache_key}.{extension}"
+        filename = f"all_tenders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+        # Параллельные запросы одного отчёта ждут одну генерацию
+        lock = self._locks.setdefault(summary.cache_key, asyncio.Lock())
+        try:
+            async with lock:
+                if path.exists():
+                    os.utime(path)  # отметка для LRU-очистки
+                    self._stats['cache_hits'] += 1
+                    logger.info(f"📄 Отчёт из кэша: user={user_id}, {report_format}, {summary.count} тендеров")
+                    return ReportResult(path, filename, summary.count, True)
+
+                user_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = user_dir / f".{summary.cache_key}.{os.getpid()}.tmp"
+                try:
+                    if report_format == 'excel':
+                        await self._write_excel(user_id, summary, params, tmp_path)
+                    else:
+                        await self._write_html(user_id, summary, params, username, tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+        finally:
+            if not lock.locked():
+                self._locks.pop(summary.cache_key, None)
+
+        self._stats['built'] += 1
+        logger.info(f"📄 Отчёт сгенерирован: user={user_id}, {report_format}, {summary.count} тендеров")
+        await asyncio.to_thread(self._evict, user_dir)
+        return ReportResult(path, filename, summary.count, False)
+
+    async def _iter_batches(self, user_id: int, summary: ReportSummary, filter_name: Optional[str], sort_by: str):
+        db = await self._get_db()
+        async with aclosing(db.iter_user_report_tenders(
+            user_id, summary.criteria, filter_name=filter_name, sort_by=sort_by, batch_size=self.BATCH_SIZE
+        )) as batches:
+            async for batch in batches:
+                self._stats['rows_written'] += len(batch)
+                yield batch
+
+    async def _write_html(
+        self,
+        user_id: int,
+        summary: ReportSummary,
+        params: Dict[str, Any],
+        username: str,
+        path: Path
+    ) -> None:
+        """HTML: секции фильтров по очереди, карточки — пачками из курсора."""
+        sort_by = params.get('sort_by', 'date_desc')
+        writer = await asyncio.to_thread(_HtmlReportWriter, path, username, summary.count, len(summary.groups))
+        try:
+            for group in summary.groups:
+                name = group['filter_name']
+                await asyncio.to_thread(writer.open_section, name, group['count'])
+                async for batch in self._iter_batches(user_id, summary, name, sort_by):
+                    await asyncio.to_thread(writer.write_cards, name, batch)
+                await asyncio.to_thread(writer.close_section)
+            await asyncio.to_thread(writer.finish, not summary.groups)
+        except BaseException:
+            writer.abort()
+            raise
+
+    async def _write_excel(
+        self,
+        user_id: int,
+        summary: ReportSummary,
+        params: Dict[str, Any],
+        path: Path
+    ) -> None:
+        """Excel: одна таблица в порядке сортировки, книга в режиме write_only."""
+        from bot.utils.excel_export import ExcelReportWriter
+
+        writer = await asyncio.to_thread(ExcelReportWriter, path)
+        async for batch in self._iter_batches(user_id, summary, None, params.get('sort_by', 'date_desc')):
+            await asyncio.to_thread(writer.write_rows, batch)
+        await asyncio.to_thread(writer.close)
+
+    def _evict(self, user_dir: Path) -> None:
+        """Оставляет MAX_CACHED_PER_USER последних использованных файлов."""
+        try:
+            files = sorted(
+                (f for f in user_dir.iterdir() if f.is_file() and not f.name.startswith('.')),
+                key=lambda f: f.stat().st_mtime,
+                reverse=True
+            )
+            for stale in files[self.MAX_CACHED_PER_USER:]:
+                stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"⚠️ Очистка кэша отчётов {user_dir}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+
+_engine: Optional[TenderReportEngine] = None
+
+
+def get_report_engine() -> TenderReportEngine:
+    """Общий на процесс генератор отчётов."""
+    global _engine
+    if _engine is None:
+        _engine = TenderReportEngine()
+    return _engine
@@ -0,0 +1,299 @@
+"""
+RSS Watermarks - инкрементальный опрос RSS в цикле мониторинга.
+
+Каждый цикл InstantSearch запрашивает окно «последние 3 дня» на каждый
+запрос, и ZakupkiRSSParser разбирает записи, почти все из которых уже
+обработаны в прошлых циклах. Фид отсортирован по дате изменения
+(sortBy=UPDATE_DATE, новые сверху), поэтому на канонический запрос пула
+(QueryPool.make_key без даты) хранится водяной знак:
+
+- newest — самый свежий pubDate, который видели;
+- seen — {номер тендера: pubDate} записей из окна перекрытия.
+
+Следующий цикл запрашивает окно с даты (newest − OVERLAP) по МСК
+(publishDateFrom — с точностью до дня), парсер останавливается на первой
+записи старше newest − OVERLAP и пропускает записи с тем же номером и
+pubDate (изменённое извещение приходит с новым pubDate и разбирается
+заново). Полный проход по 3 дням — раз в FULL_RESCAN_INTERVAL на запрос
+(со случайным сдвигом, чтобы запросы не пересканировались одним циклом).
+
+Водяные знаки продвигаются только после обработки цикла: обновления
+копит QueryPool цикла, TenderSniperService вызывает commit_watermarks()
+после рассылки. Если цикл упал, следующий запросит то же окно. Запрос,
+фильтр-потребитель которого завершился с ошибкой поиска, не продвигается;
+недоставленные тендеры (ошибка обогащения, квота, лимит триала, ошибка
+отправки) не отмечаются увиденными, а newest не уходит дальше их pubDate —
+следующий цикл разберёт их снова. Фильтр, впервые пришедший к запросу
+(consumers водяного знака), получает полное окно.
+
+Хранение — память процесса + CacheEntry (cache_type='rss_watermark'),
+переживает рестарт и смену лидера.
+"""
+
+import hashlib
+import json
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RssWatermark:
+    """
+    Окно одного запроса на время цикла: передаётся в парсер, который
+    читает since/seen и отмечает увиденные записи.
+    """
+
+    def __init__(self, key: str, since: Optional[datetime] = None,
+                 seen: Optional[Dict[str, str]] = None):
+        self.key = key
+        # Записи с pubDate раньше since уже обработаны (None — полный проход)
+        self.since = since
+        self.seen: Dict[str, str] = seen or {}
+        self.observed: Dict[str, str] = {}
+        self.newest: Optional[datetime] = None
+        # Фид получен и разобран (иначе водяной знак не двигаем)
+        self.fetched = False
+        self.bytes = 0
+        self.skipped_seen = 0
+        self.stopped_early = False
+
+    @property
+    def full(self) -> bool:
+        return self.since is None
+
+    def date_from(self, default: Optional[str]) -> Optional[str]:
+        """publishDateFrom окна: дата since по МСК, но не раньше default."""
+        if self.since is None:
+            return default
+        since_msk = self.since + RssWatermarkStore.MSK_OFFSET
+        if default:
+            try:
+                if datetime.strptime(default, '%d.%m.%Y').date() >= since_msk.date():
+                    return default
+            except ValueError:
+                pass
+        return since_msk.strftime('%d.%m.%Y')
+
+    def is_before_window(self, published: Optional[datetime]) -> bool:
+        """Запись старше окна — дальше по фиду только обработанные."""
+        return self.since is not None and published is not None and published < self.since
+
+    def is_seen(self, number: str, published: Optional[datetime]) -> bool:
+        """Та же запись (номер и pubDate) уже разбиралась в прошлом цикле."""
+        if not number or number not in self.seen:
+            return False
+        return published is None or self.seen[number] == published.isoformat()
+
+    def observe(self, number: str, published: Optional[datetime]) -> None:
+        if not number:
+            return
+        self.observed[number] = published.isoformat() if published else ''
+        if published and (self.newest is None or published > self.newest):
+            self.newest = published
+
+
+class RssWatermarkStore:
+    """Водяные знаки RSS по каноническим запросам (память + CacheEntry)."""
+
+    CACHE_TYPE = 'rss_watermark'
+    KEY_PREFIX = 'wm:'
+    DB_TTL_HOURS = 24 * 7
+
+    # Перекрытие окна: записи, появившиеся в фиде с опозданием
+    OVERLAP = timedelta(hours=3)
+    # Полный проход по 3 дням не реже, чем раз в столько (±20%)
+    FULL_RESCAN_INTERVAL = timedelta(hours=6)
+    # publishDateFrom на zakupki.gov.ru — дата по Москве
+    MSK_OFFSET = timedelta(hours=3)
+
+    def __init__(self, db=None, persistent: bool = True):
+        """
+        Args:
+            db: TenderSniperDB (по умолчанию get_sniper_db() при первом обращении)
+            persistent: False — только память (тесты, скрипты без БД)
+        """
+        self._db = db
+        self._persistent = persistent
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._stats = {
+            'incremental': 0,
+            'full_scans': 0,
+            'bytes': 0,
+            'skipped_seen': 0,
+            'stopped_early': 0,
+            'commits': 0,
+        }
+
+    async def _get_db(self):
+        if self._db is None:
+            from tender_sniper.database import get_sniper_db
+            self._db = await get_sniper_db()
+        return self._db
+
+    @classmethod
+    def make_key(cls, pool_key: tuple) -> str:
+        """Ключ хранения по каноническому ключу QueryPool (без даты)."""
+        raw = json.dumps(pool_key, ensure_ascii=False, default=str)
+        return cls.KEY_PREFIX + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self._memory.get(key)
+        if record is not None or not self._persistent:
+            return record
+        try:
+            db = await self._get_db()
+            record = (await db.cache_get_many([key], self.CACHE_TYPE)).get(key)
+        except Exception as e:
+            logger.debug(f"RSS watermark load error: {e}")
+            return None
+        if isinstance(record, dict):
+            self._memory[key] = record
+            return record
+        return None
+
+    # ============================================
+    # ЦИКЛ
+    # ============================================
+
+    async def begin(self, key: str, now: Optional[datetime] = None, full: bool = False) -> RssWatermark:
+        """
+        Окно запроса на этот цикл: инкрементальное или полный проход.
+
+        Args:
+            full: принудительно полный проход (новый фильтр-потребитель)
+        """
+        now = now or datetime.utcnow()
+        record = await self._load(key)
+        newest = _parse_iso(record.get('newest')) if record else None
+        next_full_at = _parse_iso(record.get('next_full_at')) if record else None
+
+        if full or newest is None or next_full_at is None or now >= next_full_at:
+            self._stats['full_scans'] += 1
+            return RssWatermark(key)
+
+        self._stats['incremental'] += 1
+        return RssWatermark(key, since=newest - self.OVERLAP, seen=dict(record.get('seen') or {}))
+
+    async def knows_consumer(self, key: str, consumer: Any) -> bool:
+        """
+        Потребитель уже получал окно этого запроса. Без водяного знака
+        (окно и так полное) — True.
+        """
+        record = await self._load(key)
+        if not record or not record.get('newest'):
+            return True
+        return str(consumer) in (record.get('consumers') or [])
+
+    def complete(self, watermark: RssWatermark, updates: Dict[str, Dict[str, Any]],
+                 now: Optional[datetime] = None) -> None:
+        """
+        Складывает результат окна в updates цикла (без успешного фида — ничего).
+
+        Args:
+            updates: обновления цикла до commit() (их держит QueryPool)
+        """
+        self._stats['bytes'] += watermark.bytes
+        self._stats['skipped_seen'] += watermark.skipped_seen
+        self._stats['stopped_early'] += int(watermark.stopped_early)
+        if not watermark.fetched:
+            return
+
+        now = now or datetime.utcnow()
+        key = watermark.key
+        record = updates.get(key) or self._memory.get(key) or {}
+        candidates = [d for d in (_parse_iso(record.get('newest')), watermark.newest) if d]
+        newest = max(candidates) if candidates else None
+
+        seen = {} if watermark.full else dict(record.get('seen') or {})
+        seen.update(watermark.observed)
+
+        if watermark.full:
+            interval = self.FULL_RESCAN_INTERVAL.total_seconds() * random.uniform(0.8, 1.2)
+            next_full_at = (now + timedelta(seconds=interval)).isoformat()
+        else:
+            next_full_at = record.get('next_full_at')
+
+        updates[key] = {
+            'newest': newest.isoformat() if newest else None,
+            'seen': seen,
+            'next_full_at': next_full_at,
+            'consumers': list(record.get('consumers') or []),
+        }
+
+    @staticmethod
+    def settle(record: Dict[str, Any], consumers: Iterable[Any], withheld: Iterable[str]) -> None:
+        """
+        Итог цикла для обновления запроса перед commit(): отмечает
+        потребителей, получивших окно, и возвращает в разбор недоставленные
+        тендеры — убирает их из seen, а newest не пускает дальше их pubDate.
+        """
+        record['consumers'] = sorted(set(record.get('consumers') or []) | {str(c) for c in consumers})
+        seen = record.get('seen') or {}
+        newest = _parse_iso(record.get('newest'))
+        for number in withheld:
+            published = _parse_iso(seen.pop(number, None))
+            if newest is not None and published is not None and published < newest:
+                newest = published
+        record['newest'] = newest.isoformat() if newest else None
+
+    async def commit(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Продвигает водяные знаки цикла (после того, как результаты обработаны).
+
+        Returns:
+            Количество обновлённых запросов
+        """
+        if not updates:
+            return 0
+        for record in updates.values():
+            newest = _parse_iso(record.get('newest'))
+            if newest is None:
+                continue
+            # Нужны только записи окна перекрытия: более старые отсекает is_before_window
+            horizon = newest - self.OVERLAP
+            record['seen'] = {
+                number: published for number, published in (record.get('seen') or {}).items()
+                if not published or (_parse_iso(published) or newest) >= horizon
+            }
+        self._memory.update(updates)
+        self._stats['commits'] += 1
+        if self._persistent:
+            try:
+                db = await self._get_db()
+                await db.cache_set_many(dict(updates), self.CACHE_TYPE, ttl_hours=self.DB_TTL_HOURS)
+            except Exception as e:
+                logger.warning(f"⚠️ RSS watermarks: не удалось сохранить в БД: {e}")
+        return len(updates)
+
+    # ============================================
+    # СЛУЖЕБНОЕ
+    # ============================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'queries': len(self._memory),
+        }
+
+
+_store: Optional[RssWatermarkStore] = None
+
+
+def get_rss_watermarks() -> RssWatermarkStore:
+    """Общие на процесс водяные знаки RSS."""
+    global _store
+    if _store is None:
+        _store = RssWatermarkStore()
+    return _store
@@ -8,6 +8,7 @@ Tender Sniper Service - главный модуль координации.
 import asyncio
 import os
 import sys
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -25,10 +26,15 @@ from tender_sniper.database import get_sniper_db, init_subscription_plans, get_p
 from tender_sniper.notifications.telegram_notifier import TelegramNotifier
 from tender_sniper.config import is_tender_sniper_enabled, is_component_enabled
 from tender_sniper.instant_search import InstantSearch
-from tender_sniper.monitoring import send_error_to_telegram
+from tender_sniper.query_pool import QueryPool
+from tender_sniper.rss_watermarks import get_rss_watermarks
+from tender_sniper.enrichment_store import get_enrichment_store
+from tender_sniper.monitoring import send_error_to_telegram, log_proxy_health, publish_proxy_health
 from tender_sniper.ai_name_generator import generate_tender_name  # AI генератор названий
+from tender_sniper.name_shortener import get_name_shortener
 from tender_sniper.tender_name_resolver import resolve_tender_name  # единый резолвер названия
 from tender_sniper.procedure_titles import is_procedure_type_only
+from tender_sniper.instrumentation import format_stage_summary, get_stage_metrics, timed
 from bot.config import BotConfig  # Для проверки админа
 import json
 
@@ -49,6 +55,15 @@ class TenderSniperService:
     # Московское время (UTC+3)
     MOSCOW_TZ_OFFSET = 3
 
+    # Сколько секунд цикл ждёт пакетную AI-генерацию названий фильтра
+    NAME_PREFETCH_TIMEOUT = 8.0
+
+    # Пауза между уведомлениями (flood limit Telegram)
+    NOTIFICATION_SEND_DELAY = 0.1
+
+    # Сколько отправленных уведомлений копить до записи в БД
+    NOTIFICATION_FLUSH_EVERY = 10
+
     def __init__(
         self,
         bot_token: str,
@@ -111,6 +126,13 @@ class TenderSniperService:
         self.db = await get_sniper_db()
         logger.info("   ✅ Sniper DB подключена")
 
+        # Таблица чат → пользователи для дедупликации в групповых чатах
+        try:
+            recipients = await self.db.rebuild_filter_chat_recipients()
+            logger.info(f"   ✅ Получатели групповых чатов: {recipients}")
+        except Exception as e:
+            logger.warning(f"   ⚠️ Не удалось обновить получателей групповых чатов: {e}")
+
         # Инициализируем тарифные планы (ВРЕМЕННО ОТКЛЮЧЕНО - требует миграции на PostgreSQL)
         # await init_subscription_plans(self.db_path)
         logger.info("✅ База данных готова")
@@ -198,6 +220,8 @@ class TenderSniperService:
         if self.notifier:
             await self.notifier.close()
 
+        await get_enrichment_store().flush()
+
         if self.db and hasattr(self.db, 'close'):
             try:
                 await self.db.close()
@@ -230,6 +254,9 @@ class TenderSniperService:
         Args:
             new_tenders: Список новых тендеров от парсера (ИГНОРИРУЕТСЯ в новой логике)
         """
+        stage_metrics = get_stage_metrics()
+        stage_snapshot = stage_metrics.snapshot()
+        cycle_started = time.perf_counter()
         try:
             logger.info(f"\n🔄 Проверка активных фильтров...")
 
@@ -281,16 +308,23 @@ class TenderSniperService:
             # Фаза 1: Параллельный RSS+HTML поиск по всем фильтрам
             # Семафор ограничивает одновременные запросы к RSS (не перегружаем zakupki.gov.ru)
             semaphore = asyncio.Semaphore(8)
+            # Общий пул запросов цикла: одинаковые ключевые слова разных фильтров
+            # запрашиваются у zakupki.gov.ru один раз; окно запроса — от водяного
+            # знака прошлых циклов (только новые записи RSS)
+            query_pool = QueryPool(watermarks=get_rss_watermarks())
 
             async def _search_one(fdata):
                 async with semaphore:
-                    return await self._search_filter_matches(fdata)
+                    return await self._search_filter_matches(fdata, query_pool=query_pool)
 
             logger.info(f"   ⚡ Параллельный поиск по {len(filters)} фильтрам (max 8 одновременно)...")
             raw_results = await asyncio.gather(
                 *[_search_one(f) for f in filters],
                 return_exceptions=True
             )
+            query_pool.log_stats()
+            log_proxy_health()
+            await publish_proxy_health(self.db)
 
             # Фаза 2: Последовательная обработка результатов + отправка
             # (деdup, quota check, send — всё в одном потоке, без race conditions)
@@ -305,6 +339,28 @@ class TenderSniperService:
             failed_count = 0
             search_error_count = 0
 
+            # Пакетная проверка дублей и квот: один проход по БД на весь цикл
+            # вместо запросов на каждый тендер
+            MIN_SCORE_FOR_NOTIFICATION = 35
+            user_pairs, chat_pairs = set(), set()
+            for filter_data, result in zip(filters, raw_results):
+                if isinstance(result, Exception):
+                    continue
+                notify_chat_ids = filter_data.get('notify_chat_ids') or []
+                for match in result.get('matches', []):
+                    tender_number = match.get('number')
+                    if not tender_number or match.get('match_score', 0) < MIN_SCORE_FOR_NOTIFICATION:
+                        continue
+                    user_pairs.add((filter_data['user_id'], tender_number))
+                    for chat_id in notify_chat_ids:
+                        if chat_id < 0:
+                            chat_pairs.add((chat_id, tender_number))
+
+            precheck = await self.db.bulk_notification_precheck(user_pairs, chat_pairs)
+            notified_pairs = precheck['notified']
+            chat_sent_pairs = precheck['sent_to_chat']
+            quota_used = precheck['quota_used']
+
             for filter_data, result in zip(filters, raw_results):
                 filter_id = filter_data['id']
                 filter_name = filter_data['name']
@@ -320,6 +376,7 @@ class TenderSniperService:
                 if isinstance(result, Exception):
                     logger.error(f"   ❌ Ошибка поиска для фильтра {filter_id} «{filter_name}»: {result}", exc_info=result)
                     search_error_count += 1
+                    query_pool.mark_incomplete(filter_id)
                     error_count = await self.db.increment_filter_error_count(filter_id)
                     if error_count >= 3 and self.notifier and telegram_id:
                         error_type = "Прокси" if "proxy" in str(result).lower() or "timeout" in str(result).lower() else "RSS"
@@ -331,12 +388,25 @@ class TenderSniperService:
                         )
                     continue
 
+                if result.get('error'):
+                    # Поиск упал внутри InstantSearch — результаты запросов фильтра не разобраны
+                    query_pool.mark_incomplete(filter_id)
+
                 matches = result.get('matches', [])
                 logger.info(f"\n   🔍 Фильтр «{filter_name}» (ID: {filter_id}): {len(matches)} совпадений")
 
-                # Единый порог для composite score
-                MIN_SCORE_FOR_NOTIFICATION = 35
                 notifications_to_send = []
+                # Тендеры, поставленные в очередь этим фильтром (дубли в выдаче).
+                # notified_pairs пополняется только при отправке/сохранении:
+                # неотправленный тендер другие фильтры пользователя пробуют снова
+                queued_numbers = set()
+                # Тендеры фильтра, которые цикл не доставил: водяной знак их не
+                # отмечает, следующий цикл разберёт их снова
+                undelivered = set(result.get('unenriched') or [])
+                undelivered.update(
+                    m.get('number') for m in matches
+                    if m.get('number') and m.get('match_score', 0) >= MIN_SCORE_FOR_NOTIFICATION
+                )
 
                 for match in matches:
                     tender = match
@@ -348,6 +418,7 @@ class TenderSniperService:
 
                     # Проверка: дедлайн не просрочен
                     deadline = tender.get('submission_deadline') or tender.get('deadline') or tender.get('end_date')
+                    deadline_date = None
                     if deadline:
                         try:
                             deadline_date = None
@@ -359,13 +430,16 @@ class TenderSniperService:
                                 except ValueError:
                                     continue
                             if deadline_date and deadline_date < datetime.now():
+                                undelivered.discard(tender_number)
                                 continue
                         except Exception:
                             pass
 
-                    # Проверяем, не отправляли ли уже (БД)
-                    already_notified = await self.db.is_tender_notified(tender_number, user_id)
-                    if already_notified:
+                    # Проверяем, не отправляли ли уже (БД + этот цикл)
+                    if (user_id, tender_number) in notified_pairs:
+                        undelivered.discard(tender_number)
+                        continue
+                    if tender_number in queued_numbers:
                         continue
 
                     # Проверяем квоту
@@ -374,7 +448,7 @@ class TenderSniperService:
                         daily_limit = filter_data.get('notifications_limit') or (
                             20 if subscription_tier == 'trial' else (50 if subscription_tier == 'starter' else 9999)
                         )
-                        has_quota = await self.db.check_notification_quota(user_id, daily_limit)
+                        has_quota = user_id in quota_used and quota_used[user_id] < daily_limit
                         if not has_quota:
                             logger.warning(f"      ⚠️  Квота исчерпана для user {user_id}")
                             if self.notifier:
@@ -386,17 +460,16 @@ class TenderSniperService:
                     else:
                         logger.info(f"      👑 Админ {telegram_id}: неограниченный доступ")
 
+                    queued_before = len(notifications_to_send)
                     for target_chat_id in target_chat_ids:
                         dedup_key = (target_chat_id, tender_number)
                         if dedup_key in seen_tenders:
                             continue
 
                         # Для групповых чатов: проверяем, не отправлял ли уже ДРУГОЙ пользователь
-                        if target_chat_id < 0:
-                            already_in_chat = await self.db.is_tender_sent_to_chat(tender_number, target_chat_id)
-                            if already_in_chat:
-                                seen_tenders.add(dedup_key)
-                                continue
+                        if target_chat_id < 0 and dedup_key in chat_sent_pairs:
+                            seen_tenders.add(dedup_key)
+                            continue
 
                         seen_tenders.add(dedup_key)
                         notifications_to_send.append({
@@ -420,8 +493,14 @@ class TenderSniperService:
                             'filter_id': filter_id,
                             'filter_name': filter_name,
                             'score': score,
-                            'subscription_tier': subscription_tier
+                            'subscription_tier': subscription_tier,
+                            # Разобранный срок подачи — не парсим повторно при сохранении
+                            'submission_deadline_dt': deadline_date,
                         })
+                    if len(notifications_to_send) == queued_before:
+                        # Все чаты уже получили тендер (этот цикл или другой пользователь)
+                        undelivered.discard(tender_number)
+                    queued_numbers.add(tender_number)
                     logger.info(f"      📤 К отправке: {tender_number} (score: {score})")
 
                 # === НЕМЕДЛЕННАЯ ОТПРАВКА уведомлений этого фильтра ===
@@ -439,114 +518,147 @@ class TenderSniperService:
 
                     logger.info(f"      📤 Отправка {len(notifications_to_send)} уведомлений фильтра «{filter_name}»...")
 
+                    # Короткие названия пачкой: кэш из БД + пакетный запрос к LLM
+                    # в потоке. Ждём не дольше NAME_PREFETCH_TIMEOUT — дальше fallback,
+                    # AI-название догенерируется в фоне для следующих показов.
+                    long_names = []
                     for notif in notifications_to_send:
-                      try:
-                        ntf_telegram_id = notif['telegram_id']
-                        tender_number = notif['tender'].get('number', '?')
+                        notif['resolved_name'] = resolve_tender_name(
+                            notif['tender'], notif.get('match_info'), max_length=120
+                        )
+                        if len(notif['resolved_name']) > 80 and not is_procedure_type_only(notif['resolved_name']):
+                            long_names.append((notif['resolved_name'], notif['tender']))
+                    if long_names:
+                        await get_name_shortener().shorten_many(
+                            long_names, max_length=80, timeout=self.NAME_PREFETCH_TIMEOUT
+                        )
 
-                        # Проверяем тихие часы (из pre-populated кэша, fallback на БД)
-                        if ntf_telegram_id not in user_data_cache:
-                            user_data_cache[ntf_telegram_id] = await self.db.get_user_by_telegram_id(ntf_telegram_id) or {}
+                    # Сохранение в БД и счётчики квот — пачками по ходу отправки
+                    to_save = []
+                    quota_increments = {}
+
+                    try:
+                        for notif in notifications_to_send:
+                          # Отправленные уведомления сохраняем пачками по ходу рассылки:
+                          # рассылка фильтра идёт минутами, а без записи в БД уже
+                          # отправленное при сбое ушло бы повторно в следующем цикле
+                          if len(to_save) >= self.NOTIFICATION_FLUSH_EVERY:
+                              await self._flush_notification_batch(to_save, quota_increments)
+                              to_save.clear()
+                              quota_increments.clear()
+
+                          try:
+                            ntf_telegram_id = notif['telegram_id']
+                            tender_number = notif['tender'].get('number', '?')
+
+                            # Проверяем тихие часы (из pre-populated кэша, fallback на БД)
+                            if ntf_telegram_id not in user_data_cache:
+                                user_data_cache[ntf_telegram_id] = await self.db.get_user_by_telegram_id(ntf_telegram_id) or {}
+
+                            user_data = user_data_cache.get(ntf_telegram_id, {})
+                            is_quiet_hours = not await self._should_send_notification(user_data)
+
+                            tender = notif['tender']
+
+                            # Каноническое название ОДИН РАЗ — для уведомления, БД,
+                            # кабинета и Bitrix. Строго предмет закупки, не тип процедуры.
+                            # Единый резолвер: сырое имя → объект из summary →
+                            # ai_simple_name → ai_summary → описание → номер.
+                            short_name = notif['resolved_name']
+                            # Если резолвер вернул длинное «сырое» имя — поджимаем через AI
+                            # (из кэша NameShortener, без синхронного запроса к LLM)
+                            if len(short_name) > 80 and not is_procedure_type_only(short_name):
+                                short_name = generate_tender_name(
+                                    short_name, tender_data=tender, max_length=80
+                                )
+                            # Заменяем название в тендере на короткое
+                            tender['name'] = short_name
+
+                            # Нормализуем данные тендера (маппинг из InstantSearch формата в БД формат)
+                            tender_data = {
+                                'number': tender.get('number', ''),
+                                'name': short_name,
+                                'price': tender.get('price'),
+                                'url': tender.get('url', ''),
+                                'region': tender.get('customer_region', tender.get('region', '')),
+                                'customer_name': tender.get('customer', tender.get('customer_name', '')),
+                                'published_date': tender.get('published', tender.get('published_date', '')),
+                                'submission_deadline': tender.get('submission_deadline', ''),
+                                'published_dt': tender.get('published_datetime'),
+                                'submission_deadline_dt': notif.get('submission_deadline_dt'),
+                            }
+                            notification_record = {
+                                'user_id': notif['user_id'],
+                                'filter_id': notif['filter_id'],
+                                'filter_name': notif['filter_name'],
+                                'tender_data': tender_data,
+                                'score': notif['score'],
+                                'matched_keywords': notif['match_info'].get('matched_keywords', []),
+                                'match_info': notif.get('match_info'),
+                            }
+
+                            if is_quiet_hours:
+                                logger.info(f"      🌙 Тихие часы для {ntf_telegram_id} — сохраняем без отправки")
+                                to_save.append(notification_record)
+                                undelivered.discard(tender_number)
+                                notified_pairs.add((notif['user_id'], tender_number))
+                                continue
 
-                        user_data = user_data_cache.get(ntf_telegram_id, {})
-                        is_quiet_hours = not await self._should_send_notification(user_data)
+                            # Route notification: Max or Telegram
+                            user_platform = (user_data.get('data') or {}).get('platform', 'telegram')
 
-                        tender = notif['tender']
+                            if user_platform == 'max':
+                                # Send via Max Bot API
+                                success = await self._send_max_notification(
+                                    ntf_telegram_id, tender, notif['match_info'], notif['filter_name']
+                                )
+                            else:
+                                # Send via Telegram (default)
+                                success = await self.notifier.send_tender_notification(
+                                    telegram_id=ntf_telegram_id,
+                                    tender=tender,
+                                    match_info=notif['match_info'],
+                                    filter_name=notif['filter_name'],
+                                    is_auto_notification=True,
+                                    subscription_tier=notif.get('subscription_tier', 'trial')
+                                )
 
-                        # Каноническое название ОДИН РАЗ — для уведомления, БД,
-                        # кабинета и Bitrix. Строго предмет закупки, не тип процедуры.
-                        # Единый резолвер: сырое имя → объект из summary →
-                        # ai_simple_name → ai_summary → описание → номер.
-                        short_name = resolve_tender_name(
-                            tender, notif.get('match_info'), max_length=120
-                        )
-                        # Если резолвер вернул длинное «сырое» имя — поджимаем через AI
-                        if len(short_name) > 80 and not is_procedure_type_only(short_name):
-                            short_name = generate_tender_name(
-                                short_name, tender_data=tender, max_length=80
-                            )
-                        # Заменяем название в тендере на короткое
-                        tender['name'] = short_name
-
-                        # Нормализуем данные тендера (маппинг из InstantSearch формата в БД формат)
-                        tender_data = {
-                            'number': tender.get('number', ''),
-                            'name': short_name,
-                            'price': tender.get('price'),
-                            'url': tender.get('url', ''),
-                            'region': tender.get('customer_region', tender.get('region', '')),
-                            'customer_name': tender.get('customer', tender.get('customer_name', '')),
-                            'published_date': tender.get('published', tender.get('published_date', '')),
-                            'submission_deadline': tender.get('submission_deadline', '')
-                        }
-
-                        if is_quiet_hours:
-                            logger.info(f"      🌙 Тихие часы для {ntf_telegram_id} — сохраняем без отправки")
-                            await self.db.save_notification(
-                                user_id=notif['user_id'],
-                                filter_id=notif['filter_id'],
-                                filter_name=notif['filter_name'],
-                                tender_data=tender_data,
-                                score=notif['score'],
-                                matched_keywords=notif['match_info'].get('matched_keywords', []),
-                                match_info=notif.get('match_info'),
-                            )
-                            continue
+                            if success:
+                                logger.info(f"      ✅ Отправлено ({user_platform}): {tender_number} → {ntf_telegram_id}")
 
-                        # Route notification: Max or Telegram
-                        user_platform = (user_data.get('data') or {}).get('platform', 'telegram')
+                                to_save.append(notification_record)
+                                undelivered.discard(tender_number)
+                                notified_pairs.add((notif['user_id'], tender_number))
 
-                        if user_platform == 'max':
-                            # Send via Max Bot API
-                            success = await self._send_max_notification(
-                                ntf_telegram_id, tender, notif['match_info'], notif['filter_name']
-                            )
-                        else:
-                            # Send via Telegram (default)
-                            success = await self.notifier.send_tender_notification(
-                                telegram_id=ntf_telegram_id,
-                                tender=tender,
-                                match_info=notif['match_info'],
-                                filter_name=notif['filter_name'],
-                                is_auto_notification=True,
-                                subscription_tier=notif.get('subscription_tier', 'trial')
-                            )
+                                is_admin = BotConfig.ADMIN_USER_ID and ntf_telegram_id == BotConfig.ADMIN_USER_ID
+                                if not is_admin:
+                                    quota_increments[notif['user_id']] = quota_increments.get(notif['user_id'], 0) + 1
+                                    quota_used[notif['user_id']] = quota_used.get(notif['user_id'], 0) + 1
 
-                        if success:
-                            logger.info(f"      ✅ Отправлено ({user_platform}): {tender_number} → {ntf_telegram_id}")
-
-                            await self.db.save_notification(
-                                user_id=notif['user_id'],
-                                filter_id=notif['filter_id'],
-                                filter_name=notif['filter_name'],
-                                tender_data=tender_data,
-                                score=notif['score'],
-                                matched_keywords=notif['match_info'].get('matched_keywords', []),
-                                match_info=notif.get('match_info'),
-                            )
+                                sent_count += 1
+                                self.stats['notifications_sent'] += 1
+                            else:
+                                logger.warning(f"      ❌ Не удалось отправить: {tender_number} → {ntf_telegram_id}")
+                                failed_count += 1
+                                # Чат не получил тендер — другие фильтры и циклы могут повторить
+                                seen_tenders.discard((ntf_telegram_id, tender_number))
 
-                            is_admin = BotConfig.ADMIN_USER_ID and ntf_telegram_id == BotConfig.ADMIN_USER_ID
-                            if not is_admin:
-                                await self.db.increment_notification_quota(notif['user_id'])
+                                # Если пользователь заблокировал бота — помечаем и деактивируем фильтры
+                                if ntf_telegram_id in self.notifier.blocked_chat_ids:
+                                    await self.db.mark_user_bot_blocked(ntf_telegram_id)
+                                    break  # Нет смысла отправлять остальные уведомления этому получателю
 
-                            sent_count += 1
-                            self.stats['notifications_sent'] += 1
-                        else:
-                            logger.warning(f"      ❌ Не удалось отправить: {tender_number} → {ntf_telegram_id}")
+                          except Exception as e:
                             failed_count += 1
+                            t_num = notif.get('tender', {}).get('number', '?')
+                            logger.error(f"      ❌ Ошибка отправки уведомления {t_num}: {e}", exc_info=True)
 
-                            # Если пользователь заблокировал бота — помечаем и деактивируем фильтры
-                            if ntf_telegram_id in self.notifier.blocked_chat_ids:
-                                await self.db.mark_user_bot_blocked(ntf_telegram_id)
-                                break  # Нет смысла отправлять остальные уведомления этому получателю
-
-                      except Exception as e:
-                        failed_count += 1
-                        t_num = notif.get('tender', {}).get('number', '?')
-                        logger.error(f"      ❌ Ошибка отправки уведомления {t_num}: {e}", exc_info=True)
-
-                      # Небольшая задержка между уведомлениями
-                      await asyncio.sleep(0.1)
+                          # Небольшая задержка между уведомлениями
+                          await asyncio.sleep(self.NOTIFICATION_SEND_DELAY)
+                    finally:
+                        # Сохраняем оставшиеся уведомления фильтра одной транзакцией
+                        # (и при отмене/ошибке посреди рассылки)
+                        await self._flush_notification_batch(to_save, quota_increments)
 
                     # Trial тизер: показываем сколько ещё тендеров заблокировано
                     if trial_locked_count > 0 and telegram_id:
@@ -572,19 +684,50 @@ class TenderSniperService:
 
                     notifications_to_send = []  # Очищаем после отправки
 
+                query_pool.withhold(filter_id, undelivered)
+
+            # Результаты цикла обработаны — следующий цикл запросит только новое
+            advanced = await query_pool.commit_watermarks()
+            logger.info(f"   🔖 RSS watermarks: продвинуто {advanced} запросов")
+
             # 3. Итоги цикла
             logger.info(f"\n   📊 Итого за цикл: {sent_count} отправлено, {failed_count} ошибок отправки, {search_error_count} ошибок поиска")
 
-            # Очищаем кэш обогащения после каждого цикла (экономия памяти)
+            # Где цикл провёл время (суммы по параллельным вызовам больше длительности цикла)
+            cycle_seconds = time.perf_counter() - cycle_started
+            stage_summary = format_stage_summary(stage_metrics.summary_since(stage_snapshot))
+            stage_metrics.observe('cycle', cycle_seconds)
+            logger.info(f"   ⏱️ Цикл {cycle_seconds:.1f}с, этапы: {stage_summary or 'нет вызовов'}")
+
+            # Кэш обогащения: память ограничена TTLCache, досохраняем отложенные записи в БД
             cache_stats = InstantSearch.get_cache_stats()
-            if cache_stats['size'] > 100:
-                InstantSearch.clear_cache()
+            logger.info(
+                f"   💾 Кэш обогащения: {cache_stats['size']} в памяти, "
+                f"попаданий {cache_stats['hit_rate']:.0%} (память {cache_stats['memory_hits']}, "
+                f"БД {cache_stats['db_hits']}), устарело {cache_stats['invalidated']}"
+            )
+            await get_enrichment_store().flush()
 
         except Exception as e:
             logger.error(f"❌ Ошибка обработки тендеров: {e}", exc_info=True)
             self.stats['errors'] += 1
             await send_error_to_telegram(e, context="_process_new_tenders")
 
+    async def _flush_notification_batch(self, to_save: List[Dict[str, Any]], quota_increments: Dict[int, int]):
+        """Сохраняет уведомления фильтра одной транзакцией и обновляет квоты пользователей."""
+        if to_save:
+            try:
+                saved = await self.db.save_notifications_bulk(to_save)
+                logger.debug(f"      💾 Сохранено уведомлений: {saved} из {len(to_save)}")
+            except Exception as e:
+                logger.error(f"      ❌ Ошибка пакетного сохранения уведомлений: {e}", exc_info=True)
+
+        for user_id, count in quota_increments.items():
+            try:
+                await self.db.increment_notification_quota(user_id, count)
+            except Exception as e:
+                logger.error(f"      ❌ Ошибка обновления квоты user {user_id}: {e}")
+
     async def _send_max_notification(self, chat_id: int, tender: dict, match_info: dict, filter_name: str) -> bool:
         """Send tender notification via Max Bot API."""
         try:
@@ -676,10 +819,18 @@ class TenderSniperService:
 
         return True
 
-    async def _search_filter_matches(self, filter_data: Dict[str, Any]) -> Dict[str, Any]:
+    @timed('search_filter')
+    async def _search_filter_matches(
+        self,
+        filter_data: Dict[str, Any],
+        query_pool: Optional[QueryPool] = None
+    ) -> Dict[str, Any]:
         """
         Выполняет RSS-поиск для одного фильтра. Предназначен для параллельного запуска.
-        Возвращает {'matches': [...]} или поднимает исключение (поймает asyncio.gather).
+        Возвращает {'matches': [...], 'unenriched': [...], 'error': ...} или
+        поднимает исключение (поймает asyncio.gather).
+
+        query_pool — общий пул запросов цикла (дедупликация одинаковых запросов).
         """
         filter_id = filter_data['id']
         user_id = filter_data['user_id']
@@ -704,7 +855,7 @@ class TenderSniperService:
         else:
             expanded_keywords = expanded_keywords_raw or []
 
-        searcher = InstantSearch()
+        searcher = InstantSearch(query_pool=query_pool)
         search_results = await searcher.search_by_filter(
             filter_data=filter_data,
             max_tenders=25,
@@ -714,7 +865,11 @@ class TenderSniperService:
             subscription_tier=subscription_tier
         )
         await self.db.reset_filter_error_count(filter_id)
-        return {'matches': search_results.get('matches', [])}
+        return {
+            'matches': search_results.get('matches', []),
+            'unenriched': search_results.get('unenriched', []),
+            'error': search_results.get('error'),
+        }
 
     def _print_stats(self):
         """Вывод статистики работы сервиса."""
@@ -748,6 +903,16 @@ class TenderSniperService:
             logger.info(f"\n📱 Notifier статистика:")
             logger.info(f"   Отправлено: {notifier_stats.get('notifications_sent', 0)}")
             logger.info(f"   Ошибок: {notifier_stats.get('notifications_failed', 0)}")
+            limiter_stats = notifier_stats.get('rate_limiter', {})
+            if limiter_stats:
+                logger.info(f"   RetryAfter: {limiter_stats['retry_after']}, макс. очередь: {limiter_stats['max_queue_depth']}")
+                logger.info(f"   Ожидание отправки: {limiter_stats['wait_histogram']}")
+
+        name_stats = get_name_shortener().get_stats()
+        if name_stats['llm_batches'] or name_stats['fallbacks']:
+            logger.info(f"\n🏷️  Названия: AI пакетов {name_stats['llm_batches']}, "
+                       f"сгенерировано {name_stats['llm_names']}, из кэша БД {name_stats['db_hits']}, "
+                       f"fallback {name_stats['fallbacks']}, в очереди {name_stats['pending']}")
 
         logger.info("="*70)
 
@@ -284,34 +284,16 @@ async def analyze_documentation(tender_number: str) -> str:
         tender_number: The tender/purchase number (e.g. "0345300000526000061")
     """
     try:
-        from src.parsers.zakupki_document_downloader import ZakupkiDocumentDownloader
-        from src.document_processor.text_extractor import TextExtractor
+        from tender_sniper.document_store import get_tender_documents_text
         from tender_sniper.ai_document_extractor import get_document_extractor
 
-        downloader = ZakupkiDocumentDownloader()
-        tender_url = f"https://zakupki.gov.ru/epz/order/notice/ea44/view/common-info.html?regNumber={tender_number}"
+        # Download + extract through the shared document store (cached per file)
+        result = await get_tender_documents_text(tender_number)
 
-        # Download documents (synchronous, run in thread)
-        import asyncio
-        result = await asyncio.to_thread(
-            downloader.download_documents,
-            tender_url,
-            tender_number,
-            None
-        )
-
-        if not result or result.get('downloaded', 0) == 0:
+        if not result['documents']:
             return f"Не удалось загрузить документацию тендера {tender_number}. Документы могут быть недоступны на zakupki.gov.ru."
 
-        # Extract text from downloaded files
-        extractor = TextExtractor()
-        all_text = ""
-        for file_info in result.get('files', []):
-            file_path = file_info.get('path', '')
-            if file_path:
-                text = extractor.extract(file_path)
-                if text:
-                    all_text += text + "\n\n"
+        all_text = result['text']
 
         if not all_text.strip():
             return f"Документация тендера {tender_number} загружена, но текст не удалось извлечь (возможно, скан-копии)."
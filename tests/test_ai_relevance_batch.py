@@ -0,0 +1,122 @@
+"""
+Тесты пакетной AI-проверки релевантности (AIRelevanceChecker.check_relevance_batch).
+"""
+
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cachetools import TTLCache
+
+from tender_sniper.ai_relevance_checker import AIRelevanceChecker
+
+
+class _FakeDB:
+    def __init__(self, entries=None, used=0):
+        self.entries = dict(entries or {})
+        self.used = used
+        self.get_many_calls = 0
+        self.set_many_calls = 0
+
+    async def cache_get_many(self, cache_keys, cache_type):
+        self.get_many_calls += 1
+        return {k: self.entries[k] for k in cache_keys if k in self.entries}
+
+    async def cache_set_many(self, entries, cache_type, ttl_hours=24):
+        self.set_many_calls += 1
+        self.entries.update(entries)
+
+    async def get_user_by_id(self, user_id):
+        return {'ai_analyses_used_month': self.used, 'ai_analyses_month_reset': None}
+
+    async def increment_ai_analyses_count(self, user_id, count=1):
+        self.used += count
+
+
+class _FakeClient:
+    """Отвечает на пакетный промпт: «мебель» релевантна, остальное нет; skip — пропускает пункт."""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        prompt = kwargs['messages'][1]['content']
+        self.prompts.append(prompt)
+        with self._lock:
+            self.active -= 1
+
+        def verdict(name):
+            relevant = 'мебель' in name.lower()
+            return {'relevant': relevant, 'confidence': 80 if relevant else 5, 'reason': 'тест'}
+
+        numbered = re.findall(r'^(\d+)\. Название: "(.+)"$', prompt, re.M)
+        if numbered:
+            body = {'results': [
+                {'id': int(number), **verdict(name)} for number, name in numbered if name not in self.skip
+            ]}
+        else:
+            body = verdict(re.search(r'^Название: "(.+)"', prompt, re.M).group(1))
+
+        message = type('Message', (), {'content': json.dumps(body, ensure_ascii=False)})
+        return type('Response', (), {'choices': [type('Choice', (), {'message': message})]})
+
+
+def _checker(monkeypatch, db, client):
+    monkeypatch.setattr(AIRelevanceChecker, '_cache', TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(AIRelevanceChecker, '_usage_counters', TTLCache(maxsize=100, ttl=60))
+    checker = AIRelevanceChecker(api_key='test', db=db)
+    checker.client = client
+    return checker
+
+
+def test_batch_uses_bulk_cache_and_packs_prompts(monkeypatch):
+    names = ['Мебель офисная', 'Ремонт дорог', 'Мебель школьная', 'Поставка угля', 'Мебель офисная', 'Стулья']
+    db = _FakeDB()
+    client = _FakeClient(skip={'Поставка угля'})
+    checker = _checker(monkeypatch, db, client)
+    db.entries[checker._get_cache_key('Стулья', 'мебель')] = {'is_relevant': True, 'confidence': 90, 'reason': 'из кэша'}
+    checker.BATCH_SIZE = 2
+    monkeypatch.setattr(AIRelevanceChecker, 'LLM_CONCURRENCY', 2)
+
+    results = asyncio.run(checker.check_relevance_batch(
+        [{'name': name} for name in names], filter_intent='мебель', filter_keywords=['мебель']
+    ))
+
+    assert [r['is_relevant'] for r in results] == [True, False, True, False, True, True]
+    assert [r['source'] for r in results] == ['ai', 'ai', 'ai', 'ai', 'ai', 'cache']
+    # 4 уникальных непроверенных тендера → 2 пакета + повтор пропущенного по одному
+    assert len(client.prompts) == 3 and client.peak == 2
+    assert db.get_many_calls == 1 and db.set_many_calls == 1
+    assert len(db.entries) == 5
+
+
+def test_batch_respects_quota(monkeypatch):
+    db = _FakeDB(used=AIRelevanceChecker.TIER_LIMITS['trial'] - 2)
+    client = _FakeClient()
+    checker = _checker(monkeypatch, db, client)
+
+    results = asyncio.run(checker.check_relevance_batch(
+        [{'name': f'Мебель {i}'} for i in range(4)],
+        filter_intent='мебель', filter_keywords=['мебель'], user_id=7
+    ))
+
+    assert [r['source'] for r in results] == ['ai', 'ai', 'quota_exceeded', 'quota_exceeded']
+    assert results[1]['quota_remaining'] == 0
+    assert db.used == AIRelevanceChecker.TIER_LIMITS['trial']
+    assert len(client.prompts) == 1
@@ -0,0 +1,85 @@
+"""
+Тесты async транспорта zakupki.gov.ru: token bucket на прокси и выбор прокси.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parsers.async_http import AsyncZakupkiClient, HttpResponse, TokenBucket, is_maintenance_page
+from src.parsers.proxy_health import ProxyHealthManager
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=20.0, capacity=1)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(5)])
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    # Первый токен сразу, остальные 4 — по 1/20 с
+    assert 0.18 <= elapsed < 0.5
+
+
+def test_buckets_are_independent_per_proxy():
+    client = AsyncZakupkiClient(proxy_urls=['http://p1', 'http://p2'], rate=20.0)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*[
+            client.endpoints[i % 2].bucket.acquire() for i in range(6)
+        ])
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    # По 3 запроса на прокси: 2 интервала по 1/20 с, а не 5
+    assert elapsed < 0.2
+
+
+def test_open_proxy_goes_last_and_token_wait_counts():
+    health = ProxyHealthManager()
+    client = AsyncZakupkiClient(proxy_urls=['http://p1', 'http://p2', 'http://p3'], rate=1.0, health=health)
+    p1, p2, p3 = client.endpoints
+
+    for _ in range(health.FAILURE_THRESHOLD):
+        health.record_failure(p1.label)
+    asyncio.run(p2.bucket.acquire())  # у p2 израсходован токен
+
+    assert [e.label for e in client._ordered_endpoints()] == [p3.label, p2.label, p1.label]
+
+
+def test_direct_endpoint_without_proxies():
+    client = AsyncZakupkiClient(proxy_urls=[])
+    assert [e.label for e in client.endpoints] == ['direct']
+    assert client.endpoints[0].proxy_url is None
+
+
+def test_maintenance_page_detected_by_phrase_only():
+    assert is_maintenance_page('<h1>На сайте ЕИС проводятся плановые регламентных работ</h1>')
+    # Шапка страницы блокировки тоже содержит «ЕИС»
+    assert not is_maintenance_page('<title>ЕИС Закупки</title><p>Доступ запрещён</p>')
+
+
+def test_blocked_proxy_rotated_and_penalized():
+    health = ProxyHealthManager()
+    client = AsyncZakupkiClient(proxy_urls=['http://p1', 'http://p2'], health=health)
+    blocked = '<title>ЕИС Закупки</title><p>Доступ запрещён</p>'.encode('utf-8')
+    calls = []
+
+    async def fake_request(endpoint, url, timeout):
+        calls.append(endpoint.label)
+        if len(calls) == 1:
+            return HttpResponse(403, blocked, url), 0.1
+        return HttpResponse(200, b'<rss/>', url), 0.1
+
+    client._request = fake_request
+    response = asyncio.run(client.get('https://zakupki.gov.ru/epz/order/extendedsearch/rss.html'))
+
+    assert response.status == 200
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert health.get_stats()[calls[0]]['blocked'] == 1
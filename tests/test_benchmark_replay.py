@@ -0,0 +1,66 @@
+"""
+Тесты офлайн-бенчмарка цикла мониторинга: ключи архива, сдвиг дат,
+replay-сервер + ReplayClient + разбор RSS парсером.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.benchmark.fixtures import FixtureArchive, SyntheticZakupki, request_key, shift_dates
+from tender_sniper.benchmark.replay import ReplayClient, ReplayServer
+
+RSS_URL = 'https://zakupki.gov.ru/epz/order/extendedsearch/rss.html'
+
+
+def test_request_key_ignores_dates_and_param_order():
+    first = f'{RSS_URL}?searchString=бумага&publishDateFrom=01.10.2026&morphology=on'
+    second = f'http://127.0.0.1:8080/epz/order/extendedsearch/rss.html?morphology=on&searchString=бумага&publishDateFrom=13.10.2026'
+    assert request_key(first) == request_key(second)
+    assert request_key(first) != request_key(f'{RSS_URL}?searchString=мебель&morphology=on')
+
+
+def test_archive_roundtrip_and_date_shift(tmp_path):
+    archive = FixtureArchive(recorded_at=datetime(2026, 10, 1))
+    archive.add(f'{RSS_URL}?searchString=бумага', 200, 'Окончание 30.09.2026'.encode('utf-8'), 'utf-8')
+    archive.add('https://zakupki.gov.ru/epz/order/notice/ea20/view/common-info.html?regNumber=1', 404, b'', None)
+    archive.save(tmp_path / 'fixtures.zip')
+
+    loaded = FixtureArchive.load(tmp_path / 'fixtures.zip')
+    assert loaded.counts() == {'rss': 1, 'html': 0, 'tender_page': 1, 'other': 0}
+    assert loaded.get(f'{RSS_URL}?searchString=бумага&publishDateFrom=02.10.2026')['body'].startswith('Окончание'.encode('utf-8'))
+    assert loaded.by_kind('tender_page') == []  # неуспешные ответы не подставляются
+
+    assert shift_dates('до 30.09.2026 10:00', 3) == 'до 03.10.2026 10:00'
+    assert shift_dates('Tue, 29 Sep 2026 10:00:00 +0300', 1) == 'Wed, 30 Sep 2026 10:00:00 +0300'
+
+
+def test_replayed_feed_parsed_like_production():
+    from src.parsers.zakupki_rss_parser import ZakupkiRSSParser
+
+    async def run():
+        server = ReplayServer(synthetic=SyntheticZakupki(seed=1, entries_per_feed=10), error_rate=0.0)
+        base_url = await server.start()
+        client = ReplayClient(base_url)
+        try:
+            response = await client.get(f'{RSS_URL}?searchString=картридж&publishDateFrom=13.10.2026')
+            missing = await client.get('https://zakupki.gov.ru/epz/unknown.html')
+        finally:
+            await client.close()
+            await server.stop()
+        return server, response, missing
+
+    server, response, missing = asyncio.run(run())
+    assert response.status == 200 and response.url.startswith('https://zakupki.gov.ru/')
+    assert missing.status == 404
+    assert server.get_stats()['requests'] == {'rss': 1, 'other': 1}
+
+    tenders = ZakupkiRSSParser()._parse_rss_feed(response.content, 50, None)
+    assert len(tenders) == 10
+    assert any('картридж' in t['name'] for t in tenders)
+    assert all(t['price'] and t['customer'] for t in tenders)
+    deadline = datetime.strptime(tenders[0]['submission_deadline'], '%d.%m.%Y %H:%M')
+    assert deadline > datetime.now() - timedelta(days=1)
@@ -0,0 +1,108 @@
+"""
+Тесты общего хранилища документов тендеров (TenderDocumentStore).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.document_store import TenderDocumentStore
+
+
+class _FakeDB:
+    def __init__(self):
+        self.entries = {}
+
+    async def cache_get(self, cache_key, cache_type):
+        return self.entries.get(cache_key)
+
+    async def cache_set(self, cache_key, cache_type, value, ttl_hours=24):
+        self.entries[cache_key] = value
+
+    async def cache_get_many(self, cache_keys, cache_type):
+        return {k: self.entries[k] for k in cache_keys if k in self.entries}
+
+    async def cache_set_many(self, entries, cache_type, ttl_hours=24):
+        self.entries.update(entries)
+
+
+TZ_TEXT = 'Техническое задание на поставку бумаги для офисной техники. ' * 3
+
+FILES = {
+    'https://zakupki.gov.ru/44fz/filestore/1': TZ_TEXT.encode('utf-8'),
+    # Типовая форма — тот же файл, что и в другом тендере
+    'https://zakupki.gov.ru/44fz/filestore/2': 'Проект контракта, типовая форма. '.encode('utf-8') * 3,
+    'https://zakupki.gov.ru/44fz/filestore/3': 'Проект контракта, типовая форма. '.encode('utf-8') * 3,
+}
+
+
+class _FakeDownloader:
+    listings = 0
+    fetches = 0
+
+    def get_tender_documents(self, tender_url, tender_number):
+        _FakeDownloader.listings += 1
+        urls = ['https://zakupki.gov.ru/44fz/filestore/1', 'https://zakupki.gov.ru/44fz/filestore/2']
+        if tender_number == '2':
+            urls = ['https://zakupki.gov.ru/44fz/filestore/3']
+        return [
+            {'url': url, 'filename': f"doc{url[-1]}.txt", 'title': f"Документ {url[-1]}",
+             'type': 'other', 'extension': 'txt'}
+            for url in urls
+        ]
+
+    def fetch_document(self, url):
+        _FakeDownloader.fetches += 1
+        return FILES[url], None
+
+    def _detect_file_type(self, file_path):
+        return None
+
+
+def test_download_once_and_share_text(tmp_path):
+    _FakeDownloader.listings = _FakeDownloader.fetches = 0
+    db = _FakeDB()
+
+    async def run():
+        store = TenderDocumentStore(blob_dir=tmp_path, db=db, downloader_factory=_FakeDownloader)
+        # Параллельные запросы одного тендера — одно скачивание
+        first, second = await asyncio.gather(
+            store.get_tender_documents_text('1'), store.get_tender_documents_text('1')
+        )
+        other_tender = await store.get_tender_documents_text('2')
+
+        # Другой процесс: манифест и текст из БД, файлы с диска
+        other = TenderDocumentStore(blob_dir=tmp_path, db=db, downloader_factory=_FakeDownloader)
+        again = await other.get_tender_documents_text('1', max_files=1)
+        return store, first, second, other_tender, other, again
+
+    store, first, second, other_tender, other, again = asyncio.run(run())
+
+    assert first['text'] == second['text']
+    assert TZ_TEXT.strip() in first['text']
+    assert first['text'].startswith('=== Документ 1 ===')
+    assert _FakeDownloader.listings == 2
+    assert _FakeDownloader.fetches == 3
+    # Одинаковое содержимое — один blob
+    assert other_tender['documents'][0]['path'] == first['documents'][1]['path']
+    assert len(list((tmp_path / 'blobs').rglob('*.txt'))) == 2
+    assert store.get_stats()['extractions'] == 2
+
+    assert [d['filename'] for d in again['documents']] == ['doc1.txt']
+    assert again['documents'][0]['text'].strip() == TZ_TEXT.strip()
+    assert other.get_stats()['extractions'] == 0
+    assert _FakeDownloader.listings == 2
+
+
+def test_downloads_throttled(tmp_path, monkeypatch):
+    from tender_sniper import document_store
+
+    sleeps = []
+    monkeypatch.setattr(document_store.time, 'sleep', sleeps.append)
+    store = TenderDocumentStore(blob_dir=tmp_path, db=_FakeDB(), downloader_factory=_FakeDownloader)
+    documents = asyncio.run(store.get_documents('1'))
+
+    assert len(documents) == 2
+    assert sleeps == [store.DOWNLOAD_DELAY]  # пауза между файлами, не перед первым
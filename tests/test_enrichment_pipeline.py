@@ -0,0 +1,95 @@
+"""
+Тесты параллельного обогащения в InstantSearch: лимит параллелизма,
+общая загрузка одного тендера, порядок по pre-score и дедлайн.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.enrichment_store import EnrichmentStore
+from tender_sniper.instant_search import InstantSearch
+
+
+class _FakeParser:
+    async_transport = True
+
+    def __init__(self, delay=0.05, slow=()):
+        self.delay = delay
+        self.slow = set(slow)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def enrich_tender_from_page_async(self, tender):
+        self.calls.append(tender['number'])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(10 if tender['number'] in self.slow else self.delay)
+        finally:
+            self.active -= 1
+        tender['price'] = 1000
+        return tender
+
+
+def _search(parser, **kwargs):
+    search = InstantSearch(**kwargs)
+    search.parser = parser
+    search.enrichment_store = EnrichmentStore(persistent=False)
+    return search
+
+
+def test_concurrency_limit_and_priority_order():
+    parser = _FakeParser()
+    search = _search(parser, enrich_concurrency=2)
+    candidates = [(score, {'number': str(score)}) for score in (10, 50, 30, 20)]
+
+    result = asyncio.run(search._enrich_tenders(candidates, cached={}))
+
+    assert [t['number'] for t in result] == ['50', '30', '20', '10']
+    assert parser.calls[:2] == ['50', '30']
+    assert parser.max_active == 2
+    assert all(t['price'] == 1000 for t in result)
+
+
+def test_same_tender_fetched_once_for_two_searches():
+    parser = _FakeParser()
+    first, second = _search(parser), _search(parser)
+
+    async def run():
+        return await asyncio.gather(
+            first._enrich_tenders([(10, {'number': '1'})], cached={}),
+            second._enrich_tenders([(10, {'number': '1'})], cached={}),
+        )
+
+    a, b = asyncio.run(run())
+    assert parser.calls == ['1']
+    assert a[0]['price'] == b[0]['price'] == 1000
+    assert a[0] is not b[0]
+
+
+def test_deadline_returns_partial_results():
+    parser = _FakeParser(slow={'2'})
+    search = _search(parser, enrich_deadline=0.3)
+
+    result = asyncio.run(search._enrich_tenders(
+        [(20, {'number': '1'}), (10, {'number': '2'})], cached={}
+    ))
+
+    assert [t['number'] for t in result] == ['1', '2']
+    assert result[0]['price'] == 1000
+    assert 'price' not in result[1]
+
+
+def test_cached_tenders_not_fetched():
+    parser = _FakeParser()
+    search = _search(parser)
+    cached_tender = {'number': '1', 'price': 5}
+
+    result = asyncio.run(search._enrich_tenders([(10, cached_tender)], cached={'1': {'price': 5}}))
+
+    assert parser.calls == []
+    assert result[0]['price'] == 5
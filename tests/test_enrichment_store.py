@@ -0,0 +1,83 @@
+"""
+Тесты двухуровневого кэша обогащения (EnrichmentStore).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.enrichment_store import EnrichmentStore
+
+
+class _FakeDB:
+    def __init__(self):
+        self.entries = {}
+        self.get_calls = 0
+        self.set_calls = 0
+
+    async def cache_get_many(self, cache_keys, cache_type):
+        self.get_calls += 1
+        return {k: self.entries[k] for k in cache_keys if k in self.entries}
+
+    async def cache_set_many(self, entries, cache_type, ttl_hours=24):
+        self.set_calls += 1
+        self.entries.update(entries)
+
+
+def _enriched(number, price):
+    return {'number': number, 'price': price, 'customer_region': 'Москва', 'name': 'не кэшируется'}
+
+
+def test_write_behind_and_shared_between_instances():
+    db = _FakeDB()
+    first = EnrichmentStore(db=db)
+
+    async def run():
+        first.put({'number': '1', 'update_date': '01.02.2026'}, _enriched('1', 100))
+        first.put({'number': '2'}, _enriched('2', 200))
+        assert db.set_calls == 0  # запись отложена
+        await first.flush()
+
+        # Другой процесс: пустая память, данные из БД одним запросом
+        second = EnrichmentStore(db=db)
+        found = await second.get_many([{'number': '1'}, {'number': '2'}, {'number': '3'}])
+        return second, found
+
+    second, found = asyncio.run(run())
+    assert db.set_calls == 1
+    assert db.get_calls == 1
+    assert found['1']['price'] == 100 and found['2']['price'] == 200
+    assert 'name' not in found['1']
+    stats = second.get_stats()
+    assert stats['db_hits'] == 2 and stats['misses'] == 1
+
+
+def test_memory_hits_skip_db():
+    db = _FakeDB()
+    store = EnrichmentStore(db=db)
+
+    async def run():
+        store.put({'number': '1'}, _enriched('1', 100))
+        return await store.get_many([{'number': '1'}])
+
+    assert asyncio.run(run())['1']['price'] == 100
+    assert db.get_calls == 0
+
+
+def test_changed_update_date_invalidates():
+    db = _FakeDB()
+    store = EnrichmentStore(db=db)
+
+    async def run():
+        store.put({'number': '1', 'update_date': '01.02.2026'}, _enriched('1', 100))
+        await store.flush()
+        same = await store.get_many([{'number': '1', 'update_date': '01.02.2026'}])
+        changed = await store.get_many([{'number': '1', 'update_date': '05.02.2026'}])
+        return same, changed
+
+    same, changed = asyncio.run(run())
+    assert '1' in same
+    assert changed == {}
+    assert store.get_stats()['invalidated'] == 2  # память + БД
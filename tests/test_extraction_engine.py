@@ -0,0 +1,146 @@
+"""
+Тесты извлечения текста в пуле процессов (ExtractionEngine).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.document_processor.extraction_engine import ExtractionEngine
+
+
+def _write_pdf(path: Path, pages: int) -> None:
+    """Минимальный PDF: на каждой странице строка 'Page N'."""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for n in range(1, pages + 1):
+        stream = f'BT /F1 12 Tf 72 720 Td (Page {n}) Tj ET'.encode()
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {pages} >>'.encode()
+
+    data = b'%PDF-1.4\n'
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n%s\nendobj\n' % (i, body)
+    xref = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    data += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    path.write_bytes(data)
+
+
+def test_pdf_pages_streamed_in_order(tmp_path):
+    pdf = tmp_path / 'tz.pdf'
+    _write_pdf(pdf, 7)
+    txt = tmp_path / 'notes.txt'
+    txt.write_text('Требования к поставке бумаги формата А4. ' * 5, encoding='utf-8')
+
+    engine = ExtractionEngine(max_workers=2)
+    engine.PAGES_PER_CHUNK = 2
+
+    async def run():
+        try:
+            pages = [text async for text in engine.iter_text(str(pdf))]
+            result = await engine.extract_text(str(pdf))
+            other = await engine.extract_text(str(txt))
+            return pages, result, other
+        finally:
+            engine.shutdown()
+
+    pages, result, other = asyncio.run(run())
+    assert [p.strip() for p in pages] == [f'Page {n}' for n in range(1, 8)]
+    assert result['file_type'] == 'PDF'
+    assert not result['truncated']
+    assert result['text'].index('Page 2') < result['text'].index('Page 7')
+    assert engine.get_stats()['pdf_chunks'] == 8  # 2 документа × 4 диапазона
+    assert 'бумаги формата А4' in other['text']
+    assert other['file_type'] == 'TXT'
+
+
+def test_document_timeout_returns_partial_result(tmp_path):
+    pdf = tmp_path / 'big.pdf'
+    _write_pdf(pdf, 3)
+    engine = ExtractionEngine(max_workers=1, document_timeout=0.001)
+
+    async def run():
+        try:
+            return await engine.extract_text(str(pdf))
+        finally:
+            engine.shutdown()
+
+    result = asyncio.run(run())
+    assert result['truncated']
+    assert engine.get_stats()['timeouts'] == 1
+
+
+def test_timed_out_running_task_is_killed_and_pool_recycled(tmp_path):
+    import time
+    from src.document_processor.extraction_engine import ExtractionTimeout
+
+    txt = tmp_path / 'notes.txt'
+    txt.write_text('Поставка бумаги формата А4. ' * 5, encoding='utf-8')
+    engine = ExtractionEngine(max_workers=1, document_timeout=0.001)
+
+    async def run():
+        try:
+            job = engine._submit(time.sleep, 60)
+            workers = list(engine._pool._processes.values())
+            try:
+                await engine._await(job, time.monotonic() + 5)
+            except ExtractionTimeout:
+                pass
+            for process in workers:
+                process.join(timeout=10)
+            killed = bool(workers) and all(not process.is_alive() for process in workers)
+
+            timed_out = await engine.extract_text(str(txt))  # не-PDF, лимит 0.001с
+            engine.document_timeout = 60
+            ok = await engine.extract_text(str(txt))
+            return killed, timed_out, ok
+        finally:
+            engine.shutdown()
+
+    killed, timed_out, ok = asyncio.run(run())
+    assert killed
+    assert engine.get_stats()['pool_recycles'] >= 1
+    assert timed_out['truncated'] and timed_out['text'].startswith('[Не удалось')
+    assert not ok['truncated'] and 'бумаги' in ok['text']
+
+
+def test_timeout_of_one_document_does_not_cancel_another():
+    import time
+    from src.document_processor.extraction_engine import ExtractionTimeout
+
+    engine = ExtractionEngine(max_workers=1)
+
+    async def document_a():
+        try:
+            await engine._await(engine._submit(time.sleep, 3), time.monotonic() + 1)
+        except ExtractionTimeout:
+            return 'A timeout'
+
+    async def document_b():
+        # Задачи B стоят в очереди за A: часть уже в очереди воркеров, часть — в пуле
+        jobs = [engine._submit(abs, -n) for n in range(6)]
+        return [await engine._await(job, time.monotonic() + 30) for job in jobs]
+
+    async def run():
+        try:
+            return await asyncio.gather(document_a(), document_b())
+        finally:
+            engine.shutdown()
+
+    a, b = asyncio.run(run())
+    assert a == 'A timeout'
+    assert b == list(range(6))
+    assert engine.get_stats()['resubmits'] >= 1
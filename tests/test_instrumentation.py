@@ -0,0 +1,86 @@
+"""
+Тесты таймингов этапов (tender_sniper.instrumentation) и /metrics.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.instrumentation import (
+    StageMetrics, format_stage_summary, get_stage_metrics, instrument_methods, render_stats
+)
+
+
+def test_spans_histograms_and_prometheus_text():
+    metrics = StageMetrics(buckets=(0.1, 1.0))
+
+    @metrics.timed('zakupki_fetch', kind='rss')
+    async def fetch():
+        return 'ok'
+
+    @metrics.timed('zakupki_fetch', kind='rss')
+    def fail():
+        raise ValueError('boom')
+
+    assert asyncio.run(fetch()) == 'ok'
+    with pytest.raises(ValueError):
+        fail()
+    metrics.observe('zakupki_fetch', 0.5, kind='rss')
+    metrics.observe('zakupki_fetch', 5.0, kind='rss')
+
+    text = metrics.render_prometheus()
+    assert 'sniper_stage_duration_seconds_bucket{stage="zakupki_fetch",kind="rss",le="0.1"} 2' in text
+    assert 'sniper_stage_duration_seconds_bucket{stage="zakupki_fetch",kind="rss",le="1.0"} 3' in text
+    assert 'sniper_stage_duration_seconds_bucket{stage="zakupki_fetch",kind="rss",le="+Inf"} 4' in text
+    assert 'sniper_stage_duration_seconds_count{stage="zakupki_fetch",kind="rss"} 4' in text
+    assert 'sniper_stage_errors_total{stage="zakupki_fetch",kind="rss"} 1' in text
+
+
+def test_cycle_summary_and_instrumented_class():
+    metrics = get_stage_metrics()
+    snapshot = metrics.snapshot()
+
+    @instrument_methods('db')
+    class FakeDB:
+        async def get_all_active_filters(self):
+            return []
+
+        async def _private(self):
+            return None
+
+        def sync_helper(self):
+            return 1
+
+    db = FakeDB()
+
+    async def cycle():
+        for _ in range(3):
+            await db.get_all_active_filters()
+        await db._private()
+
+    asyncio.run(cycle())
+    assert db.sync_helper() == 1
+
+    rows = metrics.summary_since(snapshot)
+    assert [(r['stage'], r['labels'], r['count']) for r in rows] == [('db', {'op': 'get_all_active_filters'}, 3)]
+    assert format_stage_summary(rows).startswith('db 3× ')
+    assert '[get_all_active_filters 3× ' in format_stage_summary(rows)
+
+
+def test_render_stats_and_metrics_endpoint():
+    text = render_stats('cache', {'ai_relevance': {'hits': 3, 'hit_rate': 0.75, 'note': 'x'}}, label='cache_type')
+    assert '# TYPE sniper_cache_hits gauge' in text
+    assert 'sniper_cache_hit_rate{cache_type="ai_relevance"} 0.75' in text
+    assert 'note' not in text
+
+    from bot.health_check import metrics_handler
+
+    get_stage_metrics().observe('telegram_send', 0.2)
+    response = asyncio.run(metrics_handler(None))
+    assert response.content_type == 'text/plain'
+    assert 'sniper_stage_duration_seconds_count{stage="telegram_send"}' in response.text
+    assert 'sniper_name_shortener_' in response.text
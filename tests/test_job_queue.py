@@ -0,0 +1,77 @@
+"""
+Тесты воркера очереди фоновых задач (JobWorker).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.jobs.queue import JOB_HANDLERS, JobWorker
+
+
+class _FakeQueue:
+    LEASE_SECONDS = 300
+
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.done = []
+        self.failed = []
+
+    async def lease(self, worker_id, job_types=None, limit=1):
+        leased = [j for j in self.jobs if not job_types or j['job_type'] in job_types][:limit]
+        for job in leased:
+            self.jobs.remove(job)
+            job['attempts'] += 1
+        return leased
+
+    async def heartbeat(self, job_id, worker_id):
+        return True
+
+    async def complete(self, job_id):
+        self.done.append(job_id)
+
+    async def fail(self, job_id, error, attempts, max_attempts):
+        self.failed.append((job_id, error))
+        return attempts < max_attempts
+
+    async def release(self, job_id):
+        pass
+
+
+def _job(job_id, job_type, **payload):
+    return {'id': job_id, 'job_type': job_type, 'payload': payload, 'attempts': 0, 'max_attempts': 3}
+
+
+def test_worker_runs_handlers_with_concurrency_limit(monkeypatch):
+    running = []
+    peak = []
+
+    async def slow(payload):
+        running.append(payload['n'])
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(payload['n'])
+        if payload['n'] == 3:
+            raise ValueError('нет документов')
+
+    monkeypatch.setitem(JOB_HANDLERS, 'test.slow', slow)
+    queue = _FakeQueue([_job(i, 'test.slow', n=i) for i in range(1, 6)] + [_job(9, 'test.unknown')])
+    worker = JobWorker(queue=queue, concurrency=2, worker_id='w1')
+    worker.POLL_INTERVAL = 0.01
+
+    async def run():
+        task = asyncio.create_task(worker.run())
+        for _ in range(200):
+            if len(queue.done) + len(queue.failed) == 6:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+        await task
+
+    asyncio.run(run())
+    assert sorted(queue.done) == [1, 2, 4, 5]
+    assert {job_id for job_id, _ in queue.failed} == {3, 9}
+    assert max(peak) == 2
+    assert worker.get_stats() == {'done': 4, 'retried': 1, 'failed': 1, 'active': 0}
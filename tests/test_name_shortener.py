@@ -0,0 +1,130 @@
+"""
+Тесты неблокирующего пакетного сокращения названий (NameShortener).
+"""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.ai_name_generator import TenderNameGenerator, generate_tender_name
+from tender_sniper.name_shortener import NameShortener
+
+
+class _FakeDB:
+    def __init__(self):
+        self.entries = {}
+
+    async def cache_get_many(self, cache_keys, cache_type):
+        return {k: self.entries[k] for k in cache_keys if k in self.entries}
+
+    async def cache_set_many(self, entries, cache_type, ttl_hours=24):
+        self.entries.update(entries)
+
+
+class _BatchLLM:
+    """Отвечает первыми тремя словами каждого пункта (или выдумкой)."""
+
+    def __init__(self, invent=False):
+        self.calls = 0
+        self.invent = invent
+
+    def generate(self, system_prompt, user_prompt):
+        self.calls += 1
+        lines = []
+        for number, name in re.findall(r'^(\d+)\. (.+)$', user_prompt, re.M):
+            answer = 'Робот мойщик окон' if self.invent else ' '.join(name.split()[:3])
+            lines.append(f"{number}. {answer}")
+        return '\n'.join(lines)
+
+
+def _generator(llm):
+    generator = TenderNameGenerator(llm_provider='groq', llm_api_key='test')
+    generator.llm = llm
+    generator._batch_llm = llm
+    return generator
+
+
+LONG_NAMES = [
+    f"Поставка компьютерного оборудования и комплектующих вариант {i} для обеспечения "
+    f"деятельности учреждения в течение календарного года"
+    for i in range(12)
+]
+
+
+def test_fallback_first_then_batched_ai_names():
+    llm = _BatchLLM()
+    shortener = NameShortener(generator=_generator(llm), persistent=False)
+
+    async def run():
+        first = [shortener.get_name(name) for name in LONG_NAMES]
+        assert llm.calls == 0  # LLM не вызывается из get_name
+        await shortener.drain()
+        return first, [shortener.get_name(name) for name in LONG_NAMES]
+
+    first, second = asyncio.run(run())
+    assert all(name.endswith('...') for name in first)  # regex fallback
+    assert second[0] == 'Поставка компьютерного оборудования'
+    assert llm.calls == 2  # 12 названий → 2 пакета по BATCH_SIZE=10
+    assert shortener.get_stats()['llm_names'] == 12
+
+
+def test_names_shared_through_db_and_hallucinations_not_retried():
+    db = _FakeDB()
+    llm = _BatchLLM()
+
+    async def run():
+        names = await NameShortener(generator=_generator(llm), db=db).shorten_many(
+            [(name, None) for name in LONG_NAMES[:3]], timeout=5
+        )
+        # Другой процесс: пустой кэш в памяти, LLM не нужен
+        other_llm = _BatchLLM()
+        other = NameShortener(generator=_generator(other_llm), db=db)
+        again = await other.shorten_many([(name, None) for name in LONG_NAMES[:3]])
+
+        liar = _BatchLLM(invent=True)
+        rejecting = NameShortener(generator=_generator(liar), persistent=False)
+        await rejecting.shorten_many([(LONG_NAMES[5], None)], timeout=5)
+        rejecting.get_name(LONG_NAMES[5])
+        await rejecting.drain()
+        return names, again, other_llm.calls, liar.calls
+
+    names, again, other_calls, liar_calls = asyncio.run(run())
+    assert names == again == ['Поставка компьютерного оборудования'] * 3
+    assert other_calls == 0
+    assert liar_calls == 1
+
+
+def test_generate_tender_name_does_not_block_event_loop(monkeypatch):
+    import tender_sniper.name_shortener as name_shortener
+
+    llm = _BatchLLM()
+    shortener = NameShortener(generator=_generator(llm), persistent=False)
+    monkeypatch.setattr(name_shortener, '_shortener', shortener)
+
+    async def run():
+        return generate_tender_name(LONG_NAMES[0], max_length=80)
+
+    name = asyncio.run(run())
+    assert llm.calls == 0
+    assert name != 'Поставка компьютерного оборудования'
+    assert shortener.get_stats()['fallbacks'] == 1
+
+
+def test_memory_cache_written_on_event_loop_thread():
+    import threading
+
+    generator = _generator(_BatchLLM())
+    writers = []
+    save = generator._save_to_memory_cache
+    generator._save_to_memory_cache = lambda key, name: (writers.append(threading.current_thread()), save(key, name))
+    shortener = NameShortener(generator=generator, persistent=False)
+
+    async def run():
+        return await shortener.shorten_many([(name, None) for name in LONG_NAMES[:3]], timeout=5)
+
+    names = asyncio.run(run())
+    assert names == ['Поставка компьютерного оборудования'] * 3
+    assert writers and all(t is threading.main_thread() for t in writers)
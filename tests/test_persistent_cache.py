@@ -0,0 +1,61 @@
+"""
+Тесты персистентного кэша: кодирование значений, метрики и чистка пачками.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.database.persistent_cache import (
+    CacheMetrics, decode_cache_value, encode_cache_value, get_cache_metrics
+)
+from tender_sniper.jobs.cache_sweeper import sweep_expired
+
+
+def test_large_values_stored_compressed():
+    get_cache_metrics().reset()
+    small = {'is_relevant': True, 'reason': 'мебель'}
+    large = {'text': 'Поставка офисной мебели для нужд учреждения. ' * 500}
+
+    assert encode_cache_value(small, 'ai_relevance') is small
+    stored = encode_cache_value(large, 'document_text')
+    assert stored != large and len(str(stored)) < len(large['text']) // 5
+    assert decode_cache_value(stored) == large
+    assert decode_cache_value(small) == small  # старые несжатые записи
+    assert decode_cache_value('Короткое название') == 'Короткое название'
+
+    stats = get_cache_metrics().get_stats()
+    assert stats['document_text']['compressed'] == 1
+    assert stats['ai_relevance']['compressed'] == 0
+
+
+def test_metrics_hit_rate():
+    metrics = CacheMetrics()
+    metrics.record_lookup('enrichment', hits=3, misses=1)
+
+    assert metrics.get_stats()['enrichment']['hit_rate'] == 0.75
+
+
+class _FakeDB:
+    CACHE_SWEEP_CHUNK = 100
+
+    def __init__(self, expired):
+        self.expired = expired
+        self.calls = []
+
+    async def cache_delete_expired(self, cache_type=None, limit=None):
+        count = min(limit, self.expired)
+        self.expired -= count
+        self.calls.append(count)
+        return count
+
+
+def test_sweeper_deletes_in_chunks():
+    db = _FakeDB(expired=250)
+    assert asyncio.run(sweep_expired(db, pause=0)) == 250
+    assert db.calls == [100, 100, 50]
+
+    db = _FakeDB(expired=1000)
+    assert asyncio.run(sweep_expired(db, max_chunks=3, pause=0)) == 300
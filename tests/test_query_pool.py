@@ -0,0 +1,154 @@
+"""
+Тесты общего пула запросов цикла мониторинга (QueryPool).
+
+Цель: одинаковые запросы разных фильтров идут на zakupki.gov.ru один раз,
+ценовой диапазон применяется на клиенте, результаты — независимые копии.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.query_pool import QueryPool, merge_search_results
+
+
+class _FakeParser:
+    def __init__(self, rss=None, html=None):
+        self.rss = rss or []
+        self.html = html or []
+        self.rss_calls = []
+        self.html_calls = []
+
+    def search_tenders_rss(self, **params):
+        self.rss_calls.append(params)
+        return [dict(t) for t in self.rss]
+
+    def search_tenders_html(self, **params):
+        self.html_calls.append(params)
+        return [dict(t) for t in self.html]
+
+
+def _params(**overrides):
+    params = dict(
+        keywords='бумага', regions=['Москва'], max_results=10,
+        law_type=None, purchase_stage='submission', date_from='01.01.2026',
+    )
+    params.update(overrides)
+    return params
+
+
+def test_identical_queries_fetched_once():
+    parser = _FakeParser(rss=[{'number': '1', 'price': 100}])
+    pool = QueryPool()
+
+    async def run():
+        return await asyncio.gather(
+            pool.fetch(parser, **_params()),
+            pool.fetch(parser, **_params(keywords='  БУМАГА ')),
+            pool.fetch(parser, **_params(regions=['москва'])),
+        )
+
+    results = asyncio.run(run())
+    assert len(parser.rss_calls) == 1
+    assert len(parser.html_calls) == 1
+    assert all(len(r) == 1 for r in results)
+    assert pool.get_stats()['unique_queries'] == 1
+    assert pool.get_stats()['pool_hits'] == 2
+
+
+def test_price_bounds_widened_and_applied_client_side():
+    parser = _FakeParser(rss=[
+        {'number': '1', 'price': 50_000},
+        {'number': '2', 'price': 500_000},
+        {'number': '3'},  # без цены — пропускаем до обогащения
+    ])
+    pool = QueryPool()
+
+    async def run():
+        cheap = await pool.fetch(parser, **_params(price_max=100_000))
+        expensive = await pool.fetch(parser, **_params(price_min=100_000))
+        return cheap, expensive
+
+    cheap, expensive = asyncio.run(run())
+    assert len(parser.rss_calls) == 1
+    assert parser.rss_calls[0]['price_min'] is None
+    assert parser.rss_calls[0]['price_max'] is None
+    assert {t['number'] for t in cheap} == {'1', '3'}
+    assert {t['number'] for t in expensive} == {'2', '3'}
+
+
+class _CappedParser(_FakeParser):
+    """Как zakupki.gov.ru: цена фильтруется на сервере, выдача обрезается по max_results."""
+
+    def search_tenders_rss(self, **params):
+        self.rss_calls.append(params)
+        found = [
+            dict(t) for t in self.rss
+            if (not params.get('price_min') or t['price'] >= params['price_min'])
+            and (not params.get('price_max') or t['price'] <= params['price_max'])
+        ]
+        return found[:params['max_results']]
+
+
+def test_truncated_shared_query_refetched_with_price_and_cap_in_key():
+    # 60 дешёвых тендеров, дорогие — за лимитом общего запроса без цены
+    parser = _CappedParser(rss=(
+        [{'number': f'c{i}', 'price': 10_000} for i in range(60)]
+        + [{'number': f'e{i}', 'price': 900_000} for i in range(5)]
+    ))
+    pool = QueryPool(results_per_query=50)
+
+    async def run():
+        cheap = await pool.fetch(parser, **_params(price_max=100_000, max_results=10))
+        expensive = await pool.fetch(parser, **_params(price_min=500_000, max_results=10))
+        wide = await pool.fetch(parser, **_params(max_results=70))
+        return cheap, expensive, wide
+
+    cheap, expensive, wide = asyncio.run(run())
+    assert len(cheap) == 10
+    # Общий запрос упёрся в лимит 50 — дорогие перезапрошены с ценой на сервере
+    assert {t['number'] for t in expensive} == {f'e{i}' for i in range(5)}
+    assert parser.rss_calls[1]['price_min'] == 500_000
+    assert pool.get_stats()['narrowed'] == 1
+    # Фильтр с большим лимитом не получает обрезанный чужой результат
+    assert len(wide) == 65
+    assert parser.rss_calls[2]['max_results'] == 70
+
+
+def test_different_regions_are_separate_queries():
+    parser = _FakeParser(rss=[{'number': '1'}])
+    pool = QueryPool()
+
+    async def run():
+        await pool.fetch(parser, **_params(regions=['Москва']))
+        await pool.fetch(parser, **_params(regions=['Татарстан']))
+
+    asyncio.run(run())
+    assert len(parser.rss_calls) == 2
+
+
+def test_results_are_independent_copies():
+    parser = _FakeParser(rss=[{'number': '1', 'name': 'Бумага А4'}])
+    pool = QueryPool()
+
+    async def run():
+        first = await pool.fetch(parser, **_params())
+        first[0]['name'] = 'изменено фильтром'
+        return await pool.fetch(parser, **_params())
+
+    second = asyncio.run(run())
+    assert second[0]['name'] == 'Бумага А4'
+
+
+def test_merge_prefers_rss_and_counts_html_additions():
+    rss = [{'number': '1', 'source': 'rss'}]
+    html = [{'number': '1', 'source': 'html'}, {'number': '2', 'source': 'html'}]
+    merged, html_new = merge_search_results(rss, html)
+    assert [t['number'] for t in merged] == ['1', '2']
+    assert merged[0]['source'] == 'rss'
+    assert html_new == 1
+
+    merged, html_new = merge_search_results(RuntimeError('rss down'), html)
+    assert len(merged) == 2
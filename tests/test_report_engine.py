@@ -0,0 +1,86 @@
+"""
+Тесты потоковой генерации отчётов (TenderReportEngine).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.report_engine import TenderReportEngine
+
+
+class _FakeDB:
+    def __init__(self, tenders):
+        self.tenders = tenders
+        self.reads = 0
+
+    def _select(self, criteria, filter_name=None):
+        rows = [t for t in self.tenders if t['id'] >= criteria.get('min_id', 0)]
+        if filter_name is not None:
+            rows = [t for t in rows if t['filter_name'] == filter_name]
+        return sorted(rows, key=lambda t: -t['id'])
+
+    async def get_user_report_groups(self, user_id, criteria, max_rows):
+        newest = self._select(criteria)[:max_rows]
+        min_id = newest[-1]['id'] if len(self._select(criteria)) > max_rows else None
+        groups = {}
+        for t in newest:
+            group = groups.setdefault(t['filter_name'], {'filter_name': t['filter_name'], 'count': 0, 'last_id': 0})
+            group['count'] += 1
+            group['last_id'] = max(group['last_id'], t['id'])
+        return sorted(groups.values(), key=lambda g: -g['last_id']), min_id
+
+    async def iter_user_report_tenders(self, user_id, criteria, filter_name=None, sort_by='date_desc', batch_size=500):
+        rows = self._select(criteria, filter_name)
+        for i in range(0, len(rows), batch_size):
+            self.reads += 1
+            yield rows[i:i + batch_size]
+
+
+def _tender(i, filter_name):
+    return {'id': i, 'number': str(i), 'name': f'Тендер {i}', 'price': 1000.0 * i, 'filter_name': filter_name}
+
+
+def test_html_report_streamed_by_sections_and_cached(tmp_path):
+    db = _FakeDB([_tender(i, 'Мебель' if i % 2 else 'Связь') for i in range(1, 8)])
+    engine = TenderReportEngine(cache_dir=tmp_path, db=db)
+    engine.BATCH_SIZE = 2
+
+    async def run():
+        first = await engine.build(1, 'html', {'sort_by': 'date_desc'}, max_rows=5)
+        reads = db.reads
+        again = await engine.build(1, 'html', {'sort_by': 'date_desc'}, max_rows=5)
+        assert db.reads == reads
+        db.tenders.append(_tender(8, 'Связь'))
+        fresh = await engine.build(1, 'html', {'sort_by': 'date_desc'}, max_rows=5)
+        return first, again, fresh
+
+    first, again, fresh = asyncio.run(run())
+
+    html = first.path.read_text(encoding='utf-8')
+    assert first.count == 5 and not first.cached
+    assert html.count('class="tender-card"') == 5
+    assert '№ 2' not in html  # старше max_rows последних
+    assert html.index('📋 Мебель') < html.index('📋 Связь')  # секция с самым свежим тендером первой
+    assert html.rstrip().endswith('</html>')
+
+    assert again.cached and again.path == first.path
+    assert not fresh.cached and fresh.path != first.path
+    assert engine.get_stats()['cache_hits'] == 1
+
+
+def test_excel_report_written_in_batches(tmp_path):
+    from openpyxl import load_workbook
+
+    db = _FakeDB([_tender(i, 'Мебель') for i in range(1, 6)])
+    engine = TenderReportEngine(cache_dir=tmp_path, db=db)
+    engine.BATCH_SIZE = 2
+
+    report = asyncio.run(engine.build(1, 'excel'))
+
+    rows = list(load_workbook(report.path).active.iter_rows(values_only=True))
+    assert report.path.suffix == '.xlsx' and db.reads == 3
+    assert [row[1] for row in rows[1:6]] == [f'Тендер {i}' for i in range(5, 0, -1)]
+    assert rows[-1][:3] == ('Итого:', '5 тендеров', '15 000 ₽')
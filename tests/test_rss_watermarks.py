@@ -0,0 +1,194 @@
+"""
+Тесты инкрементального опроса RSS (rss_watermarks): окно от водяного
+знака, остановка разбора фида на обработанных записях, продвижение
+водяных знаков только после commit.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.query_pool import QueryPool
+from tender_sniper.rss_watermarks import RssWatermark, RssWatermarkStore
+
+NOW = datetime(2026, 10, 16, 12, 0)
+
+
+def _feed(entries):
+    """RSS в формате zakupki.gov.ru: [(номер, pubDate UTC)], новые сверху."""
+    items = ''.join(
+        '<item>'
+        f'<title>Электронный аукцион № {number}</title>'
+        f'<link>/epz/order/notice/ea20/view/common-info.html?regNumber={number}</link>'
+        '<description>&lt;strong&gt;Наименование объекта закупки: &lt;/strong&gt;'
+        f'Поставка бумаги {number}&lt;br/&gt;</description>'
+        f'<pubDate>{format_datetime(published.replace(tzinfo=timezone.utc))}</pubDate>'
+        '</item>'
+        for number, published in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'.encode('utf-8')
+
+
+def test_full_scan_then_incremental_window():
+    store = RssWatermarkStore(persistent=False)
+    key = store.make_key(('бумага',))
+
+    async def run():
+        first = await store.begin(key, now=NOW)
+        first.fetched = True
+        first.observe('2', NOW - timedelta(hours=1))
+        first.observe('1', NOW - timedelta(days=2))
+        updates = {}
+        store.complete(first, updates, now=NOW)
+        before_commit = await store.begin(key, now=NOW)
+        await store.commit(updates)
+        second = await store.begin(key, now=NOW + timedelta(minutes=5))
+        rescan = await store.begin(key, now=NOW + store.FULL_RESCAN_INTERVAL * 1.3)
+        return first, before_commit, second, rescan
+
+    first, before_commit, second, rescan = asyncio.run(run())
+    assert first.full and before_commit.full  # без commit окно не сдвигается
+    assert not second.full
+    assert second.since == NOW - timedelta(hours=1) - store.OVERLAP
+    assert set(second.seen) == {'2'}  # старше окна перекрытия не храним
+    # publishDateFrom по МСК, но не шире окна фильтра
+    assert second.date_from('13.10.2026') == '16.10.2026'
+    assert second.date_from('17.10.2026') == '17.10.2026'
+    assert rescan.full
+    assert store.get_stats()['full_scans'] == 3
+
+
+def test_parser_stops_at_processed_entries():
+    from src.parsers.zakupki_rss_parser import ZakupkiRSSParser
+
+    feed = _feed([
+        ('3', NOW - timedelta(minutes=10)),
+        ('2', NOW - timedelta(hours=1)),
+        ('1', NOW - timedelta(days=1)),
+    ])
+    watermark = RssWatermark(
+        'wm:test', since=NOW - timedelta(hours=4),
+        seen={'2': (NOW - timedelta(hours=1)).isoformat()},
+    )
+    tenders = ZakupkiRSSParser()._parse_rss_feed(feed, 50, None, watermark)
+
+    assert [t['number'] for t in tenders] == ['3']
+    assert watermark.fetched and watermark.bytes == len(feed)
+    assert watermark.skipped_seen == 1 and watermark.stopped_early
+    assert watermark.newest == NOW - timedelta(minutes=10)
+
+
+class _FakeParser:
+    def __init__(self):
+        self.rss_calls = []
+
+    def search_tenders_rss(self, watermark=None, **params):
+        self.rss_calls.append(params)
+        watermark.fetched = True
+        if not watermark.full:
+            return []  # тендер 1 уже разобран в прошлом цикле
+        watermark.observe('1', datetime.utcnow())
+        return [{'number': '1', 'price': 100}]
+
+    def search_tenders_html(self, **params):
+        return [{'number': '1'}, {'number': '2'}]
+
+
+def test_pool_narrows_window_after_commit():
+    store = RssWatermarkStore(persistent=False)
+    parser = _FakeParser()
+    params = dict(keywords='бумага', regions=['Москва'], date_from='01.01.2026')
+
+    async def run():
+        first = QueryPool(watermarks=store)
+        await first.fetch(parser, **params)
+        await first.commit_watermarks()
+        second = QueryPool(watermarks=store)
+        results = await second.fetch(parser, **params)
+        return second, results
+
+    second, results = asyncio.run(run())
+    assert parser.rss_calls[0]['date_from'] == '01.01.2026'
+    assert parser.rss_calls[1]['date_from'] != '01.01.2026'
+    assert second.get_stats()['incremental'] == 1
+    # HTML не возвращает уже разобранные через RSS номера
+    assert [t['number'] for t in results] == ['2']
+
+
+class _FeedParser:
+    """RSS с окном водяного знака: [(номер, pubDate)], новые сверху."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.rss_calls = []
+
+    def search_tenders_rss(self, watermark=None, **params):
+        self.rss_calls.append(watermark.full)
+        watermark.fetched = True
+        out = []
+        for number, published in self.entries:
+            if watermark.is_before_window(published):
+                break
+            if watermark.is_seen(number, published):
+                continue
+            watermark.observe(number, published)
+            out.append({'number': number})
+        return out
+
+    def search_tenders_html(self, **params):
+        return []
+
+
+def _cycle(store, parser, consumers, report=None):
+    """Цикл мониторинга: fetch от каждого фильтра, итог фильтров, commit."""
+    async def run():
+        pool = QueryPool(watermarks=store)
+        results = {c: await pool.fetch(parser, keywords='бумага', consumer=c) for c in consumers}
+        if report:
+            report(pool)
+        await pool.commit_watermarks()
+        return {c: [t['number'] for t in r] for c, r in results.items()}
+    return asyncio.run(run())
+
+
+def test_undelivered_tender_parsed_again_next_cycle():
+    store = RssWatermarkStore(persistent=False)
+    now = datetime.utcnow()
+    parser = _FeedParser([('2', now - timedelta(minutes=5)), ('1', now - timedelta(hours=8))])
+
+    first = _cycle(store, parser, [10], report=lambda pool: pool.withhold(10, ['1']))
+    second = _cycle(store, parser, [10])
+    third = _cycle(store, parser, [10])
+
+    assert first == {10: ['2', '1']}
+    # Тендер 1 не доставлен (квота/ошибка отправки): окно не ушло дальше его pubDate
+    assert second == {10: ['1']}
+    assert third == {10: []}
+
+
+def test_failed_consumer_keeps_watermark():
+    store = RssWatermarkStore(persistent=False)
+    parser = _FeedParser([('1', datetime.utcnow() - timedelta(minutes=5))])
+
+    _cycle(store, parser, [10, 11], report=lambda pool: pool.mark_incomplete(11))
+    assert _cycle(store, parser, [10, 11]) == {10: ['1'], 11: ['1']}
+    assert _cycle(store, parser, [10, 11]) == {10: [], 11: []}
+
+
+def test_new_consumer_gets_full_window():
+    store = RssWatermarkStore(persistent=False)
+    parser = _FeedParser([('1', datetime.utcnow() - timedelta(minutes=5))])
+
+    _cycle(store, parser, [10])
+    parser.rss_calls.clear()
+    joined = _cycle(store, parser, [10, 11])
+    after = _cycle(store, parser, [10, 11])
+
+    # Старый фильтр — инкрементальное окно, новый — полное отдельным запросом
+    assert joined == {10: [], 11: ['1']}
+    assert parser.rss_calls[:2] == [False, True]
+    assert after == {10: [], 11: []}
@@ -0,0 +1,149 @@
+"""
+Тесты write-behind записи в Google Sheets (GoogleSheetsSync.append_tender).
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.google_sheets_sync import COLUMN_DEFINITIONS, GoogleSheetsSync
+
+
+class _RateLimited(Exception):
+    code = 429
+
+
+class _FakeWorksheet:
+    def __init__(self, rate_limited=0):
+        self.rows = []
+        self.rate_limited = rate_limited
+        self.append_calls = 0
+        self.col_values_calls = 0
+
+    def row_values(self, index):
+        return self.rows[0] if self.rows else []
+
+    def update(self, range_name, values):
+        self.rows[:1] = values
+
+    def format(self, *args):
+        pass
+
+    def col_values(self, index):
+        self.col_values_calls += 1
+        return [row[0] for row in self.rows]
+
+    def append_rows(self, rows, value_input_option=None):
+        self.append_calls += 1
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise _RateLimited('Quota exceeded')
+        self.rows.extend(rows)
+
+
+class _FakeSpreadsheet:
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def worksheet(self, name):
+        return self._worksheet
+
+
+class _FakeClient:
+    def __init__(self, worksheet):
+        self.spreadsheet = _FakeSpreadsheet(worksheet)
+        self.open_calls = 0
+
+    def open_by_key(self, spreadsheet_id):
+        self.open_calls += 1
+        return self.spreadsheet
+
+
+def _sync(worksheet):
+    sync = GoogleSheetsSync(credentials_json='{}')
+    sync._client = _FakeClient(worksheet)
+    sync.FLUSH_DELAY = 0.01
+    sync.RATE_LIMIT_BASE_DELAY = 0.01
+    return sync
+
+
+def _append(sync, number, wait=True):
+    return sync.append_tender(
+        'sheet-id', {'number': number, 'name': f'Тендер {number}'}, {},
+        columns=['name'], sheet_name='Неделя', wait=wait
+    )
+
+
+def test_rows_coalesced_into_one_request():
+    worksheet = _FakeWorksheet()
+    worksheet.rows = [[COLUMN_DEFINITIONS['request_number'][0], COLUMN_DEFINITIONS['name'][0]], ['0115', 'Старый']]
+    sync = _sync(worksheet)
+
+    async def run():
+        results = await asyncio.gather(*(_append(sync, str(i)) for i in range(5)))
+        await _append(sync, '5', wait=False)
+        await sync.flush()
+        return results
+
+    assert asyncio.run(run()) == [True] * 5
+    day = datetime.now().strftime('%d')
+    assert [row[0] for row in worksheet.rows[2:]] == [f'{n:02d}{day}' for n in range(3, 9)]
+    assert worksheet.append_calls == 2
+    # Таблица открыта и строки посчитаны один раз, дальше — локальный счётчик
+    assert sync._client.open_calls == 1 and worksheet.col_values_calls == 1
+    assert sync.get_stats()['rows_written'] == 6
+
+
+def test_rate_limit_retried_in_background():
+    worksheet = _FakeWorksheet(rate_limited=2)
+    sync = _sync(worksheet)
+
+    async def run():
+        return await asyncio.gather(_append(sync, '1'), _append(sync, '2'))
+
+    assert asyncio.run(run()) == [True, True]
+    assert worksheet.append_calls == 3 and len(worksheet.rows) == 3  # заголовок + 2 строки
+    assert sync.get_stats()['rate_limited'] == 2
+
+    worksheet.rate_limited = 10
+    sync.RATE_LIMIT_RETRIES = 1
+    assert asyncio.run(_append(sync, '3')) is False
+    assert sync.get_stats()['rows_failed'] == 1
+
+
+def test_enqueued_rows_report_write_outcome():
+    worksheet = _FakeWorksheet(rate_limited=10)
+    sync = _sync(worksheet)
+    sync.RATE_LIMIT_RETRIES = 0
+
+    async def run():
+        futures = [
+            await sync.enqueue_tender('sheet-id', {'number': n}, {}, columns=['name'], sheet_name='Неделя')
+            for n in ('1', '2')
+        ]
+        flushed = await sync.flush('sheet-id')
+        return [f.result() for f in futures], flushed
+
+    results, flushed = asyncio.run(run())
+    # Экспорт не должен отмечать строки, которые не легли в таблицу
+    assert results == [False, False]
+    assert flushed == {('sheet-id', 'Неделя'): False}
+
+
+def test_cancelled_flush_fails_pending_rows():
+    sync = _sync(_FakeWorksheet())
+    sync.FLUSH_DELAY = 10
+
+    async def run():
+        future = await sync.enqueue_tender('sheet-id', {'number': '1'}, {}, columns=['name'], sheet_name='Неделя')
+        task = sync._buffers[('sheet-id', 'Неделя')].flush_task
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.wait([task])
+        return await future
+
+    assert asyncio.run(run()) is False
+    assert sync.get_stats()['rows_failed'] == 1
@@ -0,0 +1,40 @@
+"""
+Тесты агрегации rollup счётчиков уведомлений (tender_sniper/jobs/stats_rollup.py).
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.jobs.stats_rollup import aggregate_notifications, bucket_start
+
+
+def test_bucket_start():
+    moment = datetime(2026, 10, 16, 14, 37, 12, 500)
+
+    assert bucket_start(moment, 'hour') == datetime(2026, 10, 16, 14)
+    assert bucket_start(moment, 'day') == datetime(2026, 10, 16)
+
+
+def test_aggregate_by_dimensions():
+    rows = [
+        (1, datetime(2026, 10, 16, 9, 5), 10, 'automonitoring', 'pro'),
+        (2, datetime(2026, 10, 16, 9, 55), 10, 'instant_search', 'pro'),
+        (3, datetime(2026, 10, 16, 23, 0), None, None, None),
+    ]
+
+    counts = aggregate_notifications(rows)
+
+    day = datetime(2026, 10, 16)
+    assert counts[('day', 'total', '', day)] == 3
+    assert counts[('hour', 'total', '', datetime(2026, 10, 16, 9))] == 2
+    assert counts[('day', 'tier', 'pro', day)] == 2
+    assert counts[('day', 'tier', 'unknown', day)] == 1
+    assert counts[('day', 'filter', '10', day)] == 2
+    assert counts[('day', 'filter', 'none', day)] == 1
+    assert counts[('day', 'source', 'automonitoring', day)] == 2
+
+    only_days = aggregate_notifications(rows, ('day',), ('total',))
+    assert dict(only_days) == {('day', 'total', '', day): 3}
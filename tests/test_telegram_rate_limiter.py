@@ -0,0 +1,62 @@
+"""
+Тесты планировщика отправки Telegram: очереди по чатам без блокировки
+соседних чатов, глобальный лимит и пауза чата после RetryAfter.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tender_sniper.notifications.telegram_notifier import _TelegramRateLimiter
+
+
+def _run_sends(limiter, chats):
+    """Возвращает время завершения acquire для каждого (chat_id) в порядке вызова."""
+    async def run():
+        started = time.monotonic()
+        done = {}
+
+        async def one(i, chat_id):
+            await limiter.acquire(chat_id)
+            done[i] = time.monotonic() - started
+
+        await asyncio.gather(*[one(i, c) for i, c in enumerate(chats)])
+        return [done[i] for i in range(len(chats))]
+
+    return asyncio.run(run())
+
+
+def test_busy_chat_does_not_block_others():
+    limiter = _TelegramRateLimiter(global_rate=1000, per_chat_interval=0.1)
+    times = _run_sends(limiter, [1, 1, 1, 1, 2])
+
+    # Чат 1: слоты через 0.1с; чат 2 не ждёт очередь чата 1
+    assert times[3] >= 0.29
+    assert times[4] < 0.05
+
+
+def test_global_rate_limit():
+    limiter = _TelegramRateLimiter(global_rate=20, per_chat_interval=0.01)
+    limiter._tokens = 1.0
+    times = _run_sends(limiter, list(range(5)))
+
+    # 5 разных чатов, но глобально 20/с: последний ≈ через 4/20 с
+    assert 0.18 <= max(times) < 0.4
+
+
+def test_retry_after_pauses_only_that_chat():
+    limiter = _TelegramRateLimiter(global_rate=1000, per_chat_interval=0.01)
+    limiter.pause_chat(1, 0.2)
+    times = _run_sends(limiter, [1, 2])
+
+    assert times[0] >= 0.19
+    assert times[1] < 0.05
+
+    stats = limiter.get_stats()
+    assert stats['retry_after'] == 1
+    assert stats['acquired'] == 2
+    assert stats['queue_depth'] == 0
+    assert sum(stats['wait_histogram'].values()) == 2
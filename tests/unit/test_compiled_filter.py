@@ -0,0 +1,64 @@
+"""
+Unit тесты для CompiledFilter (tender_sniper/matching/compiled_filter.py)
+
+Тестируем:
+- Ключевые слова: границы слов, фразы, стоп-слова, транслитерация, синонимы
+- Корни ключевых слов (первичный отсев выдачи RSS)
+- Слова-исключения (семантика SmartMatcher._word_boundary_match)
+- Кэш по версии фильтра и сервисные тендеры
+"""
+
+import pytest
+from tender_sniper.matching.compiled_filter import compile_filter, is_service_tender
+
+
+@pytest.mark.unit
+class TestCompiledFilter:
+
+    def test_keyword_word_boundaries(self):
+        compiled = compile_filter(['фен', 'батарейка', 'мебель офисная'])
+
+        assert compiled.find_keyword('Поставка фен для салона') == 'фен'
+        assert compiled.find_keyword('Поставка фенацетина') is None
+        assert compiled.find_keyword('Поставка батарейки АА') is None  # длинное слово — по началу
+        assert compiled.find_keyword('Поставка батарейка АА') == 'батарейка'
+        assert compiled.find_keyword('Закупка: МЕБЕЛЬ ОФИСНАЯ') == 'мебель офисная'
+
+    def test_stop_words_translit_and_synonyms(self):
+        compiled = compile_filter(['поставка', 'linux', 'сервер'])
+
+        assert compiled.find_keyword('Поставка бумаги') is None
+        assert compiled.find_keyword('Лицензии Линукс') == 'linux'
+        assert compiled.find_keyword('ОС Astra Linux') == 'linux'
+        assert compiled.find_keyword('Серверное оборудование') == 'сервер'
+
+    def test_keyword_roots(self):
+        compiled = compile_filter(['разработка', 'ПО'])
+
+        assert compiled.has_keyword_root('Разработку системы')
+        assert not compiled.has_keyword_root('Разгрузка вагонов')
+        assert compiled.has_keyword_root('Лицензии на по')
+        assert not compile_filter([]).has_keyword_root('Любой тендер')
+
+    def test_exclude_keywords(self):
+        compiled = compile_filter(['ноутбук'], ['ТО', 'ремонт', ' '])
+
+        assert compiled.find_excluded('Ремонтные работы') == 'ремонт'
+        assert compiled.find_excluded('ТО автомобилей') == 'ТО'
+        assert compiled.find_excluded('Поставка ноутбуков') is None
+
+    def test_cached_per_filter_version(self):
+        first = compile_filter(['ноутбук'], ['ремонт'])
+
+        assert compile_filter(['ноутбук'], ['ремонт']) is first
+        assert compile_filter(['ноутбук', 'планшет'], ['ремонт']) is not first
+
+    def test_customer_and_services(self):
+        compiled = compile_filter(['картридж'], customer_keywords=['Больница'])
+
+        assert compiled.customer_matches('ГБУЗ ГОРОДСКАЯ БОЛЬНИЦА №1')
+        assert not compiled.customer_matches('Школа №5')
+        assert not compiled.allows_services
+        assert compile_filter(['ремонт картриджей']).allows_services
+        assert is_service_tender('Оказание услуг по заправке картриджей')
+        assert not is_service_tender('Поставка картриджей')
@@ -0,0 +1,222 @@
+"""
+Unit тесты для FilterIndex (инвертированный индекс фильтров).
+
+Тестируем:
+- Совпадение результатов с полным перебором match_against_filters
+- Отсечение по цене и региону до скоринга
+- Инкрементальное обновление (upsert / remove / sync)
+"""
+
+import json
+import random
+
+import pytest
+
+from tender_sniper.matching.filter_index import FilterIndex
+from tender_sniper.matching.smart_matcher import SmartMatcher
+
+
+@pytest.fixture
+def matcher():
+    return SmartMatcher()
+
+
+def _filter(filter_id, keywords, **extra):
+    data = {
+        'id': filter_id,
+        'name': f'Фильтр {filter_id}',
+        'keywords': json.dumps(keywords, ensure_ascii=False),
+        'exclude_keywords': json.dumps(extra.pop('exclude_keywords', []), ensure_ascii=False),
+    }
+    data.update(extra)
+    return data
+
+
+def _brute(matcher, tender, filters, min_score):
+    return {(m['filter_id'], m['score']) for m in matcher.match_against_filters(tender, filters, min_score)}
+
+
+def _indexed(index, tender, min_score):
+    return {(m['filter_id'], m['score']) for m in index.match(tender, min_score)}
+
+
+TENDERS = [
+    {'number': '1', 'name': 'Поставка компьютерного оборудования', 'description': 'Ноутбуки Dell и МФУ', 'price': 2_500_000, 'region': 'Москва'},
+    {'number': '2', 'name': 'Оказание услуг по техническому обслуживанию кондиционеров', 'description': '', 'price': 300_000, 'region': 'Республика Татарстан'},
+    {'number': '3', 'name': 'Поставка программного обеспечения 1С:Предприятие', 'description': 'лицензии ПО', 'price': 90_000, 'region': 'г. Санкт-Петербург'},
+    {'number': '4', 'name': 'Закупка бумаги для офисной техники', 'description': 'бумага А4', 'price': None, 'region': ''},
+    {'number': '5', 'name': 'Ремонт кровли здания школы', 'description': 'строительно-монтажные работы', 'price': 12_000_000, 'region': 'Свердловская область'},
+    {'number': '6', 'name': 'Поставка медицинских изделий: шприцы, перчатки', 'description': '', 'price': 55_000, 'region': 'Москва'},
+]
+
+KEYWORD_SETS = [
+    ['компьютер', 'ноутбук'],
+    ['ноутбуков'],
+    ['мфу'],
+    ['программное обеспечение'],
+    ['1с'],
+    ['кондиционер', 'сплит-система'],
+    ['техническое обслуживание кондиционеров'],
+    ['бумага'],
+    ['ремонт кровли'],
+    ['медицинские изделия', 'шприц'],
+    ['поставка'],
+    ['dell'],
+    ['лицензии'],
+    ['по'],
+    ['строительно-монтажные работы'],
+    ['канцелярия', 'ручки', 'карандаши'],
+]
+
+
+def _random_filters(count, seed=42):
+    rnd = random.Random(seed)
+    filters = []
+    for i in range(1, count + 1):
+        extra = {}
+        if rnd.random() < 0.3:
+            extra['price_min'] = rnd.choice([None, 50_000, 100_000, 1_000_000])
+        if rnd.random() < 0.3:
+            extra['price_max'] = rnd.choice([None, 100_000, 5_000_000])
+        if rnd.random() < 0.4:
+            extra['regions'] = json.dumps(
+                rnd.sample(['Москва', 'Татарстан', 'Санкт-Петербург', 'Уральский', 'Московская область'], 2),
+                ensure_ascii=False
+            )
+        if rnd.random() < 0.1:
+            extra['exclude_keywords'] = ['ремонт']
+        filters.append(_filter(i, rnd.choice(KEYWORD_SETS), **extra))
+    return filters
+
+
+@pytest.mark.unit
+class TestFilterIndexParity:
+    """Индекс не должен терять совпадения полного перебора."""
+
+    @pytest.mark.parametrize('min_score', [1, 10, 40, 75])
+    def test_same_matches_as_brute_force(self, matcher, min_score):
+        filters = _random_filters(120)
+        index = FilterIndex(matcher=matcher)
+        index.build(filters)
+
+        for tender in TENDERS:
+            assert _indexed(index, tender, min_score) == _brute(matcher, tender, filters, min_score)
+
+    def test_prunes_most_filters(self, matcher):
+        filters = _random_filters(200)
+        index = FilterIndex(matcher=matcher)
+        index.build(filters)
+
+        candidates = index.candidates(TENDERS[3])
+        assert len(candidates) < len(filters) / 2
+
+
+@pytest.mark.unit
+class TestFilterIndexPruning:
+    """Отсечение по цене и региону."""
+
+    def test_price_bounds(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([
+            _filter(1, ['компьютер'], price_max=1_000_000),
+            _filter(2, ['компьютер'], price_min=1_000_000),
+        ])
+        ids = {f['id'] for f in index.candidates(TENDERS[0])}
+        assert ids == {2}
+
+    def test_region_groups(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([
+            _filter(1, ['компьютер'], regions=['Москва']),
+            _filter(2, ['компьютер'], regions=['Татарстан']),
+            _filter(3, ['компьютер'], regions=['Центральный федеральный округ']),
+            _filter(4, ['компьютер']),
+        ])
+        ids = {f['id'] for f in index.candidates(TENDERS[0])}
+        assert ids == {1, 3, 4}
+
+    def test_empty_tender_region_rejected_for_regional_filters(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([
+            _filter(1, ['бумага'], regions=['Москва']),
+            _filter(2, ['бумага']),
+        ])
+        ids = {f['id'] for f in index.candidates(TENDERS[3])}
+        assert ids == {2}
+
+
+@pytest.mark.unit
+class TestFilterIndexUpdates:
+    """Инкрементальное обновление индекса."""
+
+    def test_upsert_and_remove(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([_filter(1, ['компьютер'])])
+        assert [f['id'] for f in index.candidates(TENDERS[0])] == [1]
+
+        index.upsert_filter(_filter(1, ['кондиционер']))
+        assert index.candidates(TENDERS[0]) == []
+        assert [f['id'] for f in index.candidates(TENDERS[1])] == [1]
+
+        index.remove_filter(1)
+        assert len(index) == 0
+        assert index.candidates(TENDERS[1]) == []
+        assert index.get_stats()['terms'] == 0
+
+    def test_sync_diff(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([_filter(1, ['компьютер']), _filter(2, ['бумага'])])
+
+        result = index.sync([
+            _filter(1, ['компьютер']),
+            _filter(3, ['кондиционер'], regions=['Татарстан']),
+        ])
+        assert result == {'added': 1, 'updated': 0, 'removed': 1}
+
+        result = index.sync([
+            _filter(1, ['ноутбук']),
+            _filter(3, ['кондиционер'], regions=['Татарстан']),
+        ])
+        assert result == {'added': 0, 'updated': 1, 'removed': 0}
+        assert {f['id'] for f in index.candidates(TENDERS[0])} == {1}
+        assert {f['id'] for f in index.candidates(TENDERS[1])} == {3}
+
+    def test_sync_skips_unchanged_versions(self, matcher, monkeypatch):
+        index = FilterIndex(matcher=matcher)
+        index.build([_filter(1, ['компьютер'], updated_at='2026-10-01T10:00:00')])
+        monkeypatch.setattr(index, '_fingerprint', lambda f: pytest.fail('fingerprint для той же версии'))
+        assert index.sync([_filter(1, ['компьютер'], updated_at='2026-10-01T10:00:00')]) == {
+            'added': 0, 'updated': 0, 'removed': 0,
+        }
+
+    def test_refresh_keeps_user_fields(self, matcher):
+        index = FilterIndex(matcher=matcher)
+        index.build([_filter(1, ['компьютер'], telegram_id=42)])
+        index.refresh_filter(_filter(1, ['кондиционер']))
+        assert [f['telegram_id'] for f in index.candidates(TENDERS[1])] == [42]
+        assert index.candidates(TENDERS[0]) == []
+
+    def test_batch_match_uses_process_index_without_list(self, matcher, monkeypatch):
+        from tender_sniper.matching import filter_index
+
+        monkeypatch.setattr(filter_index, '_filter_index', None)
+        index = filter_index.get_filter_index()
+        index.sync([_filter(1, ['компьютер']), _filter(2, ['бумага'])])
+
+        compiled = []
+        monkeypatch.setattr(index, '_compile_terms', lambda f: compiled.append(f['id']) or ([], False))
+        results = matcher.batch_match(TENDERS, min_score=20)
+        assert compiled == []
+        assert set(results) == {'1', '4'}
+
+    def test_batch_match_with_list_keeps_process_index(self, matcher, monkeypatch):
+        from tender_sniper.matching import filter_index
+
+        monkeypatch.setattr(filter_index, '_filter_index', None)
+        index = filter_index.get_filter_index()
+        index.sync([_filter(1, ['компьютер']), _filter(2, ['бумага'])])
+
+        # Подмножество фильтров не вытесняет остальные из общего индекса
+        results = matcher.batch_match(TENDERS, [_filter(2, ['бумага'])], min_score=20)
+        assert set(results) == {'4'}
+        assert len(index) == 2
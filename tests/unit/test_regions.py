@@ -6,6 +6,7 @@ Unit тесты для модуля regions.py
 - Парсинг множественных регионов через запятую
 - Получение регионов по ФО
 - Определение ФО по региону
+- ID регионов и битовые маски фильтров
 """
 
 import pytest
@@ -18,7 +19,11 @@ from tender_sniper.regions import (
     get_all_federal_districts,
     format_regions_list,
     FEDERAL_DISTRICTS,
-    ALL_REGIONS
+    ALL_REGIONS,
+    REGION_IDS,
+    compile_regions,
+    normalize_region,
+    resolve_region_id,
 )
 
 
@@ -288,3 +293,25 @@ class TestEdgeCases:
         recognized, unrecognized = parse_regions_input("Москва, 12345, Санкт-Петербург")
         assert len(recognized) == 2
         assert "12345" in unrecognized
+
+
+@pytest.mark.unit
+class TestRegionIds:
+    """Тесты id регионов и битсетов фильтров."""
+
+    def test_resolve_region_id(self):
+        assert resolve_region_id("Москва") == REGION_IDS["Москва"]
+        assert resolve_region_id("ЧЕЛЯБИНСКАЯ ОБЛАСТЬ КОРКИНСКИЙ") == REGION_IDS["Челябинская область"]
+        assert resolve_region_id("ул. Ленина") is None
+
+    def test_longest_canonical_wins(self):
+        """«Томская область» не распознаётся как вложенная «Омская область»."""
+        assert normalize_region("томская область, г. томск") == "Томская область"
+
+    def test_district_expanded_to_mask(self):
+        compiled = compile_regions(("Центральный федеральный округ", "спб", "Атлантида"))
+        for region in FEDERAL_DISTRICTS["Центральный"]["regions"]:
+            assert compiled.mask >> REGION_IDS[region] & 1
+        assert compiled.mask >> REGION_IDS["Санкт-Петербург"] & 1
+        assert not compiled.mask >> REGION_IDS["Омская область"] & 1
+        assert compiled.unresolved == ("атлантида",)